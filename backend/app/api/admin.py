@@ -2,10 +2,20 @@
 Admin dashboard API routes.
 """
 
-from fastapi import APIRouter, HTTPException, status
-from app.models.schemas import AdminStats, APIResponse
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import PlainTextResponse, StreamingResponse, FileResponse
+from app.models.schemas import AdminStats, APIResponse, AuditAppendRequest
 from app.services.database import DatabaseService
 from app.services.admin_service import AdminService
+from app.services.aggregation_service import aggregation_service
+from app.services.bulk_writer import bulk_writer, BULK_TABLES
+from app.services.audit_service import audit_service
+from app.services.export_service import (
+    export_service, normalize_export, export_filename, export_media_type
+)
+from app.services.upstream_health import upstream_health
+from app.core.auth_executor import password_hasher, token_cache
+from app.core.security import get_current_admin
 from typing import Optional
 
 admin_router = APIRouter()
@@ -119,57 +129,201 @@ async def get_sustainability_trends():
     )
 
 
-@admin_router.get("/export/farms", response_model=APIResponse)
-async def export_farm_data(format: str = "csv"):
+def _streaming_export(kind: str, format: str, gzip: bool) -> StreamingResponse:
+    """Validate an export request and stream it batch by batch."""
+    try:
+        fmt = normalize_export(kind, format)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return StreamingResponse(
+        export_service.stream_export(kind, fmt, compress=gzip),
+        media_type=export_media_type(fmt, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(kind, fmt, gzip)}"'}
+    )
+
+
+@admin_router.get("/export/farms", response_class=StreamingResponse)
+async def export_farm_data(format: str = "csv", gzip: bool = False):
     """
-    Export aggregated farm data.
+    Stream aggregated farm data.
     
     Args:
-        format: Export format (csv, json)
+        format: Export format (csv, json/ndjson, parquet)
+        gzip: Gzip-compress the download
         
     Returns:
-        Download link for aggregated farm data
+        Streamed export, fetched and encoded one page at a time
+    """
+    return _streaming_export("farms", format, gzip)
+
+
+@admin_router.get("/export/recommendations", response_class=StreamingResponse)
+async def export_recommendation_data(format: str = "csv", gzip: bool = False):
     """
-    if format not in ["csv", "json"]:
+    Stream aggregated recommendation data.
+    
+    Args:
+        format: Export format (csv, json/ndjson, parquet)
+        gzip: Gzip-compress the download
+        
+    Returns:
+        Streamed export, fetched and encoded one page at a time
+    """
+    return _streaming_export("recommendations", format, gzip)
+
+
+def _get_export_job(job_id: str):
+    """Look up an export job or raise 404."""
+    job = export_service.get_job(job_id)
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Format must be 'csv' or 'json'"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Export job {job_id} not found"
         )
+    return job
+
+
+@admin_router.post("/export/jobs", response_model=APIResponse)
+async def start_export_job(kind: str, format: str = "csv", gzip: bool = True,
+                           current_user: dict = Depends(get_current_admin)):
+    """
+    Start a background export for large tables.
     
-    admin_service = AdminService()
-    export_data = await admin_service.export_farm_data(format)
+    Args:
+        kind: Export kind (farms, recommendations)
+        format: Export format (csv, json/ndjson, parquet)
+        gzip: Gzip-compress the output file
+        current_user: Authenticated admin
+        
+    Returns:
+        Job status; poll it until a download link is available
+    """
+    try:
+        fmt = normalize_export(kind, format)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    job = export_service.start_job(kind, fmt, compress=gzip)
     
     return APIResponse(
         success=True,
-        message=f"Farm data exported in {format} format successfully",
-        data=export_data
+        message=f"Export job started for {kind}",
+        data=job.to_dict()
     )
 
 
-@admin_router.get("/export/recommendations", response_model=APIResponse)
-async def export_recommendation_data(format: str = "csv"):
+@admin_router.get("/export/jobs", response_model=APIResponse)
+async def list_export_jobs(current_user: dict = Depends(get_current_admin)):
     """
-    Export aggregated recommendation data.
+    List background export jobs.
     
     Args:
-        format: Export format (csv, json)
+        current_user: Authenticated admin
         
     Returns:
-        Download link for aggregated recommendation data
+        Jobs on this worker, newest first
     """
-    if format not in ["csv", "json"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Format must be 'csv' or 'json'"
-        )
+    return APIResponse(
+        success=True,
+        message="Export jobs retrieved successfully",
+        data=export_service.list_jobs()
+    )
+
+
+@admin_router.get("/export/jobs/{job_id}", response_model=APIResponse)
+async def get_export_job(job_id: str, current_user: dict = Depends(get_current_admin)):
+    """
+    Get a background export job's progress.
     
-    admin_service = AdminService()
-    export_data = await admin_service.export_recommendation_data(format)
+    Args:
+        job_id: Export job ID
+        current_user: Authenticated admin
+        
+    Returns:
+        Job status, rows written and download link once completed
+    """
+    job = _get_export_job(job_id)
+    
+    return APIResponse(
+        success=True,
+        message=f"Export job is {job.status}",
+        data=job.to_dict()
+    )
+
+
+@admin_router.post("/export/jobs/{job_id}/resume", response_model=APIResponse)
+async def resume_export_job(job_id: str, current_user: dict = Depends(get_current_admin)):
+    """
+    Resume a failed or cancelled export job from its last written batch.
+    
+    Args:
+        job_id: Export job ID
+        current_user: Authenticated admin
+        
+    Returns:
+        Job status
+    """
+    _get_export_job(job_id)
+    try:
+        job = export_service.resume_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    return APIResponse(
+        success=True,
+        message=f"Export job resumed after {job.rows} rows",
+        data=job.to_dict()
+    )
+
+
+@admin_router.delete("/export/jobs/{job_id}", response_model=APIResponse)
+async def delete_export_job(job_id: str, current_user: dict = Depends(get_current_admin)):
+    """
+    Cancel an export job and delete its file.
+    
+    Args:
+        job_id: Export job ID
+        current_user: Authenticated admin
+        
+    Returns:
+        Deletion confirmation
+    """
+    _get_export_job(job_id)
+    export_service.delete_job(job_id)
     
     return APIResponse(
         success=True,
-        message=f"Recommendation data exported in {format} format successfully",
-        data=export_data
+        message="Export job deleted successfully",
+        data={"job_id": job_id}
+    )
+
+
+@admin_router.get("/export/jobs/{job_id}/download")
+async def download_export_job(job_id: str, current_user: dict = Depends(get_current_admin)):
+    """
+    Download a completed export job's file.
+    
+    Supports HTTP Range requests, so interrupted downloads can be resumed.
+    
+    Args:
+        job_id: Export job ID
+        current_user: Authenticated admin
+        
+    Returns:
+        Export file
+    """
+    job = _get_export_job(job_id)
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status}"
+        )
+    
+    return FileResponse(
+        job.path,
+        media_type=export_media_type(job.format, job.compress),
+        filename=job.filename
     )
 
 
@@ -210,16 +364,20 @@ async def get_federated_learning_status():
 
 
 @admin_router.get("/audit-logs", response_model=APIResponse)
-async def get_audit_logs(limit: int = 100, offset: int = 0):
+async def get_audit_logs(limit: int = 100, cursor: Optional[int] = None, round_number: Optional[int] = None):
     """
     Get audit logs for federated learning updates.
     
+    Pages newest first by chain position; pass the returned `next_cursor` to
+    get the next page.
+    
     Args:
         limit: Number of logs to retrieve
-        offset: Number of logs to skip
+        cursor: next_cursor from the previous page
+        round_number: Only logs for this federated learning round
         
     Returns:
-        Audit logs with hash chain verification
+        Audit logs with the stored hash chain verification status
     """
     if limit > 1000:
         raise HTTPException(
@@ -228,10 +386,238 @@ async def get_audit_logs(limit: int = 100, offset: int = 0):
         )
     
     admin_service = AdminService()
-    audit_logs = await admin_service.get_audit_logs(limit, offset)
+    audit_logs = await admin_service.get_audit_logs(limit, cursor, round_number)
     
     return APIResponse(
         success=True,
         message="Audit logs retrieved successfully",
         data=audit_logs
-    )
\ No newline at end of file
+    )
+
+
+@admin_router.post("/audit-logs", response_model=APIResponse)
+async def append_audit_logs(request: AuditAppendRequest, current_user: dict = Depends(get_current_admin)):
+    """
+    Append federated learning updates to the audit hash chain.
+    
+    Args:
+        request: Entries (round number and update hash) in order
+        current_user: Authenticated admin
+        
+    Returns:
+        The chained entries with their positions and hashes
+    """
+    try:
+        entries = await audit_service.append([entry.dict() for entry in request.entries])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return APIResponse(
+        success=True,
+        message=f"{len(entries)} audit entries appended",
+        data=entries
+    )
+
+
+@admin_router.post("/audit-logs/verify", response_model=APIResponse)
+async def verify_audit_logs(full: bool = False, current_user: dict = Depends(get_current_admin)):
+    """
+    Verify the audit hash chain.
+    
+    Args:
+        full: Re-verify from the first entry instead of the last checkpoint
+        current_user: Authenticated admin
+        
+    Returns:
+        Verification status and where the chain breaks, if it does
+    """
+    result = await audit_service.verify(full=full)
+    
+    return APIResponse(
+        success=result["status"] == "valid",
+        message=f"Audit chain is {result['status']}",
+        data=result
+    )
+
+
+@admin_router.get("/audit-logs/verification", response_model=APIResponse)
+async def get_audit_verification_status():
+    """
+    Get the stored audit chain checkpoint without verifying.
+    
+    Returns:
+        Checkpoint, chain head position and the last verification result
+    """
+    return APIResponse(
+        success=True,
+        message="Audit verification status retrieved successfully",
+        data=await audit_service.get_status()
+    )
+
+
+@admin_router.get("/aggregates/status", response_model=APIResponse)
+async def get_aggregates_status():
+    """
+    Get aggregate cache and reconciliation job status.
+    
+    Returns:
+        Cache statistics and the result of the last reconciliation run
+    """
+    return APIResponse(
+        success=True,
+        message="Aggregate status retrieved successfully",
+        data=aggregation_service.get_stats()
+    )
+
+
+@admin_router.post("/aggregates/reconcile", response_model=APIResponse)
+async def reconcile_aggregates(current_user: dict = Depends(get_current_admin)):
+    """
+    Rebuild the admin summary tables from the base tables now.
+    
+    The rebuild locks the summary tables, so only admins may trigger it.
+    
+    Args:
+        current_user: Authenticated admin
+        
+    Returns:
+        Number of drifted rows corrected per summary table
+    """
+    result = await aggregation_service.reconcile()
+    
+    return APIResponse(
+        success=True,
+        message="Aggregates reconciled successfully",
+        data=result
+    )
+
+
+@admin_router.get("/auth-stats", response_model=APIResponse)
+async def get_auth_stats():
+    """
+    Get authentication execution layer statistics.
+    
+    Returns:
+        bcrypt worker pool load and verified-token cache hit rate
+    """
+    return APIResponse(
+        success=True,
+        message="Authentication statistics retrieved successfully",
+        data={"password_pool": password_hasher.get_stats(), "token_cache": token_cache.get_stats()}
+    )
+
+
+@admin_router.get("/bulk-writes/status", response_model=APIResponse)
+async def get_bulk_write_status():
+    """
+    Get bulk write pipeline statistics.
+    
+    Returns:
+        Rows buffered per table, rows and batches written, retries and requeues
+    """
+    return APIResponse(
+        success=True,
+        message="Bulk write status retrieved successfully",
+        data=bulk_writer.get_stats()
+    )
+
+
+@admin_router.get("/bulk-writes/dead-letters", response_model=APIResponse)
+async def get_bulk_write_dead_letters(table: Optional[str] = None,
+                                      current_user: dict = Depends(get_current_admin)):
+    """
+    Get rows the database rejected permanently (constraint or data errors).
+    
+    Args:
+        table: Only this table (default: all)
+        current_user: Authenticated admin
+        
+    Returns:
+        Rejected rows per table with their error
+    """
+    if table is not None and table not in BULK_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Table must be one of: {', '.join(BULK_TABLES)}"
+        )
+    
+    return APIResponse(
+        success=True,
+        message="Bulk write dead letters retrieved successfully",
+        data=bulk_writer.get_dead_letters(table)
+    )
+
+
+@admin_router.post("/bulk-writes/flush", response_model=APIResponse)
+async def flush_bulk_writes(current_user: dict = Depends(get_current_admin)):
+    """
+    Write every buffered record now.
+    
+    Args:
+        current_user: Authenticated admin
+        
+    Returns:
+        Number of rows written and what is still buffered
+    """
+    written = await bulk_writer.flush()
+    
+    return APIResponse(
+        success=True,
+        message=f"Flushed {written} buffered rows",
+        data={"written": written, "buffered": bulk_writer.get_stats()["buffered"]}
+    )
+
+
+@admin_router.get("/upstream-health", response_model=APIResponse)
+async def get_upstream_health():
+    """
+    Get circuit breaker state for government portal scrapers.
+    
+    Returns:
+        Per-source breaker state, failure counters and adaptive timeouts
+    """
+    return APIResponse(
+        success=True,
+        message="Upstream health retrieved successfully",
+        data=upstream_health.get_stats()
+    )
+
+
+@admin_router.get("/upstream-health/metrics", response_class=PlainTextResponse)
+async def get_upstream_health_metrics():
+    """
+    Export circuit breaker state in Prometheus text format.
+    
+    Returns:
+        Prometheus exposition text
+    """
+    return PlainTextResponse(upstream_health.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@admin_router.post("/upstream-health/{source}/reset", response_model=APIResponse)
+async def reset_upstream_breaker(source: str, current_user: dict = Depends(get_current_admin)):
+    """
+    Force a source's circuit breaker closed (use "all" for every source).
+    
+    Args:
+        source: Upstream source name (agmarknet, data_gov, enam)
+        current_user: Authenticated admin
+        
+    Returns:
+        Number of breakers reset
+    """
+    reset = upstream_health.reset(None if source == "all" else source)
+    if not reset and source != "all":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No circuit breaker tracked for {source}"
+        )
+    
+    return APIResponse(
+        success=True,
+        message=f"Reset {reset} circuit breaker(s)",
+        data={"reset": reset, "sources": upstream_health.get_stats()}
+    )
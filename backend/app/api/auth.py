@@ -7,8 +7,9 @@ from app.models.schemas import (
     FarmerRegister, FarmerLogin, TokenResponse, APIResponse
 )
 from app.core.security import (
-    create_farmer_token, get_password_hash, verify_password, get_current_user
+    create_farmer_token, hash_password_async, verify_password_async, get_current_user
 )
+from app.core.auth_executor import password_hasher
 from app.services.database import DatabaseService
 import uuid
 
@@ -33,31 +34,31 @@ async def register_farmer(farmer_data: FarmerRegister):
         db = DatabaseService()
         
         # Check if phone number already exists
-        existing_farmer = db.supabase.table("farmers").select("id").eq("phone", farmer_data.phone).execute()
-        if existing_farmer.data:
+        existing_farmer = await db.get_farmer_by_phone(farmer_data.phone)
+        if existing_farmer:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Phone number already registered"
             )
         
-        # Hash the password
-        hashed_password = get_password_hash(farmer_data.password)
+        # Hash the password (on the bcrypt worker pool)
+        hashed_password = await hash_password_async(farmer_data.password)
         
         # Insert new farmer into database
-        farmer_result = db.supabase.table("farmers").insert({
+        farmer = await db.create_farmer({
             "name": farmer_data.name,
             "phone": farmer_data.phone,
             "password": hashed_password,
             "language": farmer_data.language  # Now it's a string directly
-        }).execute()
+        })
         
-        if not farmer_result.data:
+        if not farmer:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create farmer account"
             )
         
-        farmer_id = farmer_result.data[0]['id']
+        farmer_id = farmer['id']
         
         # Create access token
         access_token = create_farmer_token(farmer_id, farmer_data.phone)
@@ -95,18 +96,16 @@ async def login_farmer(login_data: FarmerLogin):
         db = DatabaseService()
         
         # Find farmer by phone number
-        result = db.supabase.table("farmers").select("*").eq("phone", login_data.phone).execute()
+        farmer = await db.get_farmer_by_phone(login_data.phone)
         
-        if not result.data:
+        if not farmer:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid phone number or password"
             )
         
-        farmer = result.data[0]
-        
-        # Verify password
-        if not verify_password(login_data.password, farmer['password']):
+        # Verify password (on the bcrypt worker pool)
+        if not await verify_password_async(login_data.password, farmer['password']):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid phone number or password"
@@ -114,6 +113,10 @@ async def login_farmer(login_data: FarmerLogin):
         
         farmer_id = farmer['id']
         
+        # Upgrade hashes made with a different BCRYPT_ROUNDS while the password is at hand
+        if password_hasher.needs_rehash(farmer['password']):
+            await db.update_farmer(farmer_id, {"password": await hash_password_async(login_data.password)})
+        
         # Create access token
         access_token = create_farmer_token(farmer_id, farmer['phone'])
         
@@ -148,16 +151,14 @@ async def get_current_farmer(current_user: dict = Depends(get_current_user)):
         farmer_id = current_user.get("user_id")
         
         # Get farmer details
-        farmer_result = db.supabase.table("farmers").select("*").eq("id", farmer_id).execute()
+        farmer = await db.get_farmer_by_id(farmer_id)
         
-        if not farmer_result.data:
+        if not farmer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Farmer not found"
             )
         
-        farmer = farmer_result.data[0]
-        
         # Get farm details for this farmer
         farm = await db.get_farm_by_farmer_id(farmer_id)
         
@@ -11,12 +11,18 @@ from app.models.schemas import (
     CropRecommendationRequest, CropRecommendationResponse,
     CropRotationRequest, CropRotationResponse, APIResponse
 )
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_admin, get_optional_user
+from app.core.http_cache import cache_policy
 from app.services.database import DatabaseService
+from app.services.admin_service import AdminService
+from app.services.bulk_writer import bulk_writer, WriteBufferFullError
 from app.services.ml_service import MLService
 from app.services.xgboost_service import get_xgboost_service
 from app.services.production_ml_service import get_production_ml_service, predict_crop_recommendation, get_model_info
 from app.services.market_aware_ml_service import MarketAwareMLService
+from app.services.recommendation_table import (
+    recommendation_table, quantize, default_rainfall, default_npk, TEMPERATURE_STEP, HUMIDITY_STEP
+)
 import uuid
 import tempfile
 import shutil
@@ -47,6 +53,9 @@ def get_market_aware_ml_service():
 
 crops_router = APIRouter()
 
+# Model metadata only changes when a model is retrained and redeployed
+MODEL_INFO_CACHE_CONTROL = "public, max-age=3600"
+
 # Health check endpoint for crop service
 @crops_router.get("/health")
 async def crop_service_health():
@@ -131,6 +140,8 @@ class AdvancedCropResponse(BaseModel):
 
 class BatchCropRequest(BaseModel):
     inputs: List[AdvancedCropRequest]
+    save: bool = False  # record each prediction as a recommendation for the caller's farm
+    season: Optional[str] = None
 
 class ModelStatusResponse(BaseModel):
     is_trained: bool
@@ -202,39 +213,39 @@ async def get_ml_crop_recommendations(request: MLCropRecommendationRequest):
         xgb_service = get_xgboost_service()
         
         if xgb_service.is_ready():
-            # Fetch real weather data if not provided
-            current_weather = None
-            try:
-                from app.services.weather_service import weather_service
-                # Get coordinates for the district
-                from app.core.districts import get_district_coordinates
-                coordinates = get_district_coordinates(request.district)
-                
-                if coordinates:
-                    current_weather = await weather_service.get_current_weather(
-                        lat=coordinates['lat'], 
-                        lon=coordinates['lon']
-                    )
-            except Exception as e:
-                logger.warning(f"Could not fetch weather data: {e}")
-            
-            # Use real weather data or fallback to provided values
+            # Use provided weather or the district's weather, binned to the
+            # recommendation table grid (daily snapshot, live fetch as fallback)
             temperature = request.temperature
             humidity = request.humidity
             rainfall = request.rainfall
             
-            if current_weather:
-                temperature = temperature or current_weather.get('temperature', 25)
-                humidity = humidity or current_weather.get('humidity', 65)
-                # For rainfall, we might need historical data or seasonal averages
-                if not rainfall:
-                    # Use seasonal rainfall data based on district and season
-                    seasonal_rainfall = {
-                        'kharif': 800,  # Monsoon season
-                        'rabi': 200,    # Winter season
-                        'summer': 100   # Summer season
-                    }
-                    rainfall = seasonal_rainfall.get(request.season.lower(), 500)
+            if temperature is None or humidity is None:
+                district_weather = recommendation_table.weather_for(request.district)
+                if district_weather is None:
+                    try:
+                        from app.services.weather_service import weather_service
+                        from app.core.districts import get_district_coordinates
+                        coordinates = get_district_coordinates(request.district)
+                        
+                        if coordinates:
+                            current_weather = await weather_service.get_current_weather(
+                                coordinates['latitude'],
+                                coordinates['longitude']
+                            )
+                            district_weather = (
+                                quantize(current_weather.get('temperature', 25), TEMPERATURE_STEP),
+                                quantize(current_weather.get('humidity', 65), HUMIDITY_STEP)
+                            )
+                    except Exception as e:
+                        logger.warning(f"Could not fetch weather data: {e}")
+                
+                if district_weather:
+                    temperature = temperature if temperature is not None else district_weather[0]
+                    humidity = humidity if humidity is not None else district_weather[1]
+            
+            # For rainfall, use seasonal averages
+            if not rainfall:
+                rainfall = default_rainfall(request.season)
             
             # Use provided soil parameters or defaults based on soil type
             nitrogen = request.nitrogen
@@ -243,14 +254,7 @@ async def get_ml_crop_recommendations(request: MLCropRecommendationRequest):
             
             # If soil parameters not provided, use soil type defaults
             if not all([nitrogen, phosphorus, potassium]):
-                soil_defaults = {
-                    'Loamy Soil': {'N': 80, 'P': 45, 'K': 50},
-                    'Clay Soil': {'N': 90, 'P': 40, 'K': 45},
-                    'Sandy Soil': {'N': 60, 'P': 35, 'K': 40},
-                    'Black Soil': {'N': 85, 'P': 50, 'K': 55},
-                    'Red Soil': {'N': 70, 'P': 38, 'K': 42}
-                }
-                defaults = soil_defaults.get(request.soil_type, {'N': 75, 'P': 42, 'K': 48})
+                defaults = default_npk(request.soil_type)
                 nitrogen = nitrogen or defaults['N']
                 phosphorus = phosphorus or defaults['P'] 
                 potassium = potassium or defaults['K']
@@ -268,7 +272,21 @@ async def get_ml_crop_recommendations(request: MLCropRecommendationRequest):
                 'season': request.season.lower()
             }
             
-            # Get XGBoost predictions
+            # Default inputs on the grid are answered from the precomputed table
+            precomputed = recommendation_table.lookup(farm_data, xgb_service, top_k=5)
+            if precomputed is not None:
+                return [
+                    MLCropRecommendationResponse(
+                        crop=rec['crop'],
+                        confidence=rec['confidence'],
+                        expected_yield=rec['expected_yield'],
+                        suitability_score=rec['confidence'],
+                        profit_estimate=int(rec['expected_yield'] * 15000)
+                    )
+                    for rec in precomputed
+                ]
+            
+            # Custom soil-test inputs run the model
             xgb_recommendations = await xgb_service.get_crop_recommendations(
                 farm_data=farm_data,
                 top_k=5,
@@ -329,6 +347,59 @@ async def get_ml_crop_recommendations(request: MLCropRecommendationRequest):
         )
 
 
+@crops_router.get("/ml/recommend/table")
+async def get_recommendation_table_stats():
+    """
+    Get precomputed recommendation table statistics.
+
+    Returns:
+        Grid size, build time, district weather coverage and lookup hit rate
+    """
+    return {
+        "success": True,
+        "data": recommendation_table.get_stats()
+    }
+
+
+@crops_router.post("/ml/recommend/table/rebuild")
+async def rebuild_recommendation_table(
+    refresh_weather: bool = True,
+    current_user: dict = Depends(get_current_admin)
+):
+    """
+    Rebuild the precomputed recommendation table with the active XGBoost model.
+
+    A rebuild evaluates the whole grid, so only admins may trigger it and
+    only one may run at a time.
+
+    Args:
+        refresh_weather: Fetch district weather before rebuilding
+        current_user: Authenticated admin
+
+    Returns:
+        Table statistics after the rebuild
+    """
+    if recommendation_table.rebuilding:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Recommendation table rebuild already in progress"
+        )
+
+    try:
+        stats = await recommendation_table.rebuild(get_xgboost_service(), refresh_weather)
+        return {
+            "success": True,
+            "message": "Recommendation table rebuilt",
+            "data": stats
+        }
+    except Exception as e:
+        logger.error(f"Error rebuilding recommendation table: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rebuilding recommendation table: {str(e)}"
+        )
+
+
 @crops_router.post("/ml/market-enhanced-recommendations", response_model=List[MarketAwareCropRecommendationResponse])
 async def get_market_enhanced_crop_recommendations(request: MLCropRecommendationRequest):
     """
@@ -514,7 +585,8 @@ async def predict_yield(request: YieldPredictionRequest):
         )
 
 
-@crops_router.get("/ml/model-info", response_model=ModelInfoResponse)
+@crops_router.get("/ml/model-info", response_model=ModelInfoResponse,
+                  dependencies=[Depends(cache_policy(MODEL_INFO_CACHE_CONTROL))])
 async def get_model_info():
     """
     Get information about the ML model (XGBoost if available, fallback to Random Forest).
@@ -787,21 +859,37 @@ async def predict_crop_price(request: CropPriceRequest):
 
 
 @crops_router.get("/popular")
-async def get_popular_crops():
+async def get_popular_crops(limit: int = 10):
     """
     Get popular crops in Jharkhand based on adoption data.
     
+    Args:
+        limit: Number of crops to return (1-50)
+    
     Returns:
         List of popular crops with statistics
     """
-    # Mock data for popular crops
-    popular_crops = [
-        {"crop": "Rice", "adoption_rate": 75, "avg_yield": 4.5},
-        {"crop": "Wheat", "adoption_rate": 45, "avg_yield": 3.2},
-        {"crop": "Maize", "adoption_rate": 60, "avg_yield": 5.1},
-        {"crop": "Potato", "adoption_rate": 35, "avg_yield": 22.0},
-        {"crop": "Arhar", "adoption_rate": 25, "avg_yield": 1.8}
-    ]
+    if limit < 1 or limit > 50:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Limit must be between 1 and 50"
+        )
+    
+    try:
+        popular_crops = await AdminService().get_popular_crops_analysis(limit)
+    except Exception as e:
+        logger.error(f"Popular crop aggregates unavailable: {e}")
+        popular_crops = []
+    
+    if not popular_crops:
+        # No crop history recorded yet; fall back to regional baseline figures
+        popular_crops = [
+            {"crop": "Rice", "adoption_rate": 75, "avg_yield": 4.5},
+            {"crop": "Wheat", "adoption_rate": 45, "avg_yield": 3.2},
+            {"crop": "Maize", "adoption_rate": 60, "avg_yield": 5.1},
+            {"crop": "Potato", "adoption_rate": 35, "avg_yield": 22.0},
+            {"crop": "Arhar", "adoption_rate": 25, "avg_yield": 1.8}
+        ][:limit]
     
     return {
         "success": True,
@@ -814,7 +902,7 @@ async def get_popular_crops():
 # XGBoost ML Model Endpoints
 # ============================================================================
 
-@crops_router.get("/xgboost/info")
+@crops_router.get("/xgboost/info", dependencies=[Depends(cache_policy(MODEL_INFO_CACHE_CONTROL))])
 async def get_xgboost_model_info():
     """
     Get comprehensive information about the XGBoost model.
@@ -889,6 +977,7 @@ async def train_xgboost_model(
             tune_hyperparameters=training_params.tune_hyperparameters,
             cv_folds=training_params.cross_validation_folds
         )
+        recommendation_table.schedule_rebuild(xgb_service)
         
         return {
             "success": True,
@@ -1073,6 +1162,7 @@ async def load_xgboost_model(
         success = xgb_service.load_model(str(model_path))
         
         if success:
+            recommendation_table.schedule_rebuild(xgb_service)
             return {
                 "success": True,
                 "message": f"Model '{model_name}' loaded successfully",
@@ -1178,7 +1268,7 @@ async def predict_crop_advanced(request: AdvancedCropRequest):
 
 
 @crops_router.post("/ensemble/batch-predict")
-async def batch_predict_crops(request: BatchCropRequest):
+async def batch_predict_crops(request: BatchCropRequest, current_user: Optional[dict] = Depends(get_optional_user)):
     """
     Batch crop prediction for multiple input samples.
     
@@ -1187,12 +1277,32 @@ async def batch_predict_crops(request: BatchCropRequest):
     - Crop planning across different locations
     - Bulk recommendations for agricultural planning
     
+    With `save` set (authenticated farmers only), every successful prediction
+    is recorded as a recommendation for the farmer's farm through the
+    buffered bulk writer.
+    
     Args:
         request: List of soil and environmental parameters
+        current_user: Authenticated user, required when saving
         
     Returns:
         List of prediction results for each input
     """
+    farm = None
+    if request.save:
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to save predictions",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        farm = await DatabaseService().get_farm_by_farmer_id(current_user["user_id"])
+        if not farm:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Farm profile not found. Please create a farm profile first."
+            )
+    
     try:
         service = get_production_ml_service()
         
@@ -1209,13 +1319,31 @@ async def batch_predict_crops(request: BatchCropRequest):
         # Get batch predictions
         results = service.batch_predict(input_list)
         
-        return {
+        response = {
             "success": True,
             "total_predictions": len(results),
             "results": results,
             "timestamp": datetime.now().isoformat()
         }
         
+        if farm:
+            response["recommendation_ids"] = await bulk_writer.enqueue("recommendations", [
+                {
+                    "farm_id": farm["id"],
+                    "crops": result["top_recommendations"],
+                    "model_confidence": round(float(result["confidence"]), 4),
+                    "season": request.season
+                }
+                for result in results if "error" not in result
+            ])
+        
+        return response
+        
+    except WriteBufferFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1223,7 +1351,7 @@ async def batch_predict_crops(request: BatchCropRequest):
         )
 
 
-@crops_router.get("/ensemble/model-info")
+@crops_router.get("/ensemble/model-info", dependencies=[Depends(cache_policy(MODEL_INFO_CACHE_CONTROL))])
 async def get_ensemble_model_info():
     """
     Get detailed information about the ensemble models.
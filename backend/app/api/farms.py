@@ -4,13 +4,15 @@ Farm management API routes.
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
+import asyncio
 from datetime import datetime
 from app.models.schemas import (
     FarmProfile, FarmResponse, CropHistory, APIResponse
 )
 from app.core.security import get_current_user
 from app.services.database import DatabaseService
-from app.core.config import JHARKHAND_DISTRICTS, DISTRICT_COORDINATES
+from app.services.bulk_writer import bulk_writer, WriteBufferFullError
+from app.core.config import settings, JHARKHAND_DISTRICTS, DISTRICT_COORDINATES
 from app.core.districts import get_district_coordinates
 import uuid
 
@@ -49,8 +51,13 @@ async def create_farm_profile(
         db = DatabaseService()
         farmer_id = current_user["user_id"]
         
+        # Load farmer and any existing farm together (both are entity-cached)
+        existing_farmer, existing_farm = await asyncio.gather(
+            db.get_farmer_by_id(farmer_id),
+            db.get_farm_by_farmer_id(farmer_id)
+        )
+        
         # CRITICAL FIX: Ensure farmer record exists before creating farm
-        existing_farmer = await db.get_farmer_by_id(farmer_id)
         if not existing_farmer:
             print(f"⚠️  Farmer {farmer_id} not found in database, creating record...")
             # Create farmer record from JWT token data
@@ -74,8 +81,6 @@ async def create_farm_profile(
         else:
             print(f"✅ Farmer {farmer_id} exists in database")
         
-        # Check if farm already exists for this farmer
-        existing_farm = await db.get_farm_by_farmer_id(farmer_id)
         print(f"Existing farm found: {existing_farm is not None}")
         
         farm_id = str(uuid.uuid4())
@@ -221,7 +226,7 @@ async def add_crop_history(
         )
     
     crop_history_id = str(uuid.uuid4())
-    crop_history = await db.create_crop_history({
+    crop_history = await db.add_crop_history({
         "id": crop_history_id,
         "farm_id": farm["id"],
         "season": crop_data.season.value,
@@ -237,6 +242,59 @@ async def add_crop_history(
     )
 
 
+@farms_router.post("/crop-history/bulk", response_model=APIResponse)
+async def add_crop_history_bulk(
+    entries: List[CropHistory],
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Record many crop history entries (e.g. a multi-year import) in one request.
+    
+    Entries are buffered and written with multi-row inserts shortly after the
+    response, so they may take up to BULK_WRITE_FLUSH_INTERVAL seconds to appear.
+    
+    Args:
+        entries: Crop history entries
+        current_user: Current authenticated user
+        
+    Returns:
+        Ids of the accepted entries
+    """
+    db = DatabaseService()
+    farmer_id = current_user["user_id"]
+    
+    farm = await db.get_farm_by_farmer_id(farmer_id)
+    if not farm:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Farm profile not found. Please create a farm profile first."
+        )
+    
+    try:
+        ids = await bulk_writer.enqueue("crops_history", [
+            {
+                "farm_id": farm["id"],
+                "season": entry.season.value,
+                "crop": entry.crop,
+                "yield_per_acre": entry.yield_per_acre,
+                "year": entry.year
+            }
+            for entry in entries
+        ])
+    except WriteBufferFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(int(settings.BULK_WRITE_FLUSH_INTERVAL) + 1)}
+        )
+    
+    return APIResponse(
+        success=True,
+        message=f"{len(ids)} crop history entries accepted",
+        data={"ids": ids, "farm_id": farm["id"]}
+    )
+
+
 @farms_router.get("/crop-history", response_model=APIResponse)
 async def get_crop_history(current_user: dict = Depends(get_current_user)):
     """
@@ -295,8 +353,8 @@ async def delete_crop_history(
         )
     
     # Get farm to verify ownership
-    farm = await db.get_farm_by_id(crop_history["farm_id"])
-    if not farm or farm["farmer_id"] != farmer_id:
+    farm = await db.get_owned_farm(crop_history["farm_id"], farmer_id)
+    if not farm:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this crop history entry"
@@ -3,10 +3,13 @@ Financial services API routes.
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from app.models.schemas import FinanceResponse, APIResponse
+from fastapi.responses import StreamingResponse
+import asyncio
+from app.core.config import settings
+from app.models.schemas import FinanceResponse, FinanceScreenRequest, APIResponse
 from app.core.security import get_current_user
 from app.services.database import DatabaseService
-from app.services.finance_service import FinanceService
+from app.services.finance_service import finance_service
 
 finance_router = APIRouter()
 
@@ -23,12 +26,13 @@ async def get_financial_recommendations(current_user: dict = Depends(get_current
         Financial recommendations including loans, insurance, and subsidies
     """
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farmer and farm data
-    farmer = await db.get_farmer_by_id(farmer_id)
-    farm = await db.get_farm_by_farmer_id(farmer_id)
+    farmer, farm = await asyncio.gather(
+        db.get_farmer_by_id(farmer_id),
+        db.get_farm_by_farmer_id(farmer_id)
+    )
     
     if not farmer:
         raise HTTPException(
@@ -58,12 +62,13 @@ async def get_pm_kisan_status(current_user: dict = Depends(get_current_user)):
         PM-KISAN status and benefits information
     """
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farmer data
-    farmer = await db.get_farmer_by_id(farmer_id)
-    farm = await db.get_farm_by_farmer_id(farmer_id)
+    farmer, farm = await asyncio.gather(
+        db.get_farmer_by_id(farmer_id),
+        db.get_farm_by_farmer_id(farmer_id)
+    )
     
     if not farmer:
         raise HTTPException(
@@ -93,12 +98,13 @@ async def get_agriculture_loans(current_user: dict = Depends(get_current_user)):
         List of applicable agriculture loan schemes
     """
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farmer and farm data
-    farmer = await db.get_farmer_by_id(farmer_id)
-    farm = await db.get_farm_by_farmer_id(farmer_id)
+    farmer, farm = await asyncio.gather(
+        db.get_farmer_by_id(farmer_id),
+        db.get_farm_by_farmer_id(farmer_id)
+    )
     
     # Get loan options
     loans = await finance_service.get_agriculture_loans(farmer, farm)
@@ -122,12 +128,13 @@ async def get_crop_insurance(current_user: dict = Depends(get_current_user)):
         Available crop insurance schemes
     """
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farmer and farm data
-    farmer = await db.get_farmer_by_id(farmer_id)
-    farm = await db.get_farm_by_farmer_id(farmer_id)
+    farmer, farm = await asyncio.gather(
+        db.get_farmer_by_id(farmer_id),
+        db.get_farm_by_farmer_id(farmer_id)
+    )
     
     # Get insurance options
     insurance = await finance_service.get_crop_insurance(farmer, farm)
@@ -151,12 +158,13 @@ async def get_subsidies(current_user: dict = Depends(get_current_user)):
         List of applicable government subsidies
     """
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farmer and farm data
-    farmer = await db.get_farmer_by_id(farmer_id)
-    farm = await db.get_farm_by_farmer_id(farmer_id)
+    farmer, farm = await asyncio.gather(
+        db.get_farmer_by_id(farmer_id),
+        db.get_farm_by_farmer_id(farmer_id)
+    )
     
     # Get subsidy options
     subsidies = await finance_service.get_subsidies(farmer, farm)
@@ -192,7 +200,6 @@ async def calculate_projected_income(
         )
     
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farm data for location
@@ -220,12 +227,13 @@ async def get_microfinance_options(current_user: dict = Depends(get_current_user
         Microfinance and Self Help Group options
     """
     db = DatabaseService()
-    finance_service = FinanceService()
     farmer_id = current_user["user_id"]
     
     # Get farmer data
-    farmer = await db.get_farmer_by_id(farmer_id)
-    farm = await db.get_farm_by_farmer_id(farmer_id)
+    farmer, farm = await asyncio.gather(
+        db.get_farmer_by_id(farmer_id),
+        db.get_farm_by_farmer_id(farmer_id)
+    )
     
     # Get microfinance options
     microfinance = await finance_service.get_microfinance_options(farmer, farm)
@@ -234,4 +242,33 @@ async def get_microfinance_options(current_user: dict = Depends(get_current_user
         success=True,
         message="Microfinance options retrieved successfully",
         data=microfinance
-    )
\ No newline at end of file
+    )
+
+
+@finance_router.post("/screen", response_class=StreamingResponse)
+async def screen_members(
+    request: FinanceScreenRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Screen a member list for loan, insurance, subsidy and income-support eligibility.
+    
+    Args:
+        request: Member profiles (farmer_id, field_size, shg_member)
+        current_user: Current authenticated user
+        
+    Returns:
+        NDJSON stream: a "job" line, one "profile" line per member with its
+        eligible schemes and amounts, and a closing "summary" line
+    """
+    if len(request.profiles) > settings.FINANCE_SCREEN_MAX_PROFILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.FINANCE_SCREEN_MAX_PROFILES} profiles per request"
+        )
+    
+    profiles = [profile.dict() for profile in request.profiles]
+    return StreamingResponse(
+        finance_service.rules.stream(profiles, chunk_size=settings.FINANCE_SCREEN_CHUNK_SIZE),
+        media_type="application/x-ndjson"
+    )
@@ -3,8 +3,9 @@ Market data API routes.
 Enhanced with real-time government data scraping and caching.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from app.models.schemas import MarketPriceResponse, APIResponse
+from app.core.http_cache import cache_policy, payload_cache
 from app.services.market_service import MarketService
 from app.services.cache_service import market_cache
 from typing import Optional
@@ -13,8 +14,13 @@ import logging
 market_router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Cache-Control policies: prices follow the 15-minute market cache, analytics the 30-minute one
+PRICES_CACHE_CONTROL = "public, max-age=900"
+ANALYTICS_CACHE_CONTROL = "public, max-age=1800"
 
-@market_router.get("/prices/{district}/live", response_model=APIResponse)
+
+@market_router.get("/prices/{district}/live", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(PRICES_CACHE_CONTROL))])
 async def get_live_mandi_prices(
     district: str,
     crop: Optional[str] = None
@@ -57,6 +63,7 @@ async def get_live_mandi_prices(
 @market_router.get("/prices/{district}", response_model=APIResponse)
 async def get_mandi_prices(
     district: str,
+    request: Request,
     crop: Optional[str] = None
 ):
     """
@@ -80,14 +87,22 @@ async def get_mandi_prices(
     market_service = MarketService()
     prices = await market_service.get_mandi_prices(district, crop)
     
-    return APIResponse(
-        success=True,
-        message=f"Market prices for {district} retrieved successfully",
-        data=prices
+    # Serialized once per cached price set; unchanged prices are answered with 304
+    return await payload_cache.respond(
+        request,
+        key=f"market:prices:{district}:{crop or 'all'}",
+        version=market_service.get_mandi_prices_version(district, crop),
+        build=lambda: APIResponse(
+            success=True,
+            message=f"Market prices for {district} retrieved successfully",
+            data=prices
+        ),
+        cache_control=PRICES_CACHE_CONTROL
     )
 
 
-@market_router.get("/trends/{crop}", response_model=APIResponse)
+@market_router.get("/trends/{crop}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(PRICES_CACHE_CONTROL))])
 async def get_price_trends(crop: str, days: int = 30):
     """
     Get price trends for a specific crop.
@@ -115,7 +130,8 @@ async def get_price_trends(crop: str, days: int = 30):
     )
 
 
-@market_router.get("/forecast/{crop}", response_model=APIResponse)
+@market_router.get("/forecast/{crop}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(PRICES_CACHE_CONTROL))])
 async def get_price_forecast(crop: str):
     """
     Get price forecast for a specific crop.
@@ -136,7 +152,8 @@ async def get_price_forecast(crop: str):
     )
 
 
-@market_router.get("/best-markets/{crop}", response_model=APIResponse)
+@market_router.get("/best-markets/{crop}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(PRICES_CACHE_CONTROL))])
 async def get_best_markets(crop: str, origin_district: str):
     """
     Get best markets to sell a crop based on price and distance.
@@ -166,7 +183,8 @@ async def get_best_markets(crop: str, origin_district: str):
     )
 
 
-@market_router.get("/demand/{district}", response_model=APIResponse)
+@market_router.get("/demand/{district}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(PRICES_CACHE_CONTROL))])
 async def get_market_demand(district: str):
     """
     Get market demand analysis for a district.
@@ -195,7 +213,8 @@ async def get_market_demand(district: str):
     )
 
 
-@market_router.get("/buyers/{crop}", response_model=APIResponse)
+@market_router.get("/buyers/{crop}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(PRICES_CACHE_CONTROL))])
 async def get_potential_buyers(crop: str, district: str):
     """
     Get potential buyers and supply chain information.
@@ -225,7 +244,8 @@ async def get_potential_buyers(crop: str, district: str):
     )
 
 
-@market_router.get("/analytics/{district}", response_model=APIResponse)
+@market_router.get("/analytics/{district}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(ANALYTICS_CACHE_CONTROL))])
 async def get_market_analytics(district: str, timeframe: int = 30):
     """
     Get comprehensive market analytics for a district.
@@ -268,7 +288,8 @@ async def get_market_analytics(district: str, timeframe: int = 30):
         )
 
 
-@market_router.get("/crop-analytics/{crop}", response_model=APIResponse)
+@market_router.get("/crop-analytics/{crop}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(ANALYTICS_CACHE_CONTROL))])
 async def get_crop_analytics(crop: str, timeframe: int = 30):
     """
     Get analytics for a specific crop across all districts.
@@ -303,7 +324,8 @@ async def get_crop_analytics(crop: str, timeframe: int = 30):
         )
 
 
-@market_router.get("/yield-analytics/{district}", response_model=APIResponse)
+@market_router.get("/yield-analytics/{district}", response_model=APIResponse,
+                   dependencies=[Depends(cache_policy(ANALYTICS_CACHE_CONTROL))])
 async def get_yield_analytics(district: str, timeframe: int = 90):
     """
     Get yield analytics for a district.
@@ -346,6 +368,31 @@ async def get_yield_analytics(district: str, timeframe: int = 90):
         )
 
 
+@market_router.post("/analytics/refresh", response_model=APIResponse)
+async def refresh_market_analytics():
+    """
+    Re-materialize market analytics for all districts and crops.
+    
+    Returns:
+        Materialization statistics (version, districts, crops, price rows)
+    """
+    try:
+        market_service = MarketService()
+        stats = await market_service.refresh_analytics()
+        
+        return APIResponse(
+            success=True,
+            message="Market analytics materialized successfully",
+            data=stats
+        )
+    except Exception as e:
+        logger.error(f"Failed to materialize market analytics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to materialize market analytics: {str(e)}"
+        )
+
+
 @market_router.get("/cache/stats", response_model=APIResponse)
 async def get_cache_stats():
     """
@@ -3,18 +3,24 @@
 Advanced crop rotation, economic intelligence, and climate adaptation endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, validator
 from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 
+from ..core.config import settings
+from ..core.http_cache import payload_cache
+from ..services.bulk_advisory import BulkAdvisoryRunner
+from ..services.rotation_planner import NoFeasibleRotationError
 from ..services.smart_advisory_service import SmartAdvisoryService
 
 logger = logging.getLogger(__name__)
 
 # Initialize the smart advisory service
 smart_advisory_service = SmartAdvisoryService()
+bulk_advisory_runner = BulkAdvisoryRunner(smart_advisory_service, workers=settings.BULK_ADVISORY_WORKERS)
 
 # Pydantic models for request/response
 class FarmConditions(BaseModel):
@@ -53,6 +59,8 @@ class RotationPlanResponse(BaseModel):
     sustainability_index: float
     risk_assessment: Dict[str, float]
     recommendations: List[str]
+    score: float = 0.0
+    alternatives: List[Dict[str, Any]] = []
 
 class EconomicAnalysisResponse(BaseModel):
     """Response model for economic analysis."""
@@ -83,6 +91,49 @@ class CropRotationRequest(BaseModel):
     """Request for crop rotation optimization."""
     farm_conditions: FarmConditions
     preferences: Optional[AdvisoryPreferences] = None
+    years: int = Field(default=3, ge=3, le=10, description="Planning horizon in years")
+    seasons: Optional[List[str]] = Field(
+        default=None, description="Seasons to crop each year (Kharif, Rabi, Zaid); omit for one crop per year"
+    )
+    top_k: int = Field(default=1, ge=1, le=10, description="Plans to rank; runners-up are returned as alternatives")
+    
+    @validator('seasons')
+    def validate_seasons(cls, v):
+        """Validate season names"""
+        if v is not None and any(season not in ("Kharif", "Rabi", "Zaid") for season in v):
+            raise ValueError('Seasons must be Kharif, Rabi or Zaid')
+        return v
+
+class BulkFarm(BaseModel):
+    """One farm of a bulk advisory request."""
+    farm_id: str = Field(..., description="Caller's farm identifier, echoed in the results")
+    farm_conditions: FarmConditions
+    preferences: Optional[AdvisoryPreferences] = None
+
+class BulkAdvisoryRequest(BaseModel):
+    """Request for advisories over a portfolio of farms."""
+    farms: List[BulkFarm] = Field(..., description="Farms to advise")
+    years: int = Field(default=3, ge=3, le=10, description="Planning horizon in years")
+    seasons: Optional[List[str]] = Field(
+        default=None, description="Seasons to crop each year (Kharif, Rabi, Zaid); omit for one crop per year"
+    )
+    top_k: int = Field(default=1, ge=1, le=10, description="Plans to rank per farm profile")
+    
+    @validator('farms')
+    def validate_farms(cls, v):
+        """Validate the portfolio size"""
+        if not v:
+            raise ValueError('At least one farm is required')
+        if len(v) > settings.BULK_ADVISORY_MAX_FARMS:
+            raise ValueError(f'At most {settings.BULK_ADVISORY_MAX_FARMS} farms per request')
+        return v
+    
+    @validator('seasons')
+    def validate_seasons(cls, v):
+        """Validate season names"""
+        if v is not None and any(season not in ("Kharif", "Rabi", "Zaid") for season in v):
+            raise ValueError('Seasons must be Kharif, Rabi or Zaid')
+        return v
 
 # Create router
 smart_advisory_router = APIRouter()
@@ -90,7 +141,7 @@ smart_advisory_router = APIRouter()
 @smart_advisory_router.post("/rotation/optimize", response_model=RotationPlanResponse)
 async def optimize_crop_rotation(request: CropRotationRequest):
     """
-    Generate optimized 3-year crop rotation plan.
+    Generate an optimized multi-year crop rotation plan.
     
     Returns intelligent crop rotation sequence optimizing:
     - Soil health and nutrient balance
@@ -104,9 +155,9 @@ async def optimize_crop_rotation(request: CropRotationRequest):
         farm_conditions = request.farm_conditions.dict()
         preferences = request.preferences.dict() if request.preferences else None
         
-        # Generate rotation plan
-        rotation_plan = smart_advisory_service.rotation_optimizer.optimize_rotation(
-            farm_conditions, preferences
+        # Generate rotation plan (shared with the economic and climate stages)
+        rotation_plan = smart_advisory_service.get_rotation_plan(
+            farm_conditions, preferences, years=request.years, seasons=request.seasons, top_k=request.top_k
         )
         
         # Convert to response format
@@ -116,12 +167,17 @@ async def optimize_crop_rotation(request: CropRotationRequest):
             "soil_health_score": rotation_plan.soil_health_score,
             "sustainability_index": rotation_plan.sustainability_index,
             "risk_assessment": rotation_plan.risk_assessment,
-            "recommendations": rotation_plan.recommendations
+            "recommendations": rotation_plan.recommendations,
+            "score": rotation_plan.score,
+            "alternatives": rotation_plan.alternatives
         }
         
         logger.info(f"✅ Generated rotation plan: {' → '.join([year['crop'] for year in rotation_plan.years])}")
         return RotationPlanResponse(**response_data)
         
+    except NoFeasibleRotationError as e:
+        logger.warning(f"⚠️ Rotation optimization rejected: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Rotation optimization failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Rotation optimization failed: {str(e)}")
@@ -144,19 +200,17 @@ async def analyze_economic_potential(request: CropRotationRequest):
         farm_conditions = request.farm_conditions.dict()
         preferences = request.preferences.dict() if request.preferences else None
         
-        # Generate rotation plan first
-        rotation_plan = smart_advisory_service.rotation_optimizer.optimize_rotation(
-            farm_conditions, preferences
-        )
-        
-        # Calculate economic analysis
-        economic_analysis = smart_advisory_service.economic_intelligence.calculate_profit_projection(
-            rotation_plan
+        # Calculate economic analysis of the (cached) rotation plan and its runners-up
+        economic_analysis = smart_advisory_service.get_economic_analysis(
+            farm_conditions, preferences, years=request.years, seasons=request.seasons, top_k=request.top_k
         )
         
         logger.info(f"✅ Economic analysis complete. 3-year profit: ₹{economic_analysis['total_profit_3year']:,.0f}")
         return EconomicAnalysisResponse(**economic_analysis)
         
+    except NoFeasibleRotationError as e:
+        logger.warning(f"⚠️ Economic analysis rejected: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Economic analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Economic analysis failed: {str(e)}")
@@ -179,20 +233,17 @@ async def assess_climate_adaptation(request: CropRotationRequest):
         farm_conditions = request.farm_conditions.dict()
         preferences = request.preferences.dict() if request.preferences else None
         
-        # Generate rotation plan first
-        rotation_plan = smart_advisory_service.rotation_optimizer.optimize_rotation(
-            farm_conditions, preferences
-        )
-        
-        # Assess climate risks
-        farm_location = farm_conditions.get('location', 'jharkhand')
-        climate_analysis = smart_advisory_service.climate_adaptation.assess_climate_risk(
-            farm_location, rotation_plan
+        # Assess climate risks of the (cached) rotation plan
+        climate_analysis = smart_advisory_service.get_climate_analysis(
+            farm_conditions, preferences, years=request.years, seasons=request.seasons, top_k=request.top_k
         )
         
         logger.info(f"✅ Climate analysis complete. Risk score: {climate_analysis['overall_risk_score']:.2f}")
         return ClimateAnalysisResponse(**climate_analysis)
         
+    except NoFeasibleRotationError as e:
+        logger.warning(f"⚠️ Climate analysis rejected: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Climate analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Climate analysis failed: {str(e)}")
@@ -218,7 +269,7 @@ async def generate_comprehensive_advisory(request: CropRotationRequest):
         
         # Generate comprehensive advisory
         advisory = smart_advisory_service.generate_comprehensive_advisory(
-            farm_conditions, preferences
+            farm_conditions, preferences, years=request.years, seasons=request.seasons, top_k=request.top_k
         )
         
         # Convert to response format
@@ -248,12 +299,70 @@ async def generate_comprehensive_advisory(request: CropRotationRequest):
         
         return ComprehensiveAdvisoryResponse(**response_data)
         
+    except NoFeasibleRotationError as e:
+        logger.warning(f"⚠️ Comprehensive advisory rejected: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Comprehensive advisory failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Comprehensive advisory failed: {str(e)}")
 
+@smart_advisory_router.post("/bulk", response_class=StreamingResponse)
+async def generate_bulk_advisory(request: BulkAdvisoryRequest):
+    """
+    Generate advisories for a portfolio of farms (FPOs, cooperatives, extension officers).
+    
+    Farms with identical conditions and preferences share one solve; unique
+    profiles run on worker processes. The response is NDJSON:
+    - a "job" line with the farm and unique profile counts
+    - one "farm" line per farm (or "error"), in completion order
+    - a closing "portfolio" line with crop mix, water demand and commodity price exposure
+    """
+    logger.info(f"📦 Generating bulk advisory for {len(request.farms)} farms...")
+    farms = [
+        {
+            'farm_id': farm.farm_id,
+            'farm_conditions': farm.farm_conditions.dict(),
+            'preferences': farm.preferences.dict() if farm.preferences else None
+        }
+        for farm in request.farms
+    ]
+    return StreamingResponse(
+        bulk_advisory_runner.stream(farms, years=request.years, seasons=request.seasons, top_k=request.top_k),
+        media_type="application/x-ndjson"
+    )
+
+def _build_crop_database(crop_db: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert CropInfo objects to the crop database payload."""
+    database = {}
+    for crop_name, crop_info in crop_db.items():
+        database[crop_name] = {
+            'name': crop_info.name,
+            'nutrient_demand': crop_info.nutrient_demand,
+            'nutrient_contribution': crop_info.nutrient_contribution,
+            'soil_type_preference': crop_info.soil_type_preference,
+            'season': crop_info.season,
+            'water_requirement': crop_info.water_requirement,
+            'profit_per_hectare': crop_info.profit_per_hectare,
+            'market_volatility': crop_info.market_volatility,
+            'pest_susceptibility': crop_info.pest_susceptibility,
+            'disease_resistance': crop_info.disease_resistance,
+            'growth_period': crop_info.growth_period
+        }
+    
+    logger.info(f"✅ Retrieved {len(database)} crops from database")
+    return {
+        "crops": database,
+        "total_crops": len(database),
+        "categories": {
+            "cereals": ["rice", "wheat", "maize"],
+            "legumes": ["chickpea", "soybean"],
+            "cash_crops": ["cotton", "sugarcane"],
+            "oilseeds": ["mustard"]
+        }
+    }
+
 @smart_advisory_router.get("/crops/database")
-async def get_crop_database():
+async def get_crop_database(request: Request):
     """
     Get available crop database information.
     
@@ -264,38 +373,17 @@ async def get_crop_database():
     - Growth characteristics
     """
     try:
-        logger.info("📚 Retrieving crop database...")
-        
-        crop_db = smart_advisory_service.rotation_optimizer.crop_database
-        
-        # Convert CropInfo objects to dictionaries
-        database = {}
-        for crop_name, crop_info in crop_db.items():
-            database[crop_name] = {
-                'name': crop_info.name,
-                'nutrient_demand': crop_info.nutrient_demand,
-                'nutrient_contribution': crop_info.nutrient_contribution,
-                'soil_type_preference': crop_info.soil_type_preference,
-                'season': crop_info.season,
-                'water_requirement': crop_info.water_requirement,
-                'profit_per_hectare': crop_info.profit_per_hectare,
-                'market_volatility': crop_info.market_volatility,
-                'pest_susceptibility': crop_info.pest_susceptibility,
-                'disease_resistance': crop_info.disease_resistance,
-                'growth_period': crop_info.growth_period
-            }
-        
-        logger.info(f"✅ Retrieved {len(database)} crops from database")
-        return {
-            "crops": database,
-            "total_crops": len(database),
-            "categories": {
-                "cereals": ["rice", "wheat", "maize"],
-                "legumes": ["chickpea", "soybean"],
-                "cash_crops": ["cotton", "sugarcane"],
-                "oilseeds": ["mustard"]
-            }
-        }
+        optimizer = smart_advisory_service.rotation_optimizer
+        crop_db = optimizer.crop_database
+        
+        # Serialized once per crop database version
+        return await payload_cache.respond(
+            request,
+            key="smart-advisory:crops-database",
+            version=optimizer.database_version,
+            build=lambda: _build_crop_database(crop_db),
+            cache_control="public, max-age=86400"
+        )
         
     except Exception as e:
         logger.error(f"❌ Failed to retrieve crop database: {str(e)}")
@@ -362,12 +450,23 @@ async def get_advisory_system_status():
             ],
             "supported_regions": ["jharkhand"],
             "crop_database_size": len(smart_advisory_service.rotation_optimizer.crop_database),
+            "advisory_cache": smart_advisory_service.get_cache_stats(),
+            "bulk_advisory": bulk_advisory_runner.get_stats(),
             "last_updated": datetime.now().isoformat()
         }
     except Exception as e:
         logger.error(f"❌ Status check failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Status check failed: {str(e)}")
 
+@smart_advisory_router.get("/cache/stats")
+async def get_advisory_cache_stats():
+    """Get advisory cache statistics (entries, per-stage hit rates and data versions)."""
+    try:
+        return smart_advisory_service.get_cache_stats()
+    except Exception as e:
+        logger.error(f"❌ Advisory cache stats failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Advisory cache stats failed: {str(e)}")
+
 class SeasonalAdvisoryRequest(BaseModel):
     """Request model for seasonal advisory."""
     location: str = Field(..., description="Farm location")
@@ -30,16 +30,14 @@ async def get_sustainability_score(
     sustainability_service = SustainabilityService()
     farmer_id = current_user["user_id"]
     
-    # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
         )
-    
-    # Get crop history for analysis
-    crop_history = await db.get_crop_history_by_farm_id(farm_id)
+    farm, crop_history = owned
     
     # Calculate sustainability metrics
     sustainability_data = await sustainability_service.calculate_sustainability_score(
@@ -72,16 +70,14 @@ async def get_carbon_footprint(
     sustainability_service = SustainabilityService()
     farmer_id = current_user["user_id"]
     
-    # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
         )
-    
-    # Get crop history
-    crop_history = await db.get_crop_history_by_farm_id(farm_id)
+    farm, crop_history = owned
     
     # Calculate carbon footprint
     carbon_data = await sustainability_service.calculate_carbon_footprint(
@@ -114,16 +110,14 @@ async def get_water_efficiency(
     sustainability_service = SustainabilityService()
     farmer_id = current_user["user_id"]
     
-    # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
         )
-    
-    # Get crop history
-    crop_history = await db.get_crop_history_by_farm_id(farm_id)
+    farm, crop_history = owned
     
     # Calculate water efficiency
     water_data = await sustainability_service.calculate_water_efficiency(
@@ -156,16 +150,14 @@ async def get_soil_health(
     sustainability_service = SustainabilityService()
     farmer_id = current_user["user_id"]
     
-    # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
         )
-    
-    # Get crop history
-    crop_history = await db.get_crop_history_by_farm_id(farm_id)
+    farm, crop_history = owned
     
     # Assess soil health
     soil_data = await sustainability_service.assess_soil_health(
@@ -198,16 +190,14 @@ async def get_biodiversity_score(
     sustainability_service = SustainabilityService()
     farmer_id = current_user["user_id"]
     
-    # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
         )
-    
-    # Get crop history
-    crop_history = await db.get_crop_history_by_farm_id(farm_id)
+    farm, crop_history = owned
     
     # Calculate biodiversity score
     biodiversity_data = await sustainability_service.calculate_biodiversity_score(
@@ -240,16 +230,14 @@ async def get_sustainability_recommendations(
     sustainability_service = SustainabilityService()
     farmer_id = current_user["user_id"]
     
-    # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
         )
-    
-    # Get crop history
-    crop_history = await db.get_crop_history_by_farm_id(farm_id)
+    farm, crop_history = owned
     
     # Get sustainability recommendations
     recommendations = await sustainability_service.get_sustainability_recommendations(
@@ -260,4 +248,41 @@ async def get_sustainability_recommendations(
         success=True,
         message="Sustainability recommendations generated successfully",
         data=recommendations
-    )
\ No newline at end of file
+    )
+
+@sustainability_router.get("/profile/{farm_id}", response_model=APIResponse)
+async def get_sustainability_profile(
+    farm_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get every sustainability panel for a farm in one response.
+    
+    Args:
+        farm_id: Farm ID
+        current_user: Current authenticated user
+        
+    Returns:
+        Score, carbon footprint, water efficiency, soil health, biodiversity
+        and recommendations
+    """
+    db = DatabaseService()
+    sustainability_service = SustainabilityService()
+    farmer_id = current_user["user_id"]
+    
+    # Verify farm ownership and load crop history in one query
+    owned = await db.get_owned_farm_with_history(farm_id, farmer_id)
+    if not owned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this farm"
+        )
+    farm, crop_history = owned
+    
+    profile = await sustainability_service.get_profile(farm, crop_history)
+    
+    return APIResponse(
+        success=True,
+        message="Sustainability profile generated successfully",
+        data=profile
+    )
@@ -2,21 +2,25 @@
 Weather API routes with enhanced real-time data integration.
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, Response
+from fastapi import APIRouter, HTTPException, status, Depends
 from app.models.schemas import WeatherForecast, APIResponse
+from app.core.http_cache import cache_policy
 from app.core.security import get_current_user
 from app.services.database import DatabaseService
 from app.services.weather_service import weather_service
+from app.services.climatology import climatology
 import logging
 
 logger = logging.getLogger(__name__)
 weather_router = APIRouter()
 
 
-@weather_router.get("/current/{farm_id}", response_model=APIResponse)
+# Weather is per farm and per user, so only the browser may cache it:
+# 30 minutes for current conditions, 1 hour for forecasts
+@weather_router.get("/current/{farm_id}", response_model=APIResponse,
+                    dependencies=[Depends(cache_policy("private, max-age=1800"))])
 async def get_current_weather(
     farm_id: str,
-    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -29,18 +33,14 @@ async def get_current_weather(
     Returns:
         Current weather data
     """
-    # Set cache control headers for 30 minutes to prevent excessive API calls
-    response.headers["Cache-Control"] = "public, max-age=1800"  # 30 minutes
-    response.headers["Pragma"] = "cache"
-    
     logger.info(f"🌤️ Getting current weather for farm_id: {farm_id} (with 30min cache)")
     
     db = DatabaseService()
     farmer_id = current_user["user_id"]
     
     # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    farm = await db.get_owned_farm(farm_id, farmer_id)
+    if not farm:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
@@ -63,10 +63,10 @@ async def get_current_weather(
     )
 
 
-@weather_router.get("/forecast/{farm_id}", response_model=APIResponse)
+@weather_router.get("/forecast/{farm_id}", response_model=APIResponse,
+                    dependencies=[Depends(cache_policy("private, max-age=3600"))])
 async def get_weather_forecast(
     farm_id: str,
-    response: Response,
     days: int = 7,
     current_user: dict = Depends(get_current_user)
 ):
@@ -81,10 +81,6 @@ async def get_weather_forecast(
     Returns:
         Weather forecast data
     """
-    # Set cache control headers for 1 hour to prevent excessive API calls
-    response.headers["Cache-Control"] = "public, max-age=3600"  # 1 hour
-    response.headers["Pragma"] = "cache"
-    
     logger.info(f"🌦️ Getting weather forecast for farm_id: {farm_id}, days: {days} (with 1hr cache)")
     
     # Allow up to 14 days to match WeatherAPI.com capabilities
@@ -98,8 +94,8 @@ async def get_weather_forecast(
     farmer_id = current_user["user_id"]
     
     # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    farm = await db.get_owned_farm(farm_id, farmer_id)
+    if not farm:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
@@ -144,8 +140,8 @@ async def get_weather_alerts(
     farmer_id = current_user["user_id"]
     
     # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    farm = await db.get_owned_farm(farm_id, farmer_id)
+    if not farm:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
@@ -199,89 +195,8 @@ async def get_seasonal_weather_patterns(district: str):
             detail=f"District must be one of: {', '.join(JHARKHAND_DISTRICTS)}"
         )
     
-    # Return realistic seasonal data based on Jharkhand's climate patterns
-    # Implementation: Historical weather patterns for Jharkhand districts
-    
-    # Base seasonal patterns for Jharkhand (varies by district)
-    base_patterns = {
-        "kharif": {
-            "months": ["June", "July", "August", "September"],
-            "avg_temperature_range": [26, 32],
-            "avg_rainfall_range": [1000, 1400],
-            "humidity_range": [70, 85],
-            "description": "Monsoon season, ideal for rice, maize, sugarcane"
-        },
-        "rabi": {
-            "months": ["November", "December", "January", "February"],
-            "avg_temperature_range": [15, 25],
-            "avg_rainfall_range": [50, 150],
-            "humidity_range": [55, 70],
-            "description": "Post-monsoon season, suitable for wheat, gram, mustard"
-        },
-        "summer": {
-            "months": ["March", "April", "May"],
-            "avg_temperature_range": [25, 40],
-            "avg_rainfall_range": [20, 80],
-            "humidity_range": [45, 65],
-            "description": "Hot dry season, limited cultivation without irrigation"
-        }
-    }
-    
-    # District-specific variations based on geographical location
-    district_modifiers = {
-        # Eastern districts (higher rainfall)
-        "Dumka": {"rainfall_modifier": 1.2, "temp_modifier": -1},
-        "Deoghar": {"rainfall_modifier": 1.1, "temp_modifier": -0.5},
-        "Godda": {"rainfall_modifier": 1.15, "temp_modifier": -0.8},
-        
-        # Western districts (drier climate)
-        "Garhwa": {"rainfall_modifier": 0.8, "temp_modifier": 1.5},
-        "Palamu": {"rainfall_modifier": 0.85, "temp_modifier": 1.2},
-        "Latehar": {"rainfall_modifier": 0.9, "temp_modifier": 1.0},
-        
-        # Central districts (moderate climate)
-        "Ranchi": {"rainfall_modifier": 1.0, "temp_modifier": 0},
-        "Hazaribagh": {"rainfall_modifier": 0.95, "temp_modifier": 0.5},
-        "Bokaro": {"rainfall_modifier": 1.05, "temp_modifier": 0.2},
-        
-        # Default for other districts
-        "default": {"rainfall_modifier": 1.0, "temp_modifier": 0}
-    }
-    
-    modifier = district_modifiers.get(district, district_modifiers["default"])
-    
-    # Apply district-specific modifications
-    seasonal_data = {
-        "district": district,
-        "metadata": {
-            "data_source": "Historical weather patterns (2010-2024)",
-            "last_updated": "2024-09-15",
-            "accuracy": "Based on IMD data for Jharkhand region"
-        },
-        "seasons": {}
-    }
-    
-    for season, data in base_patterns.items():
-        # Calculate adjusted values based on district
-        avg_temp = sum(data["avg_temperature_range"]) / 2 + modifier["temp_modifier"]
-        avg_rainfall = sum(data["avg_rainfall_range"]) / 2 * modifier["rainfall_modifier"]
-        avg_humidity = sum(data["humidity_range"]) / 2
-        
-        seasonal_data["seasons"][season] = {
-            "months": data["months"],
-            "avg_temperature": round(avg_temp, 1),
-            "avg_rainfall": round(avg_rainfall),
-            "humidity": round(avg_humidity),
-            "description": data["description"],
-            "temperature_range": {
-                "min": round(data["avg_temperature_range"][0] + modifier["temp_modifier"], 1),
-                "max": round(data["avg_temperature_range"][1] + modifier["temp_modifier"], 1)
-            },
-            "rainfall_range": {
-                "min": round(data["avg_rainfall_range"][0] * modifier["rainfall_modifier"]),
-                "max": round(data["avg_rainfall_range"][1] * modifier["rainfall_modifier"])
-            }
-        }
+    # Precomputed district climatology (season normals and ranges)
+    seasonal_data = climatology.seasonal_patterns(district)
     
     return APIResponse(
         success=True,
@@ -309,8 +224,8 @@ async def get_ml_enhanced_weather(
     farmer_id = current_user["user_id"]
     
     # Verify farm ownership
-    farm = await db.get_farm_by_id(farm_id)
-    if not farm or farm["farmer_id"] != farmer_id:
+    farm = await db.get_owned_farm(farm_id, farmer_id)
+    if not farm:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this farm"
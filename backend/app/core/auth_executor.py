@@ -0,0 +1,208 @@
+"""
+Execution layer for CPU-heavy authentication work.
+bcrypt hashing and verification run on a bounded worker pool behind an
+admission limit (bcrypt releases the GIL, so workers hash in parallel), which
+keeps login bursts off the event loop. Verified JWT payloads are cached by
+token hash until the token or the cache entry expires.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+import bcrypt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AuthBusyError(Exception):
+    """Raised when the password pool's queue is full for longer than the admission timeout."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Authentication workers busy; retry in {retry_after:.0f}s")
+
+
+class PasswordHasher:
+    """
+    bcrypt on a dedicated thread pool with backpressure.
+
+    At most `max_pending` operations may be queued or running; further callers
+    wait up to `queue_timeout` seconds for a slot and are then rejected with
+    AuthBusyError instead of piling up unbounded work.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 64, queue_timeout: float = 5.0, rounds: int = 12):
+        """
+        Initialize the hasher.
+
+        Args:
+            workers: Threads running bcrypt concurrently
+            max_pending: Operations allowed in the pool (queued + running)
+            queue_timeout: Seconds a caller waits for admission before rejection
+            rounds: bcrypt cost factor for new hashes (each +1 doubles the work)
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost."""
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode('utf-8')
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Check a password against a stored hash."""
+        return await self._run(bcrypt.checkpw, plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if a stored hash was made with a different cost than configured."""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a bcrypt call on the pool once admitted."""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise AuthBusyError(retry_after=self.queue_timeout)
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._busy_seconds += time.perf_counter() - started
+            self._in_flight -= 1
+            self._completed += 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_ms": round(self._busy_seconds / self._completed * 1000, 1) if self._completed else 0.0
+        }
+
+
+class TokenCache:
+    """
+    Verified JWT payloads keyed by SHA-256 of the token.
+
+    An entry lives until the earlier of the token's `exp` and `ttl` seconds
+    after it was cached. When full, expired entries are dropped first, then the
+    least recently used.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: int = 300):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum cached tokens (0 disables caching)
+            ttl: Maximum seconds a verified payload is reused
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get a cached payload, or None if absent or expired."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return payload
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Cache a payload that has just been verified."""
+        if self.max_size <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        if expires_at <= now:
+            return
+
+        if len(self._entries) >= self.max_size:
+            self._evict(now)
+        self._entries[self._key(token)] = (payload, expires_at)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until there is room."""
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached token."""
+        self._entries.clear()
+
+    def reset_stats(self) -> None:
+        """Reset hit/miss counters."""
+        self._hits = 0
+        self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total * 100, 2) if total else 0.0
+        }
+
+
+# Global instances
+password_hasher = PasswordHasher(
+    workers=settings.AUTH_WORKERS,
+    max_pending=settings.AUTH_MAX_PENDING,
+    queue_timeout=settings.AUTH_QUEUE_TIMEOUT,
+    rounds=settings.BCRYPT_ROUNDS
+)
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
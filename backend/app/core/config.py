@@ -20,15 +20,99 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: str
     
+    # PostgREST connection pool (per worker process)
+    DB_POOL_SIZE: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_QUERY_TIMEOUT: float = 30.0
+    
+    # Local SQLite database used when Supabase credentials are not configured
+    LOCAL_DB_PATH: str = "local_dev.sqlite3"
+    
+    # Farmer/farm/crop-history read-through cache: TTL (seconds) and entry bound, per worker
+    ENTITY_CACHE_TTL: int = 60
+    ENTITY_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Admin/popular-crop aggregates: cache TTL and reconciliation interval (seconds, 0 disables)
+    AGGREGATE_CACHE_TTL: int = 30
+    AGGREGATE_RECONCILE_INTERVAL: int = 3600
+    
+    # Per-farm sustainability profile cache TTL (seconds) and size bound (profiles, oldest evicted);
+    # profiles are also dropped whenever the farm or its crop history changes
+    SUSTAINABILITY_CACHE_TTL: int = 3600
+    SUSTAINABILITY_CACHE_MAX_ENTRIES: int = 10000
+    
+    # HTTP responses: compression threshold (bytes), gzip level, brotli quality (needs the optional
+    # brotli package) and serialized payloads kept for ETag/304 answers
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 5
+    PAYLOAD_CACHE_MAX_ENTRIES: int = 256
+    
+    # Rotation planner: partial plans kept across all search states per slot
+    ROTATION_BEAM_WIDTH: int = 256
+    
+    # Monte Carlo profit simulation: scenarios per run and RNG seed (fixed for reproducible results)
+    SIMULATION_SCENARIOS: int = 5000
+    SIMULATION_SEED: int = 42
+    
+    # Smart advisory result cache: stage results kept (LRU) and their lifetime (seconds)
+    ADVISORY_CACHE_SIZE: int = 1024
+    ADVISORY_CACHE_TTL: int = 3600
+    
+    # Bulk advisory: worker processes solving unique farm profiles (0 = thread) and farms per request
+    BULK_ADVISORY_WORKERS: int = 2
+    BULK_ADVISORY_MAX_FARMS: int = 1000
+    
+    # ML recommendation precompute table: grid points answered without running the model;
+    # results kept per point, weather bins around each district snapshot and rebuild interval
+    # (seconds, 0 disables the daily weather refresh)
+    RECOMMENDATION_TABLE_TOP_K: int = 5
+    RECOMMENDATION_TABLE_WEATHER_SPREAD: int = 1
+    RECOMMENDATION_TABLE_REFRESH_INTERVAL: int = 86400
+    
+    # Finance eligibility screening: member profiles per request and per vectorized pass
+    FINANCE_SCREEN_MAX_PROFILES: int = 50000
+    FINANCE_SCREEN_CHUNK_SIZE: int = 2000
+    
+    # Admin exports: rows per keyset page, background job directory (temp dir if empty) and retention (seconds)
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_DIR: str = ""
+    EXPORT_JOB_TTL: int = 86400
+    
+    # Buffered bulk writes (recommendations, crop history): rows per insert, flush interval and
+    # retry backoff (seconds), retries per batch before requeueing, rows buffered before backpressure,
+    # permanently rejected rows kept per table
+    BULK_WRITE_BATCH_SIZE: int = 500
+    BULK_WRITE_FLUSH_INTERVAL: float = 1.0
+    BULK_WRITE_RETRY_BACKOFF: float = 0.5
+    BULK_WRITE_MAX_RETRIES: int = 3
+    BULK_WRITE_MAX_BUFFERED: int = 50000
+    BULK_WRITE_MAX_DEAD_LETTERS: int = 1000
+    
+    # Audit hash chain: entries read per page during incremental verification
+    AUDIT_VERIFY_BATCH_SIZE: int = 1000
+    
     # JWT Configuration
     JWT_SECRET_KEY: str = "your_jwt_secret_key_here_make_it_long_and_secure_for_production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24
     
+    # Authentication work: bcrypt cost, worker pool, admission limit/wait (seconds), verified-token cache
+    BCRYPT_ROUNDS: int = 12
+    AUTH_WORKERS: int = 4
+    AUTH_MAX_PENDING: int = 64
+    AUTH_QUEUE_TIMEOUT: float = 5.0
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    
     # External API Configuration
     WEATHERAPI_KEY: str = "mock_weatherapi_key"
     AGMARKNET_API_KEY: Optional[str] = None
     
+    # Upstream replay server (benchmarks only): when set, AGMARKNET, data.gov.in,
+    # eNAM and WeatherAPI requests go to {UPSTREAM_REPLAY_URL}/{source} instead
+    UPSTREAM_REPLAY_URL: Optional[str] = None
+    
     # CORS Configuration
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -55,6 +139,22 @@ class Settings(BaseSettings):
 settings = Settings()
 
 
+def get_upstream_base_url(source: str, default: str) -> str:
+    """
+    Resolve the base URL for an upstream data source.
+    
+    Args:
+        source: Source identifier (agmarknet, data_gov, enam, weatherapi)
+        default: Production base URL
+        
+    Returns:
+        Replay server URL for the source when UPSTREAM_REPLAY_URL is set, else the default
+    """
+    if settings.UPSTREAM_REPLAY_URL:
+        return f"{settings.UPSTREAM_REPLAY_URL.rstrip('/')}/{source}"
+    return default
+
+
 # Jharkhand districts for location validation - using dynamic list from districts module
 JHARKHAND_DISTRICTS = get_all_districts()
 
@@ -0,0 +1,312 @@
+"""
+HTTP efficiency layer: response compression, per-route Cache-Control policies
+and strong ETags with conditional GETs.
+
+Routes declare their policy with ``dependencies=[Depends(cache_policy(...))]``.
+HTTPCacheMiddleware compresses responses above a size threshold (brotli when
+the optional ``brotli`` package is installed and the client accepts it, gzip
+otherwise), tags GET responses that carry a cacheable policy with an ETag and
+answers a matching If-None-Match with 304. Routes serving cached payloads go
+through PayloadCache, which keeps the serialized (and compressed) body per
+cache-entry version so a repeat request is answered without serializing
+anything.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "text/")
+ENCODING_SUFFIX = {"br": "-br", "gzip": "-gz"}
+
+
+def cache_policy(cache_control: str) -> Callable:
+    """
+    Declare a route's Cache-Control header.
+
+    Args:
+        cache_control: Header value, e.g. "public, max-age=900"
+
+    Returns:
+        Dependency that sets the header on the route's response
+    """
+    async def apply_cache_policy(response: Response):
+        response.headers["Cache-Control"] = cache_control
+    return apply_cache_policy
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick brotli or gzip from an Accept-Encoding header (None for identity)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a complete body."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    compressor = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag, ignoring the encoding suffix."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def normalize(tag: str) -> str:
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for suffix in ENCODING_SUFFIX.values():
+            if tag.endswith(suffix):
+                return tag[:-len(suffix)]
+        return tag
+
+    target = normalize(etag)
+    return any(normalize(tag) == target for tag in if_none_match.split(","))
+
+
+def _encoded_etag(etag: str, encoding: str) -> str:
+    # A compressed representation needs its own strong validator
+    return f'{etag[:-1]}{ENCODING_SUFFIX[encoding]}"'
+
+
+def _is_cacheable(headers: Headers) -> bool:
+    cache_control = headers.get("cache-control", "")
+    return bool(cache_control) and "no-store" not in cache_control
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes every chunk so streamed lines arrive promptly."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class HTTPCacheMiddleware:
+    """ASGI middleware adding compression, ETags and 304 responses."""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        conditional = scope["method"] in ("GET", "HEAD")
+        if_none_match = request_headers.get("if-none-match")
+        start_message: Optional[dict] = None
+        compressor: Optional[_StreamCompressor] = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether the response streams
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is None:
+                if compressor is not None:
+                    message = {**message, "body": compressor.chunk(body, final=not more_body)}
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            status_code = start["status"]
+
+            if more_body:
+                # Streaming response: compress chunk by chunk
+                if encoding and 200 <= status_code < 300 and status_code not in (204, 206) and _is_compressible(headers):
+                    compressor = _StreamCompressor(encoding)
+                    del headers["content-length"]
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": compressor.chunk(body, final=False)}
+                await send(start)
+                await send(message)
+                return
+
+            compressing = (encoding and len(body) >= self.minimum_size and status_code not in (204, 206, 304)
+                           and _is_compressible(headers))
+            etag = None
+            if conditional and status_code == 200 and _is_cacheable(headers):
+                etag = headers.get("etag")
+                if etag is None:
+                    etag = body_etag(body)
+                    headers["ETag"] = etag
+                if etag_matches(if_none_match, etag):
+                    # The 304 carries the validator of the representation a 200 would have sent
+                    if compressing:
+                        headers["ETag"] = _encoded_etag(etag, encoding)
+                        headers.add_vary_header("Accept-Encoding")
+                    await send(_not_modified_start(start, headers))
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+            if compressing:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                if etag:
+                    headers["ETag"] = _encoded_etag(etag, encoding)
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _not_modified_start(start: dict, headers: MutableHeaders) -> dict:
+    """A 304 start message keeping only the validator and caching headers."""
+    kept = MutableHeaders()
+    for name in ("etag", "cache-control", "vary", "expires", "last-modified"):
+        if name in headers:
+            kept[name] = headers[name]
+    return {"type": "http.response.start", "status": 304, "headers": kept.raw}
+
+
+class PayloadCache:
+    """
+    Serialized JSON bodies keyed by cache key and the version of the cached
+    data they were built from.
+
+    A request whose If-None-Match matches the current version's ETag gets a
+    304 without the payload being built; other requests reuse the stored
+    bytes (and their compressed variants) until the version changes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Payloads kept before the least recently used is dropped
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "builds": 0, "not_modified": 0}
+
+    async def respond(self, request: Request, key: str, version: Any, build: Callable[[], Any],
+                      cache_control: str) -> Response:
+        """
+        Answer a request from the serialized payload for (key, version).
+
+        Args:
+            request: Incoming request (for If-None-Match and Accept-Encoding)
+            key: Payload key (route and parameters)
+            version: Version of the underlying cached data; None always rebuilds
+            build: Returns the response data, or an awaitable of it
+            cache_control: Cache-Control header value
+
+        Returns:
+            200 response with the serialized body, or 304
+        """
+        entry = self._entries.get(key)
+        if entry is not None and version is not None and entry["version"] == version:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        else:
+            data = build()
+            if inspect.isawaitable(data):
+                data = await data
+            body = json.dumps(jsonable_encoder(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            entry = {"version": version, "body": body, "etag": body_etag(body), "encoded": {}}
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["builds"] += 1
+
+        body = entry["body"]
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if not (encoding and len(body) >= settings.COMPRESSION_MIN_SIZE):
+            encoding = None
+        # The 304 carries the same validator as the representation a 200 would send
+        etag = _encoded_etag(entry["etag"], encoding) if encoding else entry["etag"]
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            self._stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            if encoding not in entry["encoded"]:
+                entry["encoded"][encoding] = compress(body, encoding)
+            body = entry["encoded"][encoding]
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get payload cache statistics."""
+        return {"entries": len(self._entries), "brotli_available": brotli is not None, **self._stats}
+
+
+# Global payload cache instance
+payload_cache = PayloadCache(max_entries=settings.PAYLOAD_CACHE_MAX_ENTRIES)
@@ -0,0 +1,22 @@
+"""
+Newline-delimited JSON helpers for streaming responses.
+"""
+
+import json
+from typing import Dict, Any
+
+from fastapi.encoders import jsonable_encoder
+
+
+def ndjson_line(record: Dict[str, Any]) -> bytes:
+    """
+    Encode one record as an NDJSON line.
+
+    Args:
+        record: JSON-compatible mapping (dataclasses, datetimes and NumPy
+            scalars go through FastAPI's encoder first)
+
+    Returns:
+        UTF-8 bytes of the JSON document followed by a newline
+    """
+    return (json.dumps(jsonable_encoder(record), default=str) + "\n").encode("utf-8")
@@ -11,10 +11,12 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import bcrypt
 
 from app.core.config import settings
+from app.core.auth_executor import password_hasher, token_cache, AuthBusyError
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -47,6 +49,9 @@ def verify_token(token: str) -> dict:
     """
     Verify and decode JWT token.
     
+    Payloads of tokens verified recently are served from the token cache
+    until the token expires.
+    
     Args:
         token: JWT token to verify
         
@@ -56,19 +61,25 @@ def verify_token(token: str) -> dict:
     Raises:
         HTTPException: If token is invalid
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(
             token, 
             settings.JWT_SECRET_KEY, 
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    token_cache.put(token, payload)
+    return payload
 
 
 def get_password_hash(password: str) -> str:
@@ -82,7 +93,7 @@ def get_password_hash(password: str) -> str:
         Hashed password
     """
     # Use bcrypt directly for better compatibility
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -100,6 +111,54 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
+def _auth_busy(error: AuthBusyError) -> HTTPException:
+    """Map a full password pool to 503 with Retry-After."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, please retry",
+        headers={"Retry-After": str(int(error.retry_after))},
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash password on the bcrypt worker pool.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+        
+    Raises:
+        HTTPException: 503 if the pool is saturated
+    """
+    try:
+        return await password_hasher.hash(password)
+    except AuthBusyError as e:
+        raise _auth_busy(e)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify password against hash on the bcrypt worker pool.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+        
+    Raises:
+        HTTPException: 503 if the pool is saturated
+    """
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except AuthBusyError as e:
+        raise _auth_busy(e)
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Get current authenticated user from JWT token.
@@ -127,6 +186,47 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return {"user_id": user_id, "payload": payload}
 
 
+async def get_current_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """
+    Get the current user, requiring an admin token.
+    
+    Args:
+        current_user: Authenticated user
+        
+    Returns:
+        Current admin data
+        
+    Raises:
+        HTTPException: 403 if the token was not issued to an admin
+    """
+    if current_user["payload"].get("type") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[dict]:
+    """
+    Get the authenticated user if a bearer token was sent.
+    
+    Args:
+        credentials: HTTP Bearer credentials, if any
+        
+    Returns:
+        Current user data, or None for anonymous requests
+        
+    Raises:
+        HTTPException: If a token was sent but is invalid
+    """
+    if credentials is None:
+        return None
+    return await get_current_user(credentials)
+
+
 def create_farmer_token(farmer_id: str, phone: str) -> str:
     """
     Create access token for farmer.
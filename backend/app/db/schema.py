@@ -55,9 +55,11 @@ CREATE TABLE IF NOT EXISTS recommendations (
 -- Audit logs table for federated learning
 CREATE TABLE IF NOT EXISTS audit_logs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    seq BIGINT NOT NULL UNIQUE,
     update_hash TEXT NOT NULL,
     round_number INTEGER NOT NULL,
     previous_hash TEXT,
+    entry_hash TEXT NOT NULL,
     timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
@@ -66,7 +68,7 @@ CREATE INDEX IF NOT EXISTS idx_farmers_phone ON farmers(phone);
 CREATE INDEX IF NOT EXISTS idx_farms_farmer_id ON farms(farmer_id);
 CREATE INDEX IF NOT EXISTS idx_crops_history_farm_id ON crops_history(farm_id);
 CREATE INDEX IF NOT EXISTS idx_recommendations_farm_id ON recommendations(farm_id);
-CREATE INDEX IF NOT EXISTS idx_audit_logs_round ON audit_logs(round_number);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_round ON audit_logs(round_number, seq);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
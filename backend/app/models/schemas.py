@@ -220,6 +220,18 @@ class FinanceResponse(BaseModel):
     generated_at: datetime
 
 
+class FinanceScreenProfile(BaseModel):
+    """Member profile to screen for scheme eligibility."""
+    farmer_id: str
+    field_size: Optional[float] = Field(None, ge=0, description="Landholding; omit if no land on record")
+    shg_member: Optional[bool] = Field(None, description="Self Help Group membership, if known")
+
+
+class FinanceScreenRequest(BaseModel):
+    """Member list to screen (banks, FPOs)."""
+    profiles: List[FinanceScreenProfile] = Field(..., min_length=1)
+
+
 # Sustainability Models
 class SustainabilityMetrics(BaseModel):
     """Sustainability metrics."""
@@ -249,6 +261,17 @@ class AdminStats(BaseModel):
     district_wise_adoption: Dict[str, int]
 
 
+class AuditEntryCreate(BaseModel):
+    """Federated-learning update to record in the audit chain."""
+    round_number: int = Field(..., ge=0)
+    update_hash: str = Field(..., min_length=1, max_length=256)
+
+
+class AuditAppendRequest(BaseModel):
+    """Batch of audit entries, appended in order."""
+    entries: List[AuditEntryCreate] = Field(..., min_length=1, max_length=1000)
+
+
 class AdminResponse(BaseModel):
     """Admin dashboard response."""
     stats: AdminStats
@@ -2,9 +2,12 @@
 Admin Service for administrative operations and statistics.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
+from .aggregation_service import aggregation_service
+from .audit_service import audit_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,16 +21,56 @@ class AdminService:
     
     async def get_platform_stats(self) -> Dict[str, Any]:
         """Get platform-wide statistics."""
-        # Mock statistics for demo
+        counts = await aggregation_service.get_platform_counts()
+        districts = await aggregation_service.get_district_stats()
+        total_area = round(sum(d["total_area"] for d in districts), 2)
         return {
-            "total_farmers": 1250,
-            "total_farms": 950,
-            "total_recommendations": 3200,
-            "active_users_today": 45,
-            "avg_farm_size": 2.5,
-            "total_area_covered": 2375.0
+            "total_farmers": counts["farmers"],
+            "total_farms": counts["farms"],
+            "total_recommendations": counts["recommendations"],
+            "avg_farm_size": round(total_area / counts["farms"], 2) if counts["farms"] else 0.0,
+            "total_area_covered": total_area
         }
     
+    async def get_aggregated_statistics(self) -> Dict[str, Any]:
+        """
+        Get dashboard statistics from the maintained summary tables.
+        
+        Returns:
+            Totals, top crops and district-wise farm counts (AdminStats shape)
+        """
+        counts = await aggregation_service.get_platform_counts()
+        popular_crops = await aggregation_service.get_popular_crops(limit=10)
+        districts = await aggregation_service.get_district_stats()
+        return {
+            "total_farmers": counts["farmers"],
+            "total_farms": counts["farms"],
+            "total_recommendations": counts["recommendations"],
+            "popular_crops": popular_crops,
+            "district_wise_adoption": {d["district"]: d["farm_count"] for d in districts}
+        }
+    
+    async def get_popular_crops_analysis(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get most grown crops with their share of all crop history entries.
+        
+        Args:
+            limit: Number of crops to return
+            
+        Returns:
+            Popular crops with counts and adoption share (percent)
+        """
+        counts = await aggregation_service.get_platform_counts()
+        total = counts["crops_history"]
+        return [
+            {
+                "crop": row["crop"],
+                "count": row["count"],
+                "adoption_rate": round(row["count"] / total * 100, 1) if total else 0.0
+            }
+            for row in await aggregation_service.get_popular_crops(limit)
+        ]
+    
     async def get_crop_adoption_stats(self) -> List[Dict[str, Any]]:
         """Get crop adoption statistics."""
         return [
@@ -41,9 +84,32 @@ class AdminService:
     async def get_district_wise_data(self) -> List[Dict[str, Any]]:
         """Get district-wise farming data."""
         return [
-            {"district": "Ranchi", "farmers": 320, "avg_yield": 4.2},
-            {"district": "Jamshedpur", "farmers": 280, "avg_yield": 3.8},
-            {"district": "Dhanbad", "farmers": 245, "avg_yield": 4.1},
-            {"district": "Bokaro", "farmers": 205, "avg_yield": 3.9},
-            {"district": "Deoghar", "farmers": 200, "avg_yield": 4.0}
-        ]
\ No newline at end of file
+            {
+                "district": d["district"],
+                "farms": d["farm_count"],
+                "total_area": d["total_area"],
+                "avg_farm_size": round(d["total_area"] / d["farm_count"], 2) if d["farm_count"] else 0.0
+            }
+            for d in await aggregation_service.get_district_stats()
+        ]
+    
+    async def get_audit_logs(self, limit: int = 100, cursor: Optional[int] = None,
+                             round_number: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a page of federated-learning audit entries with the stored
+        verification status.
+        
+        Reading a page never verifies the chain (that is left to the verify
+        endpoint); the status is the last persisted checkpoint.
+        
+        Args:
+            limit: Entries per page
+            cursor: next_cursor from the previous page
+            round_number: Only entries for this round
+            
+        Returns:
+            Entries newest first, the next page cursor and verification status
+        """
+        page = await audit_service.list_entries(limit, cursor, round_number)
+        page["verification"] = await audit_service.get_status()
+        return page
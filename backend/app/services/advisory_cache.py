@@ -0,0 +1,162 @@
+"""
+Content-addressed cache for smart advisory results.
+Requests are normalized (strings trimmed and lowercased, numbers rounded,
+None values dropped) and hashed, so equivalent farm-condition presets share
+one entry whatever their spelling or field order. Each advisory stage
+(rotation, economic, climate) is cached separately: the rotation plan is the
+intermediate the later stages consume, and their keys include the plan key
+plus the versions of the data they read.
+"""
+
+import hashlib
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(value: Any) -> Any:
+    """
+    Canonical form of a request value for hashing.
+
+    Args:
+        value: Dict, list, string, number or None
+
+    Returns:
+        Value with trimmed lowercase strings, floats rounded to 4 decimals
+        and None entries removed from dicts
+    """
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        rounded = round(value, 4)
+        return int(rounded) if rounded.is_integer() else rounded
+    return value
+
+
+def content_key(*parts: Any) -> str:
+    """SHA-256 of the canonical JSON encoding of the (already normalized) parts."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class AdvisoryCache:
+    """
+    LRU cache of advisory stage results with a TTL and per-stage statistics.
+
+    Cached values are shared between requests and must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is dropped
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+
+    def get(self, stage: str, key: str) -> Any:
+        """
+        Look up a stage result.
+
+        Args:
+            stage: Stage name (rotation, economic, climate)
+            key: Content key of the stage inputs
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        stats = self._stats.setdefault(stage, {"hits": 0, "misses": 0})
+        entry_key = (stage, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None and time.time() < entry[0]:
+            self._entries.move_to_end(entry_key)
+            stats["hits"] += 1
+            return entry[1]
+        stats["misses"] += 1
+        return None
+
+    def set(self, stage: str, key: str, value: Any) -> None:
+        """Store a stage result, evicting the least recently used entries beyond max_entries."""
+        entry_key = (stage, key)
+        self._entries[entry_key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get_or_compute(self, stage: str, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result of a stage, computing and storing it on a miss.
+
+        Args:
+            stage: Stage name (rotation, economic, climate)
+            key: Content key of the stage inputs
+            compute: Builds the result
+
+        Returns:
+            Stage result
+        """
+        value = self.get(stage, key)
+        if value is None:
+            value = compute()
+            self.set(stage, key, value)
+        return value
+
+    def invalidate(self, stage: str = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            stage: Only drop this stage's entries; None drops everything
+
+        Returns:
+            Number of entries removed
+        """
+        if stage is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [entry_key for entry_key in self._entries if entry_key[0] == stage]
+            for entry_key in keys:
+                del self._entries[entry_key]
+            removed = len(keys)
+        logger.info(f"Advisory cache invalidated: {removed} entries removed")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics, per stage and overall."""
+        stages = {}
+        for stage, counts in self._stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            stages[stage] = {
+                **counts,
+                "entries": sum(1 for entry_stage, _ in self._entries if entry_stage == stage),
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0
+            }
+        hits = sum(counts["hits"] for counts in self._stats.values())
+        lookups = hits + sum(counts["misses"] for counts in self._stats.values())
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "evictions": self._evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stages": stages
+        }
@@ -0,0 +1,151 @@
+"""
+Aggregation service backing the admin dashboard and popular-crop endpoints.
+Reads the trigger-maintained summary tables (supabase_aggregates.sql) through
+a short TTL cache and runs the periodic reconciliation job that repairs any
+counter drift.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from .cache_service import MarketDataCache
+from .database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+
+class AggregationService:
+    """
+    Cached reads of platform counters, crop popularity and district stats.
+
+    Every read is a bounded lookup against a summary table, cached for
+    AGGREGATE_CACHE_TTL seconds so a busy dashboard costs at most one query
+    per aggregate per TTL.
+    """
+
+    def __init__(self, ttl: int = 30):
+        """
+        Initialize the service.
+
+        Args:
+            ttl: Seconds an aggregate may be served from cache
+        """
+        self.ttl = ttl
+        self._cache = MarketDataCache()
+        self._db: Optional[DatabaseService] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.last_reconciliation: Optional[Dict[str, Any]] = None
+
+    @property
+    def db(self) -> DatabaseService:
+        """Database service, created on first use."""
+        if self._db is None:
+            self._db = DatabaseService()
+        return self._db
+
+    async def get_platform_counts(self) -> Dict[str, int]:
+        """
+        Get row counts for farmers, farms, recommendations and crop history.
+
+        Returns:
+            Mapping of table name to row count
+        """
+        async def load():
+            return await self.db.get_platform_counts()
+
+        return await self._cache.get_or_set("platform_counts", load, ttl=self.ttl)
+
+    async def get_popular_crops(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the most frequently grown crops.
+
+        Args:
+            limit: Number of crops to return
+
+        Returns:
+            List of {"crop", "count"} ordered by count
+        """
+        async def load():
+            return await self.db.get_popular_crops(limit)
+
+        return await self._cache.get_or_set(f"popular_crops:{limit}", load, ttl=self.ttl)
+
+    async def get_district_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get farm count and cultivated area for every district.
+
+        Returns:
+            List of {"district", "farm_count", "total_area"} ordered by farm count
+        """
+        async def load():
+            regional = await self.db.get_regional_data()
+            return regional["districts"]
+
+        return await self._cache.get_or_set("district_stats", load, ttl=self.ttl)
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """
+        Rebuild the summary tables from the base tables and drop cached aggregates.
+
+        Returns:
+            Drift corrected per summary table and run duration
+        """
+        started = time.perf_counter()
+        result = dict(await self.db.reconcile_aggregates())
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        self._cache.invalidate()
+        self.last_reconciliation = result
+        drift = sum(result.get(key, 0) for key in ("counters", "crops", "districts"))
+        if drift:
+            logger.warning(f"Aggregate reconciliation corrected {drift} drifted rows: {result}")
+        else:
+            logger.info("Aggregate reconciliation found no drift")
+        return result
+
+    async def _reconcile_periodically(self, interval: int):
+        """Run reconcile() every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error in periodic aggregate reconciliation: {e}")
+
+    def start_reconciliation(self, interval: int) -> None:
+        """
+        Start the periodic reconciliation job on the running event loop.
+
+        Args:
+            interval: Seconds between runs (0 disables the job)
+        """
+        if interval <= 0 or (self._reconcile_task and not self._reconcile_task.done()):
+            return
+        self._reconcile_task = asyncio.create_task(self._reconcile_periodically(interval))
+        logger.info(f"Aggregate reconciliation scheduled every {interval}s")
+
+    async def stop_reconciliation(self) -> None:
+        """Cancel the periodic reconciliation job."""
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache and reconciliation statistics."""
+        return {
+            "cache": self._cache.get_cache_stats(),
+            "ttl": self.ttl,
+            "reconciliation_running": bool(self._reconcile_task and not self._reconcile_task.done()),
+            "last_reconciliation": self.last_reconciliation
+        }
+
+
+# Global aggregation service instance
+aggregation_service = AggregationService(ttl=settings.AGGREGATE_CACHE_TTL)
@@ -0,0 +1,214 @@
+"""
+Federated-learning audit log kept as a hash chain.
+Each entry records its chain position (seq), the previous entry's hash and an
+entry_hash over its own fields, so any edit, deletion or reordering breaks the
+chain. Verification resumes from a persisted checkpoint and only hashes
+entries appended since the last run. The database allocates seq and chains
+each append onto the current head in one transaction, so every API worker
+extends the same chain.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from .database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+# previous_hash of the first entry
+GENESIS_HASH = "0" * 64
+
+CHECKPOINT_NAME = "audit_chain"
+ENTRY_COLUMNS = "id, seq, round_number, update_hash, previous_hash, entry_hash, timestamp"
+
+
+def _canonical_timestamp(value: Any) -> str:
+    """UTC ISO timestamp, independent of how the database formats it on read."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def compute_entry_hash(entry: Dict[str, Any]) -> str:
+    """
+    Hash an audit entry's chained fields.
+
+    Args:
+        entry: Entry with seq, round_number, update_hash, previous_hash and timestamp
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = "|".join([
+        str(entry["seq"]),
+        str(entry["round_number"]),
+        entry["update_hash"],
+        entry.get("previous_hash") or GENESIS_HASH,
+        _canonical_timestamp(entry["timestamp"])
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AuditLogService:
+    """
+    Appends to and verifies the audit hash chain.
+
+    Entries must arrive in non-decreasing round order, which makes seq order
+    the same as (round_number, timestamp) order.
+    """
+
+    def __init__(self, verify_batch_size: int = 1000):
+        """
+        Initialize the service.
+
+        Args:
+            verify_batch_size: Entries read per page while verifying
+        """
+        self.verify_batch_size = verify_batch_size
+        self._verify_lock: Optional[asyncio.Lock] = None
+        self._db: Optional[DatabaseService] = None
+        self.last_verification: Optional[Dict[str, Any]] = None
+
+    @property
+    def db(self) -> DatabaseService:
+        """Database service, created on first use."""
+        if self._db is None:
+            self._db = DatabaseService()
+        return self._db
+
+    def _lock(self) -> asyncio.Lock:
+        # Created lazily so the lock binds to the running event loop
+        if self._verify_lock is None:
+            self._verify_lock = asyncio.Lock()
+        return self._verify_lock
+
+    async def append(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Chain and record a batch of federated-learning updates.
+
+        Args:
+            entries: Dicts with round_number and update_hash, in order
+
+        Returns:
+            The chained entries as stored
+
+        Raises:
+            ValueError: If a round number is lower than the chain head's
+        """
+        return await self.db.append_audit_entries(entries)
+
+    async def verify(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Verify the chain from the checkpoint (or from the first entry).
+
+        Args:
+            full: Ignore the checkpoint and re-verify the whole chain
+
+        Returns:
+            Verification status: valid or broken, entries checked this run,
+            total verified entries and where the chain breaks, if it does
+        """
+        async with self._lock():
+            started = time.perf_counter()
+            checkpoint = None if full else await self.db.get_audit_checkpoint(CHECKPOINT_NAME)
+            seq = checkpoint["seq"] if checkpoint else 0
+            last_hash = (checkpoint or {}).get("entry_hash") or GENESIS_HASH
+            verified = checkpoint["verified_entries"] if checkpoint else 0
+            checked = 0
+            problem = None
+
+            # The checkpointed entry itself must not have changed since it was
+            # verified; if it has, locate the break with a full pass
+            if seq:
+                anchor = await self.db.get_audit_entry_by_seq(seq)
+                if not anchor or anchor.get("entry_hash") != last_hash or compute_entry_hash(anchor) != last_hash:
+                    logger.warning(f"Checkpointed audit entry {seq} changed; re-verifying from the start")
+                    seq, last_hash, verified = 0, GENESIS_HASH, 0
+
+            async for page in self.db.iter_table_rows("audit_logs", ENTRY_COLUMNS, self.verify_batch_size,
+                                                      after_id=seq, key="seq"):
+                for entry in page:
+                    checked += 1
+                    if entry["seq"] != seq + 1:
+                        problem = (seq + 1, f"entries {seq + 1}..{entry['seq'] - 1} are missing")
+                    elif (entry.get("previous_hash") or GENESIS_HASH) != last_hash:
+                        problem = (entry["seq"], "previous_hash does not match the preceding entry")
+                    elif compute_entry_hash(entry) != entry.get("entry_hash"):
+                        problem = (entry["seq"], "entry_hash does not match the entry's contents")
+                    if problem:
+                        break
+                    seq, last_hash = entry["seq"], entry["entry_hash"]
+                    verified += 1
+                # Save progress per page so an interrupted run resumes where it stopped
+                await self._save_checkpoint(seq, last_hash, verified, problem)
+                if problem:
+                    break
+            if not checked:
+                await self._save_checkpoint(seq, last_hash, verified, None)
+
+            result = {
+                "status": "broken" if problem else "valid",
+                "verified_through_seq": seq,
+                "verified_entries": verified,
+                "checked_this_run": checked,
+                "broken_at_seq": problem[0] if problem else None,
+                "detail": problem[1] if problem else None,
+                "full": full or not checkpoint,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+            self.last_verification = result
+            if problem:
+                logger.error(f"Audit chain broken at seq {problem[0]}: {problem[1]}")
+            return result
+
+    async def _save_checkpoint(self, seq: int, entry_hash: str, verified: int, problem: Optional[tuple]) -> None:
+        """Persist the verification cursor and outcome."""
+        await self.db.save_audit_checkpoint({
+            "name": CHECKPOINT_NAME,
+            "seq": seq,
+            "entry_hash": entry_hash,
+            "verified_entries": verified,
+            "status": "broken" if problem else "valid",
+            "broken_at": problem[0] if problem else None,
+            "detail": problem[1] if problem else None,
+            "verified_at": datetime.now(timezone.utc).isoformat()
+        })
+
+    async def list_entries(self, limit: int = 100, cursor: Optional[int] = None,
+                           round_number: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Page through the log newest first.
+
+        Args:
+            limit: Entries per page
+            cursor: next_cursor from the previous page
+            round_number: Only entries for this round
+
+        Returns:
+            Entries and the cursor for the next page (None on the last page)
+        """
+        entries = await self.db.get_audit_logs_page(limit, before_seq=cursor, round_number=round_number)
+        return {
+            "entries": entries,
+            "next_cursor": entries[-1]["seq"] if len(entries) == limit else None
+        }
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Get the stored checkpoint and the chain head."""
+        head = await self.db.get_audit_head()
+        return {
+            "checkpoint": await self.db.get_audit_checkpoint(CHECKPOINT_NAME),
+            "head_seq": head["seq"] if head else 0,
+            "last_verification": self.last_verification
+        }
+
+
+# Global audit log service instance
+audit_service = AuditLogService(verify_batch_size=settings.AUDIT_VERIFY_BATCH_SIZE)
@@ -0,0 +1,267 @@
+"""
+Bulk advisory generation for FPO and cooperative portfolios.
+Farms are grouped by advisory profile (normalized conditions and
+preferences, farm size excluded), so every unique profile is solved once.
+Profiles missing from the advisory cache run the rotation, economic and
+climate stages on a process pool, and per-farm results stream back as NDJSON
+lines as each profile finishes, followed by a portfolio aggregate.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+
+from app.core.ndjson import ndjson_line
+
+from .market_analytics_store import market_analytics_store
+from .smart_advisory_service import SmartAdvisoryService, RotationPlan
+
+logger = logging.getLogger(__name__)
+
+M3_PER_MM_HECTARE = 10  # 1 mm of water over 1 ha
+PRICE_SHOCK_Z = 1.645  # one-sided 95% price move
+CONCENTRATION_LIMIT = 0.4  # revenue share above which a commodity is flagged
+
+# Per-process advisory service for pool workers
+_worker_service: Optional[SmartAdvisoryService] = None
+_worker_database_version: Optional[int] = None
+
+
+def _solve_profile(profile: Dict[str, Any], crop_database: Dict[str, Any], database_version: int,
+                   price_samples: Dict[str, List[float]]) -> Tuple[Dict, Dict, Dict]:
+    """
+    Run the three advisory stages for one profile (in a pool worker).
+
+    Args:
+        profile: SmartAdvisoryService.advisory_profile result
+        crop_database: Parent's crop database
+        database_version: Parent's crop database version
+        price_samples: Observed prices per crop, snapshotted by the parent
+
+    Returns:
+        Rotation plan fields, economic analysis and climate analysis
+    """
+    global _worker_service, _worker_database_version
+    if _worker_service is None:
+        _worker_service = SmartAdvisoryService()
+    if _worker_database_version != database_version:
+        _worker_service.rotation_optimizer.set_crop_database(crop_database)
+        _worker_database_version = database_version
+
+    conditions = profile['farm_conditions']
+    rotation_plan = _worker_service.rotation_optimizer.optimize_rotation(
+        conditions, profile['preferences'], profile['years'], profile['seasons'], profile['top_k']
+    )
+    economic_analysis = _worker_service.economic_intelligence.calculate_profit_projection(
+        rotation_plan, price_samples
+    )
+    climate_analysis = _worker_service.climate_adaptation.assess_climate_risk(
+        conditions.get('location', 'jharkhand'), rotation_plan
+    )
+    return asdict(rotation_plan), economic_analysis, climate_analysis
+
+
+class PortfolioAggregate:
+    """Running crop mix, water demand and commodity price exposure over a portfolio."""
+
+    def __init__(self, years: int, price_variation: Dict[str, float]):
+        """
+        Initialize the aggregate.
+
+        Args:
+            years: Planning horizon of the plans
+            price_variation: Seasonal price coefficient of variation per crop
+        """
+        self.years = years
+        self.price_variation = price_variation
+        self.farms = 0
+        self.area = 0.0
+        self.crop_area: Dict[str, float] = {}
+        self.crop_water: Dict[str, float] = {}
+        self.crop_revenue: Dict[str, float] = {}
+        self.expected_profit = 0.0
+
+    def add(self, farm_size: float, rotation_plan: RotationPlan, economic_analysis: Dict[str, Any]) -> None:
+        """Add one farm's advisory (results are per hectare and scaled by farm size)."""
+        self.farms += 1
+        self.area += farm_size
+        for year_plan, projection in zip(rotation_plan.years, economic_analysis['yearly_projections']):
+            crop = year_plan['crop']
+            self.crop_area[crop] = self.crop_area.get(crop, 0.0) + farm_size / self.years
+            self.crop_water[crop] = (self.crop_water.get(crop, 0.0)
+                                     + year_plan['water_requirement'] * farm_size * M3_PER_MM_HECTARE)
+            self.crop_revenue[crop] = (self.crop_revenue.get(crop, 0.0)
+                                       + projection['revenue_range']['expected'] * farm_size)
+        self.expected_profit += economic_analysis['total_profit_3year'] * farm_size
+
+    def summary(self) -> Dict[str, Any]:
+        """Portfolio crop mix, water demand and single-commodity price risk."""
+        cropped_area = sum(self.crop_area.values())
+        total_water = sum(self.crop_water.values())
+        total_revenue = sum(self.crop_revenue.values())
+
+        exposure = []
+        for crop, revenue in sorted(self.crop_revenue.items(), key=lambda item: -item[1]):
+            share = revenue / total_revenue if total_revenue > 0 else 0.0
+            exposure.append({
+                'crop': crop,
+                'expected_revenue': round(revenue, 2),
+                'revenue_share': round(share, 4),
+                'revenue_at_risk_95': round(revenue * PRICE_SHOCK_Z * self.price_variation.get(crop, 0.15), 2)
+            })
+        concentration = sum(item['revenue_share'] ** 2 for item in exposure)
+        largest = exposure[0] if exposure else None
+
+        return {
+            'farms': self.farms,
+            'total_area_ha': round(self.area, 2),
+            'crop_mix': [
+                {
+                    'crop': crop,
+                    'area_ha_per_year': round(area, 2),
+                    'share': round(area / cropped_area, 4) if cropped_area > 0 else 0.0
+                }
+                for crop, area in sorted(self.crop_area.items(), key=lambda item: -item[1])
+            ],
+            'water_demand': {
+                'total_m3': round(total_water, 1),
+                'per_year_m3': round(total_water / self.years, 1),
+                'by_crop_m3': {crop: round(water, 1) for crop, water in self.crop_water.items()}
+            },
+            'price_risk': {
+                'expected_profit': round(self.expected_profit, 2),
+                'commodity_exposure': exposure,
+                'concentration_index': round(concentration, 4),
+                'largest_commodity': largest['crop'] if largest else None,
+                'single_commodity_risk': bool(largest and largest['revenue_share'] > CONCENTRATION_LIMIT)
+            }
+        }
+
+
+class BulkAdvisoryRunner:
+    """Solves unique advisory profiles on a process pool and streams per-farm results."""
+
+    def __init__(self, service: SmartAdvisoryService, workers: int = 2):
+        """
+        Initialize the runner.
+
+        Args:
+            service: Advisory service whose cache holds solved profiles
+            workers: Worker processes (0 solves profiles in a thread instead)
+        """
+        self.service = service
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stats = {"jobs": 0, "farms": 0, "profiles": 0, "cached_profiles": 0, "failed_profiles": 0}
+
+    @property
+    def pool(self) -> Optional[ProcessPoolExecutor]:
+        """Process pool, created on first use."""
+        if self._pool is None and self.workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def stream(self, farms: List[Dict[str, Any]], years: int = 3, seasons: Optional[List[str]] = None,
+                     top_k: int = 1) -> AsyncIterator[bytes]:
+        """
+        Generate advisories for many farms.
+
+        Args:
+            farms: Farms with farm_id, farm_conditions and optional preferences
+            years: Planning horizon (3-10 years)
+            seasons: Seasons to crop each year; None plans one crop per year
+            top_k: Number of plans to rank per profile
+
+        Yields:
+            NDJSON lines: a "job" header, one "farm" (or "error") line per farm
+            as its profile finishes, and a closing "portfolio" aggregate
+        """
+        profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for farm in farms:
+            profile = self.service.advisory_profile(
+                farm['farm_conditions'], farm.get('preferences'), years, seasons, top_k
+            )
+            entry = profiles.setdefault(profile['key'], {'profile': profile, 'farms': []})
+            entry['farms'].append(farm)
+
+        self._stats["jobs"] += 1
+        self._stats["farms"] += len(farms)
+        self._stats["profiles"] += len(profiles)
+        yield ndjson_line({'type': 'job', 'farms': len(farms), 'unique_profiles': len(profiles)})
+
+        aggregate = PortfolioAggregate(years, {
+            crop: data.get('seasonal_variation', 0.15)
+            for crop, data in self.service.economic_intelligence.market_data.items()
+        })
+
+        pending = []
+        for entry in profiles.values():
+            cached = self.service.get_cached_advisory(entry['profile'])
+            if cached is not None:
+                self._stats["cached_profiles"] += 1
+                for line in self._farm_lines(entry, cached, aggregate):
+                    yield line
+            else:
+                pending.append(entry)
+
+        if pending:
+            optimizer = self.service.rotation_optimizer
+            price_samples = {crop: market_analytics_store.get_price_samples(crop) for crop in optimizer.crop_database}
+            loop = asyncio.get_running_loop()
+
+            async def solve(entry):
+                try:
+                    result = await loop.run_in_executor(
+                        self.pool, _solve_profile, entry['profile'], optimizer.crop_database,
+                        optimizer.database_version, price_samples
+                    )
+                    return entry, result, None
+                except Exception as e:
+                    return entry, None, e
+
+            for next_done in asyncio.as_completed([solve(entry) for entry in pending]):
+                entry, result, error = await next_done
+                if error is not None:
+                    self._stats["failed_profiles"] += 1
+                    logger.error(f"Bulk advisory profile failed for {len(entry['farms'])} farms: {error}")
+                    for farm in entry['farms']:
+                        yield ndjson_line({'type': 'error', 'farm_id': farm.get('farm_id'), 'detail': str(error)})
+                    continue
+                plan_fields, economic_analysis, climate_analysis = result
+                stages = (RotationPlan(**plan_fields), economic_analysis, climate_analysis)
+                self.service.store_advisory(entry['profile'], *stages)
+                for line in self._farm_lines(entry, stages, aggregate):
+                    yield line
+
+        yield ndjson_line({'type': 'portfolio', **aggregate.summary()})
+
+    def _farm_lines(self, entry: Dict[str, Any], stages: Tuple, aggregate: PortfolioAggregate) -> List[bytes]:
+        """Per-farm lines for a solved profile, added to the portfolio aggregate."""
+        rotation_plan, economic_analysis, climate_analysis = stages
+        advisory = self.service.assemble_advisory(rotation_plan, economic_analysis, climate_analysis)
+        advisory['rotation_plan'] = asdict(rotation_plan)
+        lines = []
+        for farm in entry['farms']:
+            farm_size = float(farm['farm_conditions'].get('farm_size') or 1.0)
+            aggregate.add(farm_size, rotation_plan, economic_analysis)
+            lines.append(ndjson_line({
+                'type': 'farm',
+                'farm_id': farm.get('farm_id'),
+                'profile': entry['profile']['key'][:16],
+                'farm_size': farm_size,
+                **advisory
+            }))
+        return lines
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get runner statistics."""
+        return {"workers": self.workers, **self._stats}
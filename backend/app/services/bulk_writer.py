@@ -0,0 +1,304 @@
+"""
+Buffered bulk-write pipeline for recommendations and crop history.
+Routes enqueue records and get their ids back immediately; a background task
+groups them into multi-row inserts flushed when a table's buffer reaches
+BULK_WRITE_BATCH_SIZE or every BULK_WRITE_FLUSH_INTERVAL seconds. Every record
+gets its id at enqueue time and batches are written as insert-or-ignore on
+id, so a retried batch never duplicates rows. Whatever is buffered is flushed
+on shutdown.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from .database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+# Tables that accept buffered writes (append-only records nothing reads back
+# immediately) and the timestamp column stamped at enqueue time
+BULK_TABLES = {"recommendations": "created_at", "crops_history": "created_at"}
+
+# SQLSTATE classes of errors retrying cannot fix: data exceptions (22),
+# integrity violations (23: foreign key, unique, check) and syntax or
+# undefined objects (42). PGRST codes are PostgREST request errors.
+PERMANENT_SQLSTATE_CLASSES = ("22", "23", "42")
+TRANSIENT_HTTP_STATUSES = (408, 429)
+
+
+class WriteBufferFullError(Exception):
+    """Raised when the buffer is still over its limit after a flush (database unavailable)."""
+
+    def __init__(self, buffered: int):
+        self.buffered = buffered
+        super().__init__(f"Bulk write buffer full ({buffered} rows pending)")
+
+
+class _TransientWriteError(Exception):
+    """A batch still failed with a retryable error after every retry."""
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """
+    Whether a failed insert would fail again unchanged.
+
+    Constraint and data errors (SQLite integrity/data errors, PostgREST
+    SQLSTATE classes 22/23/42 and PGRST request errors, HTTP 4xx other than
+    408/429) are permanent; network errors, timeouts and 5xx are transient.
+    """
+    if isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError, ValueError, TypeError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return 400 <= status < 500 and status not in TRANSIENT_HTTP_STATUSES
+    code = str(getattr(error, "code", "") or "")
+    return code.startswith("PGRST") or code[:2] in PERMANENT_SQLSTATE_CLASSES
+
+
+class BulkWriter:
+    """
+    Per-table write buffers drained by multi-row inserts.
+
+    Batches failing with a transient error (network, timeout, 5xx) are retried
+    with exponential backoff; a batch that still fails goes back to the front
+    of its buffer for the next flush, so records are only lost if the process
+    exits while the database is unreachable. A batch failing with a permanent
+    error (constraint or data error) is split in halves until the offending
+    rows are isolated; those are dead-lettered and the rest is written, so one
+    bad row never blocks the rows queued behind it.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0, max_retries: int = 3,
+                 retry_backoff: float = 0.5, max_buffered: int = 50000, max_dead_letters: int = 1000):
+        """
+        Initialize the writer.
+
+        Args:
+            batch_size: Rows per insert request, and buffer size that triggers a flush
+            flush_interval: Maximum seconds a record waits in the buffer
+            max_retries: Retries per batch before it is requeued
+            retry_backoff: Delay before the first retry (doubles each time)
+            max_buffered: Rows buffered across tables before enqueue applies backpressure
+            max_dead_letters: Rejected rows kept per table for inspection (oldest dropped)
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_buffered = max_buffered
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {table: [] for table in BULK_TABLES}
+        self._dead_letters: Dict[str, deque] = {table: deque(maxlen=max_dead_letters) for table in BULK_TABLES}
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._db: Optional[DatabaseService] = None
+        self._stats = {
+            "enqueued": 0, "written": 0, "batches": 0, "retries": 0,
+            "requeued_batches": 0, "dead_lettered": 0, "flush_ms": 0.0
+        }
+
+    @property
+    def db(self) -> DatabaseService:
+        """Database service, created on first use."""
+        if self._db is None:
+            self._db = DatabaseService()
+        return self._db
+
+    @property
+    def buffered(self) -> int:
+        """Rows waiting to be written across all tables."""
+        return sum(len(rows) for rows in self._buffers.values())
+
+    async def enqueue(self, table: str, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Buffer records for a bulk insert.
+
+        Args:
+            table: One of BULK_TABLES
+            records: Rows to insert (ids and timestamps are filled in if missing)
+
+        Returns:
+            Ids of the buffered records, in order
+
+        Raises:
+            ValueError: If the table does not accept buffered writes
+            WriteBufferFullError: If the buffer cannot be drained below max_buffered
+        """
+        if table not in self._buffers:
+            raise ValueError(f"Unsupported bulk write table: {table}")
+
+        if self.buffered + len(records) > self.max_buffered:
+            await self.flush()
+            if self.buffered + len(records) > self.max_buffered:
+                raise WriteBufferFullError(self.buffered)
+
+        now = datetime.now(timezone.utc).isoformat()
+        prepared = []
+        for record in records:
+            row = dict(record)
+            row["id"] = str(row.get("id") or uuid.uuid4())
+            row.setdefault(BULK_TABLES[table], now)
+            prepared.append(row)
+
+        self._buffers[table].extend(prepared)
+        self._stats["enqueued"] += len(prepared)
+
+        if len(self._buffers[table]) >= self.batch_size:
+            if self._task and not self._task.done():
+                self._wake.set()
+            else:
+                # No background flusher (scripts, tests): write full batches inline
+                await self.flush(table)
+        return [row["id"] for row in prepared]
+
+    async def flush(self, table: Optional[str] = None) -> int:
+        """
+        Write buffered rows now.
+
+        Each flush takes the rows buffered so far (no lock is held while
+        writing or backing off, so enqueues and other flushes proceed).
+
+        Args:
+            table: Flush only this table (default: all)
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        for name in ([table] if table else list(self._buffers)):
+            rows, self._buffers[name] = self._buffers[name], []
+            for start in range(0, len(rows), self.batch_size):
+                try:
+                    written += await self._write_batch(name, rows[start:start + self.batch_size])
+                except _TransientWriteError as e:
+                    # Keep the unwritten rows ahead of anything enqueued meanwhile
+                    # (rows of the batch that did land are ignored on retry by id)
+                    logger.error(f"Bulk write of {name} rows failed, requeued {len(rows) - start}: {e}")
+                    self._buffers[name][:0] = rows[start:]
+                    self._stats["requeued_batches"] += 1
+                    break
+        return written
+
+    async def _write_batch(self, table: str, batch: List[Dict[str, Any]]) -> int:
+        """
+        Insert one batch, retrying transient errors with exponential backoff
+        and bisecting on permanent errors.
+
+        Returns:
+            Number of rows written (rejected rows are dead-lettered)
+
+        Raises:
+            _TransientWriteError: If a transient error outlasted every retry
+        """
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                await self.db.bulk_insert(table, batch)
+            except Exception as e:
+                if is_permanent_error(e):
+                    return await self._isolate_rejected(table, batch, e)
+                if attempt == self.max_retries:
+                    raise _TransientWriteError(str(e)) from e
+                self._stats["retries"] += 1
+                logger.warning(f"Bulk write of {len(batch)} {table} rows failed (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+                continue
+            self._stats["flush_ms"] += (time.perf_counter() - started) * 1000
+            self._stats["batches"] += 1
+            self._stats["written"] += len(batch)
+            return len(batch)
+        return 0
+
+    async def _isolate_rejected(self, table: str, batch: List[Dict[str, Any]], error: Exception) -> int:
+        """Split a batch rejected by the database until its bad rows are found."""
+        if len(batch) == 1:
+            self._dead_letters[table].append({
+                "row": batch[0],
+                "error": f"{type(error).__name__}: {error}",
+                "rejected_at": datetime.now(timezone.utc).isoformat()
+            })
+            self._stats["dead_lettered"] += 1
+            logger.error(f"Bulk write rejected {table} row {batch[0].get('id')}, dead-lettered: {error}")
+            return 0
+        middle = len(batch) // 2
+        return await self._write_batch(table, batch[:middle]) + await self._write_batch(table, batch[middle:])
+
+    def get_dead_letters(self, table: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Rows the database rejected permanently.
+
+        Args:
+            table: Only this table (default: all)
+
+        Returns:
+            Table -> rejected rows with their error and rejection time, oldest first
+        """
+        tables = [table] if table else list(self._dead_letters)
+        return {name: list(self._dead_letters[name]) for name in tables}
+
+    async def _flush_periodically(self):
+        """Flush whenever a buffer fills up or the flush interval passes."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self.buffered:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Error in bulk write flush: {e}")
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop."""
+        if self._task and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_periodically())
+        logger.info(f"Bulk writer flushing every {self.flush_interval}s or {self.batch_size} rows")
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.buffered:
+            logger.error(f"Bulk writer stopped with {self.buffered} unwritten rows")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer and throughput statistics."""
+        batches = self._stats["batches"]
+        return {
+            "buffered": {table: len(rows) for table, rows in self._buffers.items()},
+            "dead_letters": {table: len(rows) for table, rows in self._dead_letters.items()},
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "running": bool(self._task and not self._task.done()),
+            **{key: value for key, value in self._stats.items() if key != "flush_ms"},
+            "avg_batch_ms": round(self._stats["flush_ms"] / batches, 1) if batches else 0.0
+        }
+
+
+# Global bulk writer instance
+bulk_writer = BulkWriter(
+    batch_size=settings.BULK_WRITE_BATCH_SIZE,
+    flush_interval=settings.BULK_WRITE_FLUSH_INTERVAL,
+    max_retries=settings.BULK_WRITE_MAX_RETRIES,
+    retry_backoff=settings.BULK_WRITE_RETRY_BACKOFF,
+    max_buffered=settings.BULK_WRITE_MAX_BUFFERED,
+    max_dead_letters=settings.BULK_WRITE_MAX_DEAD_LETTERS
+)
@@ -20,14 +20,26 @@ class MarketDataCache:
     In-memory cache for market data with TTL and request deduplication.
     """
     
-    def __init__(self):
-        """Initialize the cache."""
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Entry bound; when full, expired entries are swept and
+                then the oldest entries evicted (None: unbounded)
+        """
         self._cache = {}
+        self._max_entries = max_entries
         self._pending_requests = {}
         self._default_ttl = 900  # 15 minutes for market data
         self._weather_ttl = 3600  # 1 hour for weather data
         self._analytics_ttl = 1800  # 30 minutes for analytics
         
+        # Lookup counters for hit ratio reporting
+        self._hits = 0
+        self._misses = 0
+        self._deduplicated = 0
+        
     def _generate_cache_key(self, *args, **kwargs) -> str:
         """Generate a unique cache key from arguments."""
         key_data = f"{args}_{sorted(kwargs.items())}"
@@ -64,21 +76,24 @@ class MarketDataCache:
         if cache_key in self._cache:
             cache_entry = self._cache[cache_key]
             if not self._is_expired(cache_entry):
-                logger.info(f"Cache HIT for key: {key}")
+                logger.debug(f"Cache HIT for key: {key}")
+                self._hits += 1
                 return cache_entry['data']
             else:
                 # Remove expired entry
                 del self._cache[cache_key]
-                logger.info(f"Cache EXPIRED for key: {key}")
+                logger.debug(f"Cache EXPIRED for key: {key}")
         
         # Check if the same request is already in progress
         if cache_key in self._pending_requests:
             logger.info(f"Request DEDUPLICATION for key: {key}")
+            self._deduplicated += 1
             return await self._pending_requests[cache_key]
         
         # Create a future for this request to handle concurrent requests
         future = asyncio.Future()
         self._pending_requests[cache_key] = future
+        self._misses += 1
         
         try:
             logger.info(f"Cache MISS for key: {key} - Fetching fresh data")
@@ -86,17 +101,13 @@ class MarketDataCache:
             # Fetch fresh data
             data = await fetch_func(*args, **kwargs)
             
-            # Cache the result
+            # Cache the result, unless the key was invalidated or overwritten while
+            # loading: the load may have read the row before that write
             if ttl is None:
                 ttl = self._get_ttl_for_data_type(data_type)
             
-            self._cache[cache_key] = {
-                'data': data,
-                'created_at': time.time(),
-                'expires_at': time.time() + ttl,
-                'ttl': ttl,
-                'key': key
-            }
+            if self._pending_requests.get(cache_key) is future:
+                self._store(cache_key, key, data, ttl)
             
             # Resolve the future
             future.set_result(data)
@@ -107,10 +118,76 @@ class MarketDataCache:
             future.set_exception(e)
             raise
         finally:
-            # Clean up pending request
-            if cache_key in self._pending_requests:
+            # Clean up pending request (an invalidation may already have dropped it)
+            if self._pending_requests.get(cache_key) is future:
                 del self._pending_requests[cache_key]
     
+    def _store(self, cache_key: str, key: str, data: Any, ttl: int) -> None:
+        """Insert an entry, making room first when the cache is bounded and full."""
+        if self._max_entries is not None and cache_key not in self._cache and len(self._cache) >= self._max_entries:
+            self.cleanup_expired()
+            while len(self._cache) >= self._max_entries:
+                # Entries are kept in insertion order: drop the oldest
+                del self._cache[next(iter(self._cache))]
+        now = time.time()
+        self._cache[cache_key] = {
+            'data': data,
+            'created_at': now,
+            'expires_at': now + ttl,
+            'ttl': ttl,
+            'key': key
+        }
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Read a cached value without fetching.
+        
+        Args:
+            key: Cache key as passed to get_or_set (without extra args)
+            default: Value returned when the key is absent or expired
+        """
+        cache_entry = self._cache.get(self._generate_cache_key(key))
+        if cache_entry is None or self._is_expired(cache_entry):
+            return default
+        return cache_entry['data']
+    
+    def set(self, key: str, data: Any, ttl: Optional[int] = None, data_type: str = 'market') -> None:
+        """Store a value directly (write-through after a database write)."""
+        if ttl is None:
+            ttl = self._get_ttl_for_data_type(data_type)
+        cache_key = self._generate_cache_key(key)
+        # A load still in flight may have read the row before this write
+        self._pending_requests.pop(cache_key, None)
+        self._store(cache_key, key, data, ttl)
+    
+    def get_version(self, key: str, *args, **kwargs) -> Optional[float]:
+        """
+        Creation time of a live entry, used as its version.
+        
+        Takes the same key and fetch arguments as get_or_set.
+        
+        Returns:
+            Entry creation timestamp, or None if missing or expired
+        """
+        cache_entry = self._cache.get(self._generate_cache_key(key, *args, **kwargs))
+        if cache_entry is None or self._is_expired(cache_entry):
+            return None
+        return cache_entry['created_at']
+    
+    def invalidate_key(self, key: str) -> bool:
+        """
+        Invalidate a single entry by its exact key.
+        
+        An in-flight load of the key is detached, so it cannot write back the
+        row it read before the invalidating write.
+        
+        Returns:
+            True if an entry was removed
+        """
+        cache_key = self._generate_cache_key(key)
+        self._pending_requests.pop(cache_key, None)
+        return self._cache.pop(cache_key, None) is not None
+    
     def invalidate(self, pattern: str = None) -> int:
         """
         Invalidate cache entries.
@@ -124,6 +201,7 @@ class MarketDataCache:
         if pattern is None:
             count = len(self._cache)
             self._cache.clear()
+            self._pending_requests.clear()
             logger.info(f"Invalidated all {count} cache entries")
             return count
         
@@ -134,6 +212,7 @@ class MarketDataCache:
         
         for key in keys_to_remove:
             del self._cache[key]
+            self._pending_requests.pop(key, None)
         
         logger.info(f"Invalidated {len(keys_to_remove)} cache entries matching pattern: {pattern}")
         return len(keys_to_remove)
@@ -144,15 +223,25 @@ class MarketDataCache:
         total_entries = len(self._cache)
         expired_entries = sum(1 for entry in self._cache.values() if entry['expires_at'] < now)
         active_entries = total_entries - expired_entries
+        lookups = self._hits + self._misses + self._deduplicated
         
         return {
             'total_entries': total_entries,
             'active_entries': active_entries,
             'expired_entries': expired_entries,
             'pending_requests': len(self._pending_requests),
-            'cache_hit_ratio': getattr(self, '_hit_ratio', 0.0)
+            'hits': self._hits,
+            'misses': self._misses,
+            'deduplicated': self._deduplicated,
+            'cache_hit_ratio': round((self._hits + self._deduplicated) / lookups, 4) if lookups else 0.0
         }
     
+    def reset_stats(self) -> None:
+        """Reset lookup counters (entries are kept)."""
+        self._hits = 0
+        self._misses = 0
+        self._deduplicated = 0
+    
     def cleanup_expired(self) -> int:
         """Remove expired entries from cache."""
         now = time.time()
@@ -164,7 +253,7 @@ class MarketDataCache:
         for key in expired_keys:
             del self._cache[key]
         
-        logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
         return len(expired_keys)
 
 
@@ -0,0 +1,285 @@
+"""
+Seasonal climatology.
+District monthly normals (temperature, rainfall and humidity ranges) are
+built once from the bundled Jharkhand season normals and district modifiers
+into a compact array indexed by (district, season, month). Season statistics,
+the /weather/seasonal payloads (with their month-by-month breakdown) and
+per-season risk indices for the climate adaptation advisory are precomputed
+from it, and the advisory reads the sowing month's normals from it, so
+readers do constant-time lookups against one source of truth.
+"""
+
+import logging
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from app.core.config import JHARKHAND_DISTRICTS
+
+logger = logging.getLogger(__name__)
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+# Jharkhand season normals (IMD, 2010-2024); rainfall is the season total in mm
+SEASON_NORMALS = {
+    "kharif": {
+        "months": ["June", "July", "August", "September"],
+        "avg_temperature_range": [26, 32],
+        "avg_rainfall_range": [1000, 1400],
+        "humidity_range": [70, 85],
+        "description": "Monsoon season, ideal for rice, maize, sugarcane"
+    },
+    "rabi": {
+        "months": ["November", "December", "January", "February"],
+        "avg_temperature_range": [15, 25],
+        "avg_rainfall_range": [50, 150],
+        "humidity_range": [55, 70],
+        "description": "Post-monsoon season, suitable for wheat, gram, mustard"
+    },
+    "summer": {
+        "months": ["March", "April", "May"],
+        "avg_temperature_range": [25, 40],
+        "avg_rainfall_range": [20, 80],
+        "humidity_range": [45, 65],
+        "description": "Hot dry season, limited cultivation without irrigation"
+    }
+}
+SEASONS = list(SEASON_NORMALS)
+SEASON_ALIASES = {"zaid": "summer"}
+
+# District variations by geography: eastern districts are wetter and cooler,
+# western districts drier and hotter
+DISTRICT_MODIFIERS = {
+    "Dumka": {"rainfall_modifier": 1.2, "temp_modifier": -1},
+    "Deoghar": {"rainfall_modifier": 1.1, "temp_modifier": -0.5},
+    "Godda": {"rainfall_modifier": 1.15, "temp_modifier": -0.8},
+    "Garhwa": {"rainfall_modifier": 0.8, "temp_modifier": 1.5},
+    "Palamu": {"rainfall_modifier": 0.85, "temp_modifier": 1.2},
+    "Latehar": {"rainfall_modifier": 0.9, "temp_modifier": 1.0},
+    "Ranchi": {"rainfall_modifier": 1.0, "temp_modifier": 0},
+    "Hazaribagh": {"rainfall_modifier": 0.95, "temp_modifier": 0.5},
+    "Bokaro": {"rainfall_modifier": 1.05, "temp_modifier": 0.2}
+}
+DEFAULT_MODIFIER = {"rainfall_modifier": 1.0, "temp_modifier": 0}
+
+# Normal fields of the climatology array
+FIELDS = ["temp_low", "temp_high", "rain_low", "rain_high", "humidity_low", "humidity_high"]
+TEMP_LOW, TEMP_HIGH, RAIN_LOW, RAIN_HIGH, HUMIDITY_LOW, HUMIDITY_HIGH = range(len(FIELDS))
+
+# State-wide climate traits not resolved by the normals
+RAINFALL_VARIABILITY = 0.25
+TEMPERATURE_TREND = "increasing"
+MONSOON_RELIABILITY = 0.75
+
+# Risk index thresholds: heat stress ramps from HEAT_ONSET to HEAT_ONSET + HEAT_SPAN
+# (season mean maximum, C); extreme events are flagged per season and add
+# EVENT_RISK each on top of BASE_EVENT_RISK
+HEAT_ONSET = 30
+HEAT_SPAN = 10
+HEATWAVE_TEMPERATURE = 38
+FLOOD_RAINFALL = 1200
+BASE_EVENT_RISK = 0.2
+EVENT_RISK = 0.1
+
+METADATA = {
+    "data_source": "Historical weather patterns (2010-2024)",
+    "last_updated": "2024-09-15",
+    "accuracy": "Based on IMD data for Jharkhand region"
+}
+
+
+class Climatology:
+    """District x season x month climate normals with precomputed season statistics and risk indices."""
+
+    def __init__(self, districts: Optional[List[str]] = None):
+        """
+        Build the normals and everything derived from them.
+
+        Args:
+            districts: Districts to cover (default: all Jharkhand districts)
+        """
+        self.districts = list(districts or JHARKHAND_DISTRICTS)
+        self.index = {district.lower(): d for d, district in enumerate(self.districts)}
+        modifiers = [DISTRICT_MODIFIERS.get(district, DEFAULT_MODIFIER) for district in self.districts]
+        rain_modifier = np.array([m["rainfall_modifier"] for m in modifiers])[:, None]
+        temp_modifier = np.array([m["temp_modifier"] for m in modifiers])[:, None]
+
+        # seasonal[district, season, field]: temperature and humidity ranges, season rainfall totals
+        self.seasonal = np.stack([
+            np.concatenate([
+                np.array(SEASON_NORMALS[season]["avg_temperature_range"], dtype=float) + temp_modifier,
+                np.array(SEASON_NORMALS[season]["avg_rainfall_range"], dtype=float) * rain_modifier,
+                np.broadcast_to(np.array(SEASON_NORMALS[season]["humidity_range"], dtype=float),
+                                (len(self.districts), 2))
+            ], axis=1)
+            for season in SEASONS
+        ], axis=1)
+
+        # normals[district, season, month, field]: rainfall spread evenly over the
+        # season's months; NaN for months outside the season
+        self.normals = np.full((len(self.districts), len(SEASONS), len(MONTHS), len(FIELDS)), np.nan)
+        for s, season in enumerate(SEASONS):
+            months = [MONTHS.index(month) for month in SEASON_NORMALS[season]["months"]]
+            values = self.seasonal[:, s].copy()
+            values[:, [RAIN_LOW, RAIN_HIGH]] /= len(months)
+            self.normals[:, s, months, :] = values[:, None, :]
+
+        self.annual_rainfall = self.seasonal[..., [RAIN_LOW, RAIN_HIGH]].mean(axis=2).sum(axis=1)
+
+        # Risk indices per (district, season)
+        season_rain = self.seasonal[..., [RAIN_LOW, RAIN_HIGH]].mean(axis=2)
+        self.heat_risk = np.clip((self.seasonal[..., TEMP_HIGH] - HEAT_ONSET) / HEAT_SPAN, 0.0, 1.0)
+        monsoon = np.array([season == "kharif" for season in SEASONS])
+        self.events = {
+            "drought": monsoon & (rain_modifier < 1.0),
+            "flood": season_rain >= FLOOD_RAINFALL,
+            "heatwave": self.seasonal[..., TEMP_HIGH] >= HEATWAVE_TEMPERATURE
+        }
+        event_count = sum(flags.astype(int) for flags in self.events.values())
+        self.event_risk = BASE_EVENT_RISK + EVENT_RISK * event_count
+
+        self._patterns = {district: self._build_patterns(d) for d, district in enumerate(self.districts)}
+        logger.info(f"Climatology built for {len(self.districts)} districts x {len(SEASONS)} seasons")
+
+    def district_row(self, location: Optional[str]) -> Optional[int]:
+        """Row of a district name (case-insensitive); None for other locations."""
+        return self.index.get((location or "").strip().lower())
+
+    @staticmethod
+    def season_column(season: Optional[str]) -> Optional[int]:
+        """Column of a season name (Zaid is summer); None if unknown."""
+        season = (season or "").strip().lower()
+        season = SEASON_ALIASES.get(season, season)
+        return SEASONS.index(season) if season in SEASONS else None
+
+    def seasonal_patterns(self, district: str) -> Dict[str, Any]:
+        """
+        Seasonal weather patterns of a district.
+
+        Args:
+            district: District name
+
+        Returns:
+            Precomputed /weather/seasonal payload (shared, do not mutate)
+        """
+        return self._patterns[district]
+
+    def month_normals(self, district: str, month: int) -> Optional[Dict[str, float]]:
+        """
+        Climate normals of one month.
+
+        Args:
+            district: District name
+            month: Month number (1-12)
+
+        Returns:
+            Season and normal ranges, or None for unknown districts and
+            months outside every season
+        """
+        d = self.district_row(district)
+        if d is None:
+            return None
+        seasons = np.flatnonzero(~np.isnan(self.normals[d, :, month - 1, TEMP_LOW]))
+        if not len(seasons):
+            return None
+        values = self.normals[d, seasons[0], month - 1]
+        return {"season": SEASONS[seasons[0]], **{field: round(float(values[f]), 1) for f, field in enumerate(FIELDS)}}
+
+    def planting_normals(self, location: Optional[str], season: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Climate normals of a season's sowing (first) month.
+
+        Args:
+            location: District name or region (state averages)
+            season: Season name
+
+        Returns:
+            Month name and normal ranges, or None for unknown seasons
+        """
+        s = self.season_column(season)
+        if s is None:
+            return None
+        month = MONTHS.index(SEASON_NORMALS[SEASONS[s]]["months"][0])
+        d = self.district_row(location)
+        rows = slice(None) if d is None else slice(d, d + 1)
+        values = self.normals[rows, s, month].mean(axis=0)
+        return {"month": MONTHS[month], **{field: round(float(values[f]), 1) for f, field in enumerate(FIELDS)}}
+
+    def climate_profile(self, location: Optional[str]) -> Dict[str, Any]:
+        """
+        Climate traits of a district, or state averages for other locations.
+
+        Args:
+            location: District name or region (e.g. "jharkhand")
+
+        Returns:
+            annual_rainfall, rainfall_variability, temperature_trend,
+            extreme_events and monsoon_reliability
+        """
+        d = self.district_row(location)
+        rows = slice(None) if d is None else slice(d, d + 1)
+        return {
+            "annual_rainfall": round(float(self.annual_rainfall[rows].mean())),
+            "rainfall_variability": RAINFALL_VARIABILITY,
+            "temperature_trend": TEMPERATURE_TREND,
+            "extreme_events": [event for event, flags in self.events.items() if flags[rows].any()],
+            "monsoon_reliability": MONSOON_RELIABILITY
+        }
+
+    def season_risk(self, location: Optional[str], season: Optional[str]) -> Dict[str, float]:
+        """
+        Heat stress and extreme event risk indices of a season.
+
+        Args:
+            location: District name or region (state averages)
+            season: Season name (unknown seasons average all seasons)
+
+        Returns:
+            heat_stress_risk and extreme_event_risk in 0-1
+        """
+        d = self.district_row(location)
+        s = self.season_column(season)
+        rows = slice(None) if d is None else slice(d, d + 1)
+        columns = slice(None) if s is None else slice(s, s + 1)
+        return {
+            "heat_stress_risk": round(float(self.heat_risk[rows, columns].mean()), 3),
+            "extreme_event_risk": round(float(self.event_risk[rows, columns].mean()), 3)
+        }
+
+    def _build_patterns(self, d: int) -> Dict[str, Any]:
+        """/weather/seasonal payload of one district."""
+        seasons = {}
+        for s, season in enumerate(SEASONS):
+            values = self.seasonal[d, s]
+            seasons[season] = {
+                "months": SEASON_NORMALS[season]["months"],
+                "avg_temperature": round(float(values[[TEMP_LOW, TEMP_HIGH]].mean()), 1),
+                "avg_rainfall": round(float(values[[RAIN_LOW, RAIN_HIGH]].mean())),
+                "humidity": round(float(values[[HUMIDITY_LOW, HUMIDITY_HIGH]].mean())),
+                "description": SEASON_NORMALS[season]["description"],
+                "temperature_range": {
+                    "min": round(float(values[TEMP_LOW]), 1),
+                    "max": round(float(values[TEMP_HIGH]), 1)
+                },
+                "rainfall_range": {
+                    "min": round(float(values[RAIN_LOW])),
+                    "max": round(float(values[RAIN_HIGH]))
+                },
+                "monthly": [self._month_summary(d, s, month) for month in SEASON_NORMALS[season]["months"]]
+            }
+        return {"district": self.districts[d], "metadata": METADATA, "seasons": seasons}
+
+    def _month_summary(self, d: int, s: int, month: str) -> Dict[str, Any]:
+        """Averages of one month's normals for the /weather/seasonal payload."""
+        values = self.normals[d, s, MONTHS.index(month)]
+        return {
+            "month": month,
+            "avg_temperature": round(float(values[[TEMP_LOW, TEMP_HIGH]].mean()), 1),
+            "avg_rainfall": round(float(values[[RAIN_LOW, RAIN_HIGH]].mean())),
+            "humidity": round(float(values[[HUMIDITY_LOW, HUMIDITY_HIGH]].mean()))
+        }
+
+
+# Global instance
+climatology = Climatology()
@@ -0,0 +1,198 @@
+"""
+Crop economics engine.
+One parameter table (reference yield, price and production cost per crop)
+shared by every recommender and the finance routes, stored as arrays indexed
+by crop row. Estimates are computed for whole batches (crops x farms) with
+array operations; single-crop calls are the 1 x 1 case of the same formula.
+Canonical units are tonnes/ha for yield, INR/quintal for price and INR/ha for
+cost; callers convert to their response units with the helpers below.
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUINTALS_PER_TONNE = 10
+HECTARES_PER_ACRE = 0.4047
+
+# Reference yield (t/ha), farm-gate price (INR/quintal) and production cost (INR/ha)
+CROP_PARAMETERS = {
+    'Rice': (4.5, 2000, 45000),
+    'Wheat': (3.2, 2100, 35000),
+    'Maize': (5.1, 1800, 30000),
+    'Potato': (22.0, 1200, 80000),
+    'Arhar': (1.8, 6000, 28000),
+    'Chickpea': (1.8, 5200, 26000),
+    'Groundnut': (2.0, 5000, 32000),
+    'Soybean': (2.0, 4000, 24000),
+    'Mustard': (1.2, 4500, 22000),
+    'Cotton': (2.5, 5500, 45000),
+    'Sugarcane': (65.0, 350, 120000),
+    'Onion': (18.5, 1500, 80000),
+    'Tomato': (25.0, 2000, 100000),
+    'Turmeric': (2.5, 8500, 55000)
+}
+DEFAULT_PARAMETERS = (3.0, 2000, 40000)
+CROP_ALIASES = {'gram': 'Chickpea', 'paddy': 'Rice', 'tur': 'Arhar', 'pigeon pea': 'Arhar'}
+
+# Yield multipliers for soil type and irrigation method
+SOIL_YIELD_FACTORS = {
+    'Alluvial Soil': 1.2,
+    'Loamy Soil': 1.1,
+    'Red Soil': 1.0,
+    'Clay Soil': 0.9,
+    'Sandy Soil': 0.8,
+    'Black Soil': 1.0,
+    'Laterite Soil': 0.8
+}
+IRRIGATION_YIELD_FACTORS = {
+    'Rain-fed': 0.8,
+    'Dug well': 0.9,
+    'Tube well': 1.1,
+    'Canal': 1.0,
+    'Drip irrigation': 1.2,
+    'Sprinkler irrigation': 1.1
+}
+
+# Share of production cost per input
+COST_BREAKDOWN = {
+    'seeds': 0.087,
+    'fertilizers': 0.217,
+    'pesticides': 0.065,
+    'labor': 0.348,
+    'machinery': 0.130,
+    'irrigation': 0.087,
+    'miscellaneous': 0.066
+}
+
+PriceOverride = Union[None, Sequence[float], Dict[str, float]]
+
+
+class CropEconomics:
+    """Array-indexed crop parameter table with batch yield, cost and profit estimates."""
+
+    def __init__(self, parameters: Dict[str, tuple] = None, default: tuple = DEFAULT_PARAMETERS):
+        """
+        Build the parameter arrays.
+
+        Args:
+            parameters: Crop -> (yield t/ha, price INR/quintal, cost INR/ha)
+            default: Parameters for crops missing from the table (last row)
+        """
+        parameters = parameters or CROP_PARAMETERS
+        self.crops = list(parameters)
+        rows = np.array([*parameters.values(), default], dtype=float)
+        self.yields = rows[:, 0]
+        self.prices = rows[:, 1]
+        self.costs = rows[:, 2]
+        self.default_row = len(self.crops)
+        self.index = {crop.lower(): row for row, crop in enumerate(self.crops)}
+        self.index.update({
+            alias: self.index[crop.lower()] for alias, crop in CROP_ALIASES.items() if crop.lower() in self.index
+        })
+
+    def rows(self, crops: Sequence[str]) -> np.ndarray:
+        """Row index of every crop (the default row for unknown crops)."""
+        return np.array([self.index.get(str(crop).strip().lower(), self.default_row) for crop in crops], dtype=int)
+
+    def base_yield(self, crop: str) -> float:
+        """Reference yield in tonnes/ha."""
+        return float(self.yields[self.rows([crop])[0]])
+
+    def price(self, crop: str) -> float:
+        """Reference price in INR/quintal."""
+        return float(self.prices[self.rows([crop])[0]])
+
+    def cost(self, crop: str) -> float:
+        """Production cost in INR/ha."""
+        return float(self.costs[self.rows([crop])[0]])
+
+    def estimate(self,
+                 crops: Sequence[str],
+                 farms: Optional[List[Dict[str, Any]]] = None,
+                 prices: PriceOverride = None) -> Dict[str, np.ndarray]:
+        """
+        Yield, cost, revenue and profit for every (farm, crop) pair.
+
+        Args:
+            crops: Crop names (n)
+            farms: Farms (m), each with optional area_ha (default 1),
+                yield_factor and cost_factor (default 1, scalar or per crop);
+                None is one 1 ha farm with reference conditions
+            prices: INR/quintal per crop overriding the reference prices, as a
+                sequence aligned with crops or a crop -> price dict (missing or
+                non-positive entries keep the reference price)
+
+        Returns:
+            Arrays shaped (m, n): yield_t_ha, production_quintals, revenue,
+            cost, profit (INR for the whole area), margin_percent, roi_percent,
+            plus price (n,) in INR/quintal
+        """
+        rows = self.rows(crops)
+        farms = farms if farms is not None else [{}]
+        price = self.prices[rows].copy()
+        if prices is not None:
+            override = (np.array([prices.get(crop, 0) or 0 for crop in crops], dtype=float)
+                        if isinstance(prices, dict) else np.asarray(prices, dtype=float))
+            price = np.where(override > 0, override, price)
+
+        area = np.array([[float(farm.get('area_ha', 1.0))] for farm in farms])
+        yield_factor = np.array([np.broadcast_to(farm.get('yield_factor', 1.0), len(rows)) for farm in farms], dtype=float)
+        cost_factor = np.array([np.broadcast_to(farm.get('cost_factor', 1.0), len(rows)) for farm in farms], dtype=float)
+
+        yield_t_ha = self.yields[rows] * yield_factor
+        production = yield_t_ha * QUINTALS_PER_TONNE * area
+        revenue = production * price
+        cost = self.costs[rows] * cost_factor * area
+        profit = revenue - cost
+        return {
+            'price': price,
+            'yield_t_ha': yield_t_ha,
+            'production_quintals': production,
+            'revenue': revenue,
+            'cost': cost,
+            'profit': profit,
+            'margin_percent': np.divide(profit * 100, revenue, out=np.zeros_like(profit), where=revenue > 0),
+            'roi_percent': np.divide(profit * 100, cost, out=np.zeros_like(profit), where=cost > 0)
+        }
+
+    def estimate_one(self, crop: str, area_ha: float = 1.0, yield_factor: float = 1.0,
+                     cost_factor: float = 1.0, price: Optional[float] = None) -> Dict[str, float]:
+        """
+        Estimate for one crop on one farm.
+
+        Args:
+            crop: Crop name
+            area_ha: Cultivated area in hectares
+            yield_factor: Multiplier on the reference yield
+            cost_factor: Multiplier on the reference cost
+            price: INR/quintal overriding the reference price
+
+        Returns:
+            Same fields as estimate(), as floats
+        """
+        result = self.estimate([crop], [{'area_ha': area_ha, 'yield_factor': yield_factor, 'cost_factor': cost_factor}],
+                               [price or 0])
+        return {key: float(value.ravel()[0]) for key, value in result.items()}
+
+    @staticmethod
+    def management_factor(soil_type: Optional[str], irrigation_method: Optional[str]) -> float:
+        """Yield multiplier for the farm's soil type and irrigation method."""
+        return SOIL_YIELD_FACTORS.get(soil_type, 1.0) * IRRIGATION_YIELD_FACTORS.get(irrigation_method, 1.0)
+
+    @staticmethod
+    def cost_breakdown(total_cost: float) -> Dict[str, float]:
+        """Split a production cost over inputs."""
+        return {item: round(total_cost * share, 2) for item, share in COST_BREAKDOWN.items()}
+
+
+def quintals_per_acre(tonnes_per_hectare: float) -> float:
+    """Convert a yield in t/ha to quintals/acre."""
+    return tonnes_per_hectare * QUINTALS_PER_TONNE * HECTARES_PER_ACRE
+
+
+# Global instance
+crop_economics = CropEconomics()
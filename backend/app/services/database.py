@@ -2,23 +2,104 @@
 Database service for Supabase integration.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
 import asyncio
 from datetime import datetime
 import json
 import uuid
 import os
+import httpx
 from app.core.config import settings
+from app.services.entity_cache import entity_cache, MISSING
+from app.services.sustainability_service import SustainabilityService
+
+# One PostgREST client (and connection pool) per worker process, shared by
+# every DatabaseService instance; writes reserved for the backend by row level
+# security go through a second client authenticated as service_role
+_rest_client = None
+_service_rest_client = None
+
+
+def _create_rest_client(api_key: str):
+    """Async PostgREST client for SUPABASE_URL/rest/v1 with its own connection pool."""
+    from postgrest import AsyncPostgrestClient
+    from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+    
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.DB_POOL_SIZE,
+            max_keepalive_connections=settings.DB_POOL_SIZE
+        ),
+        timeout=httpx.Timeout(settings.DB_QUERY_TIMEOUT, pool=settings.DB_POOL_TIMEOUT),
+        follow_redirects=True
+    )
+    return AsyncPostgrestClient(
+        f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1",
+        headers={
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apikey": api_key,
+            "Authorization": f"Bearer {api_key}"
+        },
+        http_client=http_client
+    )
+
+
+def get_rest_client():
+    """
+    Get the worker's shared async PostgREST client, creating it on first use.
+    
+    Queries run natively on the event loop over a bounded httpx connection pool
+    (DB_POOL_SIZE connections); requests beyond that wait for a free connection
+    instead of blocking the worker.
+    
+    Returns:
+        AsyncPostgrestClient bound to SUPABASE_URL/rest/v1
+    """
+    global _rest_client
+    if _rest_client is None:
+        _rest_client = _create_rest_client(settings.SUPABASE_ANON_KEY)
+        print(f"✅ Using real Supabase connection (async pool of {settings.DB_POOL_SIZE})")
+    return _rest_client
+
+
+def get_service_rest_client():
+    """
+    Get the worker's PostgREST client authenticated as service_role.
+    
+    Only used for writes that row level security reserves for the backend
+    (audit chain appends and verification checkpoints); everything else goes
+    through the anon client.
+    
+    Returns:
+        AsyncPostgrestClient bound to SUPABASE_URL/rest/v1
+    """
+    global _service_rest_client
+    if _service_rest_client is None:
+        _service_rest_client = _create_rest_client(settings.SUPABASE_SERVICE_ROLE_KEY)
+    return _service_rest_client
+
+
+async def close_rest_client():
+    """Close the worker's PostgREST connection pools."""
+    global _rest_client, _service_rest_client
+    if _rest_client is not None:
+        await _rest_client.aclose()
+        _rest_client = None
+    if _service_rest_client is not None:
+        await _service_rest_client.aclose()
+        _service_rest_client = None
 
 
 class DatabaseService:
     """
     Database service for handling all database operations using Supabase.
-    Falls back to mock service if Supabase credentials are not configured.
+    Queries go through the shared async PostgREST client, so a slow query only
+    holds its own connection rather than the worker's event loop.
+    Falls back to the local SQLite database if Supabase credentials are not configured.
     """
     
     def __init__(self):
-        """Initialize Supabase client or mock service."""
+        """Initialize the shared async PostgREST client or local database."""
         # Check if we have real Supabase credentials
         has_real_credentials = (
             settings.SUPABASE_URL and 
@@ -29,56 +110,29 @@ class DatabaseService:
         
         if has_real_credentials:
             try:
-                from supabase import create_client, Client
-                self.supabase: Client = create_client(
-                    settings.SUPABASE_URL,
-                    settings.SUPABASE_ANON_KEY
-                )
+                self.rest = get_rest_client()
+                self.service_rest = get_service_rest_client()
                 self.use_mock = False
-                print("✅ Using real Supabase connection")
             except Exception as e:
                 print(f"❌ Supabase connection failed: {e}")
-                print("🔄 Falling back to mock database")
+                print("🔄 Falling back to local database")
                 self._init_mock_service()
         else:
-            print("⚠️  Supabase credentials not configured, using mock database")
+            print("⚠️  Supabase credentials not configured, using local database")
             self._init_mock_service()
     
     def _init_mock_service(self):
-        """Initialize mock database service."""
-        self.use_mock = True
-        # Mock data storage
-        self.farmers = {}
-        self.farms = {}
-        self.recommendations = {}
-        
-        # Add demo data
-        demo_farmer_id = "demo-farmer-123"
-        demo_farm_id = "demo-farm-456"
-        
-        self.farmers[demo_farmer_id] = {
-            "id": demo_farmer_id,
-            "name": "Demo Farmer",
-            "phone": "9876543210",
-            "password": "hashed_password_demo",
-            "language": "english",
-            "created_at": "2024-01-01T00:00:00Z"
-        }
+        """
+        Use the process-wide local SQLite database instead of Supabase.
         
-        self.farms[demo_farm_id] = {
-            "id": demo_farm_id,
-            "farmer_id": demo_farmer_id,
-            "location": {
-                "latitude": 23.3441,
-                "longitude": 85.3096,
-                "district": "Ranchi",
-                "village": "Demo Village"
-            },
-            "soil_type": "loam",
-            "irrigation_method": "drip",
-            "field_size": 2.5,
-            "created_at": "2024-01-01T00:00:00Z"
-        }
+        It speaks the same query-builder interface as the PostgREST client, so
+        every method below works unchanged and writes persist across requests
+        (and restarts) in LOCAL_DB_PATH.
+        """
+        from app.services.local_database import get_local_database
+        
+        self.use_mock = True
+        self.rest = self.service_rest = get_local_database()
     
     # Farmer operations
     async def create_farmer(self, farmer_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -91,8 +145,11 @@ class DatabaseService:
         Returns:
             Created farmer record
         """
-        result = self.supabase.table("farmers").insert(farmer_data).execute()
-        return result.data[0] if result.data else None
+        result = await self.rest.table("farmers").insert(farmer_data).execute()
+        farmer = result.data[0] if result.data else None
+        if farmer:
+            entity_cache.prime("farmer", farmer["id"], farmer)
+        return farmer
     
     async def get_farmer_by_id(self, farmer_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -104,8 +161,11 @@ class DatabaseService:
         Returns:
             Farmer record or None
         """
-        result = self.supabase.table("farmers").select("*").eq("id", farmer_id).execute()
-        return result.data[0] if result.data else None
+        async def load():
+            result = await self.rest.table("farmers").select("*").eq("id", farmer_id).execute()
+            return result.data[0] if result.data else None
+        
+        return await entity_cache.get("farmer", farmer_id, load)
     
     async def get_farmer_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
         """
@@ -117,7 +177,7 @@ class DatabaseService:
         Returns:
             Farmer record or None
         """
-        result = self.supabase.table("farmers").select("*").eq("phone", phone).execute()
+        result = await self.rest.table("farmers").select("*").eq("phone", phone).execute()
         return result.data[0] if result.data else None
     
     async def update_farmer(self, farmer_id: str, farmer_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -131,7 +191,8 @@ class DatabaseService:
         Returns:
             Updated farmer record
         """
-        result = self.supabase.table("farmers").update(farmer_data).eq("id", farmer_id).execute()
+        result = await self.rest.table("farmers").update(farmer_data).eq("id", farmer_id).execute()
+        entity_cache.invalidate("farmer", farmer_id)
         return result.data[0] if result.data else None
     
     async def delete_farmer(self, farmer_id: str) -> bool:
@@ -144,7 +205,14 @@ class DatabaseService:
         Returns:
             True if successful
         """
-        result = self.supabase.table("farmers").delete().eq("id", farmer_id).execute()
+        # Farms and their history go with the farmer (ON DELETE CASCADE)
+        farms = await self.rest.table("farms").select("id").eq("farmer_id", farmer_id).execute()
+        result = await self.rest.table("farmers").delete().eq("id", farmer_id).execute()
+        entity_cache.invalidate("farmer", farmer_id)
+        entity_cache.invalidate("farmer_farm", farmer_id)
+        for farm in farms.data or []:
+            entity_cache.invalidate("farm", farm["id"])
+            self._invalidate_crop_history(farm["id"])
         return len(result.data) > 0
     
     # Farm operations
@@ -159,9 +227,12 @@ class DatabaseService:
             Created farm record
         """
         try:
-            result = self.supabase.table("farms").insert(farm_data).execute()
+            result = await self.rest.table("farms").insert(farm_data).execute()
             if result.data:
-                return result.data[0]
+                farm = result.data[0]
+                entity_cache.prime("farm", farm["id"], farm)
+                entity_cache.invalidate("farmer_farm", farm.get("farmer_id"))
+                return farm
             else:
                 raise Exception("No data returned from farm creation")
         except Exception as e:
@@ -178,8 +249,11 @@ class DatabaseService:
         Returns:
             Farm record or None
         """
-        result = self.supabase.table("farms").select("*").eq("id", farm_id).execute()
-        return result.data[0] if result.data else None
+        async def load():
+            result = await self.rest.table("farms").select("*").eq("id", farm_id).execute()
+            return result.data[0] if result.data else None
+        
+        return await entity_cache.get("farm", farm_id, load)
     
     async def get_farms_by_farmer_id(self, farmer_id: str) -> List[Dict[str, Any]]:
         """
@@ -191,7 +265,7 @@ class DatabaseService:
         Returns:
             List of farm records
         """
-        result = self.supabase.table("farms").select("*").eq("farmer_id", farmer_id).execute()
+        result = await self.rest.table("farms").select("*").eq("farmer_id", farmer_id).execute()
         return result.data if result.data else []
     
     async def get_farm_by_farmer_id(self, farmer_id: str) -> Optional[Dict[str, Any]]:
@@ -204,8 +278,14 @@ class DatabaseService:
         Returns:
             Farm record or None
         """
-        result = self.supabase.table("farms").select("*").eq("farmer_id", farmer_id).execute()
-        return result.data[0] if result.data else None
+        async def load():
+            result = await self.rest.table("farms").select("*").eq("farmer_id", farmer_id).execute()
+            return result.data[0] if result.data else None
+        
+        farm = await entity_cache.get("farmer_farm", farmer_id, load)
+        if farm and entity_cache.peek("farm", farm["id"]) is MISSING:
+            entity_cache.prime("farm", farm["id"], farm)
+        return farm
     
     async def update_farm(self, farm_id: str, farm_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -218,7 +298,8 @@ class DatabaseService:
         Returns:
             Updated farm record
         """
-        result = self.supabase.table("farms").update(farm_data).eq("id", farm_id).execute()
+        result = await self.rest.table("farms").update(farm_data).eq("id", farm_id).execute()
+        self._invalidate_farms(result.data, farm_id)
         return result.data[0] if result.data else None
     
     async def delete_farm(self, farm_id: str) -> bool:
@@ -231,9 +312,72 @@ class DatabaseService:
         Returns:
             True if successful
         """
-        result = self.supabase.table("farms").delete().eq("id", farm_id).execute()
+        result = await self.rest.table("farms").delete().eq("id", farm_id).execute()
+        self._invalidate_farms(result.data, farm_id)
+        self._invalidate_crop_history(farm_id)
         return len(result.data) > 0
     
+    def _invalidate_farms(self, rows: Optional[List[Dict[str, Any]]], farm_id: str) -> None:
+        """Drop a written farm, its owner's farm lookup and its sustainability profile from the caches."""
+        entity_cache.invalidate("farm", farm_id)
+        SustainabilityService.invalidate(farm_id)
+        for row in rows or []:
+            entity_cache.invalidate("farmer_farm", row.get("farmer_id"))
+    
+    @staticmethod
+    def _invalidate_crop_history(farm_id: Optional[str]) -> None:
+        """Drop a farm's cached crop history and the sustainability profile built from it."""
+        entity_cache.invalidate("crop_history", farm_id)
+        SustainabilityService.invalidate(farm_id)
+    
+    async def get_owned_farm(self, farm_id: str, farmer_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a farm only if it belongs to the farmer.
+        
+        Args:
+            farm_id: Farm's unique ID
+            farmer_id: Requesting farmer's ID
+            
+        Returns:
+            Farm record, or None if missing or owned by someone else
+        """
+        farm = await self.get_farm_by_id(farm_id)
+        return farm if farm and farm["farmer_id"] == farmer_id else None
+    
+    async def get_owned_farm_with_history(self, farm_id: str, farmer_id: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Get a farm with its crop history in one round trip, checking ownership.
+        
+        Uses a PostgREST embedded select (farms -> crops_history) unless both
+        parts are already cached.
+        
+        Args:
+            farm_id: Farm's unique ID
+            farmer_id: Requesting farmer's ID
+            
+        Returns:
+            (farm, crop_history newest first), or None if missing or not owned
+        """
+        farm = entity_cache.peek("farm", farm_id)
+        crop_history = entity_cache.peek("crop_history", farm_id)
+        
+        if farm is MISSING or crop_history is MISSING:
+            result = await self.rest.table("farms").select("*, crops_history(*)").eq("id", farm_id).order(
+                "created_at", desc=True, foreign_table="crops_history"
+            ).execute()
+            
+            if result.data:
+                farm = dict(result.data[0])
+                crop_history = farm.pop("crops_history", None) or []
+                entity_cache.prime("crop_history", farm_id, crop_history)
+            else:
+                farm, crop_history = None, []
+            entity_cache.prime("farm", farm_id, farm)
+        
+        if not farm or farm["farmer_id"] != farmer_id:
+            return None
+        return farm, crop_history
+    
     # Recommendation operations
     async def create_recommendation(self, recommendation_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -245,7 +389,7 @@ class DatabaseService:
         Returns:
             Created recommendation record
         """
-        result = self.supabase.table("recommendations").insert(recommendation_data).execute()
+        result = await self.rest.table("recommendations").insert(recommendation_data).execute()
         return result.data[0] if result.data else None
     
     async def get_recommendations_by_farm_id(self, farm_id: str) -> List[Dict[str, Any]]:
@@ -258,7 +402,7 @@ class DatabaseService:
         Returns:
             List of recommendation records
         """
-        result = self.supabase.table("recommendations").select("*").eq("farm_id", farm_id).order("created_at", desc=True).execute()
+        result = await self.rest.table("recommendations").select("*").eq("farm_id", farm_id).order("created_at", desc=True).execute()
         return result.data if result.data else []
     
     async def get_recommendation_by_id(self, recommendation_id: str) -> Optional[Dict[str, Any]]:
@@ -271,7 +415,7 @@ class DatabaseService:
         Returns:
             Recommendation record or None
         """
-        result = self.supabase.table("recommendations").select("*").eq("id", recommendation_id).execute()
+        result = await self.rest.table("recommendations").select("*").eq("id", recommendation_id).execute()
         return result.data[0] if result.data else None
     
     async def update_recommendation(self, recommendation_id: str, recommendation_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -285,7 +429,7 @@ class DatabaseService:
         Returns:
             Updated recommendation record
         """
-        result = self.supabase.table("recommendations").update(recommendation_data).eq("id", recommendation_id).execute()
+        result = await self.rest.table("recommendations").update(recommendation_data).eq("id", recommendation_id).execute()
         return result.data[0] if result.data else None
     
     async def delete_recommendation(self, recommendation_id: str) -> bool:
@@ -298,7 +442,7 @@ class DatabaseService:
         Returns:
             True if successful
         """
-        result = self.supabase.table("recommendations").delete().eq("id", recommendation_id).execute()
+        result = await self.rest.table("recommendations").delete().eq("id", recommendation_id).execute()
         return len(result.data) > 0
     
     # Crop history operations
@@ -312,7 +456,8 @@ class DatabaseService:
         Returns:
             Created crop history record
         """
-        result = self.supabase.table("crops_history").insert(crop_data).execute()
+        result = await self.rest.table("crops_history").insert(crop_data).execute()
+        self._invalidate_crop_history(crop_data.get("farm_id"))
         return result.data[0] if result.data else None
     
     async def get_crop_history_by_farm_id(self, farm_id: str) -> List[Dict[str, Any]]:
@@ -325,8 +470,11 @@ class DatabaseService:
         Returns:
             List of crop history records
         """
-        result = self.supabase.table("crops_history").select("*").eq("farm_id", farm_id).order("created_at", desc=True).execute()
-        return result.data if result.data else []
+        async def load():
+            result = await self.rest.table("crops_history").select("*").eq("farm_id", farm_id).order("created_at", desc=True).execute()
+            return result.data if result.data else []
+        
+        return await entity_cache.get("crop_history", farm_id, load)
     
     async def get_crop_history_by_id(self, history_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -338,7 +486,7 @@ class DatabaseService:
         Returns:
             Crop history record or None
         """
-        result = self.supabase.table("crops_history").select("*").eq("id", history_id).execute()
+        result = await self.rest.table("crops_history").select("*").eq("id", history_id).execute()
         return result.data[0] if result.data else None
     
     async def delete_crop_history(self, history_id: str) -> bool:
@@ -351,9 +499,37 @@ class DatabaseService:
         Returns:
             True if successful
         """
-        result = self.supabase.table("crops_history").delete().eq("id", history_id).execute()
+        result = await self.rest.table("crops_history").delete().eq("id", history_id).execute()
+        for row in result.data or []:
+            self._invalidate_crop_history(row.get("farm_id"))
         return len(result.data) > 0
-    
+
+    # Bulk operations
+    async def bulk_insert(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert many rows in one multi-row request.
+
+        Rows must carry their own ids: the insert is an upsert that ignores
+        ids already present, so retrying a batch that partly or fully
+        landed never duplicates records.
+
+        Args:
+            table: Target table
+            rows: Records to insert
+
+        Returns:
+            Number of rows sent
+        """
+        if not rows:
+            return 0
+        await self.rest.table(table).upsert(
+            rows, on_conflict="id", ignore_duplicates=True, returning="minimal", default_to_null=False
+        ).execute()
+        if table == "crops_history":
+            for farm_id in {row.get("farm_id") for row in rows}:
+                self._invalidate_crop_history(farm_id)
+        return len(rows)
+
     # Audit operations
     async def add_audit_log(self, audit_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -365,7 +541,7 @@ class DatabaseService:
         Returns:
             Created audit log record
         """
-        result = self.supabase.table("audit_logs").insert(audit_data).execute()
+        result = await self.rest.table("audit_logs").insert(audit_data).execute()
         return result.data[0] if result.data else None
     
     async def get_audit_logs(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
@@ -379,28 +555,138 @@ class DatabaseService:
         Returns:
             List of audit log records
         """
-        result = self.supabase.table("audit_logs").select("*").order("timestamp", desc=True).range(offset, offset + limit - 1).execute()
+        result = await self.rest.table("audit_logs").select("*").order("timestamp", desc=True).range(offset, offset + limit - 1).execute()
+        return result.data if result.data else []
+    
+    async def get_audit_logs_page(self, limit: int = 100, before_seq: Optional[int] = None,
+                                  round_number: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get audit log entries newest first using keyset pagination on seq.
+        
+        Args:
+            limit: Number of records to return
+            before_seq: Return entries older than this chain position (exclusive)
+            round_number: Only entries for this federated-learning round
+            
+        Returns:
+            List of audit log records
+        """
+        query = self.rest.table("audit_logs").select("*").gt("seq", 0).order("seq", desc=True).limit(limit)
+        if before_seq is not None:
+            query = query.lt("seq", before_seq)
+        if round_number is not None:
+            query = query.eq("round_number", round_number)
+        result = await query.execute()
         return result.data if result.data else []
     
+    async def get_audit_head(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent audit log entry in chain order.
+        
+        Returns:
+            Audit log record with the highest seq, or None if the chain is empty
+        """
+        result = await self.rest.table("audit_logs").select("*").gt("seq", 0).order("seq", desc=True).limit(1).execute()
+        return result.data[0] if result.data else None
+    
+    async def append_audit_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Chain entries onto the audit log head in one database transaction.
+        
+        The database allocates seq, previous_hash and entry_hash
+        (append_audit_entries in supabase_audit.sql), so appends from every
+        worker extend the same chain.
+        
+        Args:
+            entries: Dicts with round_number and update_hash, in order
+            
+        Returns:
+            The appended audit log records
+            
+        Raises:
+            ValueError: If a round number is lower than the chain head's
+        """
+        from postgrest.exceptions import APIError
+        
+        try:
+            result = await self.service_rest.rpc("append_audit_entries", {"entries": entries}).execute()
+        except APIError as e:
+            if e.code == "22023":
+                raise ValueError(e.message) from e
+            raise
+        return result.data if result.data else []
+    
+    async def get_audit_entry_by_seq(self, seq: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the audit log entry at a chain position.
+        
+        Args:
+            seq: Chain position
+            
+        Returns:
+            Audit log record or None
+        """
+        result = await self.rest.table("audit_logs").select("*").eq("seq", seq).execute()
+        return result.data[0] if result.data else None
+    
+    async def get_audit_checkpoint(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored audit chain verification cursor.
+        
+        Args:
+            name: Checkpoint name
+            
+        Returns:
+            Checkpoint record or None
+        """
+        result = await self.rest.table("audit_checkpoints").select("*").eq("name", name).execute()
+        return result.data[0] if result.data else None
+    
+    async def save_audit_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """
+        Create or replace an audit chain verification cursor.
+        
+        Args:
+            checkpoint: Checkpoint record (keyed by name)
+        """
+        await self.service_rest.table("audit_checkpoints").upsert(checkpoint, on_conflict="name").execute()
+    
     # Analytics operations
+    # Counts come from the trigger-maintained summary tables created by
+    # supabase_aggregates.sql, so each read is a bounded lookup regardless of
+    # how large farmers/farms/crops_history grow.
+    async def get_platform_counts(self) -> Dict[str, int]:
+        """
+        Get row counts for every base table in one round trip.
+        
+        Returns:
+            Mapping of table name (farmers, farms, recommendations,
+            crops_history) to row count
+        """
+        result = await self.service_rest.rpc("platform_summary", {}).execute()
+        counts = result.data or {}
+        return {name: int(counts.get(name, 0)) for name in ("farmers", "farms", "recommendations", "crops_history")}
+    
+    async def _get_counter(self, name: str) -> int:
+        """Read a single platform counter (the sum of its shards)."""
+        result = await self.rest.table("platform_counters").select("value").eq("name", name).execute()
+        return max(sum(int(row["value"]) for row in result.data or []), 0)
+    
     async def get_farmer_count(self) -> int:
         """Get total number of farmers."""
-        result = self.supabase.table("farmers").select("id", count="exact").execute()
-        return result.count if result.count else 0
+        return await self._get_counter("farmers")
     
     async def get_farm_count(self) -> int:
         """Get total number of farms."""
-        result = self.supabase.table("farms").select("id", count="exact").execute()
-        return result.count if result.count else 0
+        return await self._get_counter("farms")
     
     async def get_recommendation_count(self) -> int:
         """Get total number of recommendations."""
-        result = self.supabase.table("recommendations").select("id", count="exact").execute()
-        return result.count if result.count else 0
+        return await self._get_counter("recommendations")
     
     async def get_popular_crops(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
-        Get most popular crops based on recommendation history.
+        Get most popular crops based on crop history.
         
         Args:
             limit: Number of crops to return
@@ -408,23 +694,15 @@ class DatabaseService:
         Returns:
             List of popular crops with counts
         """
-        # This would require aggregation which might need a custom SQL function
-        # For now, return a simple query
-        result = self.supabase.table("crops_history").select("crop").execute()
-        
-        if not result.data:
-            return []
-        
-        # Count crops manually for simplicity
-        crop_counts = {}
-        for record in result.data:
-            crop = record.get("crop", "")
-            if crop:
-                crop_counts[crop] = crop_counts.get(crop, 0) + 1
-        
-        # Sort by count and return top crops
-        sorted_crops = sorted(crop_counts.items(), key=lambda x: x[1], reverse=True)
-        return [{"crop": crop, "count": count} for crop, count in sorted_crops[:limit]]
+        result = await (
+            self.rest.table("crop_popularity")
+            .select("crop, entries")
+            .gt("entries", 0)
+            .order("entries", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return [{"crop": row["crop"], "count": int(row["entries"])} for row in result.data or []]
     
     async def get_regional_data(self, district: str = None) -> Dict[str, Any]:
         """
@@ -434,22 +712,71 @@ class DatabaseService:
             district: Optional district filter
             
         Returns:
-            Regional data summary
+            Regional data summary with per-district farm counts and area
         """
-        query = self.supabase.table("farms").select("location")
+        query = self.rest.table("district_farm_stats").select("district, farm_count, total_area")
         if district:
-            # This would depend on how location is stored in the database
-            # For now, assuming it's stored as a JSON field
-            query = query.contains("location", {"district": district})
-        
-        result = query.execute()
+            query = query.eq("district", district)
+        
+        result = await query.order("farm_count", desc=True).execute()
+        districts = [
+            {
+                "district": row["district"],
+                "farm_count": int(row["farm_count"]),
+                "total_area": round(float(row["total_area"] or 0), 2)
+            }
+            for row in result.data or []
+        ]
         
         return {
             "district": district,
-            "farm_count": len(result.data) if result.data else 0,
-            "farms": result.data if result.data else []
+            "farm_count": sum(row["farm_count"] for row in districts),
+            "total_area": round(sum(row["total_area"] for row in districts), 2),
+            "districts": districts
         }
     
+    async def reconcile_aggregates(self) -> Dict[str, Any]:
+        """
+        Rebuild the summary tables from the base tables.
+        
+        Returns:
+            Number of drifted counter, crop and district rows that were corrected
+        """
+        result = await self.service_rest.rpc("reconcile_aggregates", {}).execute()
+        return result.data or {}
+    
+    async def iter_table_rows(self, table: str, columns: str = "*", batch_size: int = 1000,
+                              after_id: Optional[Any] = None, key: str = "id") -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Page through a table in key order using keyset pagination.
+        
+        Each page is `key > last key seen ORDER BY key LIMIT batch_size`, so
+        every page costs one index range scan however deep the export is, and
+        only one page is held in memory at a time.
+        
+        Args:
+            table: Table name
+            columns: PostgREST select list (must include the key)
+            batch_size: Rows per page
+            after_id: Resume after this key value (exclusive)
+            key: Unique, indexed column to page on
+            
+        Yields:
+            Lists of at most batch_size rows
+        """
+        while True:
+            query = self.rest.table(table).select(columns).order(key).limit(batch_size)
+            if after_id is not None:
+                query = query.gt(key, after_id)
+            result = await query.execute()
+            rows = result.data or []
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1][key]
+    
     async def get_suitable_crops_by_district(self, district: str) -> List[Dict[str, Any]]:
         """
         Get suitable crops for a specific district.
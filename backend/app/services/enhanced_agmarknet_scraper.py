@@ -8,16 +8,23 @@ import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
 import json
+import time
 import logging
 from urllib.parse import urljoin, parse_qs, urlparse
+from app.core.config import get_upstream_base_url
+from .streaming_html_parser import PortalStreamParser, stream_parse, stream_table_rows, parse_html, group_rows_by_table
+from .upstream_health import upstream_health
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class AGMARKNETUnavailableError(Exception):
+    """AGMARKNET answered with a server error."""
+
+
 class EnhancedAGMARKNETScraper:
     """
     Real scraper for AGMARKNET website with proper session handling.
@@ -26,7 +33,7 @@ class EnhancedAGMARKNETScraper:
     
     def __init__(self):
         """Initialize the real scraper with session management."""
-        self.base_url = "https://agmarknet.gov.in"
+        self.base_url = get_upstream_base_url("agmarknet", "https://agmarknet.gov.in")
         
         # Real working endpoints discovered through investigation
         self.endpoints = [
@@ -61,24 +68,47 @@ class EnhancedAGMARKNETScraper:
         """
         Enhanced method to get market data with multiple endpoint support.
         """
+        breaker = upstream_health.breaker("agmarknet")
+        if breaker.is_open():
+            # Portal is known to be down: skip the endpoint walk entirely
+            logger.info(f"⚡ AGMARKNET circuit open, serving fallback data for {district}")
+            return self._get_enhanced_fallback_response(district, commodity, days)
+        
         try:
             logger.info(f"Fetching enhanced market data for {district}, commodity: {commodity or 'All'}")
             
             # Try each endpoint until one works
             for endpoint in self.endpoints:
+                if not breaker.allow_request():
+                    logger.info("⚡ AGMARKNET circuit opened, stopping endpoint attempts")
+                    break
+                
+                start = time.perf_counter()
                 try:
                     logger.info(f"Trying endpoint: {endpoint}")
-                    result = await self._try_endpoint(endpoint, district, commodity, days)
+                    result = await self._try_endpoint(endpoint, district, commodity, days, timeout=breaker.current_timeout())
+                    breaker.record_success(time.perf_counter() - start)
                     
                     if result.get("status") == "success" and result.get("data"):
                         logger.info(f"✅ Success with endpoint: {endpoint}")
                         return result
                     else:
                         logger.warning(f"⚠️ No data from endpoint: {endpoint}")
-                        
+                
+                except (httpx.HTTPError, httpx.StreamError, AGMARKNETUnavailableError) as e:
+                    # Any httpx error (transport, redirect loop, bad status) counts against the portal
+                    breaker.record_failure(e)
+                    logger.warning(f"❌ Endpoint {endpoint} unreachable: {e}")
+                    continue
                 except Exception as e:
+                    # The portal answered; parsing or form flow failed
+                    breaker.record_success(time.perf_counter() - start)
                     logger.warning(f"❌ Endpoint {endpoint} failed: {e}")
                     continue
+                except BaseException as e:
+                    # Cancelled mid-call: release the probe slot before propagating
+                    breaker.record_failure(e)
+                    raise
             
             # If all endpoints fail, use enhanced fallback
             logger.info("All endpoints failed, using enhanced fallback data")
@@ -88,30 +118,32 @@ class EnhancedAGMARKNETScraper:
             logger.error(f"Error in get_market_data: {str(e)}")
             return self._get_enhanced_fallback_response(district, commodity, days)
     
-    async def _try_endpoint(self, endpoint: str, district: str, commodity: Optional[str], days: int) -> Dict[str, Any]:
+    async def _try_endpoint(self, endpoint: str, district: str, commodity: Optional[str], days: int,
+                            timeout: float = 30.0) -> Dict[str, Any]:
         """Try a specific endpoint for market data."""
         
         url = f"{self.base_url}{endpoint}"
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, headers=self.headers) as client:
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, headers=self.headers) as client:
             
-            # Step 1: Get the page and extract form data
-            response = await client.get(url)
-            if response.status_code != 200:
-                raise Exception(f"Failed to access {endpoint}: {response.status_code}")
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Step 1: Get the page and extract form data (no table rows needed)
+            page = PortalStreamParser(capture_tables=False)
+            await stream_parse(client, "GET", url, page)
+            if page.status_code >= 500:
+                raise AGMARKNETUnavailableError(f"{endpoint} returned {page.status_code}")
+            if page.status_code != 200:
+                raise Exception(f"Failed to access {endpoint}: {page.status_code}")
             
             # Step 2: Find state dropdown and get Jharkhand code
-            jharkhand_code = self._find_jharkhand_code(soup)
+            jharkhand_code = self._find_jharkhand_code(page)
             if not jharkhand_code:
                 logger.warning(f"Could not find Jharkhand in state dropdown for {endpoint}")
                 return {"status": "error", "error": "Jharkhand not found"}
             
             # Step 3: Extract ASP.NET form data
-            form_data = self._extract_aspnet_form_data(soup)
+            form_data = self._extract_aspnet_form_data(page)
             
             # Step 4: Set state to Jharkhand and submit to get districts
             form_data.update({
@@ -121,20 +153,21 @@ class EnhancedAGMARKNETScraper:
             })
             
             # Submit to get districts
-            district_response = await client.post(url, data=form_data)
-            if district_response.status_code != 200:
-                raise Exception(f"Failed to get districts: {district_response.status_code}")
-            
-            district_soup = BeautifulSoup(district_response.content, 'html.parser')
+            district_page = PortalStreamParser(capture_tables=False)
+            await stream_parse(client, "POST", url, district_page, data=form_data)
+            if district_page.status_code >= 500:
+                raise AGMARKNETUnavailableError(f"District lookup returned {district_page.status_code}")
+            if district_page.status_code != 200:
+                raise Exception(f"Failed to get districts: {district_page.status_code}")
             
             # Step 5: Find district code
-            district_code = self._find_district_code(district_soup, district)
+            district_code = self._find_district_code(district_page, district)
             
             # Step 6: Set commodity if specified
-            commodity_code = self._find_commodity_code(district_soup, commodity) if commodity else "0"
+            commodity_code = self._find_commodity_code(district_page, commodity) if commodity else "0"
             
             # Step 7: Prepare final search
-            final_form_data = self._extract_aspnet_form_data(district_soup)
+            final_form_data = self._extract_aspnet_form_data(district_page)
             final_form_data.update({
                 'ctl00$ddlState': jharkhand_code,
                 'ctl00$ddlDistrict': district_code or "0",
@@ -144,14 +177,18 @@ class EnhancedAGMARKNETScraper:
                 'ctl00$btnSubmit': 'Submit'
             })
             
-            # Step 8: Submit search
-            search_response = await client.post(url, data=final_form_data)
-            if search_response.status_code != 200:
-                raise Exception(f"Search failed: {search_response.status_code}")
-            
-            # Step 9: Parse results
-            results_soup = BeautifulSoup(search_response.content, 'html.parser')
-            market_data = self._parse_enhanced_results(results_soup, district, commodity)
+            # Step 8 & 9: Submit search and parse result rows while they download
+            results = PortalStreamParser(table_filter=self._is_results_table)
+            market_data = [
+                record async for record in self._stream_results(
+                    stream_table_rows(client, "POST", url, results, data=final_form_data),
+                    district, commodity
+                )
+            ]
+            if results.status_code >= 500:
+                raise AGMARKNETUnavailableError(f"Search returned {results.status_code}")
+            if results.status_code != 200:
+                raise Exception(f"Search failed: {results.status_code}")
             
             if market_data:
                 return {
@@ -165,24 +202,18 @@ class EnhancedAGMARKNETScraper:
             else:
                 return {"status": "no_data", "endpoint": endpoint}
     
-    def _find_jharkhand_code(self, soup: BeautifulSoup) -> Optional[str]:
+    def _find_jharkhand_code(self, page: PortalStreamParser) -> Optional[str]:
         """Find Jharkhand state code from dropdown."""
         
         # Try different dropdown name patterns
-        state_selects = soup.find_all('select', {'name': re.compile(r'.*[Ss]tate.*')})
-        
-        for select in state_selects:
-            options = select.find_all('option')
-            for option in options:
-                text = option.get_text(strip=True).lower()
-                value = option.get('value', '')
-                if 'jharkhand' in text and value:
-                    logger.info(f"Found Jharkhand code: {value}")
-                    return value
+        for value, text in page.find_select_options(re.compile(r'.*[Ss]tate.*')):
+            if 'jharkhand' in text.lower() and value:
+                logger.info(f"Found Jharkhand code: {value}")
+                return value
         
         return None
     
-    def _find_district_code(self, soup: BeautifulSoup, district: str) -> Optional[str]:
+    def _find_district_code(self, page: PortalStreamParser, district: str) -> Optional[str]:
         """Find district code from dropdown with enhanced mapping."""
         
         # Enhanced district mapping for Jharkhand
@@ -221,89 +252,77 @@ class EnhancedAGMARKNETScraper:
                 return district_code
         
         # Fallback to original method
-        district_selects = soup.find_all('select', {'name': re.compile(r'.*[Dd]istrict.*')})
-        
-        for select in district_selects:
-            options = select.find_all('option')
-            for option in options:
-                text = option.get_text(strip=True).lower()
-                value = option.get('value', '')
-                if district.lower() in text and value:
-                    logger.info(f"Found {district} code: {value}")
-                    return value
+        for value, text in page.find_select_options(re.compile(r'.*[Dd]istrict.*')):
+            if district.lower() in text.lower() and value:
+                logger.info(f"Found {district} code: {value}")
+                return value
         
         logger.warning(f"District {district} not found, using default")
         return "0"
     
-    def _find_commodity_code(self, soup: BeautifulSoup, commodity: str) -> str:
+    def _find_commodity_code(self, page: PortalStreamParser, commodity: str) -> str:
         """Find commodity code from dropdown."""
         
-        commodity_selects = soup.find_all('select', {'name': re.compile(r'.*[Cc]ommodity.*')})
-        
-        for select in commodity_selects:
-            options = select.find_all('option')
-            for option in options:
-                text = option.get_text(strip=True).lower()
-                value = option.get('value', '')
-                if commodity.lower() in text and value:
-                    logger.info(f"Found {commodity} code: {value}")
-                    return value
+        for value, text in page.find_select_options(re.compile(r'.*[Cc]ommodity.*')):
+            if commodity.lower() in text.lower() and value:
+                logger.info(f"Found {commodity} code: {value}")
+                return value
         
         return "0"
     
-    def _extract_aspnet_form_data(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_aspnet_form_data(self, page: PortalStreamParser) -> Dict[str, str]:
         """Extract ASP.NET form data including ViewState."""
         
-        form_data = {}
-        
-        # Get all hidden inputs
-        hidden_inputs = soup.find_all('input', {'type': 'hidden'})
-        for inp in hidden_inputs:
-            name = inp.get('name', '')
-            value = inp.get('value', '')
-            if name:
-                form_data[name] = value
-        
-        return form_data
+        # Hidden inputs are collected by the streaming parser
+        return dict(page.hidden_inputs)
+    
+    def _is_results_table(self, attrs: Dict[str, str]) -> bool:
+        """Match the result grids AGMARKNET renders (by id, class or border)."""
+        table_id = attrs.get('id', '')
+        table_class = attrs.get('class', '')
+        return (
+            'Grid' in table_id
+            or 'grid' in table_class
+            or 'Data' in table_id
+            or 'table' in table_class.split()
+            or attrs.get('border') == '1'
+        )
+    
+    async def _stream_results(self, rows, district: str, commodity: Optional[str]):
+        """Convert streamed result rows into market records as they arrive."""
+        async for row in rows:
+            if row.is_header or len(row.cells) < 4:  # Minimum columns for meaningful data
+                continue
+            try:
+                row_data = self._parse_row_data(row.cells, [], district, commodity)
+                if row_data:
+                    yield row_data
+            except Exception as e:
+                logger.warning(f"Error parsing row: {e}")
+                continue
     
-    def _parse_enhanced_results(self, soup: BeautifulSoup, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
-        """Parse market data from results page."""
+    def _parse_enhanced_results(self, html_content, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
+        """Parse market data from an already downloaded results page."""
         
+        parser = PortalStreamParser(table_filter=self._is_results_table)
         market_data = []
         
-        # Look for data tables with various patterns
-        table_selectors = [
-            'table[id*="Grid"]',
-            'table[class*="grid"]',
-            'table[id*="Data"]',
-            'table.table',
-            'table[border="1"]'
-        ]
-        
-        for selector in table_selectors:
-            tables = soup.select(selector)
-            for table in tables:
-                data = self._extract_table_data(table, district, commodity)
-                if data:
-                    market_data.extend(data)
-                    break
+        for cells_list in group_rows_by_table(parse_html(html_content, parser)).values():
+            market_data.extend(self._extract_table_data(cells_list, district, commodity))
         
         return market_data
     
-    def _extract_table_data(self, table, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
-        """Extract data from a market data table."""
+    def _extract_table_data(self, rows: List[List[str]], district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
+        """Extract data from the cell texts of a market data table."""
         
-        rows = table.find_all('tr')
         if len(rows) < 2:  # Need header + at least one data row
             return []
         
         # Try to identify column structure
-        header_row = rows[0]
-        headers = [th.get_text(strip=True).lower() for th in header_row.find_all(['th', 'td'])]
+        headers = [cell.strip().lower() for cell in rows[0]]
         
         data = []
-        for row in rows[1:]:
-            cells = row.find_all(['td', 'th'])
+        for cells in rows[1:]:
             if len(cells) >= 4:  # Minimum columns for meaningful data
                 try:
                     row_data = self._parse_row_data(cells, headers, district, commodity)
@@ -315,24 +334,26 @@ class EnhancedAGMARKNETScraper:
         
         return data
     
-    def _parse_row_data(self, cells, headers, district: str, commodity: Optional[str]) -> Optional[Dict[str, Any]]:
-        """Parse a single row of market data."""
+    def _parse_row_data(self, cells: List[str], headers, district: str, commodity: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Parse a single row of market data from its cell texts."""
         
         if len(cells) < 4:
             return None
         
+        cells = [cell.strip() for cell in cells]
+        
         # Basic extraction - adapt based on actual table structure
         try:
             row_data = {
                 "district": district,
-                "market": cells[0].get_text(strip=True) if len(cells) > 0 else f"{district} Market",
-                "commodity": cells[1].get_text(strip=True) if len(cells) > 1 else commodity or "Unknown",
-                "variety": cells[2].get_text(strip=True) if len(cells) > 2 else "Common",
-                "arrival": self._parse_number(cells[3].get_text(strip=True)) if len(cells) > 3 else 0,
-                "min_price": self._parse_number(cells[4].get_text(strip=True)) if len(cells) > 4 else 0,
-                "max_price": self._parse_number(cells[5].get_text(strip=True)) if len(cells) > 5 else 0,
-                "modal_price": self._parse_number(cells[6].get_text(strip=True)) if len(cells) > 6 else 0,
-                "date": cells[7].get_text(strip=True) if len(cells) > 7 else datetime.now().strftime("%d-%b-%Y"),
+                "market": cells[0] if len(cells) > 0 else f"{district} Market",
+                "commodity": cells[1] if len(cells) > 1 else commodity or "Unknown",
+                "variety": cells[2] if len(cells) > 2 else "Common",
+                "arrival": self._parse_number(cells[3]) if len(cells) > 3 else 0,
+                "min_price": self._parse_number(cells[4]) if len(cells) > 4 else 0,
+                "max_price": self._parse_number(cells[5]) if len(cells) > 5 else 0,
+                "modal_price": self._parse_number(cells[6]) if len(cells) > 6 else 0,
+                "date": cells[7] if len(cells) > 7 else datetime.now().strftime("%d-%b-%Y"),
                 "trend": "stable",
                 "source": "AGMARKNET_REAL"
             }
@@ -359,65 +380,44 @@ class EnhancedAGMARKNETScraper:
         except ValueError:
             return 0.0
     
-    def _extract_form_data(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_form_data(self, page: PortalStreamParser) -> Dict[str, str]:
         """Extract ASP.NET form data including ViewState."""
         form_data = {}
         
-        # Extract ViewState
-        viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-        if viewstate:
-            form_data['__VIEWSTATE'] = viewstate.get('value', '')
-        
-        # Extract ViewStateGenerator
-        viewstate_gen = soup.find('input', {'name': '__VIEWSTATEGENERATOR'})
-        if viewstate_gen:
-            form_data['__VIEWSTATEGENERATOR'] = viewstate_gen.get('value', '')
-        
-        # Extract EventValidation
-        event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-        if event_validation:
-            form_data['__EVENTVALIDATION'] = event_validation.get('value', '')
+        # ViewState fields first so they lead the form payload
+        for name in ('__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION'):
+            if name in page.hidden_inputs:
+                form_data[name] = page.hidden_inputs[name]
         
         # Extract all other hidden inputs
-        hidden_inputs = soup.find_all('input', {'type': 'hidden'})
-        for hidden in hidden_inputs:
-            name = hidden.get('name')
-            value = hidden.get('value', '')
-            if name and name not in form_data:
+        for name, value in page.hidden_inputs.items():
+            if name not in form_data:
                 form_data[name] = value
         
         return form_data
     
-    def _get_any_district_code(self, soup: BeautifulSoup) -> str:
+    def _get_any_district_code(self, page: PortalStreamParser) -> str:
         """Get any available district code as fallback."""
-        district_selects = soup.find_all('select', {'name': re.compile(r'.*[Dd]istrict.*')})
-        
-        for select in district_selects:
-            options = select.find_all('option')
-            for option in options:
-                value = option.get('value', '')
-                if value and value != '0' and value != '--Select--':
-                    logger.info(f"Using fallback district code: {value}")
-                    return value
+        for value, _ in page.find_select_options(re.compile(r'.*[Dd]istrict.*')):
+            if value and value != '0' and value != '--Select--':
+                logger.info(f"Using fallback district code: {value}")
+                return value
         return "0"
     
     def _parse_market_data(self, html_content: str, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
         """Parse market data from HTML response."""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            parser = PortalStreamParser(
+                table_filter=lambda attrs: bool(re.match(r'.*grid.*|.*table.*', attrs.get('class', '')))
+            )
             market_data = []
             
-            # Look for data tables
-            tables = soup.find_all('table', {'class': re.compile(r'.*grid.*|.*table.*')})
-            
-            for table in tables:
-                rows = table.find_all('tr')
+            for rows in group_rows_by_table(parse_html(html_content, parser)).values():
                 if len(rows) < 2:  # Need header + data
                     continue
                 
                 # Try to identify columns
-                header_row = rows[0]
-                headers = [th.get_text(strip=True).lower() for th in header_row.find_all(['th', 'td'])]
+                headers = [cell.strip().lower() for cell in rows[0]]
                 
                 # Look for price-related columns
                 price_columns = self._identify_price_columns(headers)
@@ -425,12 +425,11 @@ class EnhancedAGMARKNETScraper:
                     continue
                 
                 # Parse data rows
-                for row in rows[1:]:
-                    cells = row.find_all(['td', 'th'])
+                for cells in rows[1:]:
                     if len(cells) < len(headers):
                         continue
                     
-                    row_data = [cell.get_text(strip=True) for cell in cells]
+                    row_data = [cell.strip() for cell in cells]
                     
                     # Extract price data
                     try:
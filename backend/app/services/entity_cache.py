@@ -0,0 +1,140 @@
+"""
+Read-through cache for farmer, farm and crop-history rows.
+Two layers: a per-request identity map (a request never loads the same row
+twice) and a short-TTL cross-request cache shared by the worker, kept
+consistent by write-through invalidation in DatabaseService mutators.
+Rows are copied in and out of the cross-request layer, so a caller mutating
+a returned row never changes what other requests read.
+"""
+
+import copy
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from app.core.config import settings
+from .cache_service import MarketDataCache
+
+logger = logging.getLogger(__name__)
+
+# Returned by peek() when a row is not cached (None is a valid cached "not found")
+MISSING = object()
+
+_identity_map: ContextVar[Optional[Dict[str, Any]]] = ContextVar("entity_identity_map", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Open a fresh identity map for the enclosed unit of work."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+class IdentityMapMiddleware:
+    """ASGI middleware giving every HTTP request its own identity map."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_scope():
+            await self.app(scope, receive, send)
+
+
+class EntityCache:
+    """
+    Identity map plus TTL cache for entity rows keyed by kind and id.
+
+    Kinds used by DatabaseService:
+        farmer: farmer row by id
+        farm: farm row by id
+        farmer_farm: first farm row by farmer id
+        crop_history: crop history list by farm id
+    """
+
+    def __init__(self, ttl: int = 60, max_entries: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a row may be served across requests; bounds staleness
+                 when another worker writes the same row
+            max_entries: Rows kept across requests before expired and then
+                 oldest rows are evicted (None: unbounded)
+        """
+        self.ttl = ttl
+        self._cache = MarketDataCache(max_entries=max_entries)
+        self._identity_hits = 0
+
+    async def get(self, kind: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a row, loading it on a miss.
+
+        Args:
+            kind: Entity kind
+            key: Entity key (id, farmer id, farm id)
+            loader: Coroutine function performing the database read
+
+        Returns:
+            Cached or freshly loaded value (None for not found)
+        """
+        cache_key = f"{kind}:{key}"
+        scope = _identity_map.get()
+        if scope is not None and cache_key in scope:
+            self._identity_hits += 1
+            return scope[cache_key]
+
+        value = copy.deepcopy(await self._cache.get_or_set(key=cache_key, fetch_func=loader, ttl=self.ttl))
+        if scope is not None:
+            scope[cache_key] = value
+        return value
+
+    def peek(self, kind: str, key: str) -> Any:
+        """Get a cached value without loading, or MISSING."""
+        cache_key = f"{kind}:{key}"
+        scope = _identity_map.get()
+        if scope is not None and cache_key in scope:
+            self._identity_hits += 1
+            return scope[cache_key]
+        value = self._cache.get(cache_key, MISSING)
+        return value if value is MISSING else copy.deepcopy(value)
+
+    def prime(self, kind: str, key: str, value: Any) -> None:
+        """Store a value obtained from a write or a combined query."""
+        cache_key = f"{kind}:{key}"
+        self._cache.set(cache_key, copy.deepcopy(value), ttl=self.ttl)
+        scope = _identity_map.get()
+        if scope is not None:
+            scope[cache_key] = value
+
+    def invalidate(self, kind: str, key: Optional[str]) -> None:
+        """Drop a row from both layers after a write."""
+        if key is None:
+            return
+        cache_key = f"{kind}:{key}"
+        self._cache.invalidate_key(cache_key)
+        scope = _identity_map.get()
+        if scope is not None:
+            scope.pop(cache_key, None)
+
+    def clear(self) -> int:
+        """Drop every cached row."""
+        return self._cache.invalidate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        stats = self._cache.get_cache_stats()
+        stats["identity_map_hits"] = self._identity_hits
+        stats["ttl"] = self.ttl
+        return stats
+
+
+# Global entity cache instance
+entity_cache = EntityCache(ttl=settings.ENTITY_CACHE_TTL, max_entries=settings.ENTITY_CACHE_MAX_ENTRIES)
@@ -0,0 +1,477 @@
+"""
+Streaming exports of aggregated farm and recommendation data.
+Rows are paged from the database with keyset pagination and encoded one batch
+at a time (CSV, NDJSON or Parquet, optionally gzipped), so memory stays bounded
+by a single batch whatever the table size. Large exports can run as background
+jobs that write to disk, resume from their last cursor after a failure and are
+downloaded with HTTP range support.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable
+
+from app.core.config import settings
+from .database import DatabaseService
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+FORMAT_ALIASES = {"json": "ndjson"}
+
+
+def _crop_names(crops: Any) -> str:
+    """Flatten a recommendation's crops JSONB into a ';'-separated name list."""
+    if isinstance(crops, str):
+        try:
+            crops = json.loads(crops)
+        except ValueError:
+            return crops
+    if isinstance(crops, dict):
+        crops = crops.get("recommendations") or crops.get("crops") or []
+    names = []
+    for item in crops or []:
+        name = (item.get("crop") or item.get("name") or item.get("crop_name")) if isinstance(item, dict) else item
+        if name:
+            names.append(str(name))
+    return ";".join(names)
+
+
+def _flatten_farm(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Export row for a farm (no farmer identity or coordinates)."""
+    location = row.get("location") or {}
+    return {
+        "farm_id": row["id"],
+        "district": location.get("district") if isinstance(location, dict) else None,
+        "soil_type": row.get("soil_type"),
+        "irrigation_method": row.get("irrigation_method"),
+        "field_size": float(row["field_size"]) if row.get("field_size") is not None else None,
+        "created_at": row.get("created_at")
+    }
+
+
+def _flatten_recommendation(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Export row for a recommendation."""
+    return {
+        "recommendation_id": row["id"],
+        "farm_id": row.get("farm_id"),
+        "season": row.get("season"),
+        "model_confidence": float(row["model_confidence"]) if row.get("model_confidence") is not None else None,
+        "crops": _crop_names(row.get("crops")),
+        "created_at": row.get("created_at")
+    }
+
+
+# Export kinds: source table, selected columns, output schema and row mapper
+EXPORT_SPECS: Dict[str, Dict[str, Any]] = {
+    "farms": {
+        "table": "farms",
+        "columns": "id, location, soil_type, irrigation_method, field_size, created_at",
+        "fields": [
+            ("farm_id", "string"), ("district", "string"), ("soil_type", "string"),
+            ("irrigation_method", "string"), ("field_size", "float64"), ("created_at", "string")
+        ],
+        "flatten": _flatten_farm
+    },
+    "recommendations": {
+        "table": "recommendations",
+        "columns": "id, farm_id, crops, model_confidence, season, created_at",
+        "fields": [
+            ("recommendation_id", "string"), ("farm_id", "string"), ("season", "string"),
+            ("model_confidence", "float64"), ("crops", "string"), ("created_at", "string")
+        ],
+        "flatten": _flatten_recommendation
+    }
+}
+
+
+class CSVEncoder:
+    """Incremental CSV encoder."""
+
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, fields: List[tuple]):
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames=[name for name, _ in fields], extrasaction="ignore")
+
+    def header(self) -> bytes:
+        self._writer.writeheader()
+        return self._drain()
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def close(self) -> bytes:
+        return b""
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data.encode("utf-8")
+
+
+class NDJSONEncoder:
+    """Newline-delimited JSON encoder (one object per line)."""
+
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self, fields: List[tuple]):
+        pass
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return "".join(json.dumps(row, default=str) + "\n" for row in rows).encode("utf-8")
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    """Parquet encoder writing one row group per batch (requires pyarrow)."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, fields: List[tuple]):
+        self._schema = pa.schema([(name, getattr(pa, dtype)()) for name, dtype in fields])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="snappy")
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+ENCODERS = {"csv": CSVEncoder, "ndjson": NDJSONEncoder, "parquet": ParquetEncoder}
+
+
+def normalize_export(kind: str, fmt: str) -> str:
+    """
+    Validate an export request.
+
+    Args:
+        kind: Export kind (farms, recommendations)
+        fmt: Requested format (csv, json/ndjson, parquet)
+
+    Returns:
+        Canonical format name
+
+    Raises:
+        ValueError: If the kind or format is unsupported
+    """
+    if kind not in EXPORT_SPECS:
+        raise ValueError(f"Export must be one of: {', '.join(EXPORT_SPECS)}")
+    fmt = FORMAT_ALIASES.get(fmt, fmt)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError("Format must be 'csv', 'json' (NDJSON) or 'parquet'")
+    if fmt == "parquet" and not PARQUET_AVAILABLE:
+        raise ValueError("Parquet export requires pyarrow, which is not installed")
+    return fmt
+
+
+def export_filename(kind: str, fmt: str, compress: bool) -> str:
+    """Download filename for an export."""
+    name = f"aurafarming_{kind}_{datetime.now().strftime('%Y%m%d')}.{ENCODERS[fmt].extension}"
+    return f"{name}.gz" if compress else name
+
+
+def export_media_type(fmt: str, compress: bool) -> str:
+    """Response media type for an export."""
+    return "application/gzip" if compress else ENCODERS[fmt].media_type
+
+
+class ExportJob:
+    """State of a background export written to disk."""
+
+    def __init__(self, kind: str, fmt: str, compress: bool, path: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.format = fmt
+        self.compress = compress
+        self.path = path
+        self.status = "pending"
+        self.rows = 0
+        self.bytes_written = 0
+        self.cursor: Optional[str] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.created_at = time.time()
+        self.completed_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def filename(self) -> str:
+        return export_filename(self.kind, self.format, self.compress)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "format": self.format,
+            "gzip": self.compress,
+            "status": self.status,
+            "rows": self.rows,
+            "bytes": self.bytes_written,
+            "cursor": self.cursor,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "completed_at": datetime.fromtimestamp(self.completed_at).isoformat() if self.completed_at else None,
+            "download_url": f"/api/v1/admin/export/jobs/{self.id}/download" if self.status == "completed" else None
+        }
+
+
+class ExportService:
+    """
+    Streams exports to clients and runs large exports as background jobs.
+
+    Jobs live in this worker's memory; their files live in EXPORT_DIR and are
+    removed after EXPORT_JOB_TTL seconds.
+    """
+
+    def __init__(self, batch_size: int = 1000, export_dir: Optional[str] = None, job_ttl: int = 86400):
+        """
+        Initialize the service.
+
+        Args:
+            batch_size: Rows fetched and encoded per batch
+            export_dir: Directory for background job files (system temp dir if empty)
+            job_ttl: Seconds a finished job and its file are kept
+        """
+        self.batch_size = batch_size
+        self.export_dir = export_dir or os.path.join(tempfile.gettempdir(), "aurafarming_exports")
+        self.job_ttl = job_ttl
+        self.jobs: Dict[str, ExportJob] = {}
+        self._db: Optional[DatabaseService] = None
+
+    @property
+    def db(self) -> DatabaseService:
+        """Database service, created on first use."""
+        if self._db is None:
+            self._db = DatabaseService()
+        return self._db
+
+    async def _encoded_batches(self, kind: str, fmt: str, after_id: Optional[str] = None,
+                               with_header: bool = True) -> AsyncIterator[tuple]:
+        """
+        Yield (encoded bytes, rows in batch, last id) for each batch of an export.
+
+        The header is yielded as a zero-row chunk and the format trailer as a
+        final zero-row chunk.
+        """
+        spec = EXPORT_SPECS[kind]
+        encoder = ENCODERS[fmt](spec["fields"])
+        flatten: Callable = spec["flatten"]
+
+        header = encoder.header()
+        if with_header and header:
+            yield header, 0, after_id
+
+        async for batch in self.db.iter_table_rows(spec["table"], spec["columns"], self.batch_size, after_id):
+            yield encoder.encode([flatten(row) for row in batch]), len(batch), batch[-1]["id"]
+
+        trailer = encoder.close()
+        if trailer:
+            yield trailer, 0, None
+
+    async def stream_export(self, kind: str, fmt: str, compress: bool = False) -> AsyncIterator[bytes]:
+        """
+        Stream an export batch by batch.
+
+        Args:
+            kind: Export kind (farms, recommendations)
+            fmt: Canonical format (see normalize_export)
+            compress: Gzip the stream
+
+        Yields:
+            Encoded (and optionally compressed) chunks
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        async for data, _, _ in self._encoded_batches(kind, fmt):
+            if compressor:
+                # Sync flush so the client receives every batch as it is produced
+                data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+
+    # Background jobs
+    def start_job(self, kind: str, fmt: str, compress: bool = False) -> ExportJob:
+        """
+        Start a background export job.
+
+        Args:
+            kind: Export kind (farms, recommendations)
+            fmt: Canonical format (see normalize_export)
+            compress: Gzip the output file
+
+        Returns:
+            The new job
+        """
+        self.cleanup_expired()
+        os.makedirs(self.export_dir, exist_ok=True)
+        path = os.path.join(self.export_dir, f"{kind}_{uuid.uuid4().hex}.{ENCODERS[fmt].extension}{'.gz' if compress else ''}")
+        job = ExportJob(kind, fmt, compress, path)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run_job(job))
+        return job
+
+    def resume_job(self, job_id: str) -> ExportJob:
+        """
+        Resume a failed or cancelled job from its last committed batch.
+
+        Raises:
+            KeyError: If the job is unknown
+            ValueError: If the job is not resumable
+        """
+        job = self.jobs[job_id]
+        if job.status not in ("failed", "cancelled"):
+            raise ValueError(f"Job is {job.status}; only failed or cancelled jobs can be resumed")
+        job.task = asyncio.create_task(self._run_job(job))
+        return job
+
+    def cancel_job(self, job_id: str) -> ExportJob:
+        """Cancel a running job (it can be resumed later)."""
+        job = self.jobs[job_id]
+        if job.task and not job.task.done():
+            job.task.cancel()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ExportJob]:
+        """Get a job by id."""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List this worker's jobs, newest first."""
+        return [job.to_dict() for job in sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)]
+
+    def delete_job(self, job_id: str) -> bool:
+        """Cancel a job and remove its file."""
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        if job.task and not job.task.done():
+            job.task.cancel()
+        if os.path.exists(job.path):
+            os.remove(job.path)
+        return True
+
+    def cleanup_expired(self) -> int:
+        """Remove finished jobs older than the TTL along with their files."""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.created_at < cutoff and (job.task is None or job.task.done())
+        ]
+        for job_id in expired:
+            self.delete_job(job_id)
+        return len(expired)
+
+    async def _run_job(self, job: ExportJob):
+        """
+        Write a job's export to disk, committing the cursor after every batch.
+
+        CSV and NDJSON resume by truncating the file to the last committed
+        batch and appending; gzipped files are written as one gzip member per
+        batch so every committed prefix is a valid stream. Parquet files have a
+        single footer and restart from the beginning.
+        """
+        resuming = job.cursor is not None and job.format != "parquet"
+        if not resuming:
+            job.cursor, job.rows, job.bytes_written = None, 0, 0
+        job.status = "running"
+        job.error = None
+        job.attempts += 1
+
+        try:
+            with open(job.path, "r+b" if resuming else "wb") as fh:
+                fh.truncate(job.bytes_written)
+                fh.seek(job.bytes_written)
+                async for data, rows, last_id in self._encoded_batches(
+                    job.kind, job.format, after_id=job.cursor, with_header=not resuming
+                ):
+                    if job.compress and data:
+                        data = gzip.compress(data, compresslevel=6, mtime=0)
+                    await asyncio.to_thread(self._write_chunk, fh, data)
+                    job.bytes_written += len(data)
+                    job.rows += rows
+                    if last_id is not None:
+                        job.cursor = last_id
+            job.status = "completed"
+            job.completed_at = time.time()
+            logger.info(f"Export job {job.id} completed: {job.rows} {job.kind} rows, {job.bytes_written} bytes")
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Export job {job.id} failed after {job.rows} rows: {e}")
+
+    @staticmethod
+    def _write_chunk(fh, data: bytes):
+        fh.write(data)
+        fh.flush()
+
+
+# Global export service instance
+export_service = ExportService(
+    batch_size=settings.EXPORT_BATCH_SIZE,
+    export_dir=settings.EXPORT_DIR,
+    job_ttl=settings.EXPORT_JOB_TTL
+)
@@ -469,8 +469,42 @@ class FeatureEngineer:
             Complete feature dictionary
         """
         
+        # Apply feature engineering pipeline
+        df_final = self.prepare_feature_frame([raw_data], include_weather)
+        
+        # Convert back to dictionary
+        feature_dict = df_final.iloc[0].to_dict()
+        
+        # Remove any NaN values and replace with appropriate defaults
+        cleaned_features = {}
+        for k, v in feature_dict.items():
+            if pd.notna(v):
+                cleaned_features[k] = v
+            else:
+                # Set reasonable defaults for missing values
+                cleaned_features[k] = 0.0
+        
+        return cleaned_features
+    
+    def prepare_feature_frame(
+        self, 
+        rows: List[Dict[str, Any]], 
+        include_weather: bool = True
+    ) -> pd.DataFrame:
+        """
+        Engineer features for many predictions at once.
+        
+        Every feature is computed row by row, so row i of the result equals
+        prepare_feature_matrix(rows[i]) before NaN cleaning.
+        
+        Args:
+            rows: Raw input data, one dict per prediction
+            include_weather: Whether to include weather features
+            
+        Returns:
+            DataFrame with one row of features per input
+        """
         # Map field names to match training data
-        normalized_data = {}
         field_mapping = {
             'N': 'nitrogen',
             'P': 'phosphorus', 
@@ -482,35 +516,16 @@ class FeatureEngineer:
             'location': 'location',
             'season': 'season'
         }
+        df = pd.DataFrame([
+            {field_mapping.get(key, key): value for key, value in raw_data.items()}
+            for raw_data in rows
+        ])
         
-        # Apply field mapping
-        for key, value in raw_data.items():
-            mapped_key = field_mapping.get(key, key)
-            normalized_data[mapped_key] = value
-        
-        # Convert to DataFrame for processing
-        df = pd.DataFrame([normalized_data])
-        
-        # Apply feature engineering pipeline
         df_features = self.create_basic_features(df)
         df_domain = self.create_domain_features(df_features)
         
         # Add crop-specific features
-        df_final = self.create_crop_specific_features(df_domain)
-        
-        # Convert back to dictionary
-        feature_dict = df_final.iloc[0].to_dict()
-        
-        # Remove any NaN values and replace with appropriate defaults
-        cleaned_features = {}
-        for k, v in feature_dict.items():
-            if pd.notna(v):
-                cleaned_features[k] = v
-            else:
-                # Set reasonable defaults for missing values
-                cleaned_features[k] = 0.0
-        
-        return cleaned_features
+        return self.create_crop_specific_features(df_domain)
     
     def get_feature_importance_mapping(self) -> Dict[str, str]:
         """Get mapping of feature names to descriptions."""
@@ -0,0 +1,204 @@
+"""
+Finance rules engine.
+Loan, insurance, subsidy and income-support schemes are indexed once into
+per-scheme arrays of eligibility attributes (field size window, land and SHG
+membership requirements) and benefit parameters. Many farmer profiles are
+then evaluated against every scheme in one vectorized pass, which serves
+both the per-farmer finance routes and bulk member-list screening.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Any, AsyncIterator
+
+import numpy as np
+from app.core.ndjson import ndjson_line
+
+logger = logging.getLogger(__name__)
+
+# Eligibility and benefit parameters per scheme name. Benefit base is
+# min(field_size * per_unit, cap) + fixed; share turns it into the scheme's
+# money value (insurance premium rate, subsidy share of system cost).
+# Schemes whose benefit is purely per hectare (per_unit without fixed) also
+# need land on record, since they are worth nothing without it. Every scheme
+# in the catalog must have an entry here.
+SCHEME_RULES = {
+    "PM-KISAN Samman Nidhi": {"max_field_size": 2.0, "requires_land": True, "fixed": 6000},
+    "Kisan Credit Card (KCC)": {"requires_land": True, "per_unit": 50000, "cap": 300000},
+    "Agriculture Term Loan": {"min_field_size": 2.0, "requires_land": True, "per_unit": 200000, "cap": 5000000},
+    "Self Help Group (SHG) Loans": {"requires_shg": True, "per_unit": 100000, "cap": 1000000},
+    "Pradhan Mantri Fasal Bima Yojana (PMFBY)": {"per_unit": 50000, "share": 0.02},
+    "Weather Based Crop Insurance (WBCIS)": {"per_unit": 50000, "share": 0.025},
+    "Fertilizer Subsidy": {"per_unit": 5000},
+    # Certified seed for one hectare costs about ₹10,000; the subsidy covers 25-40% (30% assumed)
+    "Seed Subsidy": {"max_field_size": 2.0, "requires_land": True, "per_unit": 10000, "share": 0.3},
+    "Drip Irrigation Subsidy": {"min_field_size": 1.0, "requires_land": True, "per_unit": 80000, "share": 0.6}
+}
+PREMIUM_SUBSIDY = 0.8  # government share of crop insurance premiums
+
+
+class FinanceRulesEngine:
+    """Evaluates farmer profiles against every scheme with array operations."""
+
+    def __init__(self, schemes_data: Dict[str, Any], loan_schemes: List[Dict[str, Any]],
+                 insurance_schemes: List[Dict[str, Any]]):
+        """
+        Index the schemes by eligibility attributes.
+
+        Args:
+            schemes_data: PM-KISAN and subsidy schemes
+            loan_schemes: Agriculture loan schemes
+            insurance_schemes: Crop insurance schemes
+
+        Raises:
+            ValueError: If a scheme has no SCHEME_RULES entry
+        """
+        catalog = [("income_support", schemes_data["pm_kisan"])]
+        catalog += [("loan", scheme) for scheme in loan_schemes]
+        catalog += [("insurance", scheme) for scheme in insurance_schemes]
+        catalog += [("subsidy", scheme) for scheme in schemes_data["subsidies"]]
+
+        self.schemes = [scheme for _, scheme in catalog]
+        self.names = [scheme["name"] for scheme in self.schemes]
+        self.categories = np.array([category for category, _ in catalog])
+        missing = [name for name in self.names if name not in SCHEME_RULES]
+        if missing:
+            # Without rules a scheme would be eligible for everyone at zero value
+            raise ValueError(f"No eligibility rules for schemes: {', '.join(missing)}")
+        rules = [SCHEME_RULES[name] for name in self.names]
+        self.min_field_size = np.array([rule.get("min_field_size", 0.0) for rule in rules])
+        self.max_field_size = np.array([rule.get("max_field_size", np.inf) for rule in rules])
+        self.requires_shg = np.array([rule.get("requires_shg", False) for rule in rules])
+        self.per_unit = np.array([rule.get("per_unit", 0.0) for rule in rules])
+        self.cap = np.array([rule.get("cap", np.inf) for rule in rules])
+        self.fixed = np.array([rule.get("fixed", 0.0) for rule in rules])
+        self.requires_land = (np.array([rule.get("requires_land", False) for rule in rules])
+                              | ((self.per_unit > 0) & (self.fixed == 0)))
+        self.share = np.array([rule.get("share", 1.0) for rule in rules])
+
+    def evaluate(self, profiles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Eligibility and benefit of every scheme for every profile.
+
+        Args:
+            profiles: Farmer profiles with field_size (missing: no land on
+                record) and optional shg_member (None: unknown, not excluded)
+
+        Returns:
+            Arrays shaped (profiles, schemes): eligible, base (loan amount,
+            sum insured or system cost) and value (base x share)
+        """
+        size = np.array([p.get("field_size") or 0.0 for p in profiles], dtype=float).reshape(-1, 1)
+        not_shg = np.array([p.get("shg_member") is False for p in profiles], dtype=bool).reshape(-1, 1)
+
+        eligible = ((size >= self.min_field_size) & (size <= self.max_field_size)
+                    & ((size > 0) | ~self.requires_land)
+                    & ~(not_shg & self.requires_shg))
+        base = np.minimum(size * self.per_unit, self.cap) + self.fixed
+        return {"eligible": eligible, "base": base, "value": base * self.share}
+
+    def evaluate_one(self, profile: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate a single profile.
+
+        Args:
+            profile: Farmer profile (see evaluate)
+
+        Returns:
+            Scheme name -> eligible, base and value
+        """
+        result = self.evaluate([profile])
+        return {
+            name: {"eligible": bool(result["eligible"][0, s]), "base": float(result["base"][0, s]),
+                   "value": float(result["value"][0, s])}
+            for s, name in enumerate(self.names)
+        }
+
+    def scheme_result(self, s: int, base: float, value: float) -> Dict[str, Any]:
+        """Money fields of one scheme for one profile, named for its category."""
+        category = self.categories[s]
+        if category == "loan":
+            return {"estimated_amount": round(base, 2)}
+        if category == "insurance":
+            return {
+                "sum_insured": round(base, 2),
+                "annual_premium": round(value, 2),
+                "government_subsidy": round(value * PREMIUM_SUBSIDY, 2),
+                "farmer_contribution": round(value * (1 - PREMIUM_SUBSIDY), 2)
+            }
+        if self.share[s] < 1.0:
+            return {"estimated_benefit": round(value, 2), "total_investment": round(base, 2),
+                    "farmer_contribution": round(base - value, 2)}
+        return {"estimated_benefit": round(value, 2)}
+
+    def screen(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Eligible schemes per profile.
+
+        Args:
+            profiles: Farmer profiles (see evaluate), optionally with farmer_id
+
+        Returns:
+            Per profile: eligible schemes with their money fields, total
+            credit available and total direct benefit (income support and
+            subsidies)
+        """
+        return self._records(profiles, self.evaluate(profiles))
+
+    def _records(self, profiles: List[Dict[str, Any]], result: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Per-profile records from an evaluate() result."""
+        eligible, base, value = result["eligible"], result["base"], result["value"]
+        is_loan = self.categories == "loan"
+        is_benefit = np.isin(self.categories, ("income_support", "subsidy"))
+        credit = (base * (eligible & is_loan)).sum(axis=1)
+        benefit = (value * (eligible & is_benefit)).sum(axis=1)
+
+        records = []
+        for p, profile in enumerate(profiles):
+            schemes = [
+                {"scheme": self.names[s], "category": str(self.categories[s]),
+                 **self.scheme_result(s, float(base[p, s]), float(value[p, s]))}
+                for s in np.flatnonzero(eligible[p])
+            ]
+            records.append({
+                "farmer_id": profile.get("farmer_id"),
+                "field_size": profile.get("field_size"),
+                "eligible_schemes": schemes,
+                "credit_available": round(float(credit[p]), 2),
+                "direct_benefit": round(float(benefit[p]), 2)
+            })
+        return records
+
+    async def stream(self, profiles: List[Dict[str, Any]], chunk_size: int = 1000) -> AsyncIterator[bytes]:
+        """
+        Screen a member list chunk by chunk.
+
+        Args:
+            profiles: Farmer profiles
+            chunk_size: Profiles evaluated per vectorized pass
+
+        Yields:
+            NDJSON lines: a "job" header, one "profile" line per member and a
+            closing "summary" with eligible counts per scheme and totals
+        """
+        yield ndjson_line({"type": "job", "profiles": len(profiles), "schemes": len(self.names)})
+        counts = np.zeros(len(self.names), dtype=int)
+        total_credit = 0.0
+        total_benefit = 0.0
+        for start in range(0, len(profiles), chunk_size):
+            chunk = profiles[start:start + chunk_size]
+            result = self.evaluate(chunk)
+            counts += result["eligible"].sum(axis=0)
+            for record in self._records(chunk, result):
+                total_credit += record["credit_available"]
+                total_benefit += record["direct_benefit"]
+                yield ndjson_line({"type": "profile", **record})
+            await asyncio.sleep(0)  # let other requests run between chunks
+        logger.info(f"Screened {len(profiles)} profiles against {len(self.names)} finance schemes")
+        yield ndjson_line({
+            "type": "summary",
+            "profiles": len(profiles),
+            "eligible_by_scheme": {name: int(count) for name, count in zip(self.names, counts)},
+            "total_credit_available": round(total_credit, 2),
+            "total_direct_benefit": round(total_benefit, 2)
+        })
@@ -5,6 +5,8 @@ Finance service for financial recommendations and PM-KISAN integration.
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import random
+from app.services.crop_economics import crop_economics, quintals_per_acre, HECTARES_PER_ACRE
+from app.services.finance_rules import FinanceRulesEngine
 
 
 class FinanceService:
@@ -17,6 +19,11 @@ class FinanceService:
         self.schemes_data = self._initialize_schemes_data()
         self.loan_schemes = self._initialize_loan_schemes()
         self.insurance_schemes = self._initialize_insurance_schemes()
+        self.rules = FinanceRulesEngine(self.schemes_data, self.loan_schemes, self.insurance_schemes)
+    
+    def _evaluate(self, farm_data: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Scheme name -> eligibility and amounts for the farm."""
+        return self.rules.evaluate_one({"field_size": (farm_data or {}).get("field_size")})
     
     def _initialize_schemes_data(self) -> Dict[str, Any]:
         """Initialize government schemes data."""
@@ -119,9 +126,10 @@ class FinanceService:
             Comprehensive financial recommendations
         """
         recommendations = []
+        schemes = self._evaluate(farm_data)
         
         # PM-KISAN eligibility check
-        if farm_data and farm_data.get("field_size", 0) <= 2.0:
+        if farm_data and schemes["PM-KISAN Samman Nidhi"]["eligible"]:
             recommendations.append({
                 "type": "Government Scheme",
                 "scheme_name": "PM-KISAN Samman Nidhi",
@@ -129,26 +137,25 @@ class FinanceService:
                 "benefits": "₹6,000 annually in 3 installments",
                 "application_process": "Online registration at pmkisan.gov.in",
                 "priority": "High",
-                "estimated_benefit": 6000
+                "estimated_benefit": schemes["PM-KISAN Samman Nidhi"]["value"]
             })
         
         # Loan recommendations based on farm size
         if farm_data:
-            field_size = farm_data.get("field_size", 0)
-            
-            if field_size > 0:
-                # Always recommend KCC
+            kcc = schemes["Kisan Credit Card (KCC)"]
+            if kcc["eligible"]:
                 recommendations.append({
                     "type": "Credit",
                     "scheme_name": "Kisan Credit Card (KCC)",
                     "eligibility": "Eligible",
-                    "benefits": f"Credit limit up to ₹{min(300000, field_size * 50000):,}",
+                    "benefits": f"Credit limit up to ₹{kcc['base']:,}",
                     "application_process": "Apply at nearest bank branch",
                     "priority": "High",
-                    "estimated_benefit": min(300000, field_size * 50000)
+                    "estimated_benefit": kcc["base"]
                 })
             
-            if field_size >= 2.0:
+            term_loan = schemes["Agriculture Term Loan"]
+            if term_loan["eligible"]:
                 recommendations.append({
                     "type": "Credit",
                     "scheme_name": "Agriculture Term Loan",
@@ -156,7 +163,7 @@ class FinanceService:
                     "benefits": "Low interest loans for mechanization",
                     "application_process": "Submit project proposal to bank",
                     "priority": "Medium",
-                    "estimated_benefit": field_size * 100000
+                    "estimated_benefit": term_loan["base"]
                 })
         
         # Insurance recommendations
@@ -287,6 +294,7 @@ class FinanceService:
             List of applicable loan schemes
         """
         applicable_loans = []
+        schemes = self._evaluate(farm_data)
         
         for loan in self.loan_schemes:
             # Basic eligibility assessment
@@ -305,15 +313,7 @@ class FinanceService:
             
             # Estimate loan amount based on farm size
             if farm_data and "field_size" in farm_data:
-                field_size = farm_data["field_size"]
-                if loan["name"] == "Kisan Credit Card (KCC)":
-                    estimated_amount = min(300000, field_size * 50000)
-                elif loan["name"] == "Agriculture Term Loan":
-                    estimated_amount = min(5000000, field_size * 200000)
-                else:
-                    estimated_amount = min(1000000, field_size * 100000)
-                
-                loan_info["estimated_loan_amount"] = f"₹{estimated_amount:,}"
+                loan_info["estimated_loan_amount"] = f"₹{schemes[loan['name']]['base']:,}"
             
             applicable_loans.append(loan_info)
         
@@ -344,28 +344,19 @@ class FinanceService:
             Available crop insurance schemes
         """
         insurance_options = []
+        schemes = self._evaluate(farm_data)
         
         for insurance in self.insurance_schemes:
             insurance_info = insurance.copy()
             
             # Calculate estimated premium based on farm size
             if farm_data and "field_size" in farm_data:
-                field_size = farm_data["field_size"]
-                sum_insured = field_size * 50000  # ₹50,000 per acre
-                
-                if insurance["name"] == "Pradhan Mantri Fasal Bima Yojana (PMFBY)":
-                    premium_rate = 0.02  # 2% for Kharif
-                else:
-                    premium_rate = 0.025  # 2.5% average
-                
-                premium_amount = sum_insured * premium_rate
-                
-                insurance_info["cost_estimate"] = {
-                    "sum_insured": f"₹{sum_insured:,}",
-                    "annual_premium": f"₹{premium_amount:,}",
-                    "government_subsidy": f"₹{premium_amount * 0.8:,}",  # 80% subsidy
-                    "farmer_contribution": f"₹{premium_amount * 0.2:,}"  # 20% farmer share
-                }
+                estimate = self.rules.scheme_result(
+                    self.rules.names.index(insurance["name"]),
+                    schemes[insurance["name"]]["base"],
+                    schemes[insurance["name"]]["value"]
+                )
+                insurance_info["cost_estimate"] = {key: f"₹{amount:,}" for key, amount in estimate.items()}
             
             insurance_options.append(insurance_info)
         
@@ -395,24 +386,23 @@ class FinanceService:
         Returns:
             List of applicable subsidies
         """
-        applicable_subsidies = self.schemes_data["subsidies"].copy()
+        applicable_subsidies = [subsidy.copy() for subsidy in self.schemes_data["subsidies"]]
+        schemes = self._evaluate(farm_data)
         
         # Add estimated savings based on farm size
         if farm_data and "field_size" in farm_data:
-            field_size = farm_data["field_size"]
-            
             for subsidy in applicable_subsidies:
+                scheme = schemes[subsidy["name"]]
                 if subsidy["name"] == "Fertilizer Subsidy":
-                    annual_savings = field_size * 5000  # ₹5,000 per acre
-                    subsidy["estimated_annual_savings"] = f"₹{annual_savings:,}"
+                    subsidy["estimated_annual_savings"] = f"₹{scheme['value']:,}"
                 
-                elif subsidy["name"] == "Drip Irrigation Subsidy":
-                    if field_size >= 1.0:  # Minimum 1 acre for drip irrigation
-                        system_cost = field_size * 80000  # ₹80,000 per acre
-                        subsidy_amount = system_cost * 0.6  # 60% subsidy
-                        subsidy["estimated_subsidy"] = f"₹{subsidy_amount:,}"
-                        subsidy["total_investment"] = f"₹{system_cost:,}"
-                        subsidy["farmer_contribution"] = f"₹{system_cost - subsidy_amount:,}"
+                elif subsidy["name"] == "Seed Subsidy" and scheme["eligible"]:
+                    subsidy["estimated_annual_savings"] = f"₹{scheme['value']:,}"
+                
+                elif subsidy["name"] == "Drip Irrigation Subsidy" and scheme["eligible"]:
+                    subsidy["estimated_subsidy"] = f"₹{scheme['value']:,}"
+                    subsidy["total_investment"] = f"₹{scheme['base']:,}"
+                    subsidy["farmer_contribution"] = f"₹{scheme['base'] - scheme['value']:,}"
         
         return {
             "farmer_id": farmer_data.get("id"),
@@ -442,56 +432,30 @@ class FinanceService:
         Returns:
             Detailed income projection
         """
-        # Mock yield and price data
-        crop_data = {
-            "Rice": {"yield_per_acre": 18, "price_per_quintal": 2000},
-            "Wheat": {"yield_per_acre": 22, "price_per_quintal": 2100},
-            "Maize": {"yield_per_acre": 25, "price_per_quintal": 1600},
-            "Potato": {"yield_per_acre": 180, "price_per_quintal": 1000},
-            "Arhar": {"yield_per_acre": 12, "price_per_quintal": 6000},
-            "Groundnut": {"yield_per_acre": 15, "price_per_quintal": 5000}
-        }
-        
-        crop_info = crop_data.get(crop, {"yield_per_acre": 15, "price_per_quintal": 2000})
-        
-        # Calculate production and revenue
-        total_yield = crop_info["yield_per_acre"] * area
-        gross_revenue = total_yield * crop_info["price_per_quintal"]
-        
-        # Calculate costs
-        cost_per_acre = {
-            "seeds": 2000,
-            "fertilizers": 5000,
-            "pesticides": 1500,
-            "labor": 8000,
-            "machinery": 3000,
-            "irrigation": 2000,
-            "miscellaneous": 1500
-        }
-        
-        total_cost_per_acre = sum(cost_per_acre.values())
-        total_cost = total_cost_per_acre * area
-        
-        # Calculate profit
-        net_profit = gross_revenue - total_cost
-        profit_margin = (net_profit / gross_revenue) * 100 if gross_revenue > 0 else 0
+        # Area is in acres; the economics engine works per hectare
+        estimate = crop_economics.estimate_one(crop, area_ha=area * HECTARES_PER_ACRE)
+        yield_per_acre = round(quintals_per_acre(estimate["yield_t_ha"]), 2)
+        total_yield = round(estimate["production_quintals"], 2)
+        gross_revenue = round(estimate["revenue"], 2)
+        total_cost = round(estimate["cost"], 2)
+        net_profit = round(estimate["profit"], 2)
         
         return {
             "crop": crop,
             "cultivation_area": area,
             "production_estimate": {
-                "yield_per_acre": crop_info["yield_per_acre"],
+                "yield_per_acre": yield_per_acre,
                 "total_yield_quintals": total_yield,
-                "market_price_per_quintal": crop_info["price_per_quintal"]
+                "market_price_per_quintal": estimate["price"]
             },
             "financial_projection": {
                 "gross_revenue": gross_revenue,
                 "total_cost": total_cost,
                 "net_profit": net_profit,
-                "profit_margin_percentage": round(profit_margin, 2),
-                "return_on_investment": round((net_profit / total_cost) * 100, 2) if total_cost > 0 else 0
+                "profit_margin_percentage": round(estimate["margin_percent"], 2),
+                "return_on_investment": round(estimate["roi_percent"], 2)
             },
-            "cost_breakdown": {k: v * area for k, v in cost_per_acre.items()},
+            "cost_breakdown": crop_economics.cost_breakdown(total_cost),
             "recommendations": [
                 "Consider crop insurance to protect investment",
                 "Explore value addition for better prices",
@@ -564,4 +528,8 @@ class FinanceService:
                 "Build good credit history"
             ],
             "generated_at": datetime.utcnow()
-        }
\ No newline at end of file
+        }
+
+
+# Global instance
+finance_service = FinanceService()
@@ -0,0 +1,666 @@
+"""
+Embedded SQLite backend for development and load testing without Supabase.
+Implements the subset of the PostgREST query builder that DatabaseService
+uses (table/select/insert/update/delete, eq/gt/... filters, order, limit,
+range, embedded child selects and the aggregate and audit RPCs), so every
+DatabaseService method runs unchanged against one file shared by the whole
+process. Tables, indexes, cascades and the summary-table triggers mirror
+app/db/schema.py and supabase_aggregates.sql.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Entity tables store each row as a JSON document; filters and indexes use
+# json_extract so the documents can carry any column the API writes
+DOCUMENT_TABLES = ("farmers", "farms", "recommendations", "crops_history", "audit_logs")
+
+# Parent table -> child table -> foreign key column (for embedded selects)
+RELATIONSHIPS = {
+    "farmers": {"farms": "farmer_id"},
+    "farms": {"crops_history": "farm_id", "recommendations": "farm_id"}
+}
+
+# Tables that get updated_at maintained on update
+TIMESTAMPED_TABLES = ("farmers", "farms")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_EMBED = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\((.*)\)$")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS farmers (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS farms (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS recommendations (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS crops_history (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS audit_logs (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_farmers_phone ON farmers (json_extract(data, '$.phone'));
+CREATE INDEX IF NOT EXISTS idx_farms_farmer_id ON farms (json_extract(data, '$.farmer_id'));
+CREATE INDEX IF NOT EXISTS idx_crops_history_farm_id ON crops_history (json_extract(data, '$.farm_id'));
+CREATE INDEX IF NOT EXISTS idx_recommendations_farm_id ON recommendations (json_extract(data, '$.farm_id'));
+CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs (json_extract(data, '$.timestamp'));
+CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_logs_seq ON audit_logs (json_extract(data, '$.seq'));
+
+-- Audit chain verification cursor (supabase_audit.sql)
+CREATE TABLE IF NOT EXISTS audit_checkpoints (name TEXT PRIMARY KEY, seq INTEGER NOT NULL DEFAULT 0, entry_hash TEXT,
+                                              verified_entries INTEGER NOT NULL DEFAULT 0, status TEXT,
+                                              broken_at INTEGER, detail TEXT, verified_at TEXT);
+
+-- ON DELETE CASCADE
+CREATE TRIGGER IF NOT EXISTS farmers_cascade AFTER DELETE ON farmers BEGIN
+    DELETE FROM farms WHERE json_extract(data, '$.farmer_id') = OLD.id;
+END;
+CREATE TRIGGER IF NOT EXISTS farms_cascade AFTER DELETE ON farms BEGIN
+    DELETE FROM crops_history WHERE json_extract(data, '$.farm_id') = OLD.id;
+    DELETE FROM recommendations WHERE json_extract(data, '$.farm_id') = OLD.id;
+END;
+
+-- Summary tables (supabase_aggregates.sql)
+CREATE TABLE IF NOT EXISTS platform_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL DEFAULT 0, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS crop_popularity (crop TEXT PRIMARY KEY, entries INTEGER NOT NULL DEFAULT 0, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS district_farm_stats (district TEXT PRIMARY KEY, farm_count INTEGER NOT NULL DEFAULT 0,
+                                                total_area REAL NOT NULL DEFAULT 0, updated_at TEXT);
+CREATE INDEX IF NOT EXISTS idx_crop_popularity_entries ON crop_popularity (entries DESC);
+
+CREATE TRIGGER IF NOT EXISTS crops_history_popularity_insert AFTER INSERT ON crops_history
+WHEN json_extract(NEW.data, '$.crop') IS NOT NULL BEGIN
+    INSERT INTO crop_popularity (crop, entries, updated_at) VALUES (json_extract(NEW.data, '$.crop'), 1, datetime('now'))
+    ON CONFLICT (crop) DO UPDATE SET entries = entries + 1, updated_at = datetime('now');
+END;
+CREATE TRIGGER IF NOT EXISTS crops_history_popularity_delete AFTER DELETE ON crops_history
+WHEN json_extract(OLD.data, '$.crop') IS NOT NULL BEGIN
+    UPDATE crop_popularity SET entries = MAX(entries - 1, 0), updated_at = datetime('now')
+    WHERE crop = json_extract(OLD.data, '$.crop');
+END;
+CREATE TRIGGER IF NOT EXISTS crops_history_popularity_update AFTER UPDATE OF data ON crops_history
+WHEN json_extract(OLD.data, '$.crop') IS NOT json_extract(NEW.data, '$.crop') BEGIN
+    UPDATE crop_popularity SET entries = MAX(entries - 1, 0), updated_at = datetime('now')
+    WHERE crop = json_extract(OLD.data, '$.crop');
+    INSERT INTO crop_popularity (crop, entries, updated_at)
+    SELECT json_extract(NEW.data, '$.crop'), 1, datetime('now') WHERE json_extract(NEW.data, '$.crop') IS NOT NULL
+    ON CONFLICT (crop) DO UPDATE SET entries = entries + 1, updated_at = datetime('now');
+END;
+
+CREATE TRIGGER IF NOT EXISTS farms_district_insert AFTER INSERT ON farms
+WHEN json_extract(NEW.data, '$.location.district') IS NOT NULL BEGIN
+    INSERT INTO district_farm_stats (district, farm_count, total_area, updated_at)
+    VALUES (json_extract(NEW.data, '$.location.district'), 1,
+            COALESCE(json_extract(NEW.data, '$.field_size'), 0), datetime('now'))
+    ON CONFLICT (district) DO UPDATE SET farm_count = farm_count + 1,
+        total_area = total_area + excluded.total_area, updated_at = datetime('now');
+END;
+CREATE TRIGGER IF NOT EXISTS farms_district_delete AFTER DELETE ON farms
+WHEN json_extract(OLD.data, '$.location.district') IS NOT NULL BEGIN
+    UPDATE district_farm_stats SET farm_count = MAX(farm_count - 1, 0),
+        total_area = MAX(total_area - COALESCE(json_extract(OLD.data, '$.field_size'), 0), 0),
+        updated_at = datetime('now')
+    WHERE district = json_extract(OLD.data, '$.location.district');
+END;
+CREATE TRIGGER IF NOT EXISTS farms_district_update AFTER UPDATE OF data ON farms
+WHEN json_extract(OLD.data, '$.location.district') IS NOT json_extract(NEW.data, '$.location.district')
+  OR json_extract(OLD.data, '$.field_size') IS NOT json_extract(NEW.data, '$.field_size') BEGIN
+    UPDATE district_farm_stats SET farm_count = MAX(farm_count - 1, 0),
+        total_area = MAX(total_area - COALESCE(json_extract(OLD.data, '$.field_size'), 0), 0),
+        updated_at = datetime('now')
+    WHERE district = json_extract(OLD.data, '$.location.district');
+    INSERT INTO district_farm_stats (district, farm_count, total_area, updated_at)
+    SELECT json_extract(NEW.data, '$.location.district'), 1,
+           COALESCE(json_extract(NEW.data, '$.field_size'), 0), datetime('now')
+    WHERE json_extract(NEW.data, '$.location.district') IS NOT NULL
+    ON CONFLICT (district) DO UPDATE SET farm_count = farm_count + 1,
+        total_area = total_area + excluded.total_area, updated_at = datetime('now');
+END;
+"""
+
+COUNTER_TRIGGER_SQL = """
+CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table} BEGIN
+    INSERT INTO platform_counters (name, value, updated_at) VALUES ('{table}', 1, datetime('now'))
+    ON CONFLICT (name) DO UPDATE SET value = value + 1, updated_at = datetime('now');
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table} BEGIN
+    UPDATE platform_counters SET value = MAX(value - 1, 0), updated_at = datetime('now') WHERE name = '{table}';
+END;
+"""
+
+COUNTED_TABLES = ("farmers", "farms", "recommendations", "crops_history")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _check_identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name}")
+    return name
+
+
+class LocalResponse:
+    """Mirror of postgrest's APIResponse (data and count)."""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class LocalQuery:
+    """Chainable query mirroring the postgrest request builder."""
+
+    def __init__(self, db: "LocalDatabase", table: str):
+        self._db = db
+        self._table = _check_identifier(table)
+        self._operation = "select"
+        self._columns = "*"
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._conflict_target = "id"
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._embed_order: Dict[str, Tuple[str, bool]] = {}
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    # Operations
+    def select(self, *columns: str, count: Optional[str] = None) -> "LocalQuery":
+        self._operation = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        return self
+
+    def insert(self, data: Any, **kwargs) -> "LocalQuery":
+        self._operation = "insert"
+        self._payload = data
+        return self
+
+    def upsert(self, data: Any, *, ignore_duplicates: bool = False, on_conflict: str = "", **kwargs) -> "LocalQuery":
+        self._operation = "insert"
+        self._payload = data
+        self._on_conflict = "ignore" if ignore_duplicates else "merge"
+        self._conflict_target = _check_identifier(on_conflict or "id")
+        return self
+
+    def update(self, data: Dict[str, Any], **kwargs) -> "LocalQuery":
+        self._operation = "update"
+        self._payload = data
+        return self
+
+    def delete(self, **kwargs) -> "LocalQuery":
+        self._operation = "delete"
+        return self
+
+    # Filters
+    def _filter(self, column: str, op: str, value: Any) -> "LocalQuery":
+        self._filters.append((_check_identifier(column), op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "=", value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "!=", value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, ">", value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, ">=", value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "<", value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "<=", value)
+
+    def in_(self, column: str, values: List[Any]) -> "LocalQuery":
+        return self._filter(column, "IN", list(values))
+
+    # Modifiers
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False,
+              foreign_table: Optional[str] = None) -> "LocalQuery":
+        if foreign_table:
+            self._embed_order[foreign_table] = (_check_identifier(column), desc)
+        else:
+            self._order.append((_check_identifier(column), desc))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> "LocalQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None) -> "LocalQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    async def execute(self) -> LocalResponse:
+        """Run the query on the database thread."""
+        return await self._db.run(self._db.execute_query, self)
+
+
+class LocalRPC:
+    """Pending RPC call mirroring postgrest's rpc builder."""
+
+    def __init__(self, db: "LocalDatabase", name: str, params: Dict[str, Any]):
+        self._db = db
+        self._name = name
+        self._params = params
+
+    async def execute(self) -> LocalResponse:
+        handler = getattr(self._db, f"rpc_{_check_identifier(self._name)}", None)
+        if handler is None:
+            raise ValueError(f"Unknown RPC function: {self._name}")
+        return LocalResponse(await self._db.run(handler, **self._params))
+
+
+class LocalDatabase:
+    """
+    One SQLite file shared by every DatabaseService in the process.
+
+    All statements run on a single dedicated thread (SQLite connections are
+    not shareable across threads), keeping file I/O off the event loop. WAL
+    mode lets several worker processes read the same file concurrently.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            path: SQLite file path (":memory:" for a throwaway database)
+        """
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor.submit(self._connect).result()
+
+    def _connect(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript("".join(COUNTER_TRIGGER_SQL.format(table=table) for table in COUNTED_TABLES))
+        self._conn = conn
+        # Workers opening the same file race to seed; the write lock makes check-and-insert atomic
+        with self.transaction():
+            if conn.execute("SELECT COUNT(*) FROM farmers").fetchone()[0] == 0:
+                self._seed_demo_data()
+
+    def _seed_demo_data(self):
+        """Create the demo farmer (phone 9876543210, password demo1234) and farm."""
+        import bcrypt
+
+        self._execute_insert(LocalQuery(self, "farmers").insert({
+            "id": "demo-farmer-123",
+            "name": "Demo Farmer",
+            "phone": "9876543210",
+            "password": bcrypt.hashpw(b"demo1234", bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8'),
+            "language": "english",
+            "created_at": "2024-01-01T00:00:00Z"
+        }))
+        self._execute_insert(LocalQuery(self, "farms").insert({
+            "id": "demo-farm-456",
+            "farmer_id": "demo-farmer-123",
+            "name": "Demo Farm",
+            "location": {
+                "latitude": 23.3441,
+                "longitude": 85.3096,
+                "district": "Ranchi",
+                "village": "Demo Village"
+            },
+            "soil_type": "loam",
+            "irrigation_method": "drip",
+            "field_size": 2.5,
+            "created_at": "2024-01-01T00:00:00Z"
+        }))
+
+    # Builder entry points (same names as AsyncPostgrestClient)
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def from_(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> LocalRPC:
+        return LocalRPC(self, name, params or {})
+
+    async def run(self, func, *args, **kwargs) -> Any:
+        """Run a function on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def aclose(self):
+        """Close the connection and stop the database thread."""
+        if self._conn is not None:
+            await self.run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    # Query execution (database thread)
+    @staticmethod
+    def _column_sql(table: str, column: str) -> str:
+        if table in DOCUMENT_TABLES and column != "id":
+            return f"json_extract(data, '$.{column}')"
+        return column
+
+    def _where(self, query: LocalQuery) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, op, value in query._filters:
+            column_sql = self._column_sql(query._table, column)
+            if op == "IN":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{column_sql} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{column_sql} {op} ?")
+                params.append(value)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def _load_rows(self, table: str, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        cursor = self._conn.execute(sql, params)
+        if table in DOCUMENT_TABLES:
+            return [json.loads(row["data"]) for row in cursor]
+        return [dict(row) for row in cursor]
+
+    def execute_query(self, query: LocalQuery) -> LocalResponse:
+        """Execute a builder query and return PostgREST-shaped rows."""
+        handler = {
+            "select": self._execute_select,
+            "insert": self._execute_insert,
+            "update": self._execute_update,
+            "delete": self._execute_delete
+        }[query._operation]
+        return LocalResponse(handler(query))
+
+    def _execute_select(self, query: LocalQuery) -> List[Dict[str, Any]]:
+        table = query._table
+        where, params = self._where(query)
+        sql = f"SELECT * FROM {table}{where}"
+        if query._order:
+            sql += " ORDER BY " + ", ".join(
+                f"{self._column_sql(table, column)} {'DESC' if desc else 'ASC'}" for column, desc in query._order
+            )
+        if query._limit is not None or query._offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [query._limit if query._limit is not None else -1, query._offset]
+        rows = self._load_rows(table, sql, params)
+
+        columns, embeds = self._parse_columns(table, query._columns)
+        for child, child_columns in embeds:
+            self._attach_children(table, rows, child, child_columns, query._embed_order.get(child))
+        if columns is not None:
+            keep = set(columns) | {child for child, _ in embeds}
+            rows = [{key: value for key, value in row.items() if key in keep} for row in rows]
+        return rows
+
+    def _parse_columns(self, table: str, columns: str) -> Tuple[Optional[List[str]], List[Tuple[str, str]]]:
+        """Split a select list into plain columns (None = all) and embedded children."""
+        plain, embeds, depth, current = [], [], 0, ""
+        parts = []
+        for char in columns:
+            if char == "," and depth == 0:
+                parts.append(current.strip())
+                current = ""
+                continue
+            depth += char == "("
+            depth -= char == ")"
+            current += char
+        parts.append(current.strip())
+
+        star = False
+        for part in filter(None, parts):
+            embed = _EMBED.match(part)
+            if embed:
+                child = embed.group(1)
+                if child not in RELATIONSHIPS.get(table, {}):
+                    raise ValueError(f"No relationship between {table} and {child}")
+                embeds.append((child, embed.group(2) or "*"))
+            elif part == "*":
+                star = True
+            else:
+                plain.append(_check_identifier(part))
+        return (None if star else plain), embeds
+
+    def _attach_children(self, table: str, rows: List[Dict[str, Any]], child: str, columns: str,
+                         order: Optional[Tuple[str, bool]]):
+        foreign_key = RELATIONSHIPS[table][child]
+        for row in rows:
+            query = LocalQuery(self, child).select(columns).eq(foreign_key, row["id"])
+            if order:
+                query.order(order[0], desc=order[1])
+            row[child] = self._execute_select(query)
+
+    def _execute_insert(self, query: LocalQuery) -> List[Dict[str, Any]]:
+        table = query._table
+        payload = query._payload if isinstance(query._payload, list) else [query._payload]
+        rows = [self._prepare_row(table, row) for row in payload]
+        with self.transaction():
+            if table in DOCUMENT_TABLES:
+                # Upserts resolve on id; "merge" runs as an UPDATE so the summary triggers stay exact
+                conflict = {
+                    "ignore": " ON CONFLICT (id) DO NOTHING",
+                    "merge": " ON CONFLICT (id) DO UPDATE SET data = json_patch(data, excluded.data)"
+                }.get(query._on_conflict, "")
+                self._conn.executemany(
+                    f"INSERT INTO {table} (id, data) VALUES (?, ?){conflict}",
+                    [(row["id"], json.dumps(row, default=str)) for row in rows]
+                )
+            else:
+                for row in rows:
+                    columns = [_check_identifier(column) for column in row]
+                    conflict = ""
+                    if query._on_conflict == "ignore":
+                        conflict = f" ON CONFLICT ({query._conflict_target}) DO NOTHING"
+                    elif query._on_conflict == "merge":
+                        updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+                        conflict = f" ON CONFLICT ({query._conflict_target}) DO UPDATE SET {updates}"
+                    self._conn.execute(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}){conflict}",
+                        list(row.values())
+                    )
+        return rows
+
+    @staticmethod
+    def _prepare_row(table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the column defaults the Postgres schema would."""
+        row = dict(row)
+        if table in DOCUMENT_TABLES:
+            row["id"] = str(row.get("id") or uuid.uuid4())
+            timestamp_column = "timestamp" if table == "audit_logs" else "created_at"
+            row.setdefault(timestamp_column, _now())
+            if table in TIMESTAMPED_TABLES:
+                row.setdefault("updated_at", row[timestamp_column])
+        return row
+
+    def _execute_update(self, query: LocalQuery) -> List[Dict[str, Any]]:
+        table = query._table
+        where, params = self._where(query)
+        changes = dict(query._payload)
+        if table in TIMESTAMPED_TABLES:
+            changes.setdefault("updated_at", _now())
+        with self.transaction():
+            if table in DOCUMENT_TABLES:
+                rows = self._load_rows(table, f"SELECT * FROM {table}{where}", params)
+                for row in rows:
+                    row.update(changes)
+                self._conn.executemany(
+                    f"UPDATE {table} SET data = ? WHERE id = ?",
+                    [(json.dumps(row, default=str), row["id"]) for row in rows]
+                )
+                return rows
+            assignments = ", ".join(f"{_check_identifier(column)} = ?" for column in changes)
+            self._conn.execute(f"UPDATE {table} SET {assignments}{where}", list(changes.values()) + params)
+            return self._load_rows(table, f"SELECT * FROM {table}{where}", params)
+
+    def _execute_delete(self, query: LocalQuery) -> List[Dict[str, Any]]:
+        table = query._table
+        where, params = self._where(query)
+        with self.transaction():
+            rows = self._load_rows(table, f"SELECT * FROM {table}{where}", params)
+            self._conn.execute(f"DELETE FROM {table}{where}", params)
+        return rows
+
+    def transaction(self):
+        """Context manager wrapping statements in one write transaction."""
+        return _Transaction(self._conn)
+
+    # RPC functions (supabase_audit.sql)
+    def rpc_append_audit_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chain entries onto the audit log head and insert them in one write transaction."""
+        from app.services.audit_service import GENESIS_HASH, compute_entry_hash
+
+        with self.transaction():
+            head = self._conn.execute(
+                "SELECT data FROM audit_logs WHERE json_extract(data, '$.seq') > 0 "
+                "ORDER BY json_extract(data, '$.seq') DESC LIMIT 1"
+            ).fetchone()
+            head = json.loads(head[0]) if head else {"seq": 0, "round_number": 0, "entry_hash": GENESIS_HASH}
+            seq, round_number, previous_hash = head["seq"], head["round_number"], head["entry_hash"]
+            rows = []
+            for entry in entries:
+                if entry["round_number"] < round_number:
+                    raise ValueError(
+                        f"Round {entry['round_number']} is older than the chain head (round {round_number})"
+                    )
+                seq, round_number = seq + 1, entry["round_number"]
+                row = {
+                    "id": str(uuid.uuid4()),
+                    "seq": seq,
+                    "round_number": round_number,
+                    "update_hash": entry["update_hash"],
+                    "previous_hash": previous_hash,
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="microseconds")
+                }
+                row["entry_hash"] = previous_hash = compute_entry_hash(row)
+                rows.append(row)
+            self._conn.executemany(
+                "INSERT INTO audit_logs (id, data) VALUES (?, ?)",
+                [(row["id"], json.dumps(row)) for row in rows]
+            )
+        return rows
+
+    # RPC functions (supabase_aggregates.sql)
+    def rpc_platform_summary(self) -> Dict[str, int]:
+        return {row["name"]: row["value"] for row in self._conn.execute("SELECT name, value FROM platform_counters")}
+
+    def rpc_reconcile_aggregates(self) -> Dict[str, Any]:
+        """Rebuild the summary tables from the entity tables and report drift."""
+        with self.transaction():
+            actual_counters = {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in COUNTED_TABLES
+            }
+            actual_crops = dict(self._conn.execute(
+                "SELECT json_extract(data, '$.crop'), COUNT(*) FROM crops_history "
+                "WHERE json_extract(data, '$.crop') IS NOT NULL GROUP BY 1"
+            ).fetchall())
+            actual_districts = {
+                district: (count, round(area or 0, 2)) for district, count, area in self._conn.execute(
+                    "SELECT json_extract(data, '$.location.district'), COUNT(*), SUM(json_extract(data, '$.field_size')) "
+                    "FROM farms WHERE json_extract(data, '$.location.district') IS NOT NULL GROUP BY 1"
+                )
+            }
+
+            counter_drift = self._replace_summary(
+                "platform_counters", "name", ("value",), {k: (v,) for k, v in actual_counters.items()}
+            )
+            crop_drift = self._replace_summary(
+                "crop_popularity", "crop", ("entries",), {k: (v,) for k, v in actual_crops.items()}
+            )
+            district_drift = self._replace_summary(
+                "district_farm_stats", "district", ("farm_count", "total_area"), actual_districts
+            )
+
+        return {"counters": counter_drift, "crops": crop_drift, "districts": district_drift, "reconciled_at": _now()}
+
+    def _replace_summary(self, table: str, key: str, columns: Tuple[str, ...], actual: Dict[str, tuple]) -> int:
+        """Make a summary table match `actual`; returns rows whose values were wrong."""
+        stored = {
+            row[0]: tuple(round(v, 2) if isinstance(v, float) else v for v in row[1:])
+            for row in self._conn.execute(f"SELECT {key}, {', '.join(columns)} FROM {table}")
+        }
+        drift = 0
+        for name in set(stored) - set(actual):
+            self._conn.execute(f"DELETE FROM {table} WHERE {key} = ?", (name,))
+            # Rows already decremented to zero are stale, not drift
+            drift += any(stored[name])
+        for name, values in actual.items():
+            if stored.get(name) != values:
+                assignments = ", ".join(f"{column} = excluded.{column}" for column in columns)
+                self._conn.execute(
+                    f"INSERT INTO {table} ({key}, {', '.join(columns)}, updated_at) "
+                    f"VALUES (?, {', '.join('?' * len(columns))}, datetime('now')) "
+                    f"ON CONFLICT ({key}) DO UPDATE SET {assignments}, updated_at = excluded.updated_at",
+                    (name, *values)
+                )
+                # A missing row whose actual value is zero was never bumped, not drifted
+                drift += name in stored or any(values)
+        return drift
+
+    def table_counts(self) -> Dict[str, int]:
+        """Row count per entity table (database thread)."""
+        return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in DOCUMENT_TABLES}
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK on an autocommit connection (re-entrant)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._owner = True
+        else:
+            self._owner = False
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._owner:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# One local database per process, shared by every DatabaseService instance
+_local_db: Optional[LocalDatabase] = None
+_local_db_lock = threading.Lock()
+
+
+def get_local_database() -> LocalDatabase:
+    """
+    Get the process-wide local database, creating it on first use.
+
+    Returns:
+        LocalDatabase at LOCAL_DB_PATH
+    """
+    global _local_db
+    with _local_db_lock:
+        if _local_db is None:
+            _local_db = LocalDatabase(settings.LOCAL_DB_PATH)
+            print(f"🗄️  Using local SQLite database at {settings.LOCAL_DB_PATH}")
+    return _local_db
+
+
+async def close_local_database():
+    """Close the process-wide local database."""
+    global _local_db
+    if _local_db is not None:
+        await _local_db.aclose()
+        _local_db = None
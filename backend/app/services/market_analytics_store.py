@@ -0,0 +1,591 @@
+"""
+Materialized market analytics for AuraFarming.
+Keeps the latest mandi price rows for every district and computes all
+district x crop analytics (price range, variance, stability, district ranking)
+in a single vectorized pass whenever new price data lands. Rows scraped
+from live portals are also kept as a dated price history per crop.
+"""
+
+import asyncio
+import time
+import logging
+from typing import Dict, List, Any, Optional
+from datetime import datetime, date
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Source labels MarketService stamps on rows scraped from live portals. Mock,
+# fallback and multi-source rows may be generated and never enter the history.
+OBSERVED_SOURCES = frozenset({"AGMARKNET", "AGMARKNET_REAL", "GOVERNMENT_REAL"})
+
+DATE_FORMATS = ("%d-%b-%Y", "%d/%m/%Y", "%d-%m-%Y")
+
+
+class MarketAnalyticsStore:
+    """
+    Read-optimized store for market analytics.
+
+    Price payloads are ingested per district (from the mandi price fetch path),
+    which marks the store dirty. The next read re-materializes every
+    district x crop cell with NumPy group reductions, so the analytics routes
+    only perform dictionary lookups.
+    """
+
+    def __init__(self, ttl: int = 900, max_concurrent_fetches: int = 6, history_days: int = 90):
+        """
+        Initialize the analytics store.
+
+        Args:
+            ttl: Seconds before a district's ingested prices are considered stale
+            max_concurrent_fetches: Upper bound on concurrent district refreshes
+            history_days: Observation days of price history kept per crop
+        """
+        self._ttl = ttl
+        self._history_days = history_days
+
+        # district -> crop key -> list of (display name, market, modal price, source)
+        self._rows: Dict[str, Dict[str, List[tuple]]] = {}
+        # crop key -> observation day -> (district, market) -> modal price, live sources only
+        self._history: Dict[str, Dict[str, Dict[tuple, float]]] = {}
+        self._ingested_at: Dict[str, float] = {}
+        self._dirty = False
+        self._data_version = 0  # bumped by every ingest that changes prices
+
+        # Materialized views
+        self._version = 0
+        self._materialized_at: Optional[str] = None
+        self._districts: List[str] = []
+        self._crop_keys: List[str] = []
+        self._crop_names: Dict[str, str] = {}
+        self._cells: Dict[str, np.ndarray] = {}
+        self._district_views: Dict[str, Dict[str, Any]] = {}
+        self._crop_views: Dict[str, Dict[str, Any]] = {}
+
+        self._refresh_lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}  # district -> fetch claimed by a request
+        self._fetch_semaphore = asyncio.Semaphore(max_concurrent_fetches)
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def ingest(self, district: str, payload: Dict[str, Any], complete: bool = True) -> int:
+        """
+        Ingest a mandi price payload for a district.
+
+        A complete (unfiltered) payload replaces the district's snapshot,
+        dropping commodities that vanished from the feed, and marks the
+        district fresh. A crop-filtered payload only refreshes the rows of its
+        crops and leaves the district's freshness alone, so the next read
+        still fetches the full list. The store is marked dirty only when
+        prices actually change.
+
+        Every row keeps its source label; rows from OBSERVED_SOURCES are also
+        recorded in the crop's price history under their observation date.
+
+        Args:
+            district: District name
+            payload: Response of MarketService.get_mandi_prices
+            complete: Whether the payload covers every commodity (no crop filter)
+
+        Returns:
+            Number of price rows ingested
+        """
+        if not isinstance(payload, dict):
+            return 0
+
+        fresh: Dict[str, List[tuple]] = {}
+        history_changed = False
+        default_source = payload.get("source") or payload.get("data_source")
+        for item in payload.get("prices", []) or []:
+            name = str(item.get("crop") or item.get("commodity") or "").strip()
+            price = item.get("modal_price", item.get("price"))
+            if not name or price is None:
+                continue
+            try:
+                price = float(price)
+            except (TypeError, ValueError):
+                continue
+            if price <= 0:
+                continue
+            market = item.get("market", f"{district} Mandi")
+            source = item.get("source") or default_source
+            fresh.setdefault(name.lower(), []).append((name, market, price, source))
+            if source in OBSERVED_SOURCES:
+                history_changed |= self._record_observation(
+                    name.lower(), _observation_day(item.get("date")), (district, market), price
+                )
+
+        if complete and not fresh:
+            # An empty feed is a failed fetch, not a district without commodities
+            return 0
+
+        current = self._rows.get(district, {})
+        updated = fresh if complete else {**current, **fresh}
+        if updated != current:
+            self._rows[district] = updated
+            self._dirty = True
+        if updated != current or history_changed:
+            self._data_version += 1
+        if complete:
+            self._ingested_at[district] = time.time()
+
+        return sum(len(rows) for rows in fresh.values())
+
+    def _record_observation(self, key: str, day: str, market: tuple, price: float) -> bool:
+        """Record one live-source price under its observation day; True if the history changed."""
+        days = self._history.setdefault(key, {})
+        if days.get(day, {}).get(market) == price:
+            return False
+        days.setdefault(day, {})[market] = price
+        if len(days) > self._history_days:
+            for old in sorted(days)[:len(days) - self._history_days]:
+                del days[old]
+        return True
+
+    def is_stale(self, district: str) -> bool:
+        """Check whether a district has no ingested data or has expired."""
+        ingested_at = self._ingested_at.get(district)
+        return ingested_at is None or time.time() - ingested_at > self._ttl
+
+    async def ensure_districts(self, market_service, districts: List[str]) -> None:
+        """
+        Make sure the given districts have fresh data, fetching stale ones concurrently.
+
+        The refresh lock only guards bookkeeping: stale districts are claimed
+        under it, fetched outside it and merged back under it. A district
+        already being fetched by another request is awaited, not fetched twice.
+
+        Args:
+            market_service: MarketService used to fetch mandi prices
+            districts: Districts that must be present in the store
+        """
+        stale = [d for d in districts if self.is_stale(d)]
+        if not stale:
+            return
+
+        async with self._refresh_lock:
+            # Another request may have refreshed while we waited
+            stale = [d for d in stale if self.is_stale(d)]
+            waiting = [self._inflight[d] for d in stale if d in self._inflight]
+            claimed = [d for d in stale if d not in self._inflight]
+            loop = asyncio.get_running_loop()
+            for district in claimed:
+                self._inflight[district] = loop.create_future()
+
+        async def fetch(district: str):
+            async with self._fetch_semaphore:
+                return await market_service.get_mandi_prices(district)
+
+        try:
+            results = await asyncio.gather(*(fetch(d) for d in claimed), return_exceptions=True)
+            async with self._refresh_lock:
+                for district, result in zip(claimed, results):
+                    if isinstance(result, Exception):
+                        logger.warning(f"Failed to refresh analytics data for {district}: {result}")
+                    else:
+                        self.ingest(district, result)
+        finally:
+            # Release the claims even when cancelled so joined requests wake up
+            for district in claimed:
+                future = self._inflight.pop(district, None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+        if waiting:
+            # Shielded: a cancelled waiter must not cancel the shared claim
+            await asyncio.gather(*(asyncio.shield(future) for future in waiting))
+
+    async def refresh_all(self, market_service, districts: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Materialization job: refresh every district and rebuild all views.
+
+        Args:
+            market_service: MarketService used to fetch mandi prices
+            districts: Districts to refresh (defaults to all Jharkhand districts)
+
+        Returns:
+            Store statistics after the rebuild
+        """
+        if districts is None:
+            from app.core.config import JHARKHAND_DISTRICTS
+            districts = JHARKHAND_DISTRICTS
+
+        for district in districts:
+            self._ingested_at.pop(district, None)
+
+        await self.ensure_districts(market_service, districts)
+        self.materialize()
+        return self.get_stats()
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+
+    def materialize(self) -> None:
+        """Rebuild every district x crop view in one vectorized pass."""
+        districts = sorted(self._rows.keys())
+        crop_keys = sorted({key for rows in self._rows.values() for key in rows})
+        district_index = {d: i for i, d in enumerate(districts)}
+        crop_index = {c: i for i, c in enumerate(crop_keys)}
+
+        d_idx, c_idx, prices = [], [], []
+        crop_names: Dict[str, str] = {}
+        for district, crops in self._rows.items():
+            for key, rows in crops.items():
+                crop_names.setdefault(key, rows[0][0])
+                for _, _, price, _ in rows:
+                    d_idx.append(district_index[district])
+                    c_idx.append(crop_index[key])
+                    prices.append(price)
+
+        n_d, n_c = len(districts), len(crop_keys)
+        size = n_d * n_c
+        flat = np.asarray(d_idx, dtype=np.int64) * max(n_c, 1) + np.asarray(c_idx, dtype=np.int64)
+        values = np.asarray(prices, dtype=np.float64)
+
+        count = np.bincount(flat, minlength=size).astype(np.float64)
+        total = np.bincount(flat, weights=values, minlength=size)
+        total_sq = np.bincount(flat, weights=values * values, minlength=size)
+        low = np.full(size, np.inf)
+        high = np.full(size, -np.inf)
+        if values.size:
+            np.minimum.at(low, flat, values)
+            np.maximum.at(high, flat, values)
+
+        shape = (n_d, n_c)
+        self._cells = {
+            "count": count.reshape(shape),
+            "total": total.reshape(shape),
+            "total_sq": total_sq.reshape(shape),
+            "low": low.reshape(shape),
+            "high": high.reshape(shape),
+        }
+        self._districts = districts
+        self._crop_keys = crop_keys
+        self._crop_names = crop_names
+
+        now = datetime.now().isoformat()
+        self._district_views = {
+            district: self._build_district_view(i, now) for i, district in enumerate(districts)
+        }
+        self._crop_views = {
+            key: self._summarize_crops(np.array([j]), crop_names[key], now)
+            for j, key in enumerate(crop_keys)
+        }
+
+        self._version += 1
+        self._materialized_at = now
+        self._dirty = False
+        logger.info(
+            f"Materialized market analytics v{self._version}: "
+            f"{n_d} districts x {n_c} crops from {values.size} price rows"
+        )
+
+    def _ensure_materialized(self) -> None:
+        """Rebuild views lazily if new data arrived since the last pass."""
+        if self._dirty:
+            self.materialize()
+
+    def _build_district_view(self, row: int, now: str) -> Dict[str, Any]:
+        """Build the precomputed per-district crop statistics."""
+        count = self._cells["count"][row]
+        present = np.nonzero(count)[0]
+        means = self._cells["total"][row, present] / count[present]
+
+        crops = [
+            {
+                "crop": self._crop_names[self._crop_keys[j]],
+                "average_price": round(float(mean), 2),
+                "min_price": round(float(self._cells["low"][row, j]), 2),
+                "max_price": round(float(self._cells["high"][row, j]), 2),
+                "markets": int(count[j]),
+            }
+            for j, mean in zip(present, means)
+        ]
+        crops.sort(key=lambda x: x["average_price"], reverse=True)
+
+        total_rows = float(count.sum())
+        return {
+            "crops": crops,
+            "total_rows": int(total_rows),
+            "average_price": round(float(self._cells["total"][row].sum() / total_rows), 2) if total_rows else 0,
+            "min_price": round(float(self._cells["low"][row, present].min()), 2) if present.size else 0,
+            "max_price": round(float(self._cells["high"][row, present].max()), 2) if present.size else 0,
+            "materialized_at": now,
+        }
+
+    def _summarize_crops(self, columns: np.ndarray, crop: str, now: str) -> Dict[str, Any]:
+        """Reduce one or more crop columns into cross-district analytics."""
+        count = self._cells["count"][:, columns].sum(axis=1)
+        total = self._cells["total"][:, columns].sum(axis=1)
+        total_sq = self._cells["total_sq"][:, columns].sum(axis=1)
+        low = self._cells["low"][:, columns].min(axis=1)
+        high = self._cells["high"][:, columns].max(axis=1)
+
+        present = np.nonzero(count)[0]
+        n = float(count.sum())
+        if n == 0:
+            return {"crop": crop, "total_markets": 0, "materialized_at": now}
+
+        avg_price = float(total.sum() / n)
+        min_price = float(low[present].min())
+        max_price = float(high[present].max())
+        std = float(np.sqrt(max(total_sq.sum() / n - avg_price ** 2, 0.0)))
+        spread = max_price - min_price
+
+        district_means = total[present] / count[present]
+        order = np.argsort(-district_means, kind="stable")
+        ranking = [
+            {
+                "rank": rank + 1,
+                "district": self._districts[present[i]],
+                "price": round(float(district_means[i]), 2),
+                "markets": int(count[present[i]]),
+            }
+            for rank, i in enumerate(order)
+        ]
+
+        return {
+            "crop": crop,
+            "districts_available": int(present.size),
+            "total_markets": int(n),
+            "average_price": round(avg_price, 2),
+            "min_price": round(min_price, 2),
+            "max_price": round(max_price, 2),
+            "price_variance": round(spread, 2),
+            "price_std": round(std, 2),
+            "stability_score": round(max(0.0, 1.0 - spread / max(avg_price, 1)), 3),
+            "district_ranking": ranking,
+            "materialized_at": now,
+        }
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
+
+    def get_district_analytics(self, district: str, timeframe: int = 30) -> Dict[str, Any]:
+        """
+        Serve market analytics for a district from the materialized views.
+
+        Args:
+            district: District name
+            timeframe: Analysis timeframe in days (echoed back)
+
+        Returns:
+            Market analytics including price summary and top commodities
+        """
+        self._ensure_materialized()
+        view = self._district_views.get(district, {"crops": [], "total_rows": 0,
+                                                   "average_price": 0, "min_price": 0, "max_price": 0})
+        crops = view["crops"]
+
+        return {
+            "district": district,
+            "timeframe_days": timeframe,
+            "price_summary": {
+                "total_commodities": len(crops),
+                "total_price_points": view["total_rows"],
+                "average_price": view["average_price"],
+                "price_range": {
+                    "min": view["min_price"],
+                    "max": view["max_price"]
+                }
+            },
+            "top_commodities": crops[:5],
+            "market_trends": {
+                "overall_trend": "stable",
+                "growth_rate": 2.5,
+                "volatility": "medium"
+            },
+            "insights": [
+                f"Market analysis for {district} shows {len(crops)} active commodities",
+                "Price volatility is within normal range",
+                "Government data sources providing reliable information"
+            ],
+            "recommendations": [
+                "Monitor price trends before selling",
+                "Consider seasonal variations in pricing",
+                "Use multiple market sources for price validation"
+            ],
+            "analytics_version": self._version,
+            "materialized_at": self._materialized_at,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def get_crop_analytics(self, crop: str, timeframe: int = 30) -> Dict[str, Any]:
+        """
+        Serve cross-district analytics for a crop from the materialized views.
+
+        Args:
+            crop: Crop name (partial names match, e.g. "Arhar" matches "Arhar (Tur)")
+            timeframe: Analysis timeframe in days (echoed back)
+
+        Returns:
+            Crop analytics including price analysis and district ranking
+        """
+        self._ensure_materialized()
+        key = crop.strip().lower()
+
+        summary = self._crop_views.get(key)
+        if summary is None:
+            columns = np.array([j for j, k in enumerate(self._crop_keys) if key in k], dtype=np.int64)
+            if columns.size:
+                summary = self._summarize_crops(columns, crop, self._materialized_at)
+
+        if not summary or not summary.get("total_markets"):
+            return {
+                "crop": crop,
+                "timeframe_days": timeframe,
+                "message": f"No data found for {crop}",
+                "timestamp": datetime.now().isoformat()
+            }
+
+        return {
+            "crop": crop,
+            "timeframe_days": timeframe,
+            "market_presence": {
+                "districts_available": summary["districts_available"],
+                "total_markets": summary["total_markets"],
+                "availability_score": min(summary["total_markets"] / 10, 1.0)
+            },
+            "price_analysis": {
+                "average_price": summary["average_price"],
+                "price_range": {
+                    "min": summary["min_price"],
+                    "max": summary["max_price"]
+                },
+                "price_variance": summary["price_variance"],
+                "price_std": summary["price_std"],
+                "stability_score": summary["stability_score"]
+            },
+            "district_comparison": summary["district_ranking"],
+            "insights": [
+                f"{crop} is available in {summary['districts_available']} districts",
+                f"Average market price is ₹{summary['average_price']:.2f} per quintal",
+                f"Price variance is ₹{summary['price_variance']:.2f}"
+            ],
+            "recommendations": [
+                "Compare prices across districts before selling",
+                "Consider transportation costs in pricing decisions",
+                "Monitor seasonal price patterns"
+            ],
+            "analytics_version": self._version,
+            "materialized_at": self._materialized_at,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def get_yield_analytics(self, district: str, timeframe: int = 90) -> Dict[str, Any]:
+        """
+        Serve yield analytics for a district from the materialized views.
+
+        Args:
+            district: District name
+            timeframe: Analysis timeframe in days (echoed back)
+
+        Returns:
+            Yield analytics including per-crop profitability
+        """
+        self._ensure_materialized()
+        view = self._district_views.get(district, {"crops": []})
+
+        yield_data = [
+            {
+                "crop": c["crop"],
+                "estimated_yield": round(c["average_price"] * 0.1, 2),  # Simplified yield estimation
+                "price_per_quintal": c["average_price"],
+                "profitability_score": min(c["average_price"] / 1000, 1.0),
+                "market_demand": "medium" if c["average_price"] > 1000 else "low"
+            }
+            for c in view["crops"]
+        ]
+        yield_data.sort(key=lambda x: x["profitability_score"], reverse=True)
+
+        return {
+            "district": district,
+            "timeframe_days": timeframe,
+            "yield_summary": {
+                "total_crops_analyzed": len(yield_data),
+                "high_yield_crops": [c for c in yield_data if c["profitability_score"] > 0.8],
+                "medium_yield_crops": [c for c in yield_data if 0.5 <= c["profitability_score"] <= 0.8],
+                "low_yield_crops": [c for c in yield_data if c["profitability_score"] < 0.5]
+            },
+            "crop_yields": yield_data,
+            "production_trends": {
+                "overall_trend": "stable",
+                "seasonal_variation": "moderate",
+                "growth_projection": "2-5% annually"
+            },
+            "insights": [
+                f"Analyzed yield potential for {len(yield_data)} crops in {district}",
+                f"Top performing crop: {yield_data[0]['crop'] if yield_data else 'N/A'}",
+                "Market prices indicate moderate profitability potential"
+            ],
+            "recommendations": [
+                "Focus on high-yield, profitable crops",
+                "Consider crop diversification for risk management",
+                "Monitor seasonal yield patterns",
+                "Invest in soil health for better yields"
+            ],
+            "analytics_version": self._version,
+            "materialized_at": self._materialized_at,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    @property
+    def data_version(self) -> int:
+        """Counter of ingested price changes, for caches of results derived from raw prices."""
+        return self._data_version
+
+    def get_price_samples(self, crop: str) -> List[float]:
+        """
+        Daily price history for a crop from live sources.
+
+        Each sample is the mean modal price over the markets observed on one
+        day, oldest first. Mock and fallback rows never contribute.
+
+        Args:
+            crop: Crop name (case-insensitive)
+
+        Returns:
+            Prices per quintal, one per observation day (empty if none were observed)
+        """
+        days = self._history.get(crop.lower(), {})
+        return [float(np.mean(list(days[day].values()))) for day in sorted(days)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get materialization statistics."""
+        return {
+            "version": self._version,
+            "data_version": self._data_version,
+            "materialized_at": self._materialized_at,
+            "dirty": self._dirty,
+            "districts": len(self._rows),
+            "crops": len(self._crop_keys),
+            "price_rows": int(self._cells["count"].sum()) if self._cells else 0,
+            "stale_districts": [d for d in self._rows if self.is_stale(d)],
+            "history_crops": len(self._history)
+        }
+
+
+def _observation_day(value: Any) -> str:
+    """ISO day of a row's observation date, defaulting to today for missing or unknown formats."""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    text = str(value or "").strip()
+    try:
+        return datetime.fromisoformat(text).date().isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return date.today().isoformat()
+
+
+# Global analytics store instance
+market_analytics_store = MarketAnalyticsStore()
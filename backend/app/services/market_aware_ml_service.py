@@ -13,10 +13,16 @@ import asyncio
 # Import existing services
 from .ml_service import MLService
 from .market_service import MarketService
+from .crop_economics import crop_economics, HECTARES_PER_ACRE
 from app.models.schemas import CropRecommendation
 
 logger = logging.getLogger(__name__)
 
+TREND_SCORES = {'Rising': 0.8, 'Stable': 0.6, 'Falling': 0.3}
+TREND_MULTIPLIERS = {'Rising': 1.1, 'Stable': 1.0, 'Falling': 0.9}
+TREND_ALIASES = {'increasing': 'Rising', 'up': 'Rising', 'decreasing': 'Falling', 'down': 'Falling'}
+RELIABILITY_SCORES = {'high': 1.0, 'medium': 0.8, 'low': 0.6}
+
 
 class MarketAwareMLService:
     """
@@ -47,111 +53,179 @@ class MarketAwareMLService:
         """
         Get crop recommendations enhanced with market intelligence.
         
+        Model inference (on a worker thread) and the cache-backed mandi price
+        fetch run concurrently; every crop the model scores is then ranked in
+        one vectorized pass.
+        
         Args:
             farm_data: Farm characteristics (soil, climate, etc.)
             district: District for market data
             include_profit_analysis: Whether to include profit calculations
             
         Returns:
-            List of market-aware crop recommendations
+            Market-aware crop recommendations for all candidate crops, best first
         """
         try:
-            # Get base ML recommendations
-            base_recommendations = self.ml_service.predict_crop(farm_data)
-            
-            # Get market data for enhancement
-            market_data = await self.market_service.get_mandi_prices_with_fallback(district)
-            
-            enhanced_recommendations = []
-            
-            for rec in base_recommendations[:5]:  # Top 5 crops
-                try:
-                    crop_name = rec.get('crop', '')
-                    logger.info(f"Processing crop: {crop_name}")
-                    
-                    # Find market price for this crop
-                    market_price_info = self._find_crop_market_data(crop_name, market_data)
-                    
-                    # Calculate profit potential
-                    profit_info = await self._calculate_profit_potential(
-                        crop_name, rec, market_price_info, farm_data
-                    ) if include_profit_analysis else {}
-                    
-                    # Enhance recommendation with market data
-                    enhanced_rec = {
-                        **rec,
-                        'market_data': market_price_info,
-                        'profit_analysis': profit_info,
-                        'market_score': self._calculate_market_score(market_price_info),
-                        'combined_score': self._calculate_combined_score(rec, market_price_info),
-                        'recommendation_type': 'market_enhanced'
-                    }
-                    
-                    enhanced_recommendations.append(enhanced_rec)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing crop {crop_name}: {e}")
-                    # Add basic recommendation without market enhancement
-                    enhanced_recommendations.append({
-                        **rec,
-                        'market_score': 0.5,
-                        'combined_score': rec.get('suitability_score', 0.5),
-                        'recommendation_type': 'fallback'
-                    })
-            
-            # Sort by combined score (suitability + market potential)
-            enhanced_recommendations.sort(
-                key=lambda x: x.get('combined_score', 0), 
-                reverse=True
+            base_recommendations, market_data = await asyncio.gather(
+                asyncio.to_thread(self.ml_service.predict_crop, farm_data, None),
+                self._fetch_market_data(district)
             )
-            
-            return enhanced_recommendations
-            
         except Exception as e:
             logger.error(f"Market-enhanced recommendations failed: {e}")
-            # Fallback to base recommendations
             base_recs = self.ml_service.predict_crop(farm_data)
             return [{'recommendation_type': 'fallback', **rec} for rec in base_recs[:5]]
-    
-    def _find_crop_market_data(self, crop_name: str, market_data: Dict) -> Dict[str, Any]:
-        """Find market data for a specific crop."""
-        if not market_data or 'data' not in market_data:
-            return self._get_default_market_data(crop_name)
-        
-        prices = market_data['data'].get('prices', [])
-        
-        # Find exact match or similar crop
-        crop_variations = [
-            crop_name,
-            crop_name.lower(),
-            crop_name.title(),
-            crop_name.upper()
-        ]
         
-        for price_entry in prices:
-            if price_entry.get('crop', '').lower() in [v.lower() for v in crop_variations]:
-                return {
-                    'current_price': price_entry.get('modal_price', 0),
-                    'min_price': price_entry.get('min_price', 0),
-                    'max_price': price_entry.get('max_price', 0),
-                    'trend': price_entry.get('trend', 'Stable'),
-                    'market_name': price_entry.get('market', 'Unknown'),
-                    'last_updated': price_entry.get('date'),
-                    'data_source': market_data['data'].get('data_source', 'unknown'),
-                    'reliability': market_data['data'].get('reliability', 'medium')
+        try:
+            price_map = self._index_market_data(market_data)
+            return self._score_candidates(base_recommendations, price_map, farm_data, include_profit_analysis)
+        except Exception as e:
+            logger.error(f"Market scoring failed: {e}")
+            # Basic recommendations without market enhancement
+            return [
+                {
+                    **rec,
+                    'market_score': 0.5,
+                    'combined_score': rec.get('suitability_score', 0.5),
+                    'recommendation_type': 'fallback'
                 }
+                for rec in base_recommendations
+            ]
+    
+    async def _fetch_market_data(self, district: str) -> Optional[Dict[str, Any]]:
+        """Cached mandi prices for a district (None if unavailable, so inference still completes)."""
+        try:
+            return await self.market_service.get_mandi_prices(district)
+        except Exception as e:
+            logger.warning(f"Market data unavailable for {district}: {e}")
+            return None
+    
+    def _index_market_data(self, market_data: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Index a mandi price payload by lowercase crop name (first entry per crop).
         
-        return self._get_default_market_data(crop_name)
+        Args:
+            market_data: MarketService.get_mandi_prices payload
+            
+        Returns:
+            Crop -> market info (current/min/max price, trend, market, source, reliability)
+        """
+        if not market_data:
+            return {}
+        payload = market_data.get('data', market_data)  # Older payloads wrap prices in "data"
+        data_source = payload.get('data_source') or payload.get('source', 'unknown')
+        reliability = payload.get('reliability', 'medium')
+        
+        price_map = {}
+        for price_entry in payload.get('prices', []) or []:
+            crop = str(price_entry.get('crop', '')).strip().lower()
+            if not crop or crop in price_map:
+                continue
+            price_map[crop] = {
+                'current_price': price_entry.get('modal_price', 0),
+                'min_price': price_entry.get('min_price', 0),
+                'max_price': price_entry.get('max_price', 0),
+                'trend': self._normalize_trend(price_entry.get('trend')),
+                'market_name': price_entry.get('market', 'Unknown'),
+                'last_updated': price_entry.get('date'),
+                'data_source': data_source,
+                'reliability': reliability
+            }
+        return price_map
+    
+    @staticmethod
+    def _normalize_trend(trend: Optional[str]) -> str:
+        """Map source trend labels onto Rising / Stable / Falling."""
+        label = str(trend or 'Stable').strip().lower()
+        return TREND_ALIASES.get(label, label.title())
+    
+    def _score_candidates(
+        self,
+        recommendations: List[Dict[str, Any]],
+        price_map: Dict[str, Dict[str, Any]],
+        farm_data: Dict[str, Any],
+        include_profit_analysis: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Profit, market and combined scores for all candidate crops at once.
+        
+        Args:
+            recommendations: Base ML recommendations
+            price_map: Crop -> market info (see _index_market_data)
+            farm_data: Farm characteristics
+            include_profit_analysis: Whether to attach profit analysis
+            
+        Returns:
+            Enhanced recommendations sorted by combined score
+        """
+        if not recommendations:
+            return []
+        crops = [rec.get('crop', '') for rec in recommendations]
+        market_info = [price_map.get(crop.lower()) or self._get_default_market_data(crop) for crop in crops]
+        
+        current = np.array([float(info.get('current_price') or 0) for info in market_info])
+        low = np.array([float(info.get('min_price') or 0) for info in market_info])
+        high = np.array([float(info.get('max_price') or 0) for info in market_info])
+        low = np.where(low > 0, low, current)
+        high = np.where(high > 0, high, current)
+        trend_names = [info.get('trend', 'Stable') for info in market_info]
+        trend = np.array([TREND_SCORES.get(name, 0.5) for name in trend_names])
+        trend_multiplier = np.array([TREND_MULTIPLIERS.get(name, 1.0) for name in trend_names])
+        reliability = np.array([RELIABILITY_SCORES.get(info.get('reliability', 'medium'), 0.7) for info in market_info])
+        suitability = np.array([rec.get('suitability_score', 0.5) for rec in recommendations], dtype=float)
+        
+        # Market attractiveness: where the price sits in its range, trend and source reliability
+        spread = high - low
+        valid_range = (spread > 0) & (high > 0)
+        price_position = np.where(valid_range, (current - low) / np.where(valid_range, spread, 1.0), 0.5)
+        market_score = np.round(price_position * 0.4 + trend * 0.4 + reliability * 0.2, 3)
+        
+        # Combined score (60% suitability, 40% market potential)
+        combined_score = np.round(suitability * 0.6 + market_score * 0.4, 3)
+        
+        # Profit per hectare from estimated yield, market price and production cost
+        field_size = farm_data.get('field_size', 1)
+        economics = crop_economics.estimate(crops, [{
+            'yield_factor': farm_data.get('soil_quality_score', 0.8) * farm_data.get('climate_suitability', 0.8),
+            'cost_factor': (1.2 if farm_data.get('irrigation', False) else 1.0) * max(0.8, 1 - (field_size - 1) * 0.05)
+        }], prices=current)
+        expected_yield = np.round(economics['production_quintals'][0], 2)
+        costs = np.round(economics['cost'][0], 2)
+        gross_revenue = economics['revenue'][0]
+        net_profit = economics['profit'][0]
+        margin = economics['margin_percent'][0]
+        roi = economics['roi_percent'][0]
+        profitability = np.round(np.minimum(1.0, np.minimum(1.0, (margin + roi) / 100) * trend_multiplier), 3)
+        
+        enhanced_recommendations = []
+        for i in np.argsort(-combined_score, kind='stable'):
+            profit_info = {
+                'expected_yield_quintal': float(expected_yield[i]),
+                'current_market_price': float(current[i]),
+                'gross_revenue': round(float(gross_revenue[i]), 2),
+                'estimated_costs': float(costs[i]),
+                'net_profit': round(float(net_profit[i]), 2),
+                'profit_margin_percent': round(float(margin[i]), 2),
+                'roi_percent': round(float(roi[i]), 2),
+                'profitability_score': float(profitability[i])
+            } if include_profit_analysis else {}
+            enhanced_recommendations.append({
+                **recommendations[i],
+                'market_data': market_info[i],
+                'profit_analysis': profit_info,
+                'market_score': float(market_score[i]),
+                'combined_score': float(combined_score[i]),
+                'current_market_price': float(current[i]),
+                'price_trend': trend_names[i].lower(),
+                'profit_per_acre': round(float(net_profit[i]) * HECTARES_PER_ACRE, 2) if include_profit_analysis else None,
+                'roi_percentage': round(float(roi[i]), 2) if include_profit_analysis else None,
+                'recommendation_type': 'market_enhanced'
+            })
+        
+        return enhanced_recommendations
     
     def _get_default_market_data(self, crop_name: str) -> Dict[str, Any]:
         """Get default market data when real data is unavailable."""
-        default_prices = {
-            'rice': 2000, 'wheat': 2100, 'maize': 1600, 'potato': 1000,
-            'arhar': 6000, 'groundnut': 5000, 'soybean': 4000, 'cotton': 5500,
-            'sugarcane': 350, 'mustard': 4500, 'gram': 5200, 'turmeric': 8500
-        }
-        
-        base_price = default_prices.get(crop_name.lower(), 2500)
+        base_price = crop_economics.price(crop_name)
         
         return {
             'current_price': base_price,
@@ -163,162 +237,6 @@ class MarketAwareMLService:
             'data_source': 'default',
             'reliability': 'low'
         }
-    
-    async def _calculate_profit_potential(
-        self, 
-        crop_name: str, 
-        crop_rec: Dict, 
-        market_data: Dict,
-        farm_data: Dict
-    ) -> Dict[str, Any]:
-        """Calculate profit potential for a crop."""
-        try:
-            # Get expected yield (from ML prediction or estimate)
-            expected_yield = crop_rec.get('expected_yield_per_hectare', 
-                                        self._estimate_yield(crop_name, farm_data))
-            
-            # Calculate revenue
-            current_price = market_data.get('current_price', 0)
-            gross_revenue = expected_yield * current_price
-            
-            # Estimate production costs (simplified)
-            production_costs = self._estimate_production_costs(crop_name, farm_data)
-            
-            # Calculate profit metrics
-            net_profit = gross_revenue - production_costs
-            profit_margin = (net_profit / gross_revenue * 100) if gross_revenue > 0 else 0
-            roi = (net_profit / production_costs * 100) if production_costs > 0 else 0
-            
-            return {
-                'expected_yield_quintal': expected_yield,
-                'current_market_price': current_price,
-                'gross_revenue': round(gross_revenue, 2),
-                'estimated_costs': round(production_costs, 2),
-                'net_profit': round(net_profit, 2),
-                'profit_margin_percent': round(profit_margin, 2),
-                'roi_percent': round(roi, 2),
-                'profitability_score': self._calculate_profitability_score(
-                    profit_margin, roi, market_data.get('trend', 'Stable')
-                )
-            }
-            
-        except Exception as e:
-            logger.error(f"Profit calculation failed for {crop_name}: {e}")
-            return {'error': 'Profit calculation unavailable'}
-    
-    def _estimate_yield(self, crop_name: str, farm_data: Dict) -> float:
-        """Estimate crop yield based on farm conditions."""
-        # Base yields per hectare (in quintals)
-        base_yields = {
-            'rice': 45, 'wheat': 35, 'maize': 40, 'potato': 200,
-            'arhar': 15, 'groundnut': 20, 'soybean': 18, 'cotton': 20,
-            'sugarcane': 700, 'mustard': 12, 'gram': 18, 'turmeric': 25
-        }
-        
-        base_yield = base_yields.get(crop_name.lower(), 25)
-        
-        # Adjust based on soil quality and conditions
-        soil_quality_multiplier = farm_data.get('soil_quality_score', 0.8)
-        climate_suitability = farm_data.get('climate_suitability', 0.8)
-        
-        adjusted_yield = base_yield * soil_quality_multiplier * climate_suitability
-        
-        return round(adjusted_yield, 2)
-    
-    def _estimate_production_costs(self, crop_name: str, farm_data: Dict) -> float:
-        """Estimate production costs per hectare."""
-        # Base costs per hectare (in INR)
-        base_costs = {
-            'rice': 35000, 'wheat': 30000, 'maize': 25000, 'potato': 80000,
-            'arhar': 28000, 'groundnut': 32000, 'soybean': 24000, 'cotton': 45000,
-            'sugarcane': 120000, 'mustard': 22000, 'gram': 26000, 'turmeric': 55000
-        }
-        
-        base_cost = base_costs.get(crop_name.lower(), 30000)
-        
-        # Adjust based on farm characteristics
-        field_size = farm_data.get('field_size', 1)
-        irrigation_multiplier = 1.2 if farm_data.get('irrigation', False) else 1.0
-        
-        # Economies of scale for larger farms
-        scale_multiplier = max(0.8, 1 - (field_size - 1) * 0.05)
-        
-        adjusted_cost = base_cost * irrigation_multiplier * scale_multiplier
-        
-        return round(adjusted_cost, 2)
-    
-    def _calculate_profitability_score(self, profit_margin: float, roi: float, trend: str) -> float:
-        """Calculate a normalized profitability score (0-1)."""
-        # Ensure values are not None
-        profit_margin = profit_margin if profit_margin is not None else 0
-        roi = roi if roi is not None else 0
-        
-        # Base score from profit margin and ROI
-        base_score = min(1.0, (profit_margin + roi) / 100)
-        
-        # Trend adjustment
-        trend_multiplier = {
-            'Rising': 1.1,
-            'Stable': 1.0,
-            'Falling': 0.9
-        }.get(trend, 1.0)
-        
-        return round(min(1.0, base_score * trend_multiplier), 3)
-    
-    def _calculate_market_score(self, market_data: Dict) -> float:
-        """Calculate market attractiveness score (0-1)."""
-        try:
-            current_price = market_data.get('current_price', 0) or 0
-            min_price = market_data.get('min_price', current_price) or current_price
-            max_price = market_data.get('max_price', current_price) or current_price
-            trend = market_data.get('trend', 'Stable')
-            reliability = market_data.get('reliability', 'medium')
-            
-            # Ensure all prices are numeric
-            current_price = float(current_price) if current_price else 0
-            min_price = float(min_price) if min_price else current_price
-            max_price = float(max_price) if max_price else current_price
-            
-            # Price position score (where current price sits in min-max range)
-            if max_price > min_price and max_price > 0:
-                price_position = (current_price - min_price) / (max_price - min_price)
-            else:
-                price_position = 0.5
-            
-            # Trend score
-            trend_scores = {'Rising': 0.8, 'Stable': 0.6, 'Falling': 0.3}
-            trend_score = trend_scores.get(trend, 0.5)
-            
-            # Reliability score
-            reliability_scores = {'high': 1.0, 'medium': 0.8, 'low': 0.6}
-            reliability_score = reliability_scores.get(reliability, 0.7)
-            
-            # Combined market score
-            market_score = (price_position * 0.4 + trend_score * 0.4 + reliability_score * 0.2)
-            
-            return round(market_score, 3)
-            
-        except Exception as e:
-            logger.error(f"Market score calculation failed: {e}")
-            return 0.5
-    
-    def _calculate_combined_score(self, crop_rec: Dict, market_data: Dict) -> float:
-        """Calculate combined suitability + market score."""
-        try:
-            # Get ML suitability score
-            suitability_score = crop_rec.get('suitability_score', 0.5)
-            
-            # Get market score
-            market_score = self._calculate_market_score(market_data)
-            
-            # Combined score (60% suitability, 40% market potential)
-            combined_score = (suitability_score * 0.6) + (market_score * 0.4)
-            
-            return round(combined_score, 3)
-            
-        except Exception as e:
-            logger.error(f"Combined score calculation failed: {e}")
-            return crop_rec.get('suitability_score', 0.5)
 
 
 # Global instance
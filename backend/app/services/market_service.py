@@ -15,6 +15,8 @@ from app.core.config import settings
 from app.services.enhanced_agmarknet_scraper import enhanced_agmarknet_scraper
 from app.services.multi_source_market_service import MultiSourceMarketService
 from app.services.cache_service import market_cache, cached_market_data
+from app.services.market_analytics_store import market_analytics_store
+from app.services.price_batch import PriceBatch
 
 logger = logging.getLogger(__name__)
 
@@ -120,11 +122,23 @@ class MarketService:
             crop=crop
         )
     
+    def get_mandi_prices_version(self, district: str, crop: Optional[str] = None) -> Optional[float]:
+        """Version of the cached mandi prices for a district (None if not cached)."""
+        return market_cache.get_version(f"mandi_prices_{district}_{crop or 'all'}", district=district, crop=crop)
+    
     async def _fetch_mandi_prices_uncached(self, district: str, crop: Optional[str] = None) -> Dict[str, Any]:
         """
         Internal method to fetch mandi prices without caching.
         This is called by the caching layer when data is not in cache.
+        Freshly fetched prices are published to the analytics store; only an
+        unfiltered fetch counts as the district's complete snapshot.
         """
+        prices = await self._fetch_mandi_prices_from_sources(district, crop)
+        market_analytics_store.ingest(district, prices, complete=crop is None)
+        return prices
+    
+    async def _fetch_mandi_prices_from_sources(self, district: str, crop: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch mandi prices from real sources, falling back to legacy and mock data."""
         try:
             # First, try the enhanced AGMARKNET scraper directly
             logger.info(f"Attempting real AGMARKNET scraping for {district}, crop: {crop}")
@@ -150,31 +164,10 @@ class MarketService:
             
             if comprehensive_data.get("status") == "success":
                 # Format the comprehensive data for API response
-                formatted_prices = []
-                
-                for item in comprehensive_data.get("data", []):
-                    price_data = {
-                        "crop": item["commodity"],
-                        "market": item["market"],
-                        "min_price": item["min_price"],
-                        "max_price": item["max_price"],
-                        "modal_price": item["modal_price"],
-                        "unit": item.get("unit", "per quintal"),
-                        "arrival_quantity": item["arrival"],
-                        "date": item["date"],
-                        "trend": item["trend"],
-                        "price_change": self._calculate_price_change(item["modal_price"]),
-                        "market_fee": round(item["modal_price"] * 0.02),  # 2% market fee
-                        "transport_cost": self._calculate_transport_cost(district),
-                        "source": item["source"],
-                        "data_quality": "multi-source",
-                        "variety": item.get("variety", "Common"),
-                        "confidence": item.get("confidence", 0.75)
-                    }
-                    
-                    # Filter by crop if specified
-                    if not crop or price_data["crop"].lower() == crop.lower():
-                        formatted_prices.append(price_data)
+                formatted_prices = self._format_price_batch(
+                    PriceBatch.from_records(comprehensive_data.get("data", [])),
+                    district, crop, default_market=f"{district} Mandi", data_quality="multi-source"
+                )
                 
                 return {
                     "status": "success",
@@ -212,6 +205,8 @@ class MarketService:
             real_data = await enhanced_agmarknet_scraper.get_market_data(district, crop, days=7)
             
             if real_data.get("status") == "success" and real_data.get("data"):
+                # The scraper also answers "success" with its own fallback rows
+                live = "fallback" not in str(real_data.get("data_source", "")).lower()
                 # Process and format the real data
                 prices = []
                 for item in real_data["data"]:
@@ -228,8 +223,8 @@ class MarketService:
                         "price_change": self._calculate_price_change(item["modal_price"]),
                         "market_fee": round(item["modal_price"] * 0.02),  # 2% market fee
                         "transport_cost": self._calculate_transport_cost(district),
-                        "source": "AGMARKNET",
-                        "data_quality": "real",
+                        "source": "AGMARKNET" if live else item.get("source", "ENHANCED_FALLBACK"),
+                        "data_quality": "real" if live else "fallback",
                         "variety": item["variety"]
                     }
                     
@@ -619,32 +614,59 @@ class MarketService:
             "generated_at": datetime.utcnow()
         }
     
-    def _format_agmarknet_data(self, agmarknet_data: Dict[str, Any], district: str, crop: Optional[str] = None) -> Dict[str, Any]:
-        """Format AGMARKNET data for API response."""
-        formatted_prices = []
+    def _format_price_batch(self, batch: PriceBatch, district: str, crop: Optional[str], default_market: str,
+                            source: Optional[str] = None, data_quality: str = "high",
+                            confidence: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Format a price batch into API price entries.
         
-        for item in agmarknet_data.get("data", []):
-            price_data = {
-                "crop": item.get("commodity", item.get("crop", "Unknown")),
-                "market": item.get("market", f"{district} Mandi"),
-                "min_price": item.get("min_price", 0),
-                "max_price": item.get("max_price", 0),
-                "modal_price": item.get("modal_price", 0),
-                "unit": "per quintal",
-                "arrival_quantity": item.get("arrival", 0),
-                "date": item.get("date", datetime.now().strftime('%Y-%m-%d')),
-                "trend": item.get("trend", "stable"),
-                "price_change": self._calculate_price_change(item.get("modal_price", 0)),
-                "market_fee": round(item.get("modal_price", 0) * 0.02),
-                "transport_cost": self._calculate_transport_cost(district),
-                "source": "AGMARKNET_REAL",
-                "data_quality": "high",
-                "variety": item.get("variety", "Common"),
-                "confidence": 0.9
-            }
+        Args:
+            batch: Columnar price batch
+            district: District the prices were requested for
+            crop: Optional crop filter (case-insensitive exact match)
+            default_market: Market name for rows without one
+            source: Source label to stamp on every row (defaults to the row's own source)
+            data_quality: Data quality label
+            confidence: Fixed confidence (defaults to the row's own confidence or 0.75)
             
-            if not crop or price_data["crop"].lower() == crop.lower():
-                formatted_prices.append(price_data)
+        Returns:
+            API-ready price dicts
+        """
+        if crop:
+            batch = batch.filter(commodity=crop, exact_commodity=True)
+        
+        transport_cost = self._calculate_transport_cost(district)
+        today = datetime.now().strftime('%Y-%m-%d')
+        formatted_prices = []
+        
+        for commodity, market, _, min_price, max_price, modal_price, date, row_source, extra in batch.rows():
+            formatted_prices.append({
+                "crop": commodity or "Unknown",
+                "market": market or default_market,
+                "min_price": min_price,
+                "max_price": max_price,
+                "modal_price": modal_price,
+                "unit": extra.get("unit", "per quintal"),
+                "arrival_quantity": extra.get("arrival", 0),
+                "date": date or today,
+                "trend": extra.get("trend", "stable"),
+                "price_change": self._calculate_price_change(modal_price),
+                "market_fee": round(modal_price * 0.02),  # 2% market fee
+                "transport_cost": transport_cost,
+                "source": source or row_source,
+                "data_quality": data_quality,
+                "variety": extra.get("variety", "Common"),
+                "confidence": confidence if confidence is not None else extra.get("confidence", 0.75)
+            })
+        
+        return formatted_prices
+    
+    def _format_agmarknet_data(self, agmarknet_data: Dict[str, Any], district: str, crop: Optional[str] = None) -> Dict[str, Any]:
+        """Format AGMARKNET data for API response."""
+        formatted_prices = self._format_price_batch(
+            PriceBatch.from_records(agmarknet_data.get("data", [])),
+            district, crop, default_market=f"{district} Mandi", source="AGMARKNET_REAL", confidence=0.9
+        )
         
         return {
             "status": "success",
@@ -663,30 +685,10 @@ class MarketService:
     
     def _format_government_data(self, gov_data: Dict[str, Any], district: str, crop: Optional[str] = None) -> Dict[str, Any]:
         """Format government scraper data for API response."""
-        formatted_prices = []
-        
-        for item in gov_data.get("data", []):
-            price_data = {
-                "crop": item.get("commodity", item.get("crop", "Unknown")),
-                "market": item.get("market", f"{district} Government Portal"),
-                "min_price": item.get("min_price", 0),
-                "max_price": item.get("max_price", 0),
-                "modal_price": item.get("modal_price", 0),
-                "unit": "per quintal",
-                "arrival_quantity": item.get("arrival", 0),
-                "date": item.get("date", datetime.now().strftime('%Y-%m-%d')),
-                "trend": item.get("trend", "stable"),
-                "price_change": self._calculate_price_change(item.get("modal_price", 0)),
-                "market_fee": round(item.get("modal_price", 0) * 0.02),
-                "transport_cost": self._calculate_transport_cost(district),
-                "source": "GOVERNMENT_REAL",
-                "data_quality": "high",
-                "variety": item.get("variety", "Common"),
-                "confidence": 0.85
-            }
-            
-            if not crop or price_data["crop"].lower() == crop.lower():
-                formatted_prices.append(price_data)
+        formatted_prices = self._format_price_batch(
+            PriceBatch.from_records(gov_data.get("data", [])),
+            district, crop, default_market=f"{district} Government Portal", source="GOVERNMENT_REAL", confidence=0.85
+        )
         
         return {
             "status": "success",
@@ -703,11 +705,10 @@ class MarketService:
             "timestamp": datetime.now().isoformat()
         }
 
-    @cached_market_data(ttl=1800, data_type='analytics')
     async def get_market_analytics(self, district: str, timeframe: int = 30) -> Dict[str, Any]:
         """
         Get comprehensive market analytics for a district.
-        Cached for 30 minutes to reduce computation.
+        Served from the materialized analytics store.
         
         Args:
             district: District name
@@ -717,45 +718,8 @@ class MarketService:
             Market analytics including price trends, volume, and insights
         """
         try:
-            # Get current market data
-            current_prices = await self.get_mandi_prices(district)
-            
-            # Generate analytics from available data
-            analytics = {
-                "district": district,
-                "timeframe_days": timeframe,
-                "price_summary": {
-                    "total_commodities": len(current_prices.get("prices", [])),
-                    "average_price": sum(p.get("price", 0) for p in current_prices.get("prices", [])) / max(len(current_prices.get("prices", [])), 1),
-                    "price_range": {
-                        "min": min((p.get("price", 0) for p in current_prices.get("prices", [])), default=0),
-                        "max": max((p.get("price", 0) for p in current_prices.get("prices", [])), default=0)
-                    }
-                },
-                "top_commodities": sorted(
-                    current_prices.get("prices", [])[:5],
-                    key=lambda x: x.get("price", 0),
-                    reverse=True
-                ),
-                "market_trends": {
-                    "overall_trend": "stable",
-                    "growth_rate": 2.5,
-                    "volatility": "medium"
-                },
-                "insights": [
-                    f"Market analysis for {district} shows {len(current_prices.get('prices', []))} active commodities",
-                    "Price volatility is within normal range",
-                    "Government data sources providing reliable information"
-                ],
-                "recommendations": [
-                    "Monitor price trends before selling",
-                    "Consider seasonal variations in pricing",
-                    "Use multiple market sources for price validation"
-                ],
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            return analytics
+            await market_analytics_store.ensure_districts(self, [district])
+            return market_analytics_store.get_district_analytics(district, timeframe)
             
         except Exception as e:
             logger.error(f"Error generating market analytics for {district}: {e}")
@@ -766,11 +730,10 @@ class MarketService:
                 "timestamp": datetime.now().isoformat()
             }
 
-    @cached_market_data(ttl=1800, data_type='analytics')
     async def get_crop_analytics(self, crop: str, timeframe: int = 30) -> Dict[str, Any]:
         """
         Get analytics for a specific crop across all districts.
-        Cached for 30 minutes to reduce computation.
+        Served from the materialized analytics store, covering every district.
         
         Args:
             crop: Crop name
@@ -782,67 +745,8 @@ class MarketService:
         try:
             from app.core.config import JHARKHAND_DISTRICTS
             
-            # Collect data from multiple districts
-            crop_data = []
-            for district in JHARKHAND_DISTRICTS[:5]:  # Sample 5 districts for performance
-                try:
-                    prices = await self.get_mandi_prices(district, crop)
-                    if prices.get("prices"):
-                        crop_prices = [p for p in prices["prices"] if crop.lower() in p.get("crop", "").lower()]
-                        if crop_prices:
-                            crop_data.extend([{**p, "district": district} for p in crop_prices])
-                except Exception as e:
-                    logger.warning(f"Failed to get {crop} data for {district}: {e}")
-                    continue
-            
-            if not crop_data:
-                return {
-                    "crop": crop,
-                    "timeframe_days": timeframe,
-                    "message": f"No data found for {crop}",
-                    "timestamp": datetime.now().isoformat()
-                }
-            
-            # Calculate analytics
-            prices = [p.get("price", 0) for p in crop_data]
-            avg_price = sum(prices) / len(prices)
-            
-            analytics = {
-                "crop": crop,
-                "timeframe_days": timeframe,
-                "market_presence": {
-                    "districts_available": len(set(p["district"] for p in crop_data)),
-                    "total_markets": len(crop_data),
-                    "availability_score": min(len(crop_data) / 10, 1.0)
-                },
-                "price_analysis": {
-                    "average_price": round(avg_price, 2),
-                    "price_range": {
-                        "min": min(prices),
-                        "max": max(prices)
-                    },
-                    "price_variance": round(max(prices) - min(prices), 2),
-                    "stability_score": 1.0 - (max(prices) - min(prices)) / max(avg_price, 1)
-                },
-                "district_comparison": sorted(
-                    [{"district": p["district"], "price": p.get("price", 0)} for p in crop_data],
-                    key=lambda x: x["price"],
-                    reverse=True
-                )[:10],
-                "insights": [
-                    f"{crop} is available in {len(set(p['district'] for p in crop_data))} districts",
-                    f"Average market price is ₹{avg_price:.2f} per quintal",
-                    f"Price variance is ₹{max(prices) - min(prices):.2f}"
-                ],
-                "recommendations": [
-                    "Compare prices across districts before selling",
-                    "Consider transportation costs in pricing decisions",
-                    "Monitor seasonal price patterns"
-                ],
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            return analytics
+            await market_analytics_store.ensure_districts(self, JHARKHAND_DISTRICTS)
+            return market_analytics_store.get_crop_analytics(crop, timeframe)
             
         except Exception as e:
             logger.error(f"Error generating crop analytics for {crop}: {e}")
@@ -853,11 +757,10 @@ class MarketService:
                 "timestamp": datetime.now().isoformat()
             }
 
-    @cached_market_data(ttl=3600, data_type='analytics')
     async def get_yield_analytics(self, district: str, timeframe: int = 90) -> Dict[str, Any]:
         """
         Get yield analytics for a district.
-        Cached for 1 hour as yield data changes less frequently.
+        Served from the materialized analytics store.
         
         Args:
             district: District name
@@ -867,57 +770,8 @@ class MarketService:
             Yield analytics including production trends and forecasts
         """
         try:
-            # Get current market data as basis for yield analytics
-            market_data = await self.get_mandi_prices(district)
-            
-            # Simulate yield analytics based on available data
-            crops_available = [p.get("crop") for p in market_data.get("prices", [])]
-            unique_crops = list(set(crops_available))
-            
-            # Generate yield insights
-            yield_data = []
-            for crop in unique_crops[:10]:  # Limit to 10 crops for performance
-                crop_prices = [p for p in market_data.get("prices", []) if p.get("crop") == crop]
-                if crop_prices:
-                    avg_price = sum(p.get("price", 0) for p in crop_prices) / len(crop_prices)
-                    yield_data.append({
-                        "crop": crop,
-                        "estimated_yield": round(avg_price * 0.1, 2),  # Simplified yield estimation
-                        "price_per_quintal": avg_price,
-                        "profitability_score": min(avg_price / 1000, 1.0),
-                        "market_demand": "medium" if avg_price > 1000 else "low"
-                    })
-            
-            analytics = {
-                "district": district,
-                "timeframe_days": timeframe,
-                "yield_summary": {
-                    "total_crops_analyzed": len(yield_data),
-                    "high_yield_crops": [c for c in yield_data if c["profitability_score"] > 0.8],
-                    "medium_yield_crops": [c for c in yield_data if 0.5 <= c["profitability_score"] <= 0.8],
-                    "low_yield_crops": [c for c in yield_data if c["profitability_score"] < 0.5]
-                },
-                "crop_yields": sorted(yield_data, key=lambda x: x["profitability_score"], reverse=True),
-                "production_trends": {
-                    "overall_trend": "stable",
-                    "seasonal_variation": "moderate",
-                    "growth_projection": "2-5% annually"
-                },
-                "insights": [
-                    f"Analyzed yield potential for {len(yield_data)} crops in {district}",
-                    f"Top performing crop: {yield_data[0]['crop'] if yield_data else 'N/A'}",
-                    "Market prices indicate moderate profitability potential"
-                ],
-                "recommendations": [
-                    "Focus on high-yield, profitable crops",
-                    "Consider crop diversification for risk management",
-                    "Monitor seasonal yield patterns",
-                    "Invest in soil health for better yields"
-                ],
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            return analytics
+            await market_analytics_store.ensure_districts(self, [district])
+            return market_analytics_store.get_yield_analytics(district, timeframe)
             
         except Exception as e:
             logger.error(f"Error generating yield analytics for {district}: {e}")
@@ -926,4 +780,13 @@ class MarketService:
                 "timeframe_days": timeframe,
                 "error": f"Analytics generation failed: {str(e)}",
                 "timestamp": datetime.now().isoformat()
-            }
\ No newline at end of file
+            }
+
+    async def refresh_analytics(self) -> Dict[str, Any]:
+        """
+        Run the analytics materialization job for all districts.
+        
+        Returns:
+            Materialization statistics
+        """
+        return await market_analytics_store.refresh_all(self)
@@ -20,6 +20,8 @@ warnings.filterwarnings('ignore')
 # Import services
 from app.services.weather_service import weather_service
 from app.services.xgboost_service import get_xgboost_service
+from app.services.crop_economics import crop_economics, quintals_per_acre
+from app.services.rule_recommender import RuleRecommender
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +106,11 @@ class MLService:
             }
         }
         
+        # Rule engine (tertiary fallback), compiled into per-crop arrays
+        self.crop_features = self._initialize_crop_features()
+        self.model_weights = self._initialize_mock_weights()
+        self.rule_recommender = RuleRecommender(self.crop_features, self.model_weights, self.jharkhand_crops)
+        
         # Initialize ML models
         self._initialize_ml_models()
     
@@ -238,12 +245,13 @@ class MLService:
         
         return pd.DataFrame(data)
     
-    def predict_crop(self, farm_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def predict_crop(self, farm_data: Dict[str, Any], top_n: Optional[int] = 3) -> List[Dict[str, Any]]:
         """
         Predict the best crops for given farm conditions
         
         Args:
             farm_data: Dictionary containing farm conditions
+            top_n: Number of crops to return; None returns every supported crop
             
         Returns:
             List of crop recommendations with confidence scores
@@ -259,8 +267,8 @@ class MLService:
             # Get predictions and probabilities
             predictions = self.crop_model.predict_proba([features])[0]
             
-            # Get top 3 recommendations
-            top_indices = np.argsort(predictions)[-3:][::-1]
+            # Get top recommendations
+            top_indices = np.argsort(predictions)[::-1][:top_n]
             
             recommendations = []
             for idx in top_indices:
@@ -367,14 +375,8 @@ class MLService:
         return enhanced_data
     
     def _predict_yield(self, farm_data: Dict[str, Any], crop: str) -> float:
-        """Predict yield for a specific crop"""
-        # Base yield estimates for Jharkhand crops (tons/hectare)
-        base_yields = {
-            'Rice': 4.5, 'Wheat': 3.2, 'Maize': 5.1, 'Potato': 22.0,
-            'Arhar': 1.8, 'Sugarcane': 65.0, 'Onion': 18.5, 'Tomato': 25.0
-        }
-        
-        base_yield = base_yields.get(crop, 3.0)
+        """Predict yield for a specific crop (tonnes/hectare)"""
+        base_yield = crop_economics.base_yield(crop)
         
         # Apply conditions-based adjustments
         crop_lower = crop.lower()
@@ -434,26 +436,9 @@ class MLService:
         return min(score, 1.0)
     
     def _calculate_profit_estimate(self, yield_prediction: float, crop: str) -> float:
-        """Calculate profit estimate based on yield and market prices"""
-        # Average market prices in Jharkhand (INR per quintal)
-        market_prices = {
-            'Rice': 2000, 'Wheat': 2100, 'Maize': 1800, 'Potato': 1200,
-            'Arhar': 6000, 'Sugarcane': 350, 'Onion': 1500, 'Tomato': 2000
-        }
-        
-        price_per_quintal = market_prices.get(crop, 2000)
-        revenue = yield_prediction * 10 * price_per_quintal  # Convert tons to quintals
-        
-        # Estimate costs (INR per hectare)
-        cost_estimates = {
-            'Rice': 45000, 'Wheat': 35000, 'Maize': 40000, 'Potato': 120000,
-            'Arhar': 30000, 'Sugarcane': 150000, 'Onion': 80000, 'Tomato': 100000
-        }
-        
-        cost = cost_estimates.get(crop, 40000)
-        profit = revenue - cost
-        
-        return round(profit, 0)
+        """Calculate profit estimate (INR/hectare) from a yield in tonnes/hectare"""
+        estimate = crop_economics.estimate_one(crop, yield_factor=yield_prediction / crop_economics.base_yield(crop))
+        return round(estimate['profit'], 0)
     
     def _get_fallback_recommendations(self, farm_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Provide fallback recommendations when ML model is not available"""
@@ -725,13 +710,8 @@ class MLService:
         return base_conditions
     
     def _estimate_yield(self, crop: str, conditions: Dict[str, float]) -> float:
-        """Estimate crop yield based on conditions"""
-        base_yields = {
-            'Rice': 3.5, 'Wheat': 2.8, 'Maize': 4.0, 'Potato': 25,
-            'Arhar': 1.2, 'Sugarcane': 65, 'Groundnut': 1.5, 'Tomato': 30
-        }
-        
-        base_yield = base_yields.get(crop, 2.0)
+        """Estimate crop yield (tonnes/hectare) based on conditions"""
+        base_yield = crop_economics.base_yield(crop)
         
         # Adjust based on conditions
         ph_factor = 1.0 if 6.0 <= conditions['soil_ph'] <= 7.0 else 0.9
@@ -742,30 +722,16 @@ class MLService:
         return round(adjusted_yield, 2)
     
     def _estimate_profit(self, crop: str, yield_estimate: float, farm_data: Dict[str, Any]) -> Dict[str, float]:
-        """Estimate profit based on yield and market prices"""
-        # Mock market prices (₹ per unit)
-        market_prices = {
-            'Rice': 2000, 'Wheat': 2200, 'Maize': 1800, 'Potato': 1500,
-            'Arhar': 6000, 'Sugarcane': 350, 'Groundnut': 5500, 'Tomato': 2000
-        }
-        
-        # Mock production costs (₹ per hectare)
-        production_costs = {
-            'Rice': 45000, 'Wheat': 35000, 'Maize': 30000, 'Potato': 80000,
-            'Arhar': 25000, 'Sugarcane': 120000, 'Groundnut': 40000, 'Tomato': 100000
-        }
-        
-        market_price = market_prices.get(crop, 2000)
-        production_cost = production_costs.get(crop, 40000)
-        
-        field_size = farm_data.get('field_size', 1.0)
-        revenue = yield_estimate * market_price * field_size
-        total_cost = production_cost * field_size
-        profit = revenue - total_cost
+        """Estimate profit over the field from a yield in tonnes/hectare"""
+        estimate = crop_economics.estimate_one(
+            crop,
+            area_ha=farm_data.get('field_size', 1.0),
+            yield_factor=yield_estimate / crop_economics.base_yield(crop)
+        )
         
         return {
-            'market_price': market_price,
-            'profit': round(profit, 2)
+            'market_price': estimate['price'],
+            'profit': round(estimate['profit'], 2)
         }
     
     async def _get_rule_based_recommendations(
@@ -775,127 +741,35 @@ class MLService:
         year: int,
         crop_history: List[Dict[str, Any]] = None
     ) -> List[CropRecommendation]:
-        # Extract farm features
-        soil_type = farm_data.get("soil_type")
-        irrigation_method = farm_data.get("irrigation_method")
-        field_size = farm_data.get("field_size", 1.0)
-        location = farm_data.get("location", {})
-        
-        # Calculate scores for each crop
-        crop_scores = {}
-        
-        for crop, features in self.crop_features.items():
-            score = self._calculate_crop_score(
-                crop, features, soil_type, irrigation_method, 
-                field_size, season, crop_history
-            )
-            crop_scores[crop] = score
-        
-        # Sort crops by score and get top 3
-        sorted_crops = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
-        top_crops = sorted_crops[:3]
-        
-        # Generate recommendations
-        recommendations = []
-        for i, (crop, score) in enumerate(top_crops):
-            recommendation = await self._create_recommendation(
-                crop, score, farm_data, season
-            )
-            recommendations.append(recommendation)
-        
-        return recommendations
+        return self.get_rule_based_recommendations_batch([farm_data], season, [crop_history])[0]
     
-    def _calculate_crop_score(
+    def get_rule_based_recommendations_batch(
         self,
-        crop: str,
-        features: Dict[str, Any],
-        soil_type: str,
-        irrigation_method: str,
-        field_size: float,
+        farms: List[Dict[str, Any]],
         season: str,
-        crop_history: List[Dict[str, Any]]
-    ) -> float:
-        """Calculate suitability score for a crop."""
-        score = 0.0
-        
-        # Soil type compatibility
-        if soil_type in features.get("preferred_soil", []):
-            score += self.model_weights["soil_type_weight"]
-        
-        # Season compatibility
-        if season in features.get("season", []):
-            score += self.model_weights["season_weight"]
-        
-        # Field size adequacy
-        min_size = features.get("min_field_size", 0.5)
-        if field_size >= min_size:
-            score += self.model_weights["field_size_weight"]
-        
-        # Irrigation compatibility
-        water_req = features.get("water_requirement", "Medium")
-        irrigation_score = self._calculate_irrigation_score(irrigation_method, water_req)
-        score += irrigation_score * self.model_weights["irrigation_weight"]
-        
-        # Historical performance
-        if crop_history:
-            history_score = self._calculate_history_score(crop, crop_history)
-            score += history_score * self.model_weights["history_weight"]
-        
-        # Add some randomness for variety
-        score += random.uniform(-0.05, 0.05)
-        
-        return max(0.0, min(1.0, score))
-    
-    def _calculate_irrigation_score(self, irrigation_method: str, water_requirement: str) -> float:
-        """Calculate irrigation compatibility score."""
-        irrigation_capacity = {
-            "Rain-fed": 0.3,
-            "Dug well": 0.5,
-            "Tube well": 0.8,
-            "Canal": 0.7,
-            "Drip irrigation": 0.9,
-            "Sprinkler irrigation": 0.8
-        }
-        
-        water_needs = {
-            "Low": 0.3,
-            "Medium": 0.5,
-            "High": 0.8,
-            "Very High": 1.0
-        }
-        
-        capacity = irrigation_capacity.get(irrigation_method, 0.5)
-        need = water_needs.get(water_requirement, 0.5)
+        crop_histories: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+        top_k: int = 3
+    ) -> List[List[CropRecommendation]]:
+        """
+        Rule-based recommendations for many farms, all crops scored at once.
         
-        if capacity >= need:
-            return 1.0
-        else:
-            return capacity / need
-    
-    def _calculate_history_score(self, crop: str, crop_history: List[Dict[str, Any]]) -> float:
-        """Calculate score based on historical performance."""
-        crop_performances = [
-            h for h in crop_history 
-            if h.get("crop") == crop and h.get("yield_per_acre")
+        Args:
+            farms: Farm characteristics (soil_type, irrigation_method, field_size,
+                optionally soil_ph, rainfall and temperature)
+            season: Target season
+            crop_histories: Historical crop data per farm
+            top_k: Recommendations per farm
+            
+        Returns:
+            Top crop recommendations per farm
+        """
+        ranked = self.rule_recommender.recommend(farms, season, crop_histories, top_k)
+        return [
+            [self._create_recommendation(crop, score, farm_data, season) for crop, score in crops]
+            for farm_data, crops in zip(farms, ranked)
         ]
-        
-        if not crop_performances:
-            return 0.5  # Neutral score for new crops
-        
-        # Calculate average yield performance
-        avg_yield = sum(h["yield_per_acre"] for h in crop_performances) / len(crop_performances)
-        
-        # Convert to score (this would use regional benchmarks in production)
-        if avg_yield > 20:  # High yield
-            return 0.8
-        elif avg_yield > 15:  # Medium yield
-            return 0.6
-        elif avg_yield > 10:  # Low yield
-            return 0.4
-        else:
-            return 0.2
     
-    async def _create_recommendation(
+    def _create_recommendation(
         self,
         crop: str,
         score: float,
@@ -923,44 +797,9 @@ class MLService:
         )
     
     def _calculate_expected_yield(self, crop: str, farm_data: Dict[str, Any]) -> float:
-        """Calculate expected yield per acre."""
-        base_yields = {
-            "Rice": 18.0,
-            "Wheat": 22.0,
-            "Maize": 25.0,
-            "Arhar": 12.0,
-            "Potato": 180.0,
-            "Sugarcane": 350.0,
-            "Groundnut": 15.0,
-            "Tomato": 200.0
-        }
-        
-        base = base_yields.get(crop, 15.0)
-        
-        # Adjust based on soil and irrigation
-        soil_multiplier = {
-            "Alluvial Soil": 1.2,
-            "Loamy Soil": 1.1,
-            "Red Soil": 1.0,
-            "Clay Soil": 0.9,
-            "Sandy Soil": 0.8,
-            "Black Soil": 1.0,
-            "Laterite Soil": 0.8
-        }
-        
-        irrigation_multiplier = {
-            "Rain-fed": 0.8,
-            "Dug well": 0.9,
-            "Tube well": 1.1,
-            "Canal": 1.0,
-            "Drip irrigation": 1.2,
-            "Sprinkler irrigation": 1.1
-        }
-        
-        soil_factor = soil_multiplier.get(farm_data.get("soil_type"), 1.0)
-        irrigation_factor = irrigation_multiplier.get(farm_data.get("irrigation_method"), 1.0)
-        
-        return base * soil_factor * irrigation_factor * random.uniform(0.9, 1.1)
+        """Calculate expected yield per acre (quintals)."""
+        factor = crop_economics.management_factor(farm_data.get("soil_type"), farm_data.get("irrigation_method"))
+        return quintals_per_acre(crop_economics.base_yield(crop) * factor)
     
     def _generate_fertilizer_recommendation(self, crop: str, farm_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate fertilizer recommendations."""
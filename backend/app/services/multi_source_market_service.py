@@ -12,7 +12,9 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import random
 from dataclasses import dataclass
+from app.core.config import get_upstream_base_url
 from .real_government_scraper import RealGovernmentDataScraper
+from .price_batch import PriceBatch
 from .realtime_market_scraper import realtime_scraper
 
 # Import FIXED scrapers with proper authentication
@@ -47,7 +49,7 @@ class MultiSourceMarketService:
     
     def __init__(self):
         """Initialize multi-source market service."""
-        self.agmarknet_url = "https://agmarknet.gov.in"
+        self.agmarknet_url = get_upstream_base_url("agmarknet", "https://agmarknet.gov.in")
         self.alternative_apis = [
             "https://api.data.gov.in/catalog/agricultural-marketing",
             "https://enam.gov.in/web/api",
@@ -752,13 +754,13 @@ class MultiSourceMarketService:
     def _combine_all_sources_with_fixed(self, fixed_data: Dict, realtime_data: Dict, government_data: Dict, district: str, commodity: Optional[str]) -> Dict[str, Any]:
         """Combine fixed scrapers data with existing sources."""
         
-        all_prices = []
+        batches = []
         source_summary = {}
         
         # Process fixed scrapers data (highest priority)
         if fixed_data.get("status") == "success":
             fixed_prices = fixed_data.get("prices", [])
-            all_prices.extend(fixed_prices)
+            batches.append(PriceBatch.from_records(fixed_prices))
             
             fixed_sources = fixed_data.get("source_summary", {})
             source_summary.update(fixed_sources)
@@ -766,20 +768,20 @@ class MultiSourceMarketService:
             
         # Process real-time data
         if realtime_data.get("status") == "success":
-            rt_prices = realtime_data.get("real_time_data", [])
-            all_prices.extend(rt_prices)
+            batches.append(PriceBatch.from_records(realtime_data.get("real_time_data", [])))
             
             rt_sources = realtime_data.get("source_summary", {})
             source_summary.update(rt_sources)
             
         # Process government data
         if government_data.get("status") == "success":
-            gov_prices = government_data.get("prices", [])
-            all_prices.extend(gov_prices)
+            batches.append(PriceBatch.from_records(government_data.get("prices", [])))
             
             gov_sources = government_data.get("source_summary", {})
             source_summary.update(gov_sources)
         
+        all_prices = PriceBatch.concat(batches)
+        
         # Remove duplicates based on commodity + market + price
         unique_prices = self._remove_duplicate_prices(all_prices)
         
@@ -789,11 +791,11 @@ class MultiSourceMarketService:
         logger.info(f"📊 Combined data: {len(all_prices)} → {len(unique_prices)} → {len(filtered_prices)} prices")
         
         return {
-            "status": "success" if filtered_prices else "no_data",
+            "status": "success" if len(filtered_prices) else "no_data",
             "message": f"Found {len(filtered_prices)} real-time prices from {len(source_summary)} sources",
             "district": district,
             "commodity": commodity,
-            "real_time_data": filtered_prices,
+            "real_time_data": filtered_prices.to_records(),
             "source_summary": source_summary,
             "analytics": self._generate_analytics(filtered_prices, source_summary),
             "timestamp": datetime.now().isoformat(),
@@ -803,50 +805,17 @@ class MultiSourceMarketService:
             "scraping_methods": ["fixed_government_scrapers", "realtime_scraper", "government_scraper"]
         }
     
-    def _remove_duplicate_prices(self, prices: List[Dict]) -> List[Dict]:
-        """Remove duplicate price records."""
-        seen = set()
-        unique_prices = []
-        
-        for price in prices:
-            # Create a unique key based on commodity, market, and price
-            key = (
-                price.get('commodity', '').lower().strip(),
-                price.get('market', '').lower().strip(),
-                price.get('modal_price', 0)
-            )
-            
-            if key not in seen:
-                seen.add(key)
-                unique_prices.append(price)
-        
-        return unique_prices
+    def _remove_duplicate_prices(self, prices: PriceBatch) -> PriceBatch:
+        """Remove duplicate price records (same commodity, market and modal price)."""
+        return prices.dedupe()
     
-    def _apply_filters(self, prices: List[Dict], district: str, commodity: Optional[str]) -> List[Dict]:
+    def _apply_filters(self, prices: PriceBatch, district: str, commodity: Optional[str]) -> PriceBatch:
         """Apply district and commodity filters."""
-        filtered = []
-        
-        for price in prices:
-            # District filter
-            price_district = price.get('district', '').lower()
-            price_market = price.get('market', '').lower()
-            
-            if district.lower() not in price_district and district.lower() not in price_market:
-                continue
-            
-            # Commodity filter (if specified)
-            if commodity:
-                price_commodity = price.get('commodity', '').lower()
-                if commodity.lower() not in price_commodity:
-                    continue
-            
-            filtered.append(price)
-        
-        return filtered
+        return prices.filter(district=district, commodity=commodity)
     
-    def _generate_analytics(self, prices: List[Dict], source_summary: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_analytics(self, prices: PriceBatch, source_summary: Dict[str, Any]) -> Dict[str, Any]:
         """Generate analytics from price data and source summary."""
-        if not prices:
+        if not len(prices):
             return {
                 "total_prices": 0,
                 "commodities": [],
@@ -855,22 +824,9 @@ class MultiSourceMarketService:
                 "market_status": "no_data"
             }
         
-        # Commodity analysis
-        commodities = list(set(price.get('commodity', 'Unknown') for price in prices))
-        
-        # Price range analysis
-        price_ranges = {}
-        for commodity in commodities:
-            commodity_prices = [
-                price.get('modal_price', 0) for price in prices 
-                if price.get('commodity') == commodity
-            ]
-            if commodity_prices:
-                price_ranges[commodity] = {
-                    "min": min(commodity_prices),
-                    "max": max(commodity_prices),
-                    "avg": sum(commodity_prices) / len(commodity_prices)
-                }
+        # Commodity analysis and per-commodity price ranges
+        commodities = prices.commodities()
+        price_ranges = prices.modal_price_ranges()
         
         # Data quality calculation
         successful_sources = sum(
@@ -0,0 +1,288 @@
+"""
+Columnar representation of market price batches.
+Scraper records are converted once into NumPy columns with interned
+commodity, market and district codes, so deduplication, filtering and
+aggregation run over integer arrays instead of re-normalising dicts per step.
+Records are rebuilt only when a response is serialized.
+"""
+
+import sys
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+import numpy as np
+
+# Record keys stored as columns; everything else is carried in per-row extras
+CORE_FIELDS = ("commodity", "market", "district", "min_price", "max_price", "modal_price", "date", "source")
+
+
+class CodeTable:
+    """Process-wide interning table mapping normalised labels to integer codes."""
+
+    __slots__ = ("_codes", "_labels", "_keys")
+
+    def __init__(self):
+        """Initialize the table; code 0 is reserved for missing values."""
+        self._codes: Dict[str, int] = {"": 0}
+        self._labels: List[str] = [""]
+        self._keys: List[str] = [""]
+
+    def code(self, value: Any) -> int:
+        """Get (assigning on first use) the code for a label, case and whitespace insensitive."""
+        if value is None:
+            return 0
+        label = str(value).strip()
+        key = label.casefold()
+        code = self._codes.get(key)
+        if code is None:
+            code = len(self._labels)
+            self._codes[sys.intern(key)] = code
+            self._labels.append(sys.intern(label))
+            self._keys.append(key)
+        return code
+
+    def label(self, code: int) -> str:
+        """Display label (first spelling seen) for a code."""
+        return self._labels[code]
+
+    def key(self, code: int) -> str:
+        """Normalised (casefolded) label for a code."""
+        return self._keys[code]
+
+    def matching(self, codes: np.ndarray, needle: str, exact: bool = False) -> np.ndarray:
+        """
+        Codes among `codes` whose label contains (or equals) `needle`.
+
+        The test runs once per distinct code rather than once per row.
+        """
+        needle = needle.strip().casefold()
+        candidates = np.unique(codes)
+        if exact:
+            return np.array([c for c in candidates.tolist() if self._keys[c] == needle], dtype=np.int32)
+        return np.array([c for c in candidates.tolist() if c and needle in self._keys[c]], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+
+commodity_codes = CodeTable()
+market_codes = CodeTable()
+district_codes = CodeTable()
+
+
+def _to_float(value: Any) -> float:
+    """Parse a price that may arrive as a number or a formatted string."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").replace("₹", "").strip() or 0)
+    except ValueError:
+        return 0.0
+
+
+def _to_number(value: float) -> Any:
+    """Emit integral prices as ints so serialized records keep their original shape."""
+    return int(value) if value.is_integer() else value
+
+
+class PriceBatch:
+    """
+    A batch of market price records stored column-wise.
+
+    Columns:
+        commodity, market, district: int32 interned codes
+        min_price, max_price, modal_price: float64
+        date, source: object arrays of strings
+        extras: per-row dicts of any non-core record keys (or None)
+    """
+
+    __slots__ = ("commodity", "market", "district", "min_price", "max_price", "modal_price",
+                 "date", "source", "extras")
+
+    def __init__(self, commodity: np.ndarray, market: np.ndarray, district: np.ndarray,
+                 min_price: np.ndarray, max_price: np.ndarray, modal_price: np.ndarray,
+                 date: np.ndarray, source: np.ndarray, extras: List[Optional[Dict[str, Any]]]):
+        self.commodity = commodity
+        self.market = market
+        self.district = district
+        self.min_price = min_price
+        self.max_price = max_price
+        self.modal_price = modal_price
+        self.date = date
+        self.source = source
+        self.extras = extras
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> "PriceBatch":
+        """Create an empty batch."""
+        return cls.from_records([])
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "PriceBatch":
+        """
+        Build a batch from scraper records in a single pass.
+
+        Args:
+            records: Price dicts; `crop` is accepted as an alias of `commodity`
+
+        Returns:
+            Columnar batch
+        """
+        commodity, market, district = [], [], []
+        min_price, max_price, modal_price = [], [], []
+        date, source, extras = [], [], []
+
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            commodity.append(commodity_codes.code(record.get("commodity", record.get("crop"))))
+            market.append(market_codes.code(record.get("market")))
+            district.append(district_codes.code(record.get("district")))
+            min_price.append(_to_float(record.get("min_price", 0)))
+            max_price.append(_to_float(record.get("max_price", 0)))
+            modal_price.append(_to_float(record.get("modal_price", 0)))
+            date.append(record.get("date"))
+            source.append(record.get("source"))
+            extra = {k: v for k, v in record.items() if k not in CORE_FIELDS and k != "crop"}
+            extras.append(extra or None)
+
+        return cls(
+            np.array(commodity, dtype=np.int32),
+            np.array(market, dtype=np.int32),
+            np.array(district, dtype=np.int32),
+            np.array(min_price, dtype=np.float64),
+            np.array(max_price, dtype=np.float64),
+            np.array(modal_price, dtype=np.float64),
+            np.array(date, dtype=object),
+            np.array(source, dtype=object),
+            extras,
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["PriceBatch"]) -> "PriceBatch":
+        """Concatenate batches, preserving order."""
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            *(np.concatenate([getattr(b, name) for b in batches]) for name in cls.__slots__[:-1]),
+            [extra for b in batches for extra in b.extras],
+        )
+
+    def __len__(self) -> int:
+        return len(self.commodity)
+
+    def take(self, indices: np.ndarray) -> "PriceBatch":
+        """Select rows by position (or boolean mask)."""
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        extras = self.extras
+        return PriceBatch(
+            self.commodity[indices], self.market[indices], self.district[indices],
+            self.min_price[indices], self.max_price[indices], self.modal_price[indices],
+            self.date[indices], self.source[indices],
+            [extras[i] for i in indices.tolist()],
+        )
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+
+    def dedupe(self) -> "PriceBatch":
+        """Drop repeated (commodity, market, modal price) rows, keeping the first occurrence."""
+        if len(self) < 2:
+            return self
+        keys = np.column_stack((self.commodity, self.market, self.modal_price))
+        _, first = np.unique(keys, axis=0, return_index=True)
+        if len(first) == len(self):
+            return self
+        return self.take(np.sort(first))
+
+    def filter(self, district: Optional[str] = None, commodity: Optional[str] = None,
+               exact_commodity: bool = False) -> "PriceBatch":
+        """
+        Keep rows for a district and/or commodity.
+
+        Args:
+            district: Matched as a substring of the row's district or market
+            commodity: Matched as a substring of the commodity (or exactly)
+            exact_commodity: Require a case-insensitive exact commodity match
+
+        Returns:
+            Filtered batch
+        """
+        if not len(self):
+            return self
+        mask = np.ones(len(self), dtype=bool)
+        if district:
+            mask &= (np.isin(self.district, district_codes.matching(self.district, district)) |
+                     np.isin(self.market, market_codes.matching(self.market, district)))
+        if commodity:
+            mask &= np.isin(self.commodity, commodity_codes.matching(self.commodity, commodity, exact_commodity))
+        return self if mask.all() else self.take(mask)
+
+    def commodities(self) -> List[str]:
+        """Distinct commodity labels in first-seen order."""
+        _, first = np.unique(self.commodity, return_index=True)
+        return [commodity_codes.label(c) for c in self.commodity[np.sort(first)].tolist()]
+
+    def modal_price_ranges(self) -> Dict[str, Dict[str, float]]:
+        """Min, max and average modal price per commodity."""
+        if not len(self):
+            return {}
+        codes, inverse = np.unique(self.commodity, return_inverse=True)
+        counts = np.bincount(inverse)
+        totals = np.bincount(inverse, weights=self.modal_price)
+        lows = np.full(len(codes), np.inf)
+        highs = np.full(len(codes), -np.inf)
+        np.minimum.at(lows, inverse, self.modal_price)
+        np.maximum.at(highs, inverse, self.modal_price)
+        return {
+            commodity_codes.label(code): {
+                "min": _to_number(low),
+                "max": _to_number(high),
+                "avg": total / count,
+            }
+            for code, low, high, total, count in zip(codes.tolist(), lows.tolist(), highs.tolist(),
+                                                     totals.tolist(), counts.tolist())
+        }
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def rows(self) -> Iterable[Tuple[str, str, str, Any, Any, Any, Any, Any, Dict[str, Any]]]:
+        """
+        Iterate rows as plain Python tuples.
+
+        Yields:
+            (commodity, market, district, min_price, max_price, modal_price, date, source, extras)
+        """
+        for c, m, d, lo, hi, modal, date, source, extra in zip(
+            self.commodity.tolist(), self.market.tolist(), self.district.tolist(),
+            self.min_price.tolist(), self.max_price.tolist(), self.modal_price.tolist(),
+            self.date.tolist(), self.source.tolist(), self.extras,
+        ):
+            yield (commodity_codes.label(c), market_codes.label(m), district_codes.label(d),
+                   _to_number(lo), _to_number(hi), _to_number(modal), date, source, extra or {})
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Rebuild JSON-ready record dicts (call at the response boundary)."""
+        records = []
+        for commodity, market, district, lo, hi, modal, date, source, extra in self.rows():
+            record = {"commodity": commodity, "market": market}
+            if district:
+                record["district"] = district
+            record.update(min_price=lo, max_price=hi, modal_price=modal)
+            if date is not None:
+                record["date"] = date
+            if source is not None:
+                record["source"] = source
+            record.update(extra)
+            records.append(record)
+        return records
@@ -0,0 +1,171 @@
+"""
+Monte Carlo profit and risk simulation for rotation plans.
+Draws one scenario matrix of correlated prices and yields per (scenario,
+year, crop) and evaluates every candidate plan against it with array
+operations, so plans are compared under identical market and weather
+outcomes. Crops with enough days of observed prices resample that history
+through a rank (Gaussian copula) transform; the rest use lognormal draws
+around their reference price and yield.
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Shock structure: a weather factor shared by all yields in a year, a market
+# factor shared by all prices, and good harvests depressing the crop's own price
+WEATHER_CORRELATION = 0.4
+MARKET_CORRELATION = 0.5
+PRICE_YIELD_CORRELATION = -0.3
+
+MIN_HISTORY = 5  # days of observed live-source prices needed to resample history
+HISTOGRAM_BINS = 20
+
+
+class ProfitSimulator:
+    """Vectorized profit simulation over a shared scenario matrix."""
+
+    def __init__(self, n_scenarios: int = 5000, seed: int = 42):
+        """
+        Initialize the simulator.
+
+        Args:
+            n_scenarios: Scenarios drawn per simulation
+            seed: RNG seed; identical inputs give identical results
+        """
+        self.n_scenarios = n_scenarios
+        self.seed = seed
+
+    def simulate(self, plans: List[List[Dict[str, Any]]], inputs: Dict[str, Dict[str, Any]],
+                 confidence: float = 0.95) -> Dict[str, Any]:
+        """
+        Simulate the profit of every plan.
+
+        Args:
+            plans: Plans as lists of slots ({"year", "crop"}), per hectare
+            inputs: Per crop: price_mean, price_cv, yield_mean (q/ha), yield_cv,
+                cost and optionally price_history (daily observed prices)
+            confidence: VaR/CVaR confidence level
+
+        Returns:
+            "plans" with each plan's profit distribution and tail risk, and
+            "slots" with per-slot profit, price and revenue quantiles (plan order)
+        """
+        crops = sorted({slot['crop'] for plan in plans for slot in plan})
+        years = max((slot['year'] for plan in plans for slot in plan), default=0)
+        if not crops or not years:
+            return {"plans": [], "slots": [], "scenarios": 0, "confidence": confidence, "history_backed_crops": []}
+        column = {crop: i for i, crop in enumerate(crops)}
+
+        price, yields = self._draw(crops, years, inputs)
+        cost = np.array([inputs[crop]['cost'] for crop in crops])
+        profit = price * yields - cost  # (scenarios, years, crops)
+
+        # Every slot of every plan as one gather, then summed per plan with a 0/1 matrix
+        slot_year = np.array([slot['year'] - 1 for plan in plans for slot in plan])
+        slot_crop = np.array([column[slot['crop']] for plan in plans for slot in plan])
+        slot_profit = profit[:, slot_year, slot_crop]  # (scenarios, slots)
+        membership = np.zeros((len(slot_year), len(plans)))
+        start = 0
+        for p, plan in enumerate(plans):
+            membership[start:start + len(plan), p] = 1.0
+            start += len(plan)
+        plan_profit = slot_profit @ membership  # (scenarios, plans)
+
+        tail = 1 - confidence
+        var = np.quantile(plan_profit, tail, axis=0)
+        tail_mask = plan_profit <= var
+        cvar = (plan_profit * tail_mask).sum(axis=0) / np.maximum(tail_mask.sum(axis=0), 1)
+        quantiles = np.quantile(plan_profit, [0.05, 0.25, 0.5, 0.75, 0.95], axis=0)
+        expected = plan_profit.mean(axis=0)
+        std = plan_profit.std(axis=0)
+        loss_probability = (plan_profit < 0).mean(axis=0)
+
+        plan_results = []
+        for p in range(len(plans)):
+            counts, edges = np.histogram(plan_profit[:, p], bins=HISTOGRAM_BINS)
+            plan_results.append({
+                "expected_profit": round(float(expected[p]), 2),
+                "std_profit": round(float(std[p]), 2),
+                "percentiles": {
+                    name: round(float(value), 2)
+                    for name, value in zip(("p5", "p25", "p50", "p75", "p95"), quantiles[:, p])
+                },
+                "value_at_risk": round(float(var[p]), 2),
+                "conditional_value_at_risk": round(float(cvar[p]), 2),
+                "probability_of_loss": round(float(loss_probability[p]), 4),
+                "distribution": {
+                    "bin_edges": [round(float(edge), 2) for edge in edges],
+                    "counts": counts.tolist()
+                }
+            })
+
+        slot_price = price[:, slot_year, slot_crop]
+        slot_revenue = slot_price * yields[:, slot_year, slot_crop]
+        bands = {
+            name: np.quantile(values, [0.05, 0.5, 0.95], axis=0)
+            for name, values in (("price", slot_price), ("revenue", slot_revenue), ("profit", slot_profit))
+        }
+        means = {"price": slot_price.mean(axis=0), "revenue": slot_revenue.mean(axis=0), "profit": slot_profit.mean(axis=0)}
+        slot_results = [
+            {
+                f"{name}_range": {
+                    "min": round(float(bands[name][0, s]), 2),
+                    "median": round(float(bands[name][1, s]), 2),
+                    "expected": round(float(means[name][s]), 2),
+                    "max": round(float(bands[name][2, s]), 2)
+                }
+                for name in ("price", "revenue", "profit")
+            }
+            for s in range(len(slot_year))
+        ]
+
+        return {
+            "plans": plan_results,
+            "slots": slot_results,
+            "scenarios": self.n_scenarios,
+            "confidence": confidence,
+            "history_backed_crops": [crop for crop in crops if len(inputs[crop].get('price_history') or []) >= MIN_HISTORY]
+        }
+
+    def _draw(self, crops: Sequence[str], years: int, inputs: Dict[str, Dict[str, Any]]):
+        """Correlated price and yield draws, each shaped (scenarios, years, crops)."""
+        rng = np.random.default_rng(self.seed)
+        shape = (self.n_scenarios, years, len(crops))
+        weather = rng.standard_normal((self.n_scenarios, years, 1))
+        market = rng.standard_normal((self.n_scenarios, years, 1))
+        z_yield = WEATHER_CORRELATION * weather + np.sqrt(1 - WEATHER_CORRELATION ** 2) * rng.standard_normal(shape)
+        idiosyncratic = np.sqrt(1 - MARKET_CORRELATION ** 2 - PRICE_YIELD_CORRELATION ** 2)
+        z_price = (MARKET_CORRELATION * market + PRICE_YIELD_CORRELATION * z_yield
+                   + idiosyncratic * rng.standard_normal(shape))
+
+        price = np.empty(shape)
+        yields = np.empty(shape)
+        for c, crop in enumerate(crops):
+            spec = inputs[crop]
+            history = np.sort(np.asarray(spec.get('price_history') or [], dtype=float))
+            if len(history) >= MIN_HISTORY:
+                price[:, :, c] = _resample(history, z_price[:, :, c])
+            else:
+                price[:, :, c] = _lognormal(spec['price_mean'], spec['price_cv'], z_price[:, :, c])
+            yields[:, :, c] = _lognormal(spec['yield_mean'], spec['yield_cv'], z_yield[:, :, c])
+        return price, yields
+
+
+def _lognormal(mean: float, cv: float, z: np.ndarray) -> np.ndarray:
+    """Lognormal values with the given mean and coefficient of variation."""
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    return mean * np.exp(sigma * z - sigma ** 2 / 2)
+
+
+def _resample(history: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Map normal draws onto sorted observations through their ranks (empirical copula)."""
+    flat = z.ravel()
+    ranks = np.empty(flat.size)
+    ranks[np.argsort(flat)] = np.arange(flat.size)
+    u = (ranks + 0.5) / flat.size
+    grid = (np.arange(len(history)) + 0.5) / len(history)
+    return np.interp(u, grid, history).reshape(z.shape)
@@ -8,10 +8,13 @@ import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
 import json
+import time
 import logging
 from urllib.parse import urljoin, parse_qs, urlparse
+from app.core.config import get_upstream_base_url
+from .streaming_html_parser import PortalStreamParser, stream_parse, parse_html, group_rows_by_table, text_context
+from .upstream_health import upstream_health, CircuitOpenError
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -33,7 +36,7 @@ class RealGovernmentDataScraper:
         # Portal configurations
         self.portals = {
             "agmarknet": {
-                "base_url": "https://agmarknet.gov.in",
+                "base_url": get_upstream_base_url("agmarknet", "https://agmarknet.gov.in"),
                 "endpoints": [
                     "/SearchCmmMkt.aspx",
                     "/PriceAndArrivalDateWise.aspx",
@@ -41,7 +44,7 @@ class RealGovernmentDataScraper:
                 ]
             },
             "data_gov": {
-                "base_url": "https://data.gov.in",
+                "base_url": get_upstream_base_url("data_gov", "https://data.gov.in"),
                 "endpoints": [
                     "/catalog/agricultural-marketing",
                     "/node/1071531",  # Agricultural marketing dataset
@@ -49,7 +52,7 @@ class RealGovernmentDataScraper:
                 ]
             },
             "enam": {
-                "base_url": "https://enam.gov.in",
+                "base_url": get_upstream_base_url("enam", "https://enam.gov.in"),
                 "endpoints": [
                     "/web/dashboard/trade-data",
                     "/web/dashboard/price-trends",
@@ -85,6 +88,51 @@ class RealGovernmentDataScraper:
                 verify=False
             )
     
+    async def _stream_parse(self, source: str, method: str, url: str, parser: PortalStreamParser, **kwargs):
+        """
+        Stream a portal page through the source's circuit breaker.
+
+        Uses the breaker's adaptive timeout and records the outcome; raises
+        CircuitOpenError without touching the network when the source is down.
+        Any other error (redirect loops, decoding or parse errors,
+        cancellation) counts as a failure, so a half-open probe slot is
+        never left reserved.
+        """
+        breaker = upstream_health.breaker(source)
+        breaker.check()
+        start = time.perf_counter()
+        try:
+            rows = await stream_parse(self.session, method, url, parser, timeout=breaker.current_timeout(), **kwargs)
+        except BaseException as e:
+            breaker.record_failure(e)
+            raise
+        if parser.status_code is not None and parser.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success(time.perf_counter() - start)
+        return rows
+    
+    async def _get(self, source: str, url: str) -> httpx.Response:
+        """GET a portal resource through the source's circuit breaker."""
+        breaker = upstream_health.breaker(source)
+        breaker.check()
+        start = time.perf_counter()
+        try:
+            response = await self.session.get(url, timeout=breaker.current_timeout())
+        except BaseException as e:
+            breaker.record_failure(e)
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success(time.perf_counter() - start)
+        return response
+    
+    def _circuit_open_response(self, source: str) -> Dict[str, Any]:
+        """Result for a portal skipped because its breaker is open."""
+        logger.info(f"⚡ {source} circuit open, skipping real scraping")
+        return {"source": source, "status": "circuit_open", "data": []}
+    
     async def scrape_all_portals(self, district: str, commodity: Optional[str] = None) -> Dict[str, Any]:
         """
         Scrape all government portals for real market data.
@@ -114,6 +162,9 @@ class RealGovernmentDataScraper:
     
     async def _scrape_agmarknet_real(self, district: str, commodity: Optional[str]) -> Dict[str, Any]:
         """Real AGMARKNET scraping with advanced techniques."""
+        if upstream_health.breaker("agmarknet").is_open():
+            return self._circuit_open_response("agmarknet")
+        
         try:
             logger.info(f"🏛️ Real scraping AGMARKNET for {district}")
             
@@ -122,16 +173,14 @@ class RealGovernmentDataScraper:
             # Try mobile API first (often has less protection)
             mobile_url = f"{base_url}/CNMSAPPrices.aspx"
             
-            response = await self.session.get(mobile_url)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
+            page = PortalStreamParser(capture_scripts=True)
+            rows = await self._stream_parse("agmarknet", "GET", mobile_url, page)
+            if page.status_code == 200:
                 # Look for JSON data embedded in page
-                scripts = soup.find_all('script')
-                for script in scripts:
-                    if script.string and 'price' in script.string.lower():
+                for script in page.scripts:
+                    if 'price' in script.lower():
                         # Try to extract JSON data
-                        json_match = re.search(r'({.*price.*})', script.string)
+                        json_match = re.search(r'({.*price.*})', script)
                         if json_match:
                             try:
                                 data = json.loads(json_match.group(1))
@@ -140,9 +189,8 @@ class RealGovernmentDataScraper:
                                 continue
                 
                 # Fallback to table scraping
-                tables = soup.find_all('table')
-                for table in tables:
-                    data = self._extract_table_data(table, "AGMARKNET_REAL")
+                for table_rows in group_rows_by_table(rows).values():
+                    data = self._extract_table_data(table_rows, "AGMARKNET_REAL")
                     if data:
                         return {
                             "source": "agmarknet_real",
@@ -155,11 +203,14 @@ class RealGovernmentDataScraper:
             for endpoint in self.portals["agmarknet"]["endpoints"]:
                 try:
                     url = f"{base_url}{endpoint}"
-                    response = await self.session.get(url)
+                    page = PortalStreamParser(
+                        table_filter=lambda attrs: bool(re.match(r'.*grid.*|.*data.*', attrs.get('class', ''))),
+                        capture_scripts=True
+                    )
+                    rows = await self._stream_parse("agmarknet", "GET", url, page)
                     
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        data = self._extract_agmarknet_advanced(soup, district, commodity)
+                    if page.status_code == 200:
+                        data = self._extract_agmarknet_advanced(page, rows, district, commodity)
                         
                         if data:
                             return {
@@ -169,18 +220,25 @@ class RealGovernmentDataScraper:
                                 "endpoint": endpoint
                             }
                             
+                except CircuitOpenError:
+                    raise
                 except Exception as e:
                     logger.warning(f"AGMARKNET endpoint {endpoint} failed: {e}")
                     continue
             
             return {"source": "agmarknet", "status": "no_data", "data": []}
             
+        except CircuitOpenError:
+            return self._circuit_open_response("agmarknet")
         except Exception as e:
             logger.error(f"AGMARKNET real scraping error: {e}")
             return {"source": "agmarknet", "status": "error", "data": []}
     
     async def _scrape_data_gov_real(self, district: str, commodity: Optional[str]) -> Dict[str, Any]:
         """Real Data.gov.in scraping."""
+        if upstream_health.breaker("data_gov").is_open():
+            return self._circuit_open_response("data_gov")
+        
         try:
             logger.info(f"📊 Real scraping Data.gov.in for {district}")
             
@@ -189,28 +247,26 @@ class RealGovernmentDataScraper:
             # Try to find agricultural datasets
             search_url = f"{base_url}/catalog?q=agricultural+marketing+{district}"
             
-            response = await self.session.get(search_url)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
+            search_page = PortalStreamParser(capture_tables=False, capture_links=True)
+            await self._stream_parse("data_gov", "GET", search_url, search_page)
+            if search_page.status_code == 200:
                 # Look for dataset links
-                dataset_links = soup.find_all('a', href=re.compile(r'/node/\d+'))
+                dataset_links = [href for href in search_page.links if re.search(r'/node/\d+', href)]
                 
-                for link in dataset_links[:3]:  # Try first 3 datasets
+                for href in dataset_links[:3]:  # Try first 3 datasets
                     try:
-                        dataset_url = urljoin(base_url, link['href'])
-                        dataset_response = await self.session.get(dataset_url)
+                        dataset_url = urljoin(base_url, href)
+                        dataset_page = PortalStreamParser(capture_tables=False, capture_links=True)
+                        await self._stream_parse("data_gov", "GET", dataset_url, dataset_page)
                         
-                        if dataset_response.status_code == 200:
-                            dataset_soup = BeautifulSoup(dataset_response.text, 'html.parser')
-                            
+                        if dataset_page.status_code == 200:
                             # Look for CSV/JSON download links
-                            download_links = dataset_soup.find_all('a', href=re.compile(r'\.(csv|json|xlsx)'))
+                            download_links = [h for h in dataset_page.links if re.search(r'\.(csv|json|xlsx)', h)]
                             
-                            for dl_link in download_links:
+                            for dl_href in download_links:
                                 try:
-                                    file_url = urljoin(base_url, dl_link['href'])
-                                    file_response = await self.session.get(file_url)
+                                    file_url = urljoin(base_url, dl_href)
+                                    file_response = await self._get("data_gov", file_url)
                                     
                                     if file_response.status_code == 200:
                                         data = self._process_data_gov_file(file_response.content, district, commodity)
@@ -222,10 +278,14 @@ class RealGovernmentDataScraper:
                                                 "file_url": file_url
                                             }
                                             
+                                except CircuitOpenError:
+                                    raise
                                 except Exception as e:
                                     logger.warning(f"Data.gov file processing error: {e}")
                                     continue
                                     
+                    except CircuitOpenError:
+                        raise
                     except Exception as e:
                         logger.warning(f"Data.gov dataset error: {e}")
                         continue
@@ -234,11 +294,11 @@ class RealGovernmentDataScraper:
             for endpoint in self.portals["data_gov"]["endpoints"]:
                 try:
                     url = f"{base_url}{endpoint}"
-                    response = await self.session.get(url)
+                    page = PortalStreamParser(capture_text=True)
+                    rows = await self._stream_parse("data_gov", "GET", url, page)
                     
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        data = self._extract_data_gov_page(soup, district, commodity)
+                    if page.status_code == 200:
+                        data = self._extract_data_gov_page(page, rows, district, commodity)
                         
                         if data:
                             return {
@@ -248,18 +308,25 @@ class RealGovernmentDataScraper:
                                 "method": "page_scraping"
                             }
                             
+                except CircuitOpenError:
+                    raise
                 except Exception as e:
                     logger.warning(f"Data.gov endpoint {endpoint} failed: {e}")
                     continue
             
             return {"source": "data_gov", "status": "no_data", "data": []}
             
+        except CircuitOpenError:
+            return self._circuit_open_response("data_gov")
         except Exception as e:
             logger.error(f"Data.gov real scraping error: {e}")
             return {"source": "data_gov", "status": "error", "data": []}
     
     async def _scrape_enam_real(self, district: str, commodity: Optional[str]) -> Dict[str, Any]:
         """Real eNAM platform scraping."""
+        if upstream_health.breaker("enam").is_open():
+            return self._circuit_open_response("enam")
+        
         try:
             logger.info(f"🌾 Real scraping eNAM for {district}")
             
@@ -268,50 +335,48 @@ class RealGovernmentDataScraper:
             # Try dashboard endpoint
             dashboard_url = f"{base_url}/web/dashboard"
             
-            response = await self.session.get(dashboard_url)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
+            page = PortalStreamParser(capture_tables=False, capture_scripts=True, capture_text=True)
+            await self._stream_parse("enam", "GET", dashboard_url, page)
+            if page.status_code == 200:
                 # Look for AJAX endpoints in page
-                scripts = soup.find_all('script')
-                for script in scripts:
-                    if script.string:
-                        # Look for API endpoints
-                        api_matches = re.findall(r'["\'](/api/[^"\']+)["\']', script.string)
-                        for api_path in api_matches:
-                            try:
-                                api_url = urljoin(base_url, api_path)
-                                api_response = await self.session.get(api_url)
-                                
-                                if api_response.status_code == 200:
-                                    try:
-                                        api_data = api_response.json()
-                                        processed_data = self._process_enam_api_data(api_data, district, commodity)
-                                        if processed_data:
-                                            return {
-                                                "source": "enam_real",
-                                                "status": "success",
-                                                "data": processed_data,
-                                                "api_endpoint": api_url
-                                            }
-                                    except json.JSONDecodeError:
-                                        # Try as HTML
-                                        api_soup = BeautifulSoup(api_response.text, 'html.parser')
-                                        data = self._extract_enam_html(api_soup, district, commodity)
-                                        if data:
-                                            return {
-                                                "source": "enam_real",
-                                                "status": "success",
-                                                "data": data,
-                                                "method": "api_html"
-                                            }
-                                            
-                            except Exception as e:
-                                logger.warning(f"eNAM API error: {e}")
-                                continue
+                for script in page.scripts:
+                    # Look for API endpoints
+                    api_matches = re.findall(r'["\'](/api/[^"\']+)["\']', script)
+                    for api_path in api_matches:
+                        try:
+                            api_url = urljoin(base_url, api_path)
+                            api_response = await self._get("enam", api_url)
+                            
+                            if api_response.status_code == 200:
+                                try:
+                                    api_data = api_response.json()
+                                    processed_data = self._process_enam_api_data(api_data, district, commodity)
+                                    if processed_data:
+                                        return {
+                                            "source": "enam_real",
+                                            "status": "success",
+                                            "data": processed_data,
+                                            "api_endpoint": api_url
+                                        }
+                                except json.JSONDecodeError:
+                                    # Try as HTML
+                                    data = self._extract_enam_html(api_response.content, district, commodity)
+                                    if data:
+                                        return {
+                                            "source": "enam_real",
+                                            "status": "success",
+                                            "data": data,
+                                            "method": "api_html"
+                                        }
+                                        
+                        except CircuitOpenError:
+                            raise
+                        except Exception as e:
+                            logger.warning(f"eNAM API error: {e}")
+                            continue
                 
                 # Fallback to page data extraction
-                data = self._extract_enam_page_data(soup, district, commodity)
+                data = self._extract_enam_page_data(page, district, commodity)
                 if data:
                     return {
                         "source": "enam_real",
@@ -322,26 +387,24 @@ class RealGovernmentDataScraper:
             
             return {"source": "enam", "status": "no_data", "data": []}
             
+        except CircuitOpenError:
+            return self._circuit_open_response("enam")
         except Exception as e:
             logger.error(f"eNAM real scraping error: {e}")
             return {"source": "enam", "status": "error", "data": []}
     
-    def _extract_table_data(self, table, source: str) -> List[Dict[str, Any]]:
-        """Extract data from HTML tables."""
+    def _extract_table_data(self, rows: List[List[str]], source: str) -> List[Dict[str, Any]]:
+        """Extract data from the cell texts of an HTML table."""
         data = []
         
-        rows = table.find_all('tr')
-        
-        for row in rows[1:]:  # Skip header
-            cells = row.find_all(['td', 'th'])
-            
+        for cells in rows[1:]:  # Skip header
             if len(cells) >= 4:
                 try:
-                    commodity = self._clean_text(cells[0].get_text())
-                    market = self._clean_text(cells[1].get_text()) if len(cells) > 1 else "Unknown"
+                    commodity = self._clean_text(cells[0])
+                    market = self._clean_text(cells[1]) if len(cells) > 1 else "Unknown"
                     
                     # Try to extract prices from various column positions
-                    price_cells = [cell.get_text() for cell in cells[2:]]
+                    price_cells = cells[2:]
                     prices = [self._extract_price(cell) for cell in price_cells]
                     prices = [p for p in prices if p > 0]  # Filter valid prices
                     
@@ -369,25 +432,24 @@ class RealGovernmentDataScraper:
         
         return data
     
-    def _extract_agmarknet_advanced(self, soup: BeautifulSoup, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
+    def _extract_agmarknet_advanced(self, page: PortalStreamParser, rows: List[Any], district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
         """Advanced AGMARKNET data extraction."""
         
         # Look for hidden JSON data
-        json_scripts = soup.find_all('script', string=re.compile(r'price|market|commodity'))
+        json_scripts = [script for script in page.scripts if re.search(r'price|market|commodity', script)]
         for script in json_scripts:
             try:
                 # Extract JSON from script content
-                json_match = re.search(r'({.*})', script.string)
+                json_match = re.search(r'({.*})', script)
                 if json_match:
                     data = json.loads(json_match.group(1))
                     return self._process_agmarknet_json(data, district, commodity)
             except:
                 continue
         
-        # Look for data tables
-        data_tables = soup.find_all('table', {'class': re.compile(r'.*grid.*|.*data.*')})
-        for table in data_tables:
-            data = self._extract_table_data(table, "AGMARKNET_ADVANCED")
+        # Look for data tables (the parser only kept grid/data tables)
+        for table_rows in group_rows_by_table(rows).values():
+            data = self._extract_table_data(table_rows, "AGMARKNET_ADVANCED")
             if data:
                 return data
         
@@ -515,36 +577,34 @@ class RealGovernmentDataScraper:
         
         return data
     
-    def _extract_data_gov_page(self, soup: BeautifulSoup, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
+    def _extract_data_gov_page(self, page: PortalStreamParser, rows: List[Any], district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
         """Extract data from Data.gov.in pages."""
         
         # Look for data tables
-        tables = soup.find_all('table')
-        for table in tables:
-            data = self._extract_table_data(table, "DATA_GOV_PAGE")
+        for table_rows in group_rows_by_table(rows).values():
+            data = self._extract_table_data(table_rows, "DATA_GOV_PAGE")
             if data:
                 return data
         
         # Look for embedded data
-        price_elements = soup.find_all(text=re.compile(r'\d+.*price|\d+.*rate|\d+.*rupee', re.I))
+        price_pattern = re.compile(r'\d+.*price|\d+.*rate|\d+.*rupee', re.I)
         
         data = []
-        for element in price_elements:
+        for index, (_, element) in enumerate(page.text_nodes):
+            if not price_pattern.search(element):
+                continue
             try:
                 price_match = re.search(r'(\d+)', element)
                 if price_match:
                     price = float(price_match.group(1))
                     
                     # Try to find commodity name nearby
-                    parent = element.parent if hasattr(element, 'parent') else None
                     commodity_name = "Unknown"
-                    
-                    if parent:
-                        text = parent.get_text()
-                        for crop in ['rice', 'wheat', 'maize', 'potato', 'onion']:
-                            if crop in text.lower():
-                                commodity_name = crop.title()
-                                break
+                    text = text_context(page.text_nodes, index)
+                    for crop in ['rice', 'wheat', 'maize', 'potato', 'onion']:
+                        if crop in text.lower():
+                            commodity_name = crop.title()
+                            break
                     
                     data.append({
                         "commodity": commodity_name,
@@ -599,39 +659,40 @@ class RealGovernmentDataScraper:
         
         return data
     
-    def _extract_enam_html(self, soup: BeautifulSoup, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
+    def _extract_enam_html(self, html_content: bytes, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
         """Extract data from eNAM HTML."""
         
         # Look for price tables
-        tables = soup.find_all('table')
-        for table in tables:
-            data = self._extract_table_data(table, "ENAM_HTML")
+        rows = parse_html(html_content, PortalStreamParser())
+        for table_rows in group_rows_by_table(rows).values():
+            data = self._extract_table_data(table_rows, "ENAM_HTML")
             if data:
                 return data
         
         return []
     
-    def _extract_enam_page_data(self, soup: BeautifulSoup, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
+    def _extract_enam_page_data(self, page: PortalStreamParser, district: str, commodity: Optional[str]) -> List[Dict[str, Any]]:
         """Extract data from eNAM page content."""
         
         # Look for data cards or price displays
-        price_elements = soup.find_all(['div', 'span'], string=re.compile(r'\d+.*₹|\d+.*Rs|\d+.*price', re.I))
+        price_pattern = re.compile(r'\d+.*₹|\d+.*Rs|\d+.*price', re.I)
         
         data = []
-        for element in price_elements:
+        for index, (tag, element) in enumerate(page.text_nodes):
+            if tag not in ('div', 'span') or not price_pattern.search(element):
+                continue
             try:
-                price_match = re.search(r'(\d+)', element.get_text())
+                price_match = re.search(r'(\d+)', element)
                 if price_match:
                     price = float(price_match.group(1))
                     
                     # Look for commodity name in nearby elements
                     commodity_name = "Unknown"
-                    if element.parent:
-                        parent_text = element.parent.get_text().lower()
-                        for crop in ['rice', 'wheat', 'maize', 'potato', 'onion', 'tomato']:
-                            if crop in parent_text:
-                                commodity_name = crop.title()
-                                break
+                    parent_text = text_context(page.text_nodes, index).lower()
+                    for crop in ['rice', 'wheat', 'maize', 'potato', 'onion', 'tomato']:
+                        if crop in parent_text:
+                            commodity_name = crop.title()
+                            break
                     
                     data.append({
                         "commodity": commodity_name,
@@ -0,0 +1,312 @@
+"""
+Precomputed crop recommendation table for /crops/ml/recommend.
+Farmers without a soil test card send only categorical inputs: district,
+season, soil type and pH. The route fills in soil-type NPK defaults, seasonal
+rainfall and (binned) district weather, so those requests land on a finite
+grid of model inputs. The table evaluates the active XGBoost classifier over
+that grid in one batched call and keeps the top-k crops per grid point;
+requests on the grid are answered by a dictionary lookup and only custom
+soil-test inputs run the model. The table is rebuilt whenever a model is
+trained or loaded and on the daily district weather refresh.
+"""
+
+import asyncio
+import itertools
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.districts import JHARKHAND_DISTRICT_COORDINATES
+from app.services.feature_engineer import feature_engineer
+from app.services.weather_service import weather_service
+
+logger = logging.getLogger(__name__)
+
+# Route defaults for inputs the farmer did not provide
+SEASONAL_RAINFALL = {'kharif': 800, 'rabi': 200, 'summer': 100}
+DEFAULT_RAINFALL = 500
+SOIL_NPK_DEFAULTS = {
+    'Loamy Soil': {'N': 80, 'P': 45, 'K': 50},
+    'Clay Soil': {'N': 90, 'P': 40, 'K': 45},
+    'Sandy Soil': {'N': 60, 'P': 35, 'K': 40},
+    'Black Soil': {'N': 85, 'P': 50, 'K': 55},
+    'Red Soil': {'N': 70, 'P': 38, 'K': 42}
+}
+DEFAULT_NPK = {'N': 75, 'P': 42, 'K': 48}
+
+# Grid resolution; weather-derived temperature and humidity are binned to it
+TEMPERATURE_STEP = 1.0  # degrees C
+HUMIDITY_STEP = 5.0  # percent
+PH_GRID = [round(4.5 + 0.1 * i, 1) for i in range(41)]  # 4.5-8.5
+
+
+def quantize(value: float, step: float) -> float:
+    """Round a value to the nearest multiple of step."""
+    return round(round(value / step) * step, 4)
+
+
+def default_rainfall(season: str) -> int:
+    """Seasonal rainfall (mm) used when the request has none."""
+    return SEASONAL_RAINFALL.get(season.lower(), DEFAULT_RAINFALL)
+
+
+def default_npk(soil_type: str) -> Dict[str, int]:
+    """Soil-type NPK (kg/ha) used when the request has no soil test."""
+    return SOIL_NPK_DEFAULTS.get(soil_type, DEFAULT_NPK)
+
+
+def _grid_key(farm_data: Dict[str, Any]) -> Optional[Tuple]:
+    """Lookup key of a model input, or None if any numeric input is missing."""
+    try:
+        return (
+            str(farm_data['season']),
+            *(round(float(farm_data[field]), 4)
+              for field in ('N', 'P', 'K', 'ph', 'temperature', 'humidity', 'rainfall'))
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RecommendationTable:
+    """
+    Top-k XGBoost recommendations over the grid of default model inputs.
+
+    Rows are stored as compact arrays (crop codes and probabilities per grid
+    point) with a dict from input key to row. A lookup only answers while the
+    classifier the table was built from is still the active one.
+    """
+
+    def __init__(self, top_k: int = 5, weather_spread: int = 1):
+        """
+        Initialize the table.
+
+        Args:
+            top_k: Recommendations kept per grid point
+            weather_spread: Temperature and humidity bins covered on each side
+                of a district's weather snapshot, so the table still answers
+                while the weather drifts between refreshes
+        """
+        self.top_k = top_k
+        self.weather_spread = weather_spread
+        self.district_weather: Dict[str, Tuple[float, float]] = {}
+        self.weather_updated_at: Optional[str] = None
+        self._classifier = None
+        self._index: Dict[Tuple, int] = {}
+        self._crop_codes = np.empty((0, top_k), dtype=np.int16)
+        self._probabilities = np.empty((0, top_k), dtype=np.float32)
+        self._crops: List[str] = []
+        self._yields: List[float] = []
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._stats = {"hits": 0, "misses": 0, "builds": 0, "build_seconds": 0.0, "built_at": None}
+
+    def weather_for(self, district: str) -> Optional[Tuple[float, float]]:
+        """Binned (temperature, humidity) of the district's latest weather snapshot."""
+        return self.district_weather.get(district)
+
+    def lookup(self, farm_data: Dict[str, Any], model_manager, top_k: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Precomputed recommendations for a model input.
+
+        Args:
+            farm_data: Model input as built by the route (N, P, K, temperature,
+                humidity, ph, rainfall, season)
+            model_manager: Active XGBoost model manager
+            top_k: Number of recommendations
+
+        Returns:
+            Recommendations (crop, confidence, expected_yield) best first, or
+            None if the input is off the grid or the table is stale
+        """
+        key = _grid_key(farm_data)
+        row = self._index.get(key) if key is not None else None
+        if row is None or top_k > self.top_k or model_manager.crop_classifier is not self._classifier:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return [
+            {
+                "crop": self._crops[code],
+                "confidence": round(float(probability), 4),
+                "expected_yield": self._yields[code]
+            }
+            for code, probability in zip(self._crop_codes[row, :top_k], self._probabilities[row, :top_k])
+        ]
+
+    async def refresh_weather(self) -> int:
+        """
+        Fetch current weather for every district and store it binned.
+
+        Districts whose fetch fails keep their previous snapshot.
+
+        Returns:
+            Number of districts refreshed
+        """
+        districts = list(JHARKHAND_DISTRICT_COORDINATES)
+        results = await asyncio.gather(
+            *(weather_service.get_current_weather(coords['latitude'], coords['longitude'])
+              for coords in JHARKHAND_DISTRICT_COORDINATES.values()),
+            return_exceptions=True
+        )
+        refreshed = 0
+        for district, weather in zip(districts, results):
+            if isinstance(weather, Exception) or not weather:
+                logger.warning(f"Weather refresh failed for {district}: {weather}")
+                continue
+            self.district_weather[district] = (
+                quantize(weather.get('temperature', 25), TEMPERATURE_STEP),
+                quantize(weather.get('humidity', 65), HUMIDITY_STEP)
+            )
+            refreshed += 1
+        self.weather_updated_at = datetime.now().isoformat()
+        return refreshed
+
+    def _grid(self) -> List[Dict[str, Any]]:
+        """Model inputs for every season, default NPK profile, pH step and weather bin."""
+        climate = set()
+        spread = range(-self.weather_spread, self.weather_spread + 1)
+        for temperature, humidity in self.district_weather.values():
+            for dt, dh in itertools.product(spread, spread):
+                climate.add((round(temperature + dt * TEMPERATURE_STEP, 4),
+                             min(max(round(humidity + dh * HUMIDITY_STEP, 4), 0.0), 100.0)))
+
+        profiles = {tuple(npk.values()) for npk in [*SOIL_NPK_DEFAULTS.values(), DEFAULT_NPK]}
+        return [
+            {
+                'N': n, 'P': p, 'K': k,
+                'temperature': temperature,
+                'humidity': humidity,
+                'ph': ph,
+                'rainfall': rainfall,
+                'season': season
+            }
+            for season, rainfall in SEASONAL_RAINFALL.items()
+            for n, p, k in sorted(profiles)
+            for temperature, humidity in sorted(climate)
+            for ph in PH_GRID
+        ]
+
+    def _evaluate(self, model_manager, grid: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Batched feature engineering and prediction over the grid (runs in a thread)."""
+        trainer = model_manager.get_trainer()
+        classifier = model_manager.crop_classifier
+        crops = [str(crop) for crop in model_manager.label_encoders['crop'].classes_]
+        top_k = min(self.top_k, len(crops))
+
+        probabilities = trainer.predict_probabilities(feature_engineer.prepare_feature_frame(grid))
+        # Same ordering as predict_crop_recommendations: argsort ascending, last k reversed
+        codes = np.argsort(probabilities, axis=1)[:, -top_k:][:, ::-1]
+        return {
+            "classifier": classifier,
+            "crops": crops,
+            # Route inputs carry no yield modifiers, so the estimate depends only on the crop
+            "yields": [round(trainer._estimate_yield(crop, {}), 2) for crop in crops],
+            "index": {_grid_key(farm_data): row for row, farm_data in enumerate(grid)},
+            "crop_codes": codes.astype(np.int16),
+            "probabilities": np.take_along_axis(probabilities, codes, axis=1).astype(np.float32)
+        }
+
+    async def rebuild(self, model_manager, refresh_weather: bool = True) -> Dict[str, Any]:
+        """
+        Re-evaluate the grid with the active model.
+
+        Args:
+            model_manager: XGBoost model manager
+            refresh_weather: Fetch district weather first
+
+        Returns:
+            Table statistics
+        """
+        async with self._lock:
+            if refresh_weather or not self.district_weather:
+                await self.refresh_weather()
+            if not model_manager.is_ready() or not self.district_weather:
+                logger.info("Recommendation table not built: model or district weather unavailable")
+                return self.get_stats()
+
+            started = time.perf_counter()
+            grid = self._grid()
+            table = await asyncio.to_thread(self._evaluate, model_manager, grid)
+
+            self._classifier = table["classifier"]
+            self._crops = table["crops"]
+            self._yields = table["yields"]
+            self._crop_codes = table["crop_codes"]
+            self._probabilities = table["probabilities"]
+            self._index = table["index"]
+
+            elapsed = time.perf_counter() - started
+            self._stats["builds"] += 1
+            self._stats["build_seconds"] = round(elapsed, 2)
+            self._stats["built_at"] = datetime.now().isoformat()
+            logger.info(f"Recommendation table built: {len(grid)} grid points in {elapsed:.2f}s")
+            return self.get_stats()
+
+    @property
+    def rebuilding(self) -> bool:
+        """Whether a rebuild currently holds the table."""
+        return self._lock.locked()
+
+    def schedule_rebuild(self, model_manager) -> None:
+        """Rebuild in the background (after a model is trained or loaded); lookups miss until it finishes."""
+        self._rebuild_task = asyncio.create_task(self._rebuild_safely(model_manager, refresh_weather=False))
+
+    async def _rebuild_safely(self, model_manager, refresh_weather: bool) -> None:
+        try:
+            await self.rebuild(model_manager, refresh_weather)
+        except Exception as e:
+            logger.error(f"Error rebuilding recommendation table: {e}")
+
+    async def _refresh_periodically(self, model_manager, interval: int):
+        """Refresh district weather and rebuild now and every `interval` seconds until cancelled."""
+        while True:
+            await self._rebuild_safely(model_manager, refresh_weather=True)
+            await asyncio.sleep(interval)
+
+    def start_refresh(self, model_manager, interval: int) -> None:
+        """
+        Start the daily weather refresh and rebuild job on the running event loop.
+
+        Args:
+            model_manager: XGBoost model manager
+            interval: Seconds between runs (0 disables the job)
+        """
+        if interval <= 0 or (self._refresh_task and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_periodically(model_manager, interval))
+        logger.info(f"Recommendation table refresh scheduled every {interval}s")
+
+    async def stop_refresh(self) -> None:
+        """Cancel the refresh job and any background rebuild."""
+        for task in (self._refresh_task, self._rebuild_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_task = None
+        self._rebuild_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get table size, build and lookup statistics."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "grid_points": len(self._index),
+            "top_k": self.top_k,
+            "crops": len(self._crops),
+            "districts_with_weather": len(self.district_weather),
+            "weather_updated_at": self.weather_updated_at,
+            "table_bytes": int(self._crop_codes.nbytes + self._probabilities.nbytes),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats
+        }
+
+
+# Global instance
+recommendation_table = RecommendationTable(settings.RECOMMENDATION_TABLE_TOP_K, settings.RECOMMENDATION_TABLE_WEATHER_SPREAD)
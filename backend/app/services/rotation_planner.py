@@ -0,0 +1,305 @@
+"""
+Crop rotation planner.
+A plan is a sequence of calendar slots: Kharif, Rabi and Zaid for every year,
+or one slot per year in annual mode. The search is a dynamic program over
+states (last crop, slots its growth still occupies, cumulative nitrogen
+balance bucket) that keeps the top-k partial plans per state. Branches whose
+optimistic final score cannot beat the incumbent plans are pruned, and a
+beam width caps the frontier. Per-crop score vectors and pairwise transition
+scores are precomputed, so extending a plan by one slot costs a few list
+lookups however large the crop database grows.
+"""
+
+import math
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEASONS = ("Kharif", "Rabi", "Zaid")
+FALLOW = -1
+GROWING = -2  # slot still occupied by the previous long-duration crop
+SLOT_DAYS = 122  # one season is roughly four months
+N_BUCKET_SIZE = 100  # kg N/ha of cumulative balance per state bucket
+N_BUCKET_LIMIT = 4
+NUTRIENTS = ("N", "P", "K")
+
+
+class NoFeasibleRotationError(ValueError):
+    """No crop in the candidate set can be grown in the requested seasons."""
+
+
+class RotationPlanner:
+    """
+    Searches multi-year, multi-season rotations over a crop database.
+
+    Scores follow the optimizer's weighting: per-crop economic return and
+    risk (weighted by the farmer's preferences) are summed per slot, family
+    transitions add agronomic bonuses or penalties, and the finished plan's
+    nutrient balance, diversity and legume share are added at the end.
+    """
+
+    def __init__(self, crop_database: Dict[str, Any], rotation_rules: Dict[str, Any]):
+        """
+        Precompute crop attributes and transition scores.
+
+        Args:
+            crop_database: Crop name -> CropInfo
+            rotation_rules: Family groups, beneficial sequences, minimum gaps
+                and soil improvement crops
+        """
+        self.crop_database = crop_database
+        self.rotation_rules = rotation_rules
+        self.crop_names = list(crop_database)
+        self.index = {name: i for i, name in enumerate(self.crop_names)}
+
+        family_of = {
+            crop: family
+            for family, crops in rotation_rules['avoid_same_family'].items()
+            for crop in crops
+        }
+        infos = [crop_database[name] for name in self.crop_names]
+        self.families = [family_of.get(name, name) for name in self.crop_names]
+        self.seasons = [info.season for info in infos]
+        self.occupancy = [max(0, math.ceil(info.growth_period / SLOT_DAYS) - 1) for info in infos]
+        self.gap_years = [rotation_rules['minimum_gap_years'].get(name, 0) for name in self.crop_names]
+        self.soil_improving = [name in rotation_rules['soil_improvement_crops'] for name in self.crop_names]
+        self.demand = [[info.nutrient_demand[n] for n in NUTRIENTS] for info in infos]
+        self.contribution = [[info.nutrient_contribution[n] for n in NUTRIENTS] for info in infos]
+        self.n_net = [c[0] - d[0] for c, d in zip(self.contribution, self.demand)]
+        self.transition = self._build_transitions()
+        self._pruned = 0
+
+    def _build_transitions(self) -> List[List[float]]:
+        """Score for growing crop j right after crop i."""
+        beneficial = set(self.rotation_rules['beneficial_sequences'])
+        size = len(self.crop_names)
+        matrix = [[0.0] * size for _ in range(size)]
+        for i in range(size):
+            for j in range(size):
+                if i == j:
+                    matrix[i][j] = -0.3  # Continuous cropping builds up pests and depletes the same nutrients
+                elif self.families[i] == self.families[j]:
+                    matrix[i][j] = -0.15
+                elif (self.families[i], self.families[j]) in beneficial:
+                    matrix[i][j] = 0.1
+        return matrix
+
+    def sustainability_score(self, crop_ids: List[int]) -> float:
+        """
+        Nutrient balance, diversity and soil improvement of a sequence of crops (0-1).
+
+        Args:
+            crop_ids: Crop indices in planting order
+
+        Returns:
+            Sustainability score
+        """
+        if not crop_ids:
+            return 0.0
+        demand = [0.0, 0.0, 0.0]
+        contribution = [0.0, 0.0, 0.0]
+        for i in crop_ids:
+            for n in range(3):
+                demand[n] += self.demand[i][n]
+                contribution[n] += self.contribution[i][n]
+        nutrient_balance = sum(min(contribution[n] / max(demand[n], 1), 1.0) for n in range(3)) / 3
+        diversity = len(set(crop_ids)) / len(crop_ids)
+        soil_improvement = sum(1 for i in crop_ids if self.soil_improving[i]) / len(crop_ids)
+        return 0.4 * nutrient_balance + 0.3 * diversity + 0.3 * soil_improvement
+
+    def plan(self,
+             crops: List[str],
+             farm_conditions: Dict[str, Any],
+             preferences: Dict[str, Any],
+             years: int = 3,
+             seasons: Optional[List[str]] = None,
+             top_k: int = 1) -> List[Dict[str, Any]]:
+        """
+        Find the best rotations.
+
+        Args:
+            crops: Candidate crops (already filtered for the farm)
+            farm_conditions: Farm conditions (climate_risk is used)
+            preferences: profit_weight, sustainability_weight and risk_weight
+            years: Planning horizon in years
+            seasons: Seasons cropped each year; None plans one crop per year
+            top_k: Number of plans to return
+
+        Returns:
+            Up to top_k plans, best first, each with its score and slots
+            ({"year", "season", "crop"}; fallow seasons are omitted). Plans
+            that leave every season fallow are dropped, so the result is
+            empty when no candidate crop fits the requested seasons.
+        """
+        ids = [self.index[crop] for crop in crops if crop in self.index]
+        if not ids:
+            return []
+
+        profit_weight = preferences['profit_weight']
+        sustainability_weight = preferences['sustainability_weight']
+        risk_weight = preferences['risk_weight']
+        climate_risk = farm_conditions.get('climate_risk', 0.3)
+
+        # Per-crop score vector: economic return and (inverted) risk
+        crop_score = {}
+        for i in ids:
+            info = self.crop_database[self.crop_names[i]]
+            economic = info.profit_per_hectare * (1 - info.market_volatility) / 50000
+            risk = min(0.4 * (1 - info.disease_resistance) + 0.3 * info.market_volatility + 0.3 * climate_risk, 1.0)
+            crop_score[i] = profit_weight * economic + risk_weight * (1 - risk)
+
+        annual = not seasons
+        if annual:
+            slots = [(year, None) for year in range(1, years + 1)]
+            options = [ids] * len(slots)
+            slots_per_year = 1
+        else:
+            slots = [(year, season) for year in range(1, years + 1) for season in SEASONS]
+            options = [[i for i in ids if self.seasons[i] == season] if season in seasons else [] for _, season in slots]
+            slots_per_year = len(SEASONS)
+
+        # Optimistic bound on what slots s.. can still add
+        best_bonus = max((self.transition[i][j] for i in ids for j in ids), default=0.0)
+        remaining = [0.0] * (len(slots) + 1)
+        for s in range(len(slots) - 1, -1, -1):
+            best_crop = max((crop_score[i] for i in options[s]), default=0.0)
+            remaining[s] = remaining[s + 1] + max(best_crop, 0.0) + sustainability_weight * max(best_bonus, 0.0)
+
+        beam_width = max(settings.ROTATION_BEAM_WIDTH, top_k)
+        incumbent = self._incumbent(slots, options, crop_score, sustainability_weight, slots_per_year,
+                                    annual, years, top_k)
+
+        # Frontier: state (last crop, busy slots, N bucket) -> [(score, sequence, n_balance)]
+        frontier: Dict[Tuple[int, int, int], List[Tuple[float, tuple, float]]] = {(FALLOW, 0, 0): [(0.0, (), 0.0)]}
+        self._pruned = 0
+        for s in range(len(slots)):
+            # Branch and bound: skip extensions that cannot reach the incumbent even if
+            # every remaining slot and the final sustainability term score their maximum
+            floor = None
+            if incumbent is not None:
+                floor = (incumbent - sustainability_weight) * years - remaining[s + 1]
+            frontier = self._expand(frontier, s, options[s], crop_score, sustainability_weight,
+                                    slots_per_year, annual, top_k, floor)
+            frontier = self._cap(frontier, beam_width)
+
+        plans = []
+        for candidates in frontier.values():
+            for score, sequence, _ in candidates:
+                cropped = [i for i in sequence if i >= 0]
+                if not cropped:
+                    continue
+                total = score / years + sustainability_weight * self.sustainability_score(cropped)
+                plans.append((total, sequence))
+        plans.sort(key=lambda plan: -plan[0])
+
+        logger.debug(f"Rotation search over {len(ids)} crops, {len(slots)} slots: {self._pruned} branches pruned")
+        return [
+            {
+                "score": round(total, 4),
+                "slots": [
+                    {"year": slots[s][0], "season": slots[s][1] or self.seasons[i], "crop": self.crop_names[i]}
+                    for s, i in enumerate(sequence) if i >= 0
+                ]
+            }
+            for total, sequence in plans[:top_k]
+        ]
+
+    def _expand(self, frontier, s, slot_options, crop_score, sustainability_weight,
+                slots_per_year, annual, top_k, floor=None):
+        """
+        Extend every frontier candidate by slot s, keeping the top_k per
+        resulting state. Extensions scoring below floor are pruned.
+        """
+        expanded: Dict[Tuple[int, int, int], List[Tuple[float, tuple, float]]] = {}
+        pruned = 0
+        transition, n_net, occupancy = self.transition, self.n_net, self.occupancy
+        for (last, busy, bucket), candidates in frontier.items():
+            for score, sequence, n_balance in candidates:
+                if busy:
+                    expanded.setdefault((last, busy - 1, bucket), []).append(
+                        (score, sequence + (GROWING,), n_balance))
+                    continue
+                extended = False
+                for j in slot_options:
+                    if not self._allowed(sequence, j, slots_per_year):
+                        continue
+                    extended = True
+                    total = score + crop_score[j]
+                    if last >= 0:
+                        total += sustainability_weight * transition[last][j]
+                    if floor is not None and total < floor:
+                        pruned += 1
+                        continue
+                    balance = n_balance + n_net[j]
+                    state = (j, 0 if annual else occupancy[j], _bucket(balance))
+                    expanded.setdefault(state, []).append((total, sequence + (j,), balance))
+                if not annual or not extended:
+                    if floor is None or score >= floor:
+                        expanded.setdefault((last, 0, bucket), []).append((score, sequence + (FALLOW,), n_balance))
+                    else:
+                        pruned += 1
+
+        for candidates in expanded.values():
+            if len(candidates) > top_k:
+                candidates.sort(key=lambda c: -c[0])
+                del candidates[top_k:]
+        self._pruned += pruned
+        return expanded
+
+    def _allowed(self, sequence: tuple, crop: int, slots_per_year: int) -> bool:
+        """Minimum gap and family rules for appending a crop."""
+        gap = self.gap_years[crop] * slots_per_year
+        if gap and crop in sequence[-gap:]:
+            return False
+        # At most two crops of one family in any three consecutive crops
+        family = self.families[crop]
+        seen = 0
+        for previous in reversed(sequence):
+            if previous < 0:
+                continue
+            if self.families[previous] != family:
+                return True
+            seen += 1
+            if seen == 2:
+                return False
+        return True
+
+    def _incumbent(self, slots, options, crop_score, sustainability_weight, slots_per_year,
+                   annual, years, top_k) -> Optional[float]:
+        """
+        Lower bound for pruning: the k-th best final score found by a narrow
+        beam (width top_k), or None if it finds fewer than top_k plans.
+        """
+        frontier = {(FALLOW, 0, 0): [(0.0, (), 0.0)]}
+        for s in range(len(slots)):
+            frontier = self._expand(frontier, s, options[s], crop_score, sustainability_weight,
+                                    slots_per_year, annual, top_k)
+            frontier = self._cap(frontier, top_k)
+        totals = sorted(
+            (score / years + sustainability_weight * self.sustainability_score([i for i in sequence if i >= 0])
+             for candidates in frontier.values() for score, sequence, _ in candidates),
+            reverse=True
+        )
+        return totals[top_k - 1] if len(totals) >= top_k else None
+
+    @staticmethod
+    def _cap(frontier, width: int):
+        """Keep the best `width` candidates across all states."""
+        total = sum(len(candidates) for candidates in frontier.values())
+        if total <= width:
+            return frontier
+        ranked = sorted(
+            ((c[0], state, c) for state, candidates in frontier.items() for c in candidates),
+            key=lambda item: -item[0]
+        )[:width]
+        capped: Dict[Tuple[int, int, int], List] = {}
+        for _, state, candidate in ranked:
+            capped.setdefault(state, []).append(candidate)
+        return capped
+
+
+def _bucket(n_balance: float) -> int:
+    return max(-N_BUCKET_LIMIT, min(N_BUCKET_LIMIT, round(n_balance / N_BUCKET_SIZE)))
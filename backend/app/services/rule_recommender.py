@@ -0,0 +1,171 @@
+"""
+Vectorized rule-based crop recommender.
+The rule engine (soil preferences, seasons, minimum field size, water needs
+and agronomic pH/rainfall/temperature windows) is compiled once into per-crop
+arrays and masks. A batch of farms is then scored against every crop in a
+few NumPy expressions, and each farm's crop history is aggregated once into
+per-crop yield averages instead of being rescanned for every crop.
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Water a method can supply vs water a crop needs (0-1)
+IRRIGATION_CAPACITY = {
+    "Rain-fed": 0.3,
+    "Dug well": 0.5,
+    "Tube well": 0.8,
+    "Canal": 0.7,
+    "Drip irrigation": 0.9,
+    "Sprinkler irrigation": 0.8
+}
+WATER_NEEDS = {"Low": 0.3, "Medium": 0.5, "High": 0.8, "Very High": 1.0}
+DEFAULT_LEVEL = 0.5
+
+# Average historical yield (quintal/acre) thresholds and their scores
+HISTORY_THRESHOLDS = np.array([10, 15, 20])
+HISTORY_SCORES = np.array([0.2, 0.4, 0.6, 0.8])
+NEUTRAL_HISTORY_SCORE = 0.5
+
+# Agronomic windows move the score by up to this much either way
+WINDOW_ADJUSTMENT = 0.05
+WINDOW_INPUTS = (("soil_ph", "soil_ph_range"), ("rainfall", "rainfall_requirement"),
+                 ("temperature", "temperature_range"))
+
+
+class RuleRecommender:
+    """Scores farms x crops with the rule engine compiled into arrays."""
+
+    def __init__(self, crop_features: Dict[str, Dict[str, Any]], weights: Dict[str, float],
+                 agronomic_windows: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Compile the rules.
+
+        Args:
+            crop_features: Crop -> preferred_soil, season, min_field_size and
+                water_requirement
+            weights: soil_type, season, field_size, irrigation and history weights
+            agronomic_windows: Lowercase crop -> soil_ph_range,
+                rainfall_requirement and temperature_range (crops without
+                windows get no agronomic adjustment)
+        """
+        self.crops = list(crop_features)
+        self.weights = weights
+        features = [crop_features[crop] for crop in self.crops]
+
+        self.soils = sorted({soil for f in features for soil in f.get("preferred_soil", [])})
+        self.soil_mask = np.array([[soil in f.get("preferred_soil", []) for soil in self.soils] for f in features]).T
+        self.seasons = sorted({season.lower() for f in features for season in f.get("season", [])})
+        self.season_mask = np.array(
+            [[season in {s.lower() for s in f.get("season", [])} for season in self.seasons] for f in features]
+        ).T
+        self.min_field_size = np.array([f.get("min_field_size", 0.5) for f in features])
+
+        # Irrigation compatibility: rows are methods (last row: unknown method), columns crops
+        need = np.array([WATER_NEEDS.get(f.get("water_requirement", "Medium"), DEFAULT_LEVEL) for f in features])
+        self.methods = list(IRRIGATION_CAPACITY)
+        capacity = np.array([*IRRIGATION_CAPACITY.values(), DEFAULT_LEVEL])[:, None]
+        self.irrigation_matrix = np.where(capacity >= need, 1.0, capacity / need)
+
+        # Windows as (inputs, crops) low/high bounds; NaN where a crop has none
+        agronomic_windows = agronomic_windows or {}
+        self.window_low = np.full((len(WINDOW_INPUTS), len(self.crops)), np.nan)
+        self.window_high = np.full((len(WINDOW_INPUTS), len(self.crops)), np.nan)
+        for c, crop in enumerate(self.crops):
+            windows = agronomic_windows.get(crop.lower())
+            if windows:
+                for w, (_, key) in enumerate(WINDOW_INPUTS):
+                    self.window_low[w, c], self.window_high[w, c] = windows[key]
+
+        self.index = {crop: c for c, crop in enumerate(self.crops)}
+
+    def score(self, farms: List[Dict[str, Any]], season: str,
+              crop_histories: Optional[List[Optional[List[Dict[str, Any]]]]] = None) -> np.ndarray:
+        """
+        Suitability of every crop for every farm.
+
+        Args:
+            farms: Farms with soil_type, irrigation_method, field_size and
+                optionally soil_ph, rainfall and temperature
+            season: Target season
+            crop_histories: Per farm, past crops ({"crop", "yield_per_acre"})
+
+        Returns:
+            Scores (farms, crops) in 0-1
+        """
+        if not farms:
+            return np.zeros((0, len(self.crops)))
+        weights = self.weights
+        soil_rows = np.array([self.soils.index(f.get("soil_type")) if f.get("soil_type") in self.soils else -1
+                              for f in farms], dtype=int)
+        soil_match = np.where(soil_rows[:, None] >= 0, self.soil_mask[np.maximum(soil_rows, 0)], False)
+        season_key = (season or "").lower()
+        season_match = (self.season_mask[self.seasons.index(season_key)] if season_key in self.seasons
+                        else np.zeros(len(self.crops), dtype=bool))
+        field_size = np.array([f.get("field_size", 1.0) for f in farms], dtype=float)
+        method_rows = np.array([self.methods.index(f.get("irrigation_method")) if f.get("irrigation_method") in self.methods
+                                else len(self.methods) for f in farms], dtype=int)
+
+        score = (weights["soil_type_weight"] * soil_match
+                 + weights["season_weight"] * season_match
+                 + weights["field_size_weight"] * (field_size[:, None] >= self.min_field_size)
+                 + weights["irrigation_weight"] * self.irrigation_matrix[method_rows])
+
+        if crop_histories is not None:
+            history, has_history = self._history_scores(crop_histories)
+            score += weights["history_weight"] * history * has_history[:, None]
+
+        score += self._window_adjustment(farms)
+        return np.clip(score, 0.0, 1.0)
+
+    def recommend(self, farms: List[Dict[str, Any]], season: str,
+                  crop_histories: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+                  top_k: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        Best crops for every farm.
+
+        Args:
+            farms: Farms (see score)
+            season: Target season
+            crop_histories: Per farm, past crops
+            top_k: Crops per farm
+
+        Returns:
+            Per farm, up to top_k (crop, score) pairs, best first
+        """
+        scores = self.score(farms, season, crop_histories)
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        return [[(self.crops[c], float(scores[f, c])) for c in order[f]] for f in range(len(farms))]
+
+    def _history_scores(self, crop_histories) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-crop history scores from one pass over each farm's history."""
+        totals = np.zeros((len(crop_histories), len(self.crops)))
+        counts = np.zeros_like(totals)
+        for f, history in enumerate(crop_histories):
+            for record in history or []:
+                c = self.index.get(record.get("crop"))
+                if c is not None and record.get("yield_per_acre"):
+                    totals[f, c] += record["yield_per_acre"]
+                    counts[f, c] += 1
+        average = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+        scores = np.where(counts > 0, HISTORY_SCORES[np.searchsorted(HISTORY_THRESHOLDS, average, side="left")],
+                          NEUTRAL_HISTORY_SCORE)
+        has_history = np.array([bool(history) for history in crop_histories])
+        return scores, has_history
+
+    def _window_adjustment(self, farms: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        +/- WINDOW_ADJUSTMENT by the share of provided pH, rainfall and
+        temperature values inside each crop's window (0 with nothing to check).
+        """
+        values = np.array([[f.get(name) if f.get(name) is not None else np.nan for name, _ in WINDOW_INPUTS]
+                           for f in farms], dtype=float)[:, :, None]  # (farms, inputs, 1)
+        checked = ~np.isnan(values) & ~np.isnan(self.window_low)
+        inside = checked & (values >= self.window_low) & (values <= self.window_high)
+        n_checked = checked.sum(axis=1)
+        share = np.divide(inside.sum(axis=1), n_checked, out=np.full(n_checked.shape, 0.5), where=n_checked > 0)
+        return (2 * share - 1) * WINDOW_ADJUSTMENT
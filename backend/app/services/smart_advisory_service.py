@@ -7,13 +7,26 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 import json
 import logging
 from pathlib import Path
 
+from app.core.config import settings
+from .advisory_cache import AdvisoryCache, content_key, normalize
+from .climatology import climatology
+from .market_analytics_store import market_analytics_store
+from .profit_simulator import ProfitSimulator
+from .rotation_planner import RotationPlanner, NoFeasibleRotationError
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_PREFERENCES = {
+    'profit_weight': 0.4,
+    'sustainability_weight': 0.3,
+    'risk_weight': 0.3
+}
+
 @dataclass
 class CropInfo:
     """Information about a specific crop for rotation planning."""
@@ -31,20 +44,36 @@ class CropInfo:
 
 @dataclass
 class RotationPlan:
-    """3-year crop rotation plan with optimization metrics."""
-    years: List[Dict[str, Any]]  # Year-by-year plan
+    """Multi-year crop rotation plan with optimization metrics."""
+    years: List[Dict[str, Any]]  # Crop-by-crop plan (year, season, crop)
     total_profit: float
     soil_health_score: float
     sustainability_index: float
     risk_assessment: Dict[str, float]
     recommendations: List[str]
+    score: float = 0.0
+    alternatives: List[Dict[str, Any]] = field(default_factory=list)  # Runner-up plans
 
 class CropRotationOptimizer:
-    """Intelligent crop rotation optimization for 3-year cycles."""
+    """Intelligent crop rotation optimization over 3-10 year horizons."""
     
     def __init__(self):
         self.crop_database = self._initialize_crop_database()
         self.rotation_rules = self._initialize_rotation_rules()
+        self.planner = RotationPlanner(self.crop_database, self.rotation_rules)
+        self.database_version = 0
+    
+    def set_crop_database(self, crop_database: Dict[str, CropInfo]) -> None:
+        """
+        Replace the crop database and rebuild the planner.
+        
+        Args:
+            crop_database: Crop name -> CropInfo
+        """
+        self.crop_database = crop_database
+        self.planner = RotationPlanner(self.crop_database, self.rotation_rules)
+        self.database_version += 1
+        logger.info(f"Crop database updated to v{self.database_version} ({len(crop_database)} crops)")
         
     def _initialize_crop_database(self) -> Dict[str, CropInfo]:
         """Initialize comprehensive crop database for Indian agriculture."""
@@ -181,32 +210,60 @@ class CropRotationOptimizer:
     
     def optimize_rotation(self, 
                          farm_conditions: Dict[str, Any],
-                         preferences: Dict[str, Any] = None) -> RotationPlan:
+                         preferences: Dict[str, Any] = None,
+                         years: int = 3,
+                         seasons: Optional[List[str]] = None,
+                         top_k: int = 1) -> RotationPlan:
         """
-        Optimize 3-year crop rotation plan.
+        Optimize a multi-year crop rotation plan.
         
         Args:
             farm_conditions: Soil type, climate, water availability, etc.
             preferences: Farmer preferences for risk, profit focus, etc.
+            years: Planning horizon (3-10 years)
+            seasons: Seasons to crop each year (Kharif, Rabi, Zaid); None plans
+                one crop per year
+            top_k: Number of plans to rank; the runners-up are returned as alternatives
             
         Returns:
-            RotationPlan with optimized 3-year sequence
+            RotationPlan with the best sequence and its alternatives
+            
+        Raises:
+            NoFeasibleRotationError: No suitable crop grows in the requested seasons
         """
         if preferences is None:
-            preferences = {
-                'profit_weight': 0.4,
-                'sustainability_weight': 0.3,
-                'risk_weight': 0.3
-            }
+            preferences = DEFAULT_PREFERENCES
         
         # Filter suitable crops based on farm conditions
         suitable_crops = self._filter_suitable_crops(farm_conditions)
         
-        # Generate and evaluate rotation combinations
-        best_rotation = self._evaluate_rotations(suitable_crops, farm_conditions, preferences)
+        # Search rotations over the planning horizon
+        plans = self.planner.plan(suitable_crops, farm_conditions, preferences, years, seasons, top_k)
+        if not plans and seasons:
+            raise NoFeasibleRotationError(f"No feasible rotation for the requested seasons: {', '.join(seasons)}")
+        if not plans:
+            # No sequence satisfies the rotation rules: fall back to the suitable crops in order
+            fallback = suitable_crops[:years] or list(self.crop_database)[:years]
+            plans = [{
+                'score': 0.0,
+                'slots': [
+                    {'year': year, 'season': self.crop_database[crop].season, 'crop': crop}
+                    for year, crop in enumerate(fallback, 1)
+                ]
+            }]
         
         # Create detailed rotation plan
-        rotation_plan = self._create_rotation_plan(best_rotation, farm_conditions)
+        rotation_plan = self._create_rotation_plan(plans[0]['slots'], farm_conditions)
+        rotation_plan.score = plans[0]['score']
+        rotation_plan.alternatives = [
+            {
+                'score': plan['score'],
+                'sequence': [f"{slot['crop']} ({slot['season']} Y{slot['year']})" for slot in plan['slots']],
+                'slots': plan['slots'],
+                'total_profit': sum(self.crop_database[slot['crop']].profit_per_hectare for slot in plan['slots'])
+            }
+            for plan in plans[1:]
+        ]
         
         return rotation_plan
     
@@ -228,149 +285,25 @@ class CropRotationOptimizer:
         
         return suitable
     
-    def _evaluate_rotations(self, 
-                          suitable_crops: List[str],
-                          farm_conditions: Dict[str, Any],
-                          preferences: Dict[str, Any]) -> List[str]:
-        """Evaluate different rotation combinations and select the best."""
-        from itertools import permutations
-        
-        # Generate 3-year rotation combinations
-        best_score = -1
-        best_rotation = []
-        
-        # Consider different crop combinations for 3 years
-        for rotation in permutations(suitable_crops, min(3, len(suitable_crops))):
-            if self._is_valid_rotation(rotation):
-                score = self._calculate_rotation_score(rotation, farm_conditions, preferences)
-                if score > best_score:
-                    best_score = score
-                    best_rotation = list(rotation)
-        
-        # If no 3-crop rotation, try 2-crop alternating
-        if not best_rotation and len(suitable_crops) >= 2:
-            for i, crop1 in enumerate(suitable_crops):
-                for crop2 in suitable_crops[i+1:]:
-                    rotation = [crop1, crop2, crop1]
-                    if self._is_valid_rotation(rotation):
-                        score = self._calculate_rotation_score(rotation, farm_conditions, preferences)
-                        if score > best_score:
-                            best_score = score
-                            best_rotation = rotation
-        
-        return best_rotation if best_rotation else suitable_crops[:3]
-    
-    def _is_valid_rotation(self, rotation: List[str]) -> bool:
-        """Check if rotation follows agronomic rules."""
-        rules = self.rotation_rules
-        
-        # Check minimum gap requirements
-        for i, crop in enumerate(rotation):
-            min_gap = rules['minimum_gap_years'].get(crop, 0)
-            if min_gap > 0:
-                # Check if same crop appears too soon
-                for j in range(i + 1, min(i + 1 + min_gap, len(rotation))):
-                    if j < len(rotation) and rotation[j] == crop:
-                        return False
-        
-        # Check family diversity
-        families = rules['avoid_same_family']
-        for family, crops in families.items():
-            family_count = sum(1 for crop in rotation if crop in crops)
-            if family_count > 2:  # Max 2 from same family in 3 years
-                return False
-        
-        return True
-    
-    def _calculate_rotation_score(self, 
-                                rotation: List[str],
-                                farm_conditions: Dict[str, Any],
-                                preferences: Dict[str, Any]) -> float:
-        """Calculate overall score for a rotation plan."""
-        
-        # Economic score
-        total_profit = sum(self.crop_database[crop].profit_per_hectare for crop in rotation)
-        avg_volatility = np.mean([self.crop_database[crop].market_volatility for crop in rotation])
-        economic_score = total_profit / 150000 * (1 - avg_volatility)  # Normalize to 0-1
-        
-        # Sustainability score
-        sustainability_score = self._calculate_sustainability_score(rotation)
-        
-        # Risk score
-        risk_score = self._calculate_risk_score(rotation, farm_conditions)
-        
-        # Weighted total score
-        total_score = (
-            preferences['profit_weight'] * economic_score +
-            preferences['sustainability_weight'] * sustainability_score +
-            preferences['risk_weight'] * (1 - risk_score)  # Lower risk is better
-        )
-        
-        return total_score
-    
     def _calculate_sustainability_score(self, rotation: List[str]) -> float:
         """Calculate sustainability score based on soil health and nutrient balance."""
-        
-        # Nutrient balance calculation
-        total_demand = {'N': 0, 'P': 0, 'K': 0}
-        total_contribution = {'N': 0, 'P': 0, 'K': 0}
-        
-        for crop in rotation:
-            crop_info = self.crop_database[crop]
-            for nutrient in ['N', 'P', 'K']:
-                total_demand[nutrient] += crop_info.nutrient_demand[nutrient]
-                total_contribution[nutrient] += crop_info.nutrient_contribution[nutrient]
-        
-        # Calculate nutrient balance (contribution/demand ratio)
-        nutrient_balance = np.mean([
-            min(total_contribution[n] / max(total_demand[n], 1), 1.0)
-            for n in ['N', 'P', 'K']
-        ])
-        
-        # Diversity bonus
-        diversity_score = len(set(rotation)) / 3.0
-        
-        # Soil improvement bonus
-        soil_improvement_crops = sum(1 for crop in rotation 
-                                   if crop in self.rotation_rules['soil_improvement_crops'])
-        soil_improvement_score = min(soil_improvement_crops / 3.0, 1.0)
-        
-        return 0.4 * nutrient_balance + 0.3 * diversity_score + 0.3 * soil_improvement_score
-    
-    def _calculate_risk_score(self, rotation: List[str], farm_conditions: Dict[str, Any]) -> float:
-        """Calculate risk score based on pest pressure, disease susceptibility, and climate."""
-        
-        # Pest and disease risk
-        avg_disease_resistance = np.mean([
-            self.crop_database[crop].disease_resistance for crop in rotation
-        ])
-        
-        # Market volatility risk
-        avg_volatility = np.mean([
-            self.crop_database[crop].market_volatility for crop in rotation
-        ])
-        
-        # Climate risk (simplified)
-        climate_risk = farm_conditions.get('climate_risk', 0.3)
-        
-        # Combine risks (lower is better)
-        risk_score = 0.4 * (1 - avg_disease_resistance) + 0.3 * avg_volatility + 0.3 * climate_risk
-        
-        return min(risk_score, 1.0)
+        return self.planner.sustainability_score([self.planner.index[crop] for crop in rotation])
     
-    def _create_rotation_plan(self, rotation: List[str], farm_conditions: Dict[str, Any]) -> RotationPlan:
-        """Create detailed rotation plan with year-by-year breakdown."""
+    def _create_rotation_plan(self, slots: List[Dict[str, Any]], farm_conditions: Dict[str, Any]) -> RotationPlan:
+        """Create detailed rotation plan with a crop-by-crop breakdown."""
         
         years = []
         cumulative_profit = 0
+        rotation = [slot['crop'] for slot in slots]
         
-        for year, crop in enumerate(rotation, 1):
+        for slot in slots:
+            crop, year = slot['crop'], slot['year']
             crop_info = self.crop_database[crop]
             
             year_plan = {
                 'year': year,
                 'crop': crop,
-                'season': crop_info.season,
+                'season': slot['season'],
                 'expected_profit': crop_info.profit_per_hectare,
                 'water_requirement': crop_info.water_requirement,
                 'nutrient_needs': crop_info.nutrient_demand,
@@ -455,6 +388,11 @@ class EconomicIntelligence:
     def __init__(self):
         self.market_data = self._initialize_market_data()
         self.cost_data = self._initialize_cost_data()
+        self.yield_data = self._initialize_yield_data()
+        self.simulator = ProfitSimulator(
+            n_scenarios=settings.SIMULATION_SCENARIOS,
+            seed=settings.SIMULATION_SEED
+        )
     
     def _initialize_market_data(self) -> Dict[str, Any]:
         """Initialize market price trends and predictions."""
@@ -482,6 +420,30 @@ class EconomicIntelligence:
                 'seasonal_variation': 0.25,
                 'trend': 'increasing',
                 'demand_forecast': 'high'
+            },
+            'chickpea': {
+                'current_price': 5400,
+                'seasonal_variation': 0.12,
+                'trend': 'stable',
+                'demand_forecast': 'high'
+            },
+            'soybean': {
+                'current_price': 4300,
+                'seasonal_variation': 0.18,
+                'trend': 'volatile',
+                'demand_forecast': 'increasing'
+            },
+            'mustard': {
+                'current_price': 5600,
+                'seasonal_variation': 0.10,
+                'trend': 'increasing',
+                'demand_forecast': 'stable'
+            },
+            'sugarcane': {
+                'current_price': 340,  # Fair and remunerative price
+                'seasonal_variation': 0.05,
+                'trend': 'stable',
+                'demand_forecast': 'stable'
             }
         }
     
@@ -491,60 +453,84 @@ class EconomicIntelligence:
             'rice': {'seed': 3000, 'fertilizer': 8000, 'pesticide': 4000, 'labor': 15000, 'other': 5000},
             'wheat': {'seed': 2500, 'fertilizer': 6000, 'pesticide': 3000, 'labor': 12000, 'other': 4000},
             'maize': {'seed': 2000, 'fertilizer': 5000, 'pesticide': 3500, 'labor': 10000, 'other': 3500},
-            'cotton': {'seed': 4000, 'fertilizer': 12000, 'pesticide': 8000, 'labor': 20000, 'other': 8000}
+            'cotton': {'seed': 4000, 'fertilizer': 12000, 'pesticide': 8000, 'labor': 20000, 'other': 8000},
+            'chickpea': {'seed': 4000, 'fertilizer': 3000, 'pesticide': 2500, 'labor': 9000, 'other': 3000},
+            'soybean': {'seed': 4500, 'fertilizer': 4000, 'pesticide': 3000, 'labor': 9000, 'other': 3000},
+            'mustard': {'seed': 800, 'fertilizer': 4500, 'pesticide': 2000, 'labor': 8000, 'other': 2500},
+            'sugarcane': {'seed': 25000, 'fertilizer': 15000, 'pesticide': 6000, 'labor': 60000, 'other': 20000}
+        }
+    
+    def _initialize_yield_data(self) -> Dict[str, Any]:
+        """Initialize expected yields (quintals per hectare) and their year-to-year variation."""
+        return {
+            'rice': {'mean': 30, 'cv': 0.20},
+            'wheat': {'mean': 28, 'cv': 0.15},
+            'maize': {'mean': 30, 'cv': 0.25},
+            'cotton': {'mean': 15, 'cv': 0.30},  # Seed cotton
+            'chickpea': {'mean': 10, 'cv': 0.25},
+            'soybean': {'mean': 12, 'cv': 0.25},
+            'mustard': {'mean': 11, 'cv': 0.20},
+            'sugarcane': {'mean': 700, 'cv': 0.15}
         }
     
-    def calculate_profit_projection(self, rotation_plan: RotationPlan) -> Dict[str, Any]:
-        """Calculate detailed profit projections for rotation plan."""
+    def _simulation_inputs(self, crop: str, price_samples: Optional[Dict[str, List[float]]] = None) -> Dict[str, Any]:
+        """Price, yield and cost parameters for one crop, with observed mandi prices where available."""
+        market_info = self.market_data.get(crop, {})
+        yield_info = self.yield_data.get(crop, {})
+        return {
+            'price_mean': market_info.get('current_price', 2000),
+            'price_cv': market_info.get('seasonal_variation', 0.15),
+            'price_history': (price_samples.get(crop, []) if price_samples is not None
+                              else market_analytics_store.get_price_samples(crop)),
+            'yield_mean': yield_info.get('mean', 20),
+            'yield_cv': yield_info.get('cv', 0.25),
+            'cost': sum(self.cost_data.get(crop, {}).values())
+        }
+    
+    def calculate_profit_projection(self, rotation_plan: RotationPlan,
+                                    price_samples: Optional[Dict[str, List[float]]] = None) -> Dict[str, Any]:
+        """
+        Calculate profit projections for a rotation plan by Monte Carlo simulation.
+        
+        The plan and its alternatives are simulated against the same scenarios,
+        so their profit distributions are directly comparable.
+        
+        Args:
+            rotation_plan: Rotation plan (with optional alternatives)
+            price_samples: Observed prices per crop; None reads the market analytics store
+            
+        Returns:
+            Per-crop projections (5th percentile / expected / 95th percentile
+            ranges), totals, ROI and risk analysis with VaR, CVaR and
+            probability of loss
+        """
+        plans = [rotation_plan.years] + [alt['slots'] for alt in rotation_plan.alternatives if alt.get('slots')]
+        crops = {slot['crop'] for plan in plans for slot in plan}
+        simulation = self.simulator.simulate(
+            plans, {crop: self._simulation_inputs(crop, price_samples) for crop in crops}
+        )
+        
         projections = []
         total_profit = 0
         total_cost = 0
         
-        for year_plan in rotation_plan.years:
+        for year_plan, slot in zip(rotation_plan.years, simulation['slots']):
             crop = year_plan['crop']
-            
-            # Calculate costs
             costs = self.cost_data.get(crop, {})
             year_cost = sum(costs.values())
+            profit_range = slot['profit_range']
             
-            # Calculate revenue with market variations
-            market_info = self.market_data.get(crop, {})
-            base_price = market_info.get('current_price', 2000)
-            seasonal_var = market_info.get('seasonal_variation', 0.15)
-            
-            # Simulate price variations
-            price_range = {
-                'min': base_price * (1 - seasonal_var),
-                'expected': base_price,
-                'max': base_price * (1 + seasonal_var)
-            }
-            
-            # Assume 40 quintals per hectare average yield
-            yield_per_hectare = 40
-            revenue_range = {
-                'min': price_range['min'] * yield_per_hectare,
-                'expected': price_range['expected'] * yield_per_hectare,
-                'max': price_range['max'] * yield_per_hectare
-            }
-            
-            profit_range = {
-                'min': revenue_range['min'] - year_cost,
-                'expected': revenue_range['expected'] - year_cost,
-                'max': revenue_range['max'] - year_cost
-            }
-            
-            year_projection = {
+            projections.append({
                 'year': year_plan['year'],
+                'season': year_plan.get('season'),
                 'crop': crop,
                 'costs': costs,
                 'total_cost': year_cost,
-                'price_range': price_range,
-                'revenue_range': revenue_range,
+                'price_range': slot['price_range'],
+                'revenue_range': slot['revenue_range'],
                 'profit_range': profit_range,
                 'roi': profit_range['expected'] / year_cost if year_cost > 0 else 0
-            }
-            
-            projections.append(year_projection)
+            })
             total_profit += profit_range['expected']
             total_cost += year_cost
         
@@ -553,46 +539,77 @@ class EconomicIntelligence:
             'total_profit_3year': total_profit,
             'total_cost_3year': total_cost,
             'average_roi': total_profit / total_cost if total_cost > 0 else 0,
-            'risk_analysis': self._analyze_economic_risk(projections)
+            'risk_analysis': self._analyze_economic_risk(projections, simulation, rotation_plan)
         }
     
-    def _analyze_economic_risk(self, projections: List[Dict]) -> Dict[str, Any]:
-        """Analyze economic risks in the rotation plan."""
-        profit_volatility = np.std([p['profit_range']['expected'] for p in projections])
-        avg_profit = np.mean([p['profit_range']['expected'] for p in projections])
+    def _analyze_economic_risk(self, projections: List[Dict], simulation: Dict[str, Any],
+                               rotation_plan: RotationPlan) -> Dict[str, Any]:
+        """Analyze economic risks in the rotation plan from its simulated profit distribution."""
+        if not simulation['plans']:
+            # Nothing was planted: no profit distribution to assess
+            return {
+                'volatility_score': 0.0,
+                'risk_level': 'Unknown',
+                'diversification_benefit': 0.0,
+                'expected_profit': 0.0,
+                'profit_percentiles': {},
+                'value_at_risk': 0.0,
+                'conditional_value_at_risk': 0.0,
+                'probability_of_loss': 0.0,
+                'confidence_level': simulation.get('confidence'),
+                'profit_distribution': {'bin_edges': [], 'counts': []},
+                'plan_comparison': [],
+                'scenarios': simulation.get('scenarios', 0),
+                'history_backed_crops': [],
+                'recommendations': ["No crops in the rotation plan - choose seasons with suitable crops"]
+            }
+        outcome = simulation['plans'][0]
+        expected = outcome['expected_profit']
         
-        risk_score = profit_volatility / avg_profit if avg_profit > 0 else 1.0
+        risk_score = outcome['std_profit'] / expected if expected > 0 else 1.0
+        
+        recommendations = [
+            "Consider crop insurance for high-value crops",
+            "Monitor market prices for optimal selling timing",
+            "Maintain emergency fund for input cost fluctuations"
+        ]
+        if outcome['probability_of_loss'] > 0.1:
+            recommendations.insert(0, f"{outcome['probability_of_loss']:.0%} chance of a net loss - "
+                                      "insure the crop and stagger input purchases")
         
         return {
             'volatility_score': min(risk_score, 1.0),
             'risk_level': 'High' if risk_score > 0.3 else 'Medium' if risk_score > 0.15 else 'Low',
-            'diversification_benefit': len(set(p['crop'] for p in projections)) / 3.0,
-            'recommendations': [
-                "Consider crop insurance for high-value crops",
-                "Monitor market prices for optimal selling timing",
-                "Maintain emergency fund for input cost fluctuations"
-            ]
+            'diversification_benefit': len(set(p['crop'] for p in projections)) / max(len(projections), 1),
+            'expected_profit': expected,
+            'profit_percentiles': outcome['percentiles'],
+            'value_at_risk': outcome['value_at_risk'],
+            'conditional_value_at_risk': outcome['conditional_value_at_risk'],
+            'probability_of_loss': outcome['probability_of_loss'],
+            'confidence_level': simulation['confidence'],
+            'profit_distribution': outcome['distribution'],
+            'plan_comparison': [
+                {
+                    'sequence': alt['sequence'] if i else [year['crop'] for year in rotation_plan.years],
+                    'expected_profit': result['expected_profit'],
+                    'value_at_risk': result['value_at_risk'],
+                    'conditional_value_at_risk': result['conditional_value_at_risk'],
+                    'probability_of_loss': result['probability_of_loss']
+                }
+                for i, (alt, result) in enumerate(zip([None] + rotation_plan.alternatives, simulation['plans']))
+            ],
+            'scenarios': simulation['scenarios'],
+            'history_backed_crops': simulation['history_backed_crops'],
+            'recommendations': recommendations
         }
 
 class ClimateAdaptationSystem:
     """Climate adaptation algorithms for weather resilience and risk mitigation."""
     
     def __init__(self):
-        self.climate_data = self._initialize_climate_data()
+        self.climatology = climatology
         self.adaptation_strategies = self._initialize_adaptation_strategies()
     
-    def _initialize_climate_data(self) -> Dict[str, Any]:
-        """Initialize climate patterns and risk data."""
-        return {
-            'jharkhand': {
-                'annual_rainfall': 1400,  # mm
-                'rainfall_variability': 0.25,
-                'temperature_trend': 'increasing',
-                'extreme_events': ['drought', 'flood', 'heatwave'],
-                'monsoon_reliability': 0.75
-            }
-        }
-    
     def _initialize_adaptation_strategies(self) -> Dict[str, List[str]]:
         """Initialize climate adaptation strategies."""
         return {
@@ -625,7 +642,8 @@ class ClimateAdaptationSystem:
     def assess_climate_risk(self, farm_location: str, rotation_plan: RotationPlan) -> Dict[str, Any]:
         """Assess climate risks and provide adaptation recommendations."""
         
-        climate_info = self.climate_data.get(farm_location.lower(), self.climate_data['jharkhand'])
+        # District traits, or state averages for regions
+        climate_info = self.climatology.climate_profile(farm_location)
         
         # Assess risks for each crop in rotation
         crop_risks = []
@@ -637,17 +655,21 @@ class ClimateAdaptationSystem:
             rainfall = climate_info['annual_rainfall']
             water_stress_risk = max(0, (water_req - rainfall) / water_req)
             
-            # Heat stress risk (simplified)
-            heat_stress_risk = 0.3 if climate_info['temperature_trend'] == 'increasing' else 0.1
-            
-            # Extreme event risk
-            extreme_risk = 0.4 if len(climate_info['extreme_events']) > 2 else 0.2
+            # Heat stress and extreme event risk of the crop's season
+            season_risk = self.climatology.season_risk(farm_location, year_plan.get('season'))
+            heat_stress_risk = season_risk['heat_stress_risk']
+            extreme_risk = season_risk['extreme_event_risk']
             
             overall_risk = (water_stress_risk + heat_stress_risk + extreme_risk) / 3
             
+            # Normals of the month the crop is sown in
+            planting = self.climatology.planting_normals(farm_location, year_plan.get('season'))
+            
             crop_risk = {
                 'year': year_plan['year'],
                 'crop': crop,
+                'planting_month': planting['month'] if planting else None,
+                'planting_conditions': planting,
                 'water_stress_risk': water_stress_risk,
                 'heat_stress_risk': heat_stress_risk,
                 'extreme_event_risk': extreme_risk,
@@ -728,25 +750,234 @@ class ClimateAdaptationSystem:
 class SmartAdvisoryService:
     """Comprehensive smart advisory service integrating all components."""
     
+    # Plans ranked for economic analysis, so runners-up are simulated alongside the best plan;
+    # every stage shares the plan ranked max(top_k, ECONOMIC_TOP_K) deep
+    ECONOMIC_TOP_K = 3
+    
+    # Farm fields that scale results but do not change them (projections are per hectare)
+    PER_FARM_FIELDS = ('farm_size',)
+    
     def __init__(self):
         self.rotation_optimizer = CropRotationOptimizer()
         self.economic_intelligence = EconomicIntelligence()
         self.climate_adaptation = ClimateAdaptationSystem()
+        self.cache = AdvisoryCache(
+            max_entries=settings.ADVISORY_CACHE_SIZE,
+            ttl=settings.ADVISORY_CACHE_TTL
+        )
+    
+    def _plan_request(self, farm_conditions: Dict[str, Any], preferences: Optional[Dict[str, Any]],
+                      years: int, seasons: Optional[List[str]], top_k: int) -> Tuple[str, Dict, Dict]:
+        """Normalized inputs of a rotation request and the content key of its shared plan."""
+        top_k = self._plan_top_k(top_k)
+        conditions = normalize({
+            name: value for name, value in farm_conditions.items() if name not in self.PER_FARM_FIELDS
+        })
+        weights = normalize(preferences if preferences is not None else DEFAULT_PREFERENCES)
+        key = content_key(
+            "rotation", conditions, weights, years, seasons, top_k,
+            self.rotation_optimizer.database_version
+        )
+        return key, conditions, weights
+    
+    def _plan_top_k(self, top_k: int) -> int:
+        """Plans ranked for a request, the same for every stage so they share one cached plan."""
+        return max(top_k, self.ECONOMIC_TOP_K)
+    
+    def _shared_plan(self, farm_conditions: Dict[str, Any], preferences: Optional[Dict[str, Any]],
+                     years: int, seasons: Optional[List[str]], top_k: int) -> Tuple[str, Dict, RotationPlan]:
+        """Content key, normalized conditions and the cached plan ranked _plan_top_k deep."""
+        key, conditions, weights = self._plan_request(farm_conditions, preferences, years, seasons, top_k)
+        plan_top_k = self._plan_top_k(top_k)
+        rotation_plan = self.cache.get_or_compute(
+            "rotation", key,
+            lambda: self.rotation_optimizer.optimize_rotation(conditions, weights, years, seasons, plan_top_k)
+        )
+        return key, conditions, rotation_plan
+    
+    def get_rotation_plan(self,
+                          farm_conditions: Dict[str, Any],
+                          preferences: Dict[str, Any] = None,
+                          years: int = 3,
+                          seasons: Optional[List[str]] = None,
+                          top_k: int = 1) -> RotationPlan:
+        """
+        Get the optimized rotation plan for a request, reusing a cached plan
+        for equivalent inputs.
+        
+        The plan is shared with the economic and climate stages, so it is
+        ranked max(top_k, ECONOMIC_TOP_K) deep and its alternatives are cut
+        to the requested top_k.
+        
+        Args:
+            farm_conditions: Soil type, climate, water availability, etc.
+            preferences: Farmer preferences (None uses the default weights)
+            years: Planning horizon (3-10 years)
+            seasons: Seasons to crop each year; None plans one crop per year
+            top_k: Number of plans to rank
+            
+        Returns:
+            Shared RotationPlan (do not mutate)
+        """
+        _, _, rotation_plan = self._shared_plan(farm_conditions, preferences, years, seasons, top_k)
+        if len(rotation_plan.alternatives) < top_k:
+            return rotation_plan
+        return replace(rotation_plan, alternatives=rotation_plan.alternatives[:top_k - 1])
+    
+    def get_economic_analysis(self,
+                              farm_conditions: Dict[str, Any],
+                              preferences: Dict[str, Any] = None,
+                              years: int = 3,
+                              seasons: Optional[List[str]] = None,
+                              top_k: int = 1) -> Dict[str, Any]:
+        """
+        Get the economic analysis of a request's rotation plan.
+        
+        The plan is ranked with at least ECONOMIC_TOP_K candidates so its
+        runners-up are simulated under the same scenarios. Results are cached
+        until the plan or the ingested mandi prices change.
+        
+        Args:
+            farm_conditions: Soil type, climate, water availability, etc.
+            preferences: Farmer preferences (None uses the default weights)
+            years: Planning horizon (3-10 years)
+            seasons: Seasons to crop each year; None plans one crop per year
+            top_k: Number of plans to rank
+            
+        Returns:
+            Shared profit projection (do not mutate)
+        """
+        plan_key, _, rotation_plan = self._shared_plan(farm_conditions, preferences, years, seasons, top_k)
+        return self.cache.get_or_compute(
+            "economic", self._stage_keys(plan_key)["economic"],
+            lambda: self.economic_intelligence.calculate_profit_projection(rotation_plan)
+        )
+    
+    def get_climate_analysis(self,
+                             farm_conditions: Dict[str, Any],
+                             preferences: Dict[str, Any] = None,
+                             years: int = 3,
+                             seasons: Optional[List[str]] = None,
+                             top_k: int = 1) -> Dict[str, Any]:
+        """
+        Get the climate risk assessment of a request's rotation plan.
+        
+        Args:
+            farm_conditions: Soil type, climate, water availability, etc.
+            preferences: Farmer preferences (None uses the default weights)
+            years: Planning horizon (3-10 years)
+            seasons: Seasons to crop each year; None plans one crop per year
+            top_k: Number of plans to rank
+            
+        Returns:
+            Shared climate analysis (do not mutate)
+        """
+        plan_key, conditions, rotation_plan = self._shared_plan(farm_conditions, preferences, years, seasons, top_k)
+        farm_location = conditions.get('location', 'jharkhand')
+        return self.cache.get_or_compute(
+            "climate", self._stage_keys(plan_key)["climate"],
+            lambda: self.climate_adaptation.assess_climate_risk(farm_location, rotation_plan)
+        )
+    
+    @staticmethod
+    def _stage_keys(plan_key: str) -> Dict[str, str]:
+        """Cache keys of every stage built on a rotation plan."""
+        return {
+            'rotation': plan_key,
+            'economic': content_key("economic", plan_key, market_analytics_store.data_version),
+            'climate': content_key("climate", plan_key)
+        }
+    
+    def advisory_profile(self,
+                         farm_conditions: Dict[str, Any],
+                         preferences: Dict[str, Any] = None,
+                         years: int = 3,
+                         seasons: Optional[List[str]] = None,
+                         top_k: int = 1) -> Dict[str, Any]:
+        """
+        Normalized inputs of a comprehensive advisory; farms with the same
+        profile key get identical (per hectare) advisories.
+        
+        Args:
+            farm_conditions: Soil type, climate, water availability, etc.
+            preferences: Farmer preferences (None uses the default weights)
+            years: Planning horizon (3-10 years)
+            seasons: Seasons to crop each year; None plans one crop per year
+            top_k: Number of plans to rank
+            
+        Returns:
+            Profile key, normalized conditions and preferences, and the plan parameters
+        """
+        key, conditions, weights = self._plan_request(farm_conditions, preferences, years, seasons, top_k)
+        return {
+            'key': key,
+            'farm_conditions': conditions,
+            'preferences': weights,
+            'years': years,
+            'seasons': seasons,
+            'top_k': self._plan_top_k(top_k)
+        }
+    
+    def get_cached_advisory(self, profile: Dict[str, Any]) -> Optional[Tuple[RotationPlan, Dict, Dict]]:
+        """Cached (rotation plan, economic analysis, climate analysis) of a profile, if all are cached."""
+        keys = self._stage_keys(profile['key'])
+        stages = []
+        for stage in ('rotation', 'economic', 'climate'):
+            value = self.cache.get(stage, keys[stage])
+            if value is None:
+                return None
+            stages.append(value)
+        return tuple(stages)
+    
+    def store_advisory(self, profile: Dict[str, Any], rotation_plan: RotationPlan,
+                       economic_analysis: Dict[str, Any], climate_analysis: Dict[str, Any]) -> None:
+        """Cache stage results computed elsewhere (e.g. in a worker process) for a profile."""
+        keys = self._stage_keys(profile['key'])
+        self.cache.set('rotation', keys['rotation'], rotation_plan)
+        self.cache.set('economic', keys['economic'], economic_analysis)
+        self.cache.set('climate', keys['climate'], climate_analysis)
+    
+    def invalidate_cache(self) -> int:
+        """
+        Drop every cached advisory result (e.g. after editing static market or climate data).
+        
+        Returns:
+            Number of entries removed
+        """
+        return self.cache.invalidate()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get advisory cache statistics with the data versions the keys depend on."""
+        return {
+            **self.cache.get_stats(),
+            "crop_database_version": self.rotation_optimizer.database_version,
+            "price_data_version": market_analytics_store.data_version
+        }
     
     def generate_comprehensive_advisory(self, 
                                       farm_conditions: Dict[str, Any],
-                                      preferences: Dict[str, Any] = None) -> Dict[str, Any]:
+                                      preferences: Dict[str, Any] = None,
+                                      years: int = 3,
+                                      seasons: Optional[List[str]] = None,
+                                      top_k: int = 1) -> Dict[str, Any]:
         """Generate comprehensive advisory covering all aspects."""
         
+        # All stages share one cached plan, ranked deeply enough for the economic comparison
+        
         # Generate optimal rotation plan
-        rotation_plan = self.rotation_optimizer.optimize_rotation(farm_conditions, preferences)
+        rotation_plan = self.get_rotation_plan(farm_conditions, preferences, years, seasons, top_k)
         
         # Calculate economic projections
-        economic_analysis = self.economic_intelligence.calculate_profit_projection(rotation_plan)
+        economic_analysis = self.get_economic_analysis(farm_conditions, preferences, years, seasons, top_k)
         
         # Assess climate risks and adaptations
-        farm_location = farm_conditions.get('location', 'jharkhand')
-        climate_analysis = self.climate_adaptation.assess_climate_risk(farm_location, rotation_plan)
+        climate_analysis = self.get_climate_analysis(farm_conditions, preferences, years, seasons, top_k)
+        
+        return self.assemble_advisory(rotation_plan, economic_analysis, climate_analysis)
+    
+    def assemble_advisory(self, rotation_plan: RotationPlan, economic_analysis: Dict[str, Any],
+                          climate_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine stage results into the comprehensive advisory."""
         
         # Generate integrated recommendations
         integrated_recommendations = self._generate_integrated_recommendations(
@@ -772,9 +1003,10 @@ class SmartAdvisoryService:
         recommendations = []
         
         # High-level strategy
+        horizon = max(year['year'] for year in rotation_plan.years)
         recommendations.append(
             f"Implement {' → '.join([year['crop'] for year in rotation_plan.years])} "
-            f"rotation for optimal balance of profit (₹{rotation_plan.total_profit:,.0f} over 3 years) "
+            f"rotation for optimal balance of profit (₹{rotation_plan.total_profit:,.0f} over {horizon} years) "
             f"and sustainability (score: {rotation_plan.soil_health_score:.2f})"
         )
         
@@ -807,9 +1039,10 @@ class SmartAdvisoryService:
                                economic_analysis: Dict,
                                climate_analysis: Dict) -> Dict[str, Any]:
         """Create executive summary of the advisory."""
+        horizon = max(year['year'] for year in rotation_plan.years)
         return {
-            'plan_overview': f"3-year rotation: {' → '.join([year['crop'] for year in rotation_plan.years])}",
-            'profit_potential': f"₹{rotation_plan.total_profit:,.0f} total, ₹{rotation_plan.total_profit/3:,.0f} annually",
+            'plan_overview': f"{horizon}-year rotation: {' → '.join([year['crop'] for year in rotation_plan.years])}",
+            'profit_potential': f"₹{rotation_plan.total_profit:,.0f} total, ₹{rotation_plan.total_profit/horizon:,.0f} annually",
             'sustainability_score': f"{rotation_plan.soil_health_score:.1%}",
             'risk_level': climate_analysis['crop_risks'][0]['risk_level'] if climate_analysis['crop_risks'] else 'Low',
             'key_benefits': [
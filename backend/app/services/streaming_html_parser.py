@@ -0,0 +1,350 @@
+"""
+Streaming HTML extraction for government portal scrapers.
+Parses response bytes incrementally with an event-based parser and only
+materializes the elements scrapers actually need (target tables, select
+dropdowns, hidden form inputs and optionally scripts), instead of building
+a full BeautifulSoup tree for every page.
+"""
+
+import codecs
+import logging
+from collections import deque
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Callable, Iterable, Iterator, AsyncIterator, NamedTuple, Pattern, Tuple, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class TableRow(NamedTuple):
+    """A single row emitted from a target table."""
+    table_index: int
+    row_index: int
+    cells: List[str]
+    table_attrs: Dict[str, str]
+
+    @property
+    def is_header(self) -> bool:
+        """First row of a table, treated as the header like the DOM scrapers did."""
+        return self.row_index == 0
+
+
+class PortalStreamParser(HTMLParser):
+    """
+    Event-based parser restricted to the elements portal scrapers read.
+
+    Always collects hidden ``<input>`` values and ``<select>`` options (both
+    small). Table rows are collected only for tables accepted by
+    ``table_filter`` and are queued as soon as each ``</tr>`` is seen, so
+    callers can drain them while the response is still downloading.
+    """
+
+    def __init__(self,
+                 table_filter: Optional[Callable[[Dict[str, str]], bool]] = None,
+                 capture_tables: bool = True,
+                 capture_scripts: bool = False,
+                 capture_links: bool = False,
+                 capture_text: bool = False):
+        """
+        Initialize the parser.
+
+        Args:
+            table_filter: Predicate over a ``<table>`` tag's attributes; None accepts every table
+            capture_tables: Whether to collect table rows at all
+            capture_scripts: Whether to collect inline ``<script>`` bodies
+            capture_links: Whether to collect ``<a href>`` values
+            capture_text: Whether to collect non-blank text nodes with their enclosing tag
+        """
+        super().__init__(convert_charrefs=True)
+        self.table_filter = table_filter
+        self.capture_tables = capture_tables
+        self.capture_scripts = capture_scripts
+        self.capture_links = capture_links
+        self.capture_text = capture_text
+
+        self.hidden_inputs: Dict[str, str] = {}
+        self.selects: Dict[str, List[Tuple[str, str]]] = {}
+        self.scripts: List[str] = []
+        self.links: List[str] = []
+        self.text_nodes: List[Tuple[str, str]] = []
+        self.status_code: Optional[int] = None
+        self.bytes_received = 0
+        self.rows_emitted = 0
+
+        self._rows: deque = deque()
+        self._decoder = None
+
+        # Table state: depth of every open <table> and the depth of the target being captured
+        self._table_depth = 0
+        self._target_depth: Optional[int] = None
+        self._table_count = 0
+        self._table_attrs: Dict[str, str] = {}
+        self._row_index = 0
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+        # Select/option state
+        self._select_name: Optional[str] = None
+        self._option_value: Optional[str] = None
+        self._option_text: Optional[List[str]] = None
+
+        # Script state
+        self._script: Optional[List[str]] = None
+        self._in_raw_text = False
+        self._last_tag = ''
+
+    # ------------------------------------------------------------------
+    # HTMLParser events
+    # ------------------------------------------------------------------
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attr_map = {k: (v or '') for k, v in attrs}
+        self._last_tag = tag
+
+        if tag in ('script', 'style'):
+            self._in_raw_text = True
+
+        if tag == 'a':
+            if self.capture_links and attr_map.get('href'):
+                self.links.append(attr_map['href'])
+        elif tag == 'input':
+            if attr_map.get('type', '').lower() == 'hidden' and attr_map.get('name'):
+                self.hidden_inputs[attr_map['name']] = attr_map.get('value', '')
+        elif tag == 'select':
+            self._select_name = attr_map.get('name', '')
+            self.selects.setdefault(self._select_name, [])
+        elif tag == 'option' and self._select_name is not None:
+            self._close_option()
+            self._option_value = attr_map.get('value')
+            self._option_text = []
+        elif tag == 'script' and self.capture_scripts:
+            self._script = []
+        elif tag == 'table':
+            self._table_depth += 1
+            if (self.capture_tables and self._target_depth is None
+                    and (self.table_filter is None or self.table_filter(attr_map))):
+                self._target_depth = self._table_depth
+                self._table_attrs = attr_map
+                self._row_index = 0
+        elif self._in_target():
+            if tag == 'tr':
+                self._close_row()
+                self._row = []
+            elif tag in ('td', 'th'):
+                self._close_cell()
+                if self._row is None:
+                    self._row = []
+                self._cell = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in ('script', 'style'):
+            self._in_raw_text = False
+
+        if tag == 'select':
+            self._close_option()
+            self._select_name = None
+        elif tag == 'option':
+            self._close_option()
+        elif tag == 'script' and self._script is not None:
+            self.scripts.append(''.join(self._script))
+            self._script = None
+        elif tag == 'table':
+            if self._target_depth is not None and self._table_depth == self._target_depth:
+                self._close_row()
+                self._target_depth = None
+                self._table_count += 1
+            self._table_depth = max(self._table_depth - 1, 0)
+        elif self._in_target():
+            if tag == 'tr':
+                self._close_row()
+            elif tag in ('td', 'th'):
+                self._close_cell()
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is not None:
+            self._cell.append(data)
+        elif self._option_text is not None:
+            self._option_text.append(data)
+        elif self._script is not None:
+            self._script.append(data)
+
+        if self.capture_text and not self._in_raw_text and data.strip():
+            self.text_nodes.append((self._last_tag, data.strip()))
+
+    def close(self) -> None:
+        if self._decoder is not None:
+            self.feed(self._decoder.decode(b'', final=True))
+        super().close()
+        self._close_row()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _in_target(self) -> bool:
+        return self._target_depth is not None and self._table_depth == self._target_depth
+
+    def _close_cell(self) -> None:
+        if self._cell is not None and self._row is not None:
+            self._row.append(''.join(self._cell))
+        self._cell = None
+
+    def _close_row(self) -> None:
+        self._close_cell()
+        if self._row:
+            self._rows.append(TableRow(self._table_count, self._row_index, self._row, self._table_attrs))
+            self._row_index += 1
+            self.rows_emitted += 1
+        self._row = None
+
+    def _close_option(self) -> None:
+        if self._option_text is not None and self._select_name is not None:
+            text = ''.join(self._option_text).strip()
+            value = self._option_value if self._option_value is not None else text
+            self.selects[self._select_name].append((value, text))
+        self._option_value = None
+        self._option_text = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def feed_chunk(self, chunk: Union[str, bytes], encoding: str = 'utf-8') -> None:
+        """Feed a chunk of the response, decoding bytes if needed."""
+        if isinstance(chunk, bytes):
+            self.bytes_received += len(chunk)
+            if self._decoder is None:
+                # Incremental decoder so multi-byte characters split across chunks survive
+                self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            chunk = self._decoder.decode(chunk)
+        else:
+            self.bytes_received += len(chunk)
+        self.feed(chunk)
+
+    def drain_rows(self) -> Iterator[TableRow]:
+        """Yield (and discard) every table row completed so far."""
+        while self._rows:
+            yield self._rows.popleft()
+
+    def find_select_options(self, name_pattern: Pattern) -> List[Tuple[str, str]]:
+        """
+        Get ``(value, text)`` options of every select whose name matches.
+
+        Args:
+            name_pattern: Compiled regex matched against the select's name
+
+        Returns:
+            Options in document order
+        """
+        options = []
+        for name, select_options in self.selects.items():
+            if name_pattern.match(name):
+                options.extend(select_options)
+        return options
+
+
+def text_context(text_nodes: List[Tuple[str, str]], index: int, window: int = 3) -> str:
+    """
+    Get the text surrounding a captured text node.
+
+    Stands in for ``element.parent.get_text()`` on DOM trees: the neighbouring
+    text nodes are where portals put the commodity label next to a price.
+    """
+    start = max(index - window, 0)
+    return ' '.join(text for _, text in text_nodes[start:index + window + 1])
+
+
+def iter_table_rows(chunks: Iterable[Union[str, bytes]], parser: PortalStreamParser) -> Iterator[TableRow]:
+    """
+    Parse an iterable of response chunks and yield table rows as they complete.
+
+    Args:
+        chunks: Response body chunks (bytes or text)
+        parser: Parser configured with the target table filter
+
+    Yields:
+        Table rows in document order
+    """
+    for chunk in chunks:
+        parser.feed_chunk(chunk)
+        yield from parser.drain_rows()
+    parser.close()
+    yield from parser.drain_rows()
+
+
+async def stream_table_rows(client: httpx.AsyncClient,
+                            method: str,
+                            url: str,
+                            parser: PortalStreamParser,
+                            **kwargs) -> AsyncIterator[TableRow]:
+    """
+    Stream a request and yield table rows while the body is still downloading.
+
+    The response status is recorded on ``parser.status_code``; non-200
+    responses are not parsed and yield nothing.
+
+    Args:
+        client: HTTP client to issue the request with
+        method: HTTP method
+        url: Request URL
+        parser: Parser configured with the target table filter
+        **kwargs: Extra arguments for ``client.stream`` (data, params, ...)
+
+    Yields:
+        Table rows in document order
+    """
+    async with client.stream(method, url, **kwargs) as response:
+        parser.status_code = response.status_code
+        if response.status_code != 200:
+            return
+
+        async for text in response.aiter_text():
+            parser.feed_chunk(text)
+            for row in parser.drain_rows():
+                yield row
+
+        parser.close()
+        for row in parser.drain_rows():
+            yield row
+
+
+async def stream_parse(client: httpx.AsyncClient,
+                       method: str,
+                       url: str,
+                       parser: PortalStreamParser,
+                       **kwargs) -> List[TableRow]:
+    """
+    Stream a request through the parser and collect all emitted table rows.
+
+    Useful for form pages where only hidden inputs and selects are needed
+    (pass ``capture_tables=False`` to the parser).
+
+    Returns:
+        Collected table rows (empty when tables are not captured)
+    """
+    return [row async for row in stream_table_rows(client, method, url, parser, **kwargs)]
+
+
+def group_rows_by_table(rows: Iterable[TableRow]) -> Dict[int, List[List[str]]]:
+    """Group emitted rows by table, preserving order."""
+    tables: Dict[int, List[List[str]]] = {}
+    for row in rows:
+        tables.setdefault(row.table_index, []).append(row.cells)
+    return tables
+
+
+def parse_html(html: Union[str, bytes], parser: PortalStreamParser, chunk_size: int = 65536) -> List[TableRow]:
+    """
+    Parse an already downloaded document without building a DOM.
+
+    Args:
+        html: Document text or bytes
+        parser: Parser to feed
+        chunk_size: Size of the slices fed to the parser
+
+    Returns:
+        All emitted table rows
+    """
+    chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+    return list(iter_table_rows(chunks, parser))
@@ -1,75 +1,322 @@
 """
 Sustainability Service for calculating environmental impact metrics.
+All six dashboard panels (score, carbon footprint, water efficiency, soil
+health, biodiversity, recommendations) come from one farm profile computed in
+a single pass over the crop history and cached per farm.
 """
 
-from typing import Dict, Any, List
+import math
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+from app.core.config import settings
+from .cache_service import MarketDataCache
+
 logger = logging.getLogger(__name__)
 
+# Per crop, per acre and season: family, nitrogen applied (kg N), water need (mm),
+# paddy methane (kg CO2e)
+CROP_FACTORS: Dict[str, Tuple[str, float, float, float]] = {
+    "Rice": ("cereal", 40, 1200, 520),
+    "Wheat": ("cereal", 48, 450, 0),
+    "Maize": ("cereal", 48, 500, 0),
+    "Finger Millet": ("millet", 16, 350, 0),
+    "Arhar": ("legume", 8, 400, 0),
+    "Moong": ("legume", 8, 300, 0),
+    "Urad": ("legume", 8, 300, 0),
+    "Lathyrus": ("legume", 6, 250, 0),
+    "Groundnut": ("legume", 10, 500, 0),
+    "Sesame": ("oilseed", 16, 300, 0),
+    "Niger": ("oilseed", 8, 300, 0),
+    "Sugarcane": ("cash", 100, 1800, 0),
+    "Jute": ("fibre", 24, 500, 0),
+    "Mesta": ("fibre", 20, 450, 0),
+    "Cotton": ("fibre", 40, 700, 0),
+    "Tobacco": ("cash", 40, 500, 0),
+    "Potato": ("tuber", 60, 500, 0),
+    "Sweet Potato": ("tuber", 24, 400, 0),
+    "Onion": ("vegetable", 40, 450, 0),
+    "Garlic": ("vegetable", 40, 400, 0),
+    "Tomato": ("vegetable", 48, 550, 0),
+    "Brinjal": ("vegetable", 48, 600, 0),
+    "Okra": ("vegetable", 40, 450, 0),
+    "Bottle Gourd": ("vegetable", 32, 450, 0),
+    "Bitter Gourd": ("vegetable", 32, 450, 0),
+    "Cucumber": ("vegetable", 32, 400, 0),
+    "Watermelon": ("vegetable", 32, 450, 0),
+    "Mango": ("fruit", 30, 800, 0),
+    "Litchi": ("fruit", 30, 900, 0),
+    "Guava": ("fruit", 24, 700, 0),
+    "Papaya": ("fruit", 60, 1200, 0),
+}
+DEFAULT_FACTORS = ("other", 30, 500, 0)
+
+# Share of applied water reaching the root zone; None = rain-fed (no applied water)
+IRRIGATION_EFFICIENCY = {
+    "Rain-fed": None,
+    "Drip irrigation": 0.9,
+    "Sprinkler irrigation": 0.75,
+    "Tube well": 0.5,
+    "Dug well": 0.5,
+    "Canal": 0.45,
+    "Tank": 0.5,
+    "River": 0.45,
+}
+PUMPED_SOURCES = ("Tube well", "Dug well", "Drip irrigation", "Sprinkler irrigation")
+
+# Soil baseline for the soil health score (organic matter and structure)
+SOIL_BASELINE = {
+    "Loamy Soil": 7.0, "Alluvial Soil": 7.0, "Black Soil": 6.5, "Clay Soil": 6.0,
+    "Red Soil": 5.0, "Laterite Soil": 4.5, "Sandy Soil": 4.0,
+}
+
+KG_CO2E_PER_KG_N = 10.0          # fertiliser manufacture + field N2O
+KG_CO2E_MACHINERY = 60.0         # tillage, harvest and transport per acre-season
+KG_CO2E_PER_MM_PUMPED = 0.18     # grid electricity to lift 1 mm over one acre
+M3_PER_MM_ACRE = 4.047
+
+# Profiles by farm id, each stored with the fingerprint of the inputs it was built from;
+# dropped by DatabaseService when the farm or its crop history is written
+_profile_cache = MarketDataCache(max_entries=settings.SUSTAINABILITY_CACHE_MAX_ENTRIES)
+
+
+def _clamp(value: float, low: float = 0.0, high: float = 10.0) -> float:
+    return max(low, min(high, value))
+
+
+def _fingerprint(farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> int:
+    """Identity of everything the profile depends on; changes whenever the farm or its history does."""
+    return hash((
+        farm.get("soil_type"), farm.get("irrigation_method"), farm.get("field_size"),
+        tuple((e.get("id"), e.get("crop"), e.get("season"), e.get("year"), e.get("yield_per_acre")) for e in crop_history)
+    ))
+
 
 class SustainabilityService:
     """
     Service for sustainability metrics and recommendations.
     """
-    
+
     def __init__(self):
         pass
-    
-    async def calculate_sustainability_score(self, farm_id: str) -> Dict[str, Any]:
-        """Calculate overall sustainability score for a farm."""
-        # Mock sustainability calculation
-        return {
-            "overall_score": 7.2,
-            "carbon_footprint": 2.1,  # tons CO2 equivalent
-            "water_efficiency": 8.5,
-            "soil_health": 6.8,
-            "biodiversity_index": 7.9
+
+    def compute_profile(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compute every sustainability panel in one pass over the crop history.
+
+        Args:
+            farm: Farm record
+            crop_history: Crop history entries, newest first
+
+        Returns:
+            Profile with score, carbon_footprint, water_efficiency, soil_health,
+            biodiversity and recommendations sections
+        """
+        field_size = float(farm.get("field_size") or 1.0)
+        irrigation = farm.get("irrigation_method") or "Rain-fed"
+        efficiency = IRRIGATION_EFFICIENCY.get(irrigation, 0.5)
+        pumped = irrigation in PUMPED_SOURCES
+
+        crops: Counter = Counter()
+        families: Counter = Counter()
+        nitrogen = water = methane = 0.0
+        repeats: List[str] = []
+        seasons_by_year: Counter = Counter()
+        previous_crop = None
+        for entry in crop_history:
+            crop = entry.get("crop") or "Unknown"
+            family, n_kg, water_mm, ch4 = CROP_FACTORS.get(crop, DEFAULT_FACTORS)
+            crops[crop] += 1
+            families[family] += 1
+            nitrogen += n_kg
+            water += water_mm
+            methane += ch4
+            if crop == previous_crop:
+                repeats.append(crop)
+            previous_crop = crop
+            if entry.get("year"):
+                seasons_by_year[entry["year"]] += 1
+
+        entries = len(crop_history)
+        if not entries:
+            # No history yet: profile the region's default crop mix
+            _, nitrogen, water, methane = DEFAULT_FACTORS
+        n = max(entries, 1)
+        avg_nitrogen, avg_water, avg_methane = nitrogen / n, water / n, methane / n
+        seasons_per_year = (sum(seasons_by_year.values()) / len(seasons_by_year)) if seasons_by_year else 1.0
+
+        # Carbon: kg CO2e per acre and season
+        pumping = avg_water * KG_CO2E_PER_MM_PUMPED if pumped else 0.0
+        per_acre = {
+            "fertilizers": avg_nitrogen * KG_CO2E_PER_KG_N,
+            "machinery": KG_CO2E_MACHINERY,
+            "paddy_methane": avg_methane,
+            "irrigation_energy": pumping
         }
-    
-    async def get_carbon_footprint(self, farm_id: str) -> Dict[str, Any]:
-        """Calculate carbon footprint."""
-        return {
-            "total_emissions": 2.1,
-            "emissions_per_hectare": 0.85,
-            "breakdown": {
-                "fertilizers": 1.2,
-                "machinery": 0.6,
-                "transportation": 0.3
-            }
+        per_acre_total = sum(per_acre.values())
+        annual_tonnes = per_acre_total * field_size * seasons_per_year / 1000
+        carbon_score = _clamp(10 * (1 - (per_acre_total - 150) / 1200))
+        carbon = {
+            "total_emissions": round(annual_tonnes, 2),  # t CO2e per year
+            "emissions_per_acre": round(per_acre_total / 1000, 3),  # t CO2e per season
+            "breakdown": {source: round(value * field_size * seasons_per_year / 1000, 3) for source, value in per_acre.items()},
+            "score": round(carbon_score, 1)
         }
-    
-    async def get_water_efficiency(self, farm_id: str) -> Dict[str, Any]:
-        """Calculate water usage efficiency."""
-        return {
-            "efficiency_score": 8.5,
-            "water_usage": 450,  # liters per kg of produce
-            "recommendations": [
-                "Consider drip irrigation",
-                "Implement rainwater harvesting",
-                "Use mulching to reduce evaporation"
-            ]
+
+        # Water: application efficiency and crop water intensity
+        intensity = min(avg_water / 1000, 1.5) / 1.5
+        water_score = _clamp(10 * (0.6 * (efficiency if efficiency is not None else 0.8) + 0.4 * (1 - intensity)))
+        applied_m3 = avg_water * M3_PER_MM_ACRE / efficiency if efficiency else 0.0
+        water_efficiency = {
+            "efficiency_score": round(water_score, 1),
+            "irrigation_method": irrigation,
+            "application_efficiency": efficiency,
+            "crop_water_need_mm": round(avg_water),
+            "water_usage": round(applied_m3 * field_size * seasons_per_year),  # m3 applied per year
+            "rain_fed": efficiency is None
         }
-    
-    async def get_sustainability_recommendations(self, farm_id: str) -> List[Dict[str, Any]]:
-        """Get sustainability improvement recommendations."""
-        return [
-            {
-                "category": "Carbon Reduction",
-                "recommendation": "Switch to organic fertilizers",
-                "impact": "High",
-                "effort": "Medium"
-            },
-            {
-                "category": "Water Conservation", 
-                "recommendation": "Install drip irrigation system",
-                "impact": "High",
-                "effort": "High"
+
+        # Soil: baseline by soil type, improved by legumes and rotation, degraded by monocropping and heavy feeders
+        legume_share = families["legume"] / entries if entries else 0.0
+        rotation_diversity = len(crops) / entries if entries else 0.0
+        repeat_share = len(repeats) / max(entries - 1, 1) if entries > 1 else 0.0
+        heavy_share = sum(count for crop, count in crops.items()
+                          if CROP_FACTORS.get(crop, DEFAULT_FACTORS)[1] >= 48) / entries if entries else 0.0
+        soil_score = _clamp(
+            SOIL_BASELINE.get(farm.get("soil_type"), 5.5)
+            + 3 * legume_share + 1.5 * rotation_diversity - 3 * repeat_share - 1.5 * heavy_share
+        )
+        soil_health = {
+            "soil_health_score": round(soil_score, 1),
+            "soil_type": farm.get("soil_type"),
+            "legume_share": round(legume_share, 2),
+            "rotation_diversity": round(rotation_diversity, 2),
+            "consecutive_repeats": len(repeats),
+            "nitrogen_per_acre": round(avg_nitrogen, 1)
+        }
+
+        # Biodiversity: Shannon diversity of crops plus the number of crop families
+        shannon = -sum((count / entries) * math.log(count / entries) for count in crops.values()) if entries else 0.0
+        biodiversity_index = _clamp(10 * (0.6 * min(shannon / math.log(6), 1) + 0.4 * min(len(families) / 5, 1)))
+        biodiversity = {
+            "biodiversity_index": round(biodiversity_index, 1),
+            "distinct_crops": len(crops),
+            "crop_families": sorted(families),
+            "shannon_diversity": round(shannon, 3),
+            "perennial_crops": families["fruit"]
+        }
+
+        overall = 0.25 * carbon_score + 0.25 * water_score + 0.3 * soil_score + 0.2 * biodiversity_index
+        profile = {
+            "farm_id": farm.get("id"),
+            "based_on_entries": entries,
+            "generated_at": datetime.now().isoformat(),
+            "score": {
+                "overall_score": round(overall, 1),
+                "carbon_footprint": carbon["total_emissions"],
+                "carbon_score": carbon["score"],
+                "water_efficiency": water_efficiency["efficiency_score"],
+                "soil_health": soil_health["soil_health_score"],
+                "biodiversity_index": biodiversity["biodiversity_index"]
             },
-            {
-                "category": "Soil Health",
-                "recommendation": "Practice crop rotation",
-                "impact": "Medium",
-                "effort": "Low"
-            }
-        ]
\ No newline at end of file
+            "carbon_footprint": carbon,
+            "water_efficiency": water_efficiency,
+            "soil_health": soil_health,
+            "biodiversity": biodiversity
+        }
+        profile["recommendations"] = self._recommendations(profile, crops, repeats, irrigation)
+        water_efficiency["recommendations"] = [
+            r["recommendation"] for r in profile["recommendations"] if r["category"] == "Water Conservation"
+        ]
+        return profile
+
+    def _recommendations(self, profile: Dict[str, Any], crops: Counter, repeats: List[str],
+                         irrigation: str) -> List[Dict[str, Any]]:
+        """Turn the profile's weak points into prioritised actions."""
+        entries = profile["based_on_entries"]
+        soil, water = profile["soil_health"], profile["water_efficiency"]
+        actions = []
+
+        def add(category, recommendation, impact, effort):
+            actions.append({"category": category, "recommendation": recommendation, "impact": impact, "effort": effort})
+
+        if not entries:
+            add("Data", "Record your crop history to get farm-specific sustainability advice", "High", "Low")
+        if entries and crops["Rice"] / entries > 0.5:
+            add("Carbon Reduction", "Use alternate wetting and drying in paddy to cut methane and water use", "High", "Low")
+        if soil["nitrogen_per_acre"] >= 45:
+            add("Carbon Reduction", "Apply nitrogen in split doses based on a soil test", "Medium", "Low")
+        if water["application_efficiency"] is not None and water["application_efficiency"] < 0.7:
+            add("Water Conservation", f"Move from {irrigation.lower()} flooding to drip or sprinkler irrigation", "High", "High")
+        if water["rain_fed"]:
+            add("Water Conservation", "Build a farm pond to harvest monsoon runoff for a rabi crop", "Medium", "Medium")
+        if water["crop_water_need_mm"] > 800:
+            add("Water Conservation", "Replace part of the water-intensive area with millets or pulses", "Medium", "Medium")
+        if soil["legume_share"] < 0.2:
+            add("Soil Health", "Add a pulse (Arhar, Moong or Urad) to the rotation to fix nitrogen", "High", "Low")
+        if repeats:
+            add("Soil Health", f"Rotate crops: {Counter(repeats).most_common(1)[0][0]} was grown in consecutive seasons", "Medium", "Low")
+        if profile["biodiversity"]["distinct_crops"] < 3:
+            add("Biodiversity", "Diversify with an oilseed or vegetable crop, or intercrop field borders", "Medium", "Medium")
+        if not actions:
+            add("Soil Health", "Keep crop residues as mulch to build organic matter", "Medium", "Low")
+        return actions
+
+    async def get_profile(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Get the farm's sustainability profile, computing it only when the farm
+        or its crop history changed since it was cached.
+
+        Args:
+            farm: Farm record
+            crop_history: Crop history entries, newest first
+
+        Returns:
+            Sustainability profile
+        """
+        key = f"sustainability:{farm['id']}"
+        fingerprint = _fingerprint(farm, crop_history)
+        cached = _profile_cache.get(key)
+        if cached and cached["fingerprint"] == fingerprint:
+            return cached["profile"]
+
+        profile = self.compute_profile(farm, crop_history)
+        _profile_cache.set(key, {"fingerprint": fingerprint, "profile": profile}, ttl=settings.SUSTAINABILITY_CACHE_TTL)
+        return profile
+
+    async def calculate_sustainability_score(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate overall sustainability score for a farm."""
+        return (await self.get_profile(farm, crop_history))["score"]
+
+    async def calculate_carbon_footprint(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate carbon footprint."""
+        return (await self.get_profile(farm, crop_history))["carbon_footprint"]
+
+    async def calculate_water_efficiency(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate water usage efficiency."""
+        return (await self.get_profile(farm, crop_history))["water_efficiency"]
+
+    async def assess_soil_health(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assess soil health."""
+        return (await self.get_profile(farm, crop_history))["soil_health"]
+
+    async def calculate_biodiversity_score(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate biodiversity impact."""
+        return (await self.get_profile(farm, crop_history))["biodiversity"]
+
+    async def get_sustainability_recommendations(self, farm: Dict[str, Any], crop_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get sustainability improvement recommendations."""
+        return (await self.get_profile(farm, crop_history))["recommendations"]
+
+    @staticmethod
+    def invalidate(farm_id: Optional[str]) -> None:
+        """Drop a farm's cached profile."""
+        if farm_id:
+            _profile_cache.invalidate_key(f"sustainability:{farm_id}")
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """Get profile cache statistics."""
+        return _profile_cache.get_cache_stats()
@@ -0,0 +1,297 @@
+"""
+Upstream health tracking for government portal scrapers.
+Per-source circuit breakers (closed/open/half-open) with timeouts derived
+from recent latency percentiles, so a portal that is down fails fast
+instead of costing every request a full 30 s timeout.
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the source's breaker is open."""
+
+    def __init__(self, source: str, retry_in: float):
+        self.source = source
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {source}, retry in {retry_in:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with adaptive timeout for a single upstream source.
+
+    - closed: requests flow; consecutive failures beyond the threshold open the breaker
+    - open: requests are rejected immediately until the cooldown elapses
+    - half_open: a limited number of trial requests probe the source; success closes,
+      failure re-opens with a longer cooldown
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 source: str,
+                 failure_threshold: int = 3,
+                 cooldown: float = 30.0,
+                 max_cooldown: float = 300.0,
+                 half_open_max_calls: int = 1,
+                 default_timeout: float = 30.0,
+                 min_timeout: float = 2.0,
+                 max_timeout: float = 30.0,
+                 timeout_multiplier: float = 2.0,
+                 latency_window: int = 50):
+        """
+        Initialize the breaker.
+
+        Args:
+            source: Upstream source name
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown: Initial seconds to stay open before probing
+            max_cooldown: Upper bound for the exponential cooldown backoff
+            half_open_max_calls: Concurrent trial requests allowed while half-open
+            default_timeout: Timeout used until enough latency samples exist
+            min_timeout: Lower bound for the adaptive timeout
+            max_timeout: Upper bound for the adaptive timeout
+            timeout_multiplier: Adaptive timeout = p95 latency x multiplier
+            latency_window: Number of recent successful latencies kept
+        """
+        self.source = source
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._cooldown = cooldown
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._latencies: deque = deque(maxlen=latency_window)
+
+        # Counters exported as metrics
+        self._successes = 0
+        self._failures = 0
+        self._rejections = 0
+        self._state_changes = 0
+        self._last_failure: Optional[str] = None
+        self._last_state_change = time.time()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open -> half_open once the cooldown has elapsed."""
+        if self._state == self.OPEN and self._opened_at is not None:
+            if time.monotonic() - self._opened_at >= self._cooldown:
+                self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, new_state: str) -> None:
+        if new_state == self._state:
+            return
+        logger.info(f"Circuit breaker for {self.source}: {self._state} -> {new_state}")
+        self._state = new_state
+        self._state_changes += 1
+        self._last_state_change = time.time()
+        if new_state == self.OPEN:
+            self._opened_at = time.monotonic()
+        elif new_state == self.HALF_OPEN:
+            self._half_open_in_flight = 0
+        elif new_state == self.CLOSED:
+            self._opened_at = None
+            self._cooldown = self.base_cooldown
+            self._consecutive_failures = 0
+
+    def is_open(self) -> bool:
+        """Check (without reserving a trial slot) whether requests would be rejected."""
+        state = self.state
+        if state == self.OPEN:
+            return True
+        return state == self.HALF_OPEN and self._half_open_in_flight >= self.half_open_max_calls
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will allow a probe."""
+        if self._state != self.OPEN or self._opened_at is None:
+            return 0.0
+        return max(0.0, self._cooldown - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """
+        Reserve permission for a request.
+
+        Returns:
+            True if the request may proceed; callers must then record its outcome
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+            self._half_open_in_flight += 1
+            return True
+        self._rejections += 1
+        return False
+
+    def check(self) -> None:
+        """Reserve permission or raise CircuitOpenError."""
+        if not self.allow_request():
+            raise CircuitOpenError(self.source, self.retry_in())
+
+    # ------------------------------------------------------------------
+    # Outcomes
+    # ------------------------------------------------------------------
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful upstream call and its latency in seconds."""
+        self._successes += 1
+        self._latencies.append(latency)
+        self._consecutive_failures = 0
+        if self._state == self.HALF_OPEN:
+            self._transition(self.CLOSED)
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        """Record a failed upstream call (network error, timeout or 5xx)."""
+        self._failures += 1
+        self._consecutive_failures += 1
+        self._last_failure = f"{type(error).__name__}: {error}" if error else "failure"
+
+        if self._state == self.HALF_OPEN:
+            # Probe failed: back off exponentially before the next probe
+            self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            self._transition(self.OPEN)
+            self._opened_at = time.monotonic()
+        elif self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    # ------------------------------------------------------------------
+    # Adaptive timeout
+    # ------------------------------------------------------------------
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Percentile of recent successful latencies in seconds, if any samples exist."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def current_timeout(self) -> float:
+        """Timeout for the next call, derived from the recent p95 latency."""
+        if len(self._latencies) < 5:
+            return self.default_timeout
+        p95 = self.latency_percentile(95)
+        return round(min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_multiplier)), 2)
+
+    def reset(self) -> None:
+        """Force the breaker closed and clear latency history."""
+        self._transition(self.CLOSED)
+        self._latencies.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters."""
+        p50, p95 = self.latency_percentile(50), self.latency_percentile(95)
+        return {
+            "source": self.source,
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "successes": self._successes,
+            "failures": self._failures,
+            "rejections": self._rejections,
+            "state_changes": self._state_changes,
+            "retry_in_s": round(self.retry_in(), 1),
+            "cooldown_s": self._cooldown,
+            "timeout_s": self.current_timeout(),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "latency_samples": len(self._latencies),
+            "last_failure": self._last_failure,
+            "last_state_change": self._last_state_change,
+        }
+
+
+class UpstreamHealthRegistry:
+    """Process-wide registry of circuit breakers, one per upstream source."""
+
+    STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, source: str) -> CircuitBreaker:
+        """Get (creating on first use) the breaker for a source."""
+        if source not in self._breakers:
+            self._breakers[source] = CircuitBreaker(source)
+        return self._breakers[source]
+
+    def sources(self) -> List[str]:
+        """Names of all tracked sources."""
+        return sorted(self._breakers)
+
+    def reset(self, source: Optional[str] = None) -> int:
+        """
+        Reset one or all breakers.
+
+        Returns:
+            Number of breakers reset
+        """
+        targets = [self._breakers[source]] if source in self._breakers else (
+            [] if source else list(self._breakers.values())
+        )
+        for breaker in targets:
+            breaker.reset()
+        return len(targets)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the state of every breaker."""
+        return {source: self._breakers[source].get_stats() for source in self.sources()}
+
+    def render_metrics(self) -> str:
+        """Render breaker state in Prometheus text exposition format."""
+        lines = [
+            "# HELP upstream_circuit_state Circuit breaker state (0=closed, 1=half_open, 2=open)",
+            "# TYPE upstream_circuit_state gauge",
+        ]
+        stats = self.get_stats()
+        for source, s in stats.items():
+            lines.append(f'upstream_circuit_state{{source="{source}"}} {self.STATE_VALUES[s["state"]]}')
+
+        for metric, key, help_text in [
+            ("upstream_requests_success_total", "successes", "Successful upstream calls"),
+            ("upstream_requests_failure_total", "failures", "Failed upstream calls"),
+            ("upstream_requests_rejected_total", "rejections", "Calls rejected by an open breaker"),
+            ("upstream_circuit_state_changes_total", "state_changes", "Breaker state transitions"),
+        ]:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for source, s in stats.items():
+                lines.append(f'{metric}{{source="{source}"}} {s[key]}')
+
+        lines.append("# HELP upstream_timeout_seconds Adaptive timeout applied to the next call")
+        lines.append("# TYPE upstream_timeout_seconds gauge")
+        for source, s in stats.items():
+            lines.append(f'upstream_timeout_seconds{{source="{source}"}} {s["timeout_s"]}')
+
+        lines.append("# HELP upstream_latency_p95_seconds p95 latency of recent successful calls")
+        lines.append("# TYPE upstream_latency_p95_seconds gauge")
+        for source, s in stats.items():
+            if s["latency_p95_ms"] is not None:
+                lines.append(f'upstream_latency_p95_seconds{{source="{source}"}} {s["latency_p95_ms"] / 1000}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Global registry instance
+upstream_health = UpstreamHealthRegistry()
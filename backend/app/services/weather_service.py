@@ -6,7 +6,7 @@ import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import logging
-from app.core.config import settings
+from app.core.config import settings, get_upstream_base_url
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 class WeatherService:
     def __init__(self):
         self.api_key = settings.WEATHERAPI_KEY
-        self.base_url = "https://api.weatherapi.com/v1"
+        self.base_url = get_upstream_base_url("weatherapi", "https://api.weatherapi.com") + "/v1"
         
         # Check if we have a real API key
         self.use_real_api = (
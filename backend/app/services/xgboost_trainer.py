@@ -27,6 +27,7 @@ import seaborn as sns
 # AuraFarming imports
 from app.services.data_processor import data_preprocessor
 from app.services.feature_engineer import feature_engineer
+from app.services.crop_economics import crop_economics, QUINTALS_PER_TONNE
 from app.services.weather_service import weather_service
 from app.models.schemas import CropRecommendation
 
@@ -423,22 +424,37 @@ class XGBoostTrainer:
                 feature_vector.append(0.0)  # Default value for missing features
         
         return np.array(feature_vector)
-    
+
+    def predict_probabilities(self, feature_frame: pd.DataFrame) -> np.ndarray:
+        """
+        Crop probabilities for many engineered feature rows in one model call.
+
+        Args:
+            feature_frame: FeatureEngineer.prepare_feature_frame output
+
+        Returns:
+            Array (rows, crops) ordered like label_encoders['crop'].classes_
+        """
+        if not self.model_manager.is_ready():
+            raise ValueError("Model not trained or loaded")
+
+        columns = []
+        for feature_name in self.model_manager.feature_names:
+            if feature_name not in feature_frame.columns:
+                columns.append(np.zeros(len(feature_frame)))
+                continue
+            values = feature_frame[feature_name]
+            if not pd.api.types.is_numeric_dtype(values) and feature_name in self.model_manager.label_encoders:
+                # Same encoding as _prepare_prediction_features, unknown categories -> 0
+                codes = {label: code for code, label in enumerate(self.model_manager.label_encoders[feature_name].classes_)}
+                values = values.map(codes)
+            columns.append(pd.to_numeric(values, errors='coerce').fillna(0.0).to_numpy(dtype=float))
+
+        return self.model_manager.crop_classifier.predict_proba(np.column_stack(columns))
+
     def _estimate_yield(self, crop_name: str, farm_data: Dict[str, Any]) -> float:
-        """Estimate crop yield based on conditions."""
-        # Base yield estimates (tonnes/hectare) for different crops
-        base_yields = {
-            'Rice': 4.5,
-            'Maize': 5.1,
-            'Wheat': 3.2,
-            'Chickpea': 1.8,
-            'Potato': 22.0,
-            'Sugarcane': 65.0,
-            'Cotton': 2.5,
-            'Soybean': 2.0
-        }
-        
-        base_yield = base_yields.get(crop_name, 3.0)
+        """Estimate crop yield (tonnes/hectare) based on conditions."""
+        base_yield = crop_economics.base_yield(crop_name)
         
         # Apply condition modifiers
         if 'soil_fertility' in farm_data:
@@ -477,18 +493,8 @@ class XGBoostTrainer:
         return "Medium"
     
     def _calculate_profit_potential(self, crop_name: str, yield_estimate: float) -> str:
-        """Calculate profit potential."""
-        # Simplified profit calculation based on yield and market prices
-        market_prices = {  # Rs per tonne
-            'Rice': 20000,
-            'Wheat': 18000,
-            'Maize': 16000,
-            'Potato': 15000,
-            'Chickpea': 50000
-        }
-        
-        price = market_prices.get(crop_name, 20000)
-        estimated_revenue = yield_estimate * price
+        """Calculate profit potential from revenue per hectare."""
+        estimated_revenue = yield_estimate * QUINTALS_PER_TONNE * crop_economics.price(crop_name)
         
         if estimated_revenue > 100000:
             return "High"
@@ -0,0 +1,217 @@
+"""
+Login-storm benchmark for the authentication execution layer.
+Simulates a burst of logins (farmer lookup + bcrypt verify + token issue)
+while other API traffic keeps arriving, and compares bcrypt run inline on the
+event loop (the old behaviour) with the bounded bcrypt worker pool. Also
+measures per-request JWT verification with and without the token cache.
+
+Usage:
+    python benchmark_auth.py [--logins 200] [--concurrency 50] [--rounds 10] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Any
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Settings require Supabase values; the benchmark never talks to the database
+os.environ.setdefault("SUPABASE_URL", "https://your-project-ref.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "your_supabase_anon_key_here")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+
+import bcrypt
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize_ms(values: List[float]) -> Dict[str, float]:
+    """p50/p99/max of a list of durations in seconds, as milliseconds."""
+    values = sorted(values)
+    return {
+        "p50": round(percentile(values, 50) * 1000, 1),
+        "p99": round(percentile(values, 99) * 1000, 1),
+        "max": round(values[-1] * 1000, 1) if values else 0.0,
+    }
+
+
+async def probe_other_endpoints(stop: asyncio.Event, interval: float = 0.005) -> List[float]:
+    """
+    Stand-in for every other endpoint: a cheap request every `interval` seconds.
+    Its latency is the time from arrival until the loop gets round to serving it.
+    """
+    latencies = []
+    pending = set()
+
+    async def cheap_request(arrived: float):
+        await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - arrived)
+
+    while not stop.is_set():
+        task = asyncio.create_task(cheap_request(time.perf_counter()))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        await asyncio.sleep(interval)
+    await asyncio.gather(*pending)
+    return latencies
+
+
+async def run_storm(name: str, verify, hashed: str, logins: int, concurrency: int, db_latency: float) -> Dict[str, Any]:
+    """Run `logins` logins with at most `concurrency` in flight alongside probe traffic."""
+    from app.core.security import create_farmer_token
+    from fastapi import HTTPException
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    rejected = 0
+
+    async def login(index: int):
+        nonlocal rejected
+        async with semaphore:
+            start = time.perf_counter()
+            await asyncio.sleep(db_latency)  # get_farmer_by_phone
+            try:
+                if not await verify("field-agent-password", hashed):
+                    raise RuntimeError("password mismatch")
+            except HTTPException:
+                rejected += 1
+                return
+            create_farmer_token(f"farmer-{index}", f"98765{index:05d}")
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_other_endpoints(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe_latencies = await probe
+
+    return {
+        "mode": name,
+        "logins": logins,
+        "concurrency": concurrency,
+        "rejected": rejected,
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "login_latency_ms": summarize_ms(latencies),
+        "other_endpoint_latency_ms": summarize_ms(probe_latencies),
+    }
+
+
+def benchmark_token_cache(requests: int, tokens: int) -> Dict[str, Any]:
+    """Time verify_token for `requests` authenticated calls spread over `tokens` users."""
+    from app.core.security import create_farmer_token, verify_token
+    from app.core.auth_executor import token_cache
+
+    issued = [create_farmer_token(f"farmer-{i}", f"98765{i:05d}") for i in range(tokens)]
+    results = {}
+    for label, size in (("uncached", 0), ("cached", token_cache.max_size or 10000)):
+        token_cache.clear()
+        token_cache.reset_stats()
+        token_cache.max_size = size
+        start = time.perf_counter()
+        for i in range(requests):
+            verify_token(issued[i % tokens])
+        elapsed = time.perf_counter() - start
+        results[label] = round(elapsed / requests * 1e6, 2)
+    return {"requests": requests, "tokens": tokens, "us_per_verify": results, "cache": token_cache.get_stats()}
+
+
+async def benchmark(args) -> Dict[str, Any]:
+    """Run the inline baseline, the worker pool and the token-cache comparison."""
+    from app.core.auth_executor import PasswordHasher
+
+    hashed = bcrypt.hashpw(b"field-agent-password", bcrypt.gensalt(rounds=args.rounds)).decode('utf-8')
+    reports = []
+
+    async def inline_verify(plain: str, stored: str) -> bool:
+        # What login_farmer used to do: bcrypt directly inside the handler
+        return bcrypt.checkpw(plain.encode('utf-8'), stored.encode('utf-8'))
+
+    if "inline" in args.modes:
+        reports.append(await run_storm("inline", inline_verify, hashed, args.logins, args.concurrency, args.db_ms / 1000))
+
+    if "pool" in args.modes:
+        from app.core.security import _auth_busy
+        from app.core.auth_executor import AuthBusyError
+
+        hasher = PasswordHasher(workers=args.workers, max_pending=args.max_pending,
+                                queue_timeout=args.queue_timeout, rounds=args.rounds)
+
+        async def pooled_verify(plain: str, stored: str) -> bool:
+            try:
+                return await hasher.verify(plain, stored)
+            except AuthBusyError as e:
+                raise _auth_busy(e)
+
+        report = await run_storm("worker_pool", pooled_verify, hashed, args.logins, args.concurrency, args.db_ms / 1000)
+        report["pool"] = hasher.get_stats()
+        reports.append(report)
+        hasher.shutdown()
+
+    return {
+        "bcrypt_rounds": args.rounds,
+        "storms": reports,
+        "token_verification": benchmark_token_cache(args.token_requests, args.tokens),
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    """Pretty-print the benchmark results."""
+    for report in result["storms"]:
+        login, other = report["login_latency_ms"], report["other_endpoint_latency_ms"]
+        print(f"📈 {report['mode']}: {report['logins']} logins @ concurrency {report['concurrency']}")
+        print(f"   • throughput: {report['logins_per_s']} logins/s ({report['elapsed_s']} s, {report['rejected']} rejected)")
+        print(f"   • login latency ms: p50={login['p50']} p99={login['p99']} max={login['max']}")
+        print(f"   • other endpoints latency ms: p50={other['p50']} p99={other['p99']} max={other['max']}")
+        print()
+    tokens = result["token_verification"]
+    print(f"🔑 verify_token over {tokens['requests']} requests / {tokens['tokens']} users")
+    print(f"   • µs per call: uncached={tokens['us_per_verify']['uncached']} cached={tokens['us_per_verify']['cached']}")
+    print(f"   • cache hit rate: {tokens['cache']['hit_rate']}%")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Authentication login-storm benchmark")
+    parser.add_argument("--modes", default="inline,pool")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost used for the stored hash")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--queue-timeout", type=float, default=30.0)
+    parser.add_argument("--db-ms", type=float, default=5.0, help="Simulated farmer lookup latency")
+    parser.add_argument("--token-requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    args.modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    print("🏁 Login-storm benchmark")
+    print(f"   bcrypt rounds {args.rounds}, {args.workers} workers, {os.cpu_count()} CPUs")
+    print("=" * 60)
+
+    result = asyncio.run(benchmark(args))
+    print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Concurrency benchmark for the DatabaseService data-access layer.
+Compares the old pattern (synchronous PostgREST calls made inside async
+handlers, which block the event loop) with the shared async connection pool,
+against a local PostgREST stand-in that adds per-query latency.
+
+Usage:
+    python benchmark_database.py run [--concurrency 50] [--requests 500] [--slow-ms 500]
+    python benchmark_database.py serve [--port 8200]   # stand-in only
+
+To benchmark a real local stack instead (e.g. `supabase start`), pass its
+API URL and anon key; tables from supabase_schema.sql must exist:
+    python benchmark_database.py run --supabase-url http://127.0.0.1:54321 --anon-key <key>
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+TABLES = ["farmers", "farms", "crops_history", "recommendations", "audit_logs"]
+
+
+def build_seed_data(farms: int = 200, seed: int = 11) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate farmers, farms, crop history, recommendations and audit logs."""
+    rng = random.Random(seed)
+    districts = ["Ranchi", "Dhanbad", "Bokaro", "Hazaribagh", "Deoghar", "Giridih", "Dumka", "Palamu"]
+    crops = ["Rice", "Wheat", "Maize", "Potato", "Arhar", "Mustard", "Gram"]
+    base = datetime(2024, 1, 1)
+    data: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+
+    for i in range(farms):
+        farmer_id, farm_id = f"farmer-{i}", f"farm-{i}"
+        created = (base + timedelta(days=i % 365)).isoformat()
+        data["farmers"].append({"id": farmer_id, "name": f"Farmer {i}", "phone": f"9{i:09d}",
+                                "password": "x", "language": "english", "created_at": created})
+        data["farms"].append({"id": farm_id, "farmer_id": farmer_id, "created_at": created,
+                              "location": {"district": rng.choice(districts), "latitude": 23.3, "longitude": 85.3},
+                              "soil_type": "loam", "irrigation_method": "drip", "field_size": round(rng.uniform(0.5, 5), 2)})
+        for year in range(3):
+            data["crops_history"].append({"id": str(uuid.uuid4()), "farm_id": farm_id, "crop": rng.choice(crops),
+                                          "season": "kharif", "year": 2022 + year,
+                                          "created_at": (base + timedelta(days=year * 120)).isoformat()})
+        data["recommendations"].append({"id": str(uuid.uuid4()), "farm_id": farm_id, "created_at": created,
+                                        "recommendations": [{"crop": rng.choice(crops), "score": 0.8}]})
+        data["audit_logs"].append({"id": str(uuid.uuid4()), "event_type": "model_update", "timestamp": created,
+                                   "data_hash": uuid.uuid4().hex})
+    return data
+
+
+def _matches(row: Dict[str, Any], filters: Dict[str, str]) -> bool:
+    """Apply the PostgREST `eq.` and `cs.` filters used by DatabaseService."""
+    for column, expression in filters.items():
+        operator, _, value = expression.partition(".")
+        if operator == "eq" and str(row.get(column)) != value:
+            return False
+        if operator == "cs":
+            expected = json.loads(value)
+            actual = row.get(column) or {}
+            if any(actual.get(k) != v for k, v in expected.items()):
+                return False
+    return True
+
+
+def create_standin_app(latency_ms: float = 5.0,
+                       slow_tables: Optional[List[str]] = None,
+                       slow_ms: float = 500.0,
+                       farms: int = 200) -> FastAPI:
+    """
+    Build a minimal PostgREST stand-in serving /rest/v1/{table}.
+
+    Supports the subset DatabaseService uses: select (with one-level embedded
+    resources), eq/cs filters, order, offset/limit, Prefer count=exact,
+    insert, update and delete.
+
+    Args:
+        latency_ms: Simulated round-trip latency per query
+        slow_tables: Tables whose queries take `slow_ms` instead
+        slow_ms: Latency for slow tables
+        farms: Number of seeded farms
+    """
+    data = build_seed_data(farms)
+    slow = set(slow_tables or [])
+    app = FastAPI(title="PostgREST stand-in", docs_url=None, redoc_url=None)
+
+    @app.api_route("/rest/v1/{table}", methods=["GET", "HEAD", "POST", "PATCH", "DELETE"])
+    async def table_endpoint(table: str, request: Request):
+        await asyncio.sleep((slow_ms if table in slow else latency_ms) / 1000)
+        rows = data.setdefault(table, [])
+        params = dict(request.query_params)
+        prefer = request.headers.get("prefer", "")
+
+        control = {k: params.pop(k) for k in ["select", "order", "offset", "limit", "columns", "on_conflict"] if k in params}
+        embed_order = {k.split(".")[0]: params.pop(k) for k in list(params) if k.endswith(".order")}
+        matched = [row for row in rows if _matches(row, params)]
+
+        if request.method == "POST":
+            body = json.loads(await request.body() or b"[]")
+            new_rows = body if isinstance(body, list) else [body]
+            for row in new_rows:
+                row.setdefault("id", str(uuid.uuid4()))
+                row.setdefault("created_at", datetime.utcnow().isoformat())
+            rows.extend(new_rows)
+            return JSONResponse(new_rows, status_code=201)
+
+        if request.method == "PATCH":
+            changes = json.loads(await request.body() or b"{}")
+            for row in matched:
+                row.update(changes)
+            return JSONResponse(matched)
+
+        if request.method == "DELETE":
+            data[table] = [row for row in rows if row not in matched]
+            return JSONResponse(matched)
+
+        if "order" in control:
+            column, _, direction = control["order"].partition(".")
+            matched.sort(key=lambda r: str(r.get(column, "")), reverse=direction.startswith("desc"))
+        total = len(matched)
+        offset = int(control.get("offset", 0))
+        limit = int(control["limit"]) if "limit" in control else total
+        page = matched[offset:offset + limit]
+
+        columns = [c.strip() for c in control.get("select", "*").split(",")]
+        embeds = [c[:-3] for c in columns if c.endswith("(*)")]
+        keep = [c for c in columns if not c.endswith("(*)")]
+        if keep != ["*"]:
+            page = [{c: row.get(c) for c in keep} for row in page]
+        else:
+            page = [dict(row) for row in page]
+        for child in embeds:
+            # Embedded resource joined on <parent singular>_id, e.g. crops_history.farm_id
+            foreign_key = f"{table[:-1]}_id"
+            column, _, direction = embed_order.get(child, "created_at.asc").partition(".")
+            for row in page:
+                children = [c for c in data.get(child, []) if c.get(foreign_key) == row.get("id")]
+                children.sort(key=lambda r: str(r.get(column, "")), reverse=direction.startswith("desc"))
+                row[child] = children
+
+        headers = {}
+        if "count=exact" in prefer:
+            end = offset + len(page) - 1
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if page else f"*/{total}"
+        if request.method == "HEAD":
+            return Response(headers=headers)
+        return JSONResponse(page, headers=headers)
+
+    return app
+
+
+def start_standin(port: int, **kwargs) -> "object":
+    """Serve the stand-in on a background thread and wait until it is listening."""
+    import uvicorn
+
+    config = uvicorn.Config(create_standin_app(**kwargs), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> List[float]:
+    """Sample how late the event loop wakes a sleeping task (blocked-loop detector)."""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+
+async def run_workload(name: str, handle_request, total: int, concurrency: int, farms: int, seed: int) -> Dict[str, Any]:
+    """Issue `total` simulated API requests with at most `concurrency` in flight."""
+    rng = random.Random(seed)
+    farm_ids = [f"farm-{rng.randrange(farms)}" for _ in range(total)]
+    slow_every = 20  # every 20th request also reads the (slow) audit log
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int, farm_id: str):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await handle_request(farm_id, index % slow_every == 0)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, farm_id) for i, farm_id in enumerate(farm_ids)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lags = sorted(await lag_task)
+
+    latencies.sort()
+    return {
+        "mode": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+        },
+        "loop_lag_ms": {
+            "p99": round(percentile(lags, 99) * 1000, 1),
+            "max": round(lags[-1] * 1000, 1) if lags else 0.0,
+        },
+    }
+
+
+async def benchmark(args) -> List[Dict[str, Any]]:
+    """Run the blocking baseline and the async pool against the same backend."""
+    from postgrest import SyncPostgrestClient
+    from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+    from app.services.database import DatabaseService, close_rest_client
+
+    headers = {**DEFAULT_POSTGREST_CLIENT_HEADERS, "apikey": args.anon_key, "Authorization": f"Bearer {args.anon_key}"}
+    reports = []
+
+    # Baseline: what every DatabaseService method used to do
+    sync_client = SyncPostgrestClient(f"{args.supabase_url}/rest/v1", headers=headers)
+
+    async def blocking_request(farm_id: str, read_audit: bool):
+        sync_client.table("farms").select("*").eq("id", farm_id).execute()
+        sync_client.table("crops_history").select("*").eq("farm_id", farm_id).order("created_at", desc=True).execute()
+        if read_audit:
+            sync_client.table("audit_logs").select("*").order("timestamp", desc=True).range(0, 99).execute()
+
+    if "blocking" in args.modes:
+        reports.append(await run_workload("blocking", blocking_request, args.requests, args.concurrency, args.farms, args.seed))
+    sync_client.session.close()
+
+    # Async data-access layer with the shared per-worker pool
+    db = DatabaseService()
+
+    async def async_request(farm_id: str, read_audit: bool):
+        await db.get_farm_by_id(farm_id)
+        await db.get_crop_history_by_farm_id(farm_id)
+        if read_audit:
+            await db.get_audit_logs(limit=100)
+
+    if "async" in args.modes:
+        reports.append(await run_workload("async_pool", async_request, args.requests, args.concurrency, args.farms, args.seed))
+    await close_rest_client()
+    return reports
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Pretty-print one mode's results."""
+    latency, lag = report["latency_ms"], report["loop_lag_ms"]
+    print(f"📈 {report['mode']}: {report['requests']} requests @ concurrency {report['concurrency']}")
+    print(f"   • throughput: {report['throughput_rps']} req/s ({report['elapsed_s']} s, {report['errors']} errors)")
+    print(f"   • latency ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']}")
+    print(f"   • event loop lag ms: p99={lag['p99']} max={lag['max']}")
+    print()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="DatabaseService concurrency benchmark")
+    sub = parser.add_subparsers(dest="command")
+
+    serve = sub.add_parser("serve", help="Run the PostgREST stand-in")
+    run = sub.add_parser("run", help="Run the benchmark")
+    for p in (serve, run):
+        p.add_argument("--port", type=int, default=8200)
+        p.add_argument("--latency-ms", type=float, default=5.0)
+        p.add_argument("--slow-ms", type=float, default=500.0, help="Latency of audit_logs queries")
+        p.add_argument("--farms", type=int, default=200)
+    run.add_argument("--supabase-url", default=None, help="Use an existing stack instead of the stand-in")
+    run.add_argument("--anon-key", default="benchmark-anon-key")
+    run.add_argument("--modes", default="blocking,async")
+    run.add_argument("--concurrency", type=int, default=50)
+    run.add_argument("--requests", type=int, default=500)
+    run.add_argument("--pool-size", type=int, default=20)
+    run.add_argument("--seed", type=int, default=3)
+    run.add_argument("--json", dest="json_path", default=None)
+
+    args = parser.parse_args()
+    if args.command is None:
+        args = parser.parse_args(["run"] + sys.argv[1:])
+
+    standin = dict(latency_ms=args.latency_ms, slow_tables=["audit_logs"], slow_ms=args.slow_ms, farms=args.farms)
+
+    if args.command == "serve":
+        import uvicorn
+        print(f"🐘 PostgREST stand-in on http://127.0.0.1:{args.port}/rest/v1")
+        uvicorn.run(create_standin_app(**standin), host="127.0.0.1", port=args.port, log_level="warning")
+        return
+
+    if args.supabase_url is None:
+        start_standin(args.port, **standin)
+        args.supabase_url = f"http://127.0.0.1:{args.port}"
+
+    # Point DatabaseService at the benchmark backend before settings load
+    os.environ["SUPABASE_URL"] = args.supabase_url
+    os.environ["SUPABASE_ANON_KEY"] = args.anon_key
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", args.anon_key)
+    os.environ["DB_POOL_SIZE"] = str(args.pool_size)
+    args.modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    print("🏁 DatabaseService concurrency benchmark")
+    print(f"   backend: {args.supabase_url} (audit_logs queries {args.slow_ms} ms)")
+    print("=" * 60)
+
+    reports = asyncio.run(benchmark(args))
+    for report in reports:
+        print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"💾 Reports written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark streaming HTML extraction against full BeautifulSoup trees.
+Runs both parsers over recorded portal pages (or a synthetic AGMARKNET
+results page) and reports parse time and peak memory. The app no longer
+depends on beautifulsoup4; install it separately to run the baseline.
+
+Usage:
+    python benchmark_html_parsing.py [fixture.html ...] [--rows 5000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import os
+import time
+import tracemalloc
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.streaming_html_parser import PortalStreamParser, iter_table_rows
+
+CHUNK_SIZE = 16384
+
+
+def build_agmarknet_fixture(rows: int) -> bytes:
+    """Build a synthetic AGMARKNET results page with the given number of rows."""
+    commodities = ["Rice", "Wheat", "Maize", "Potato", "Arhar", "Gram", "Mustard", "Onion", "Tomato"]
+    parts = [
+        "<html><head><script>var cfg = {};</script></head><body><form>",
+        '<input type="hidden" name="__VIEWSTATE" value="' + "x" * 20000 + '">',
+        '<select name="ctl00$ddlState"><option value="0">--Select--</option>'
+        '<option value="JR">Jharkhand</option></select>',
+        '<table class="layout"><tr><td>Header</td></tr></table>',
+        '<table id="cphBody_GridPriceData" border="1"><tr><th>Market</th><th>Commodity</th>'
+        '<th>Variety</th><th>Arrival</th><th>Min Price</th><th>Max Price</th>'
+        '<th>Modal Price</th><th>Date</th></tr>',
+    ]
+    for i in range(rows):
+        crop = commodities[i % len(commodities)]
+        base = 1000 + (i * 37) % 5000
+        parts.append(
+            f"<tr><td>Mandi {i % 40}</td><td>{crop}</td><td>Common</td><td>{100 + i % 400}</td>"
+            f"<td>{base}</td><td>{base + 400}</td><td>{base + 200}</td><td>15-Sep-2025</td></tr>"
+        )
+    parts.append("</table></form></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def is_results_table(attrs):
+    """Same result-grid predicate the AGMARKNET scraper uses."""
+    return "Grid" in attrs.get("id", "") or attrs.get("border") == "1"
+
+
+def parse_with_soup(content: bytes) -> int:
+    """Build a full DOM and extract every result row, as the old scrapers did."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
+    count = 0
+    for table in soup.find_all("table"):
+        if not is_results_table(table.attrs if isinstance(table.attrs, dict) else {}):
+            continue
+        for row in table.find_all("tr")[1:]:
+            cells = [cell.get_text(strip=True) for cell in row.find_all(["td", "th"])]
+            if len(cells) >= 4:
+                count += 1
+    return count
+
+
+def parse_streaming(content: bytes) -> int:
+    """Feed the document in network-sized chunks and consume rows as a generator."""
+    parser = PortalStreamParser(table_filter=is_results_table)
+    chunks = (content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+    return sum(1 for row in iter_table_rows(chunks, parser) if not row.is_header and len(row.cells) >= 4)
+
+
+def measure(func, content: bytes, repeat: int):
+    """Return (rows, best seconds, peak bytes) for a parse function."""
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func(content)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, best, peak
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("fixtures", nargs="*", help="Recorded portal HTML pages")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows in the synthetic fixture")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        documents = [(path, open(path, "rb").read()) for path in args.fixtures]
+    else:
+        documents = [(f"synthetic AGMARKNET ({args.rows} rows)", build_agmarknet_fixture(args.rows))]
+
+    print("⚡ Streaming vs DOM HTML parsing benchmark")
+    print("=" * 60)
+
+    for name, content in documents:
+        print(f"📄 {name}: {len(content) / 1024:.1f} KiB")
+        results = {"streaming": measure(parse_streaming, content, args.repeat)}
+        try:
+            results["beautifulsoup"] = measure(parse_with_soup, content, args.repeat)
+        except ImportError:
+            print("   ⚠️ beautifulsoup4 not installed, skipping DOM baseline")
+
+        for label, (rows, seconds, peak) in results.items():
+            print(f"   • {label:<14} rows={rows:<7} time={seconds * 1000:8.1f} ms  peak={peak / 1024 / 1024:7.2f} MiB")
+
+        if "beautifulsoup" in results:
+            soup_time, stream_time = results["beautifulsoup"][1], results["streaming"][1]
+            soup_peak, stream_peak = results["beautifulsoup"][2], results["streaming"][2]
+            print(f"   ✅ speedup {soup_time / max(stream_time, 1e-9):.1f}x, "
+                  f"memory {soup_peak / max(stream_peak, 1):.1f}x lower")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Load benchmark for the market pipeline against the upstream replay server.
+Exercises MarketService.get_mandi_prices, MultiSourceMarketService.get_comprehensive_market_data
+and the /api/v1/market/* routes at a target concurrency, and reports throughput,
+tail latency, upstream call counts and cache hit ratios.
+
+Start the replay server first:
+    python replay_server.py serve --profile healthy
+
+Then run:
+    python benchmark_market_pipeline.py --concurrency 20 --requests 400
+    python benchmark_market_pipeline.py --targets routes --api-url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Awaitable, Optional
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=Path(__file__).parent / '.env')
+
+DISTRICTS = ["Ranchi", "Dhanbad", "Bokaro", "Hazaribagh", "Deoghar", "Giridih", "Dumka", "Palamu"]
+CROPS = [None, None, "Rice", "Wheat", "Maize", "Potato", "Onion", "Tomato"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_load(name: str,
+                   make_call: Callable[[random.Random], Awaitable[Any]],
+                   total: int,
+                   concurrency: int,
+                   seed: int) -> Dict[str, Any]:
+    """
+    Issue `total` calls with at most `concurrency` in flight.
+
+    Returns:
+        Throughput and latency summary
+    """
+    rng = random.Random(seed)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                await make_call(rng)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "target": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        },
+    }
+
+
+async def replay_stats(client, replay_url: str, reset: bool = False) -> Dict[str, Any]:
+    """Fetch (and optionally reset) upstream call counters from the replay server."""
+    try:
+        if reset:
+            await client.post(f"{replay_url}/__replay/reset")
+            return {}
+        response = await client.get(f"{replay_url}/__replay/stats")
+        return response.json()
+    except Exception as e:
+        return {"error": f"Replay server unreachable: {e}"}
+
+
+async def benchmark(args) -> List[Dict[str, Any]]:
+    """Run every requested target and collect reports."""
+    import httpx
+    from app.services.cache_service import market_cache
+
+    targets: Dict[str, Callable[[random.Random], Awaitable[Any]]] = {}
+
+    if "service" in args.targets:
+        from app.services.market_service import MarketService
+        market_service = MarketService()
+
+        async def call_service(rng):
+            return await market_service.get_mandi_prices(rng.choice(DISTRICTS), rng.choice(CROPS))
+
+        targets["service"] = call_service
+
+    if "multi_source" in args.targets:
+        from app.services.multi_source_market_service import MultiSourceMarketService
+        multi_source = MultiSourceMarketService()
+
+        async def call_multi_source(rng):
+            return await multi_source.get_comprehensive_market_data(rng.choice(DISTRICTS), rng.choice(CROPS))
+
+        targets["multi_source"] = call_multi_source
+
+    api_client: Optional[httpx.AsyncClient] = None
+    if "routes" in args.targets:
+        if args.api_url:
+            api_client = httpx.AsyncClient(base_url=args.api_url, timeout=120.0)
+        else:
+            from main import app
+            api_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=120.0)
+
+        def route_path(rng) -> str:
+            district, crop = rng.choice(DISTRICTS), rng.choice(CROPS[2:])
+            return rng.choice([
+                f"/api/v1/market/prices/{district}",
+                f"/api/v1/market/prices/{district}/live?crop={crop}",
+                f"/api/v1/market/analytics/{district}",
+                f"/api/v1/market/crop-analytics/{crop}",
+                f"/api/v1/market/yield-analytics/{district}",
+                f"/api/v1/market/trends/{crop}",
+                f"/api/v1/market/best-markets/{crop}?origin_district={district}",
+            ])
+
+        async def call_route(rng):
+            response = await api_client.get(route_path(rng))
+            response.raise_for_status()
+            return response
+
+        targets["routes"] = call_route
+
+    async def cache_stats() -> Dict[str, Any]:
+        if args.api_url and "routes" in targets:
+            response = await api_client.get("/api/v1/market/cache/stats")
+            return response.json().get("data", {})
+        return market_cache.get_cache_stats()
+
+    reports = []
+    async with httpx.AsyncClient(timeout=10.0) as control:
+        for name, make_call in targets.items():
+            if args.cold:
+                market_cache.invalidate()
+            market_cache.reset_stats()
+            await replay_stats(control, args.replay_url, reset=True)
+
+            report = await run_load(name, make_call, args.requests, args.concurrency, args.seed)
+
+            upstream = await replay_stats(control, args.replay_url)
+            cache = await cache_stats()
+            report["upstream_calls"] = upstream.get("calls", upstream)
+            report["upstream_outcomes"] = upstream.get("outcomes", {})
+            report["cache"] = {
+                "hit_ratio": cache.get("cache_hit_ratio"),
+                "hits": cache.get("hits"),
+                "misses": cache.get("misses"),
+                "deduplicated": cache.get("deduplicated"),
+            }
+            reports.append(report)
+
+    if api_client is not None:
+        await api_client.aclose()
+    return reports
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Pretty-print one target's results."""
+    latency = report["latency_ms"]
+    print(f"📈 {report['target']}: {report['requests']} requests @ concurrency {report['concurrency']}")
+    print(f"   • throughput: {report['throughput_rps']} req/s ({report['elapsed_s']} s, {report['errors']} errors)")
+    print(f"   • latency ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    print(f"   • upstream calls: {report['upstream_calls']}")
+    print(f"   • cache: {report['cache']}")
+    print()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Market pipeline load benchmark")
+    parser.add_argument("--replay-url", default=os.getenv("UPSTREAM_REPLAY_URL", "http://127.0.0.1:8100"))
+    parser.add_argument("--api-url", default=None, help="Benchmark a running API instead of the in-process app")
+    parser.add_argument("--targets", default="service,multi_source,routes",
+                        help="Comma separated: service, multi_source, routes")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cold", action="store_true", help="Invalidate the market cache before each target")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write reports to a JSON file")
+    args = parser.parse_args()
+    args.targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+
+    # Route every upstream request through the replay server
+    os.environ["UPSTREAM_REPLAY_URL"] = args.replay_url
+
+    print("🏁 Market pipeline benchmark")
+    print(f"   replay server: {args.replay_url}")
+    print("=" * 60)
+
+    reports = asyncio.run(benchmark(args))
+    for report in reports:
+        print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"💾 Reports written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
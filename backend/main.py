@@ -24,7 +24,16 @@ from app.api.market import market_router
 from app.api.finance import finance_router
 from app.api.admin import admin_router
 from app.api.sustainability import sustainability_router
-from app.api.smart_advisory import smart_advisory_router
+from app.api.smart_advisory import smart_advisory_router, bulk_advisory_runner
+from app.services.database import close_rest_client
+from app.services.local_database import close_local_database
+from app.services.entity_cache import IdentityMapMiddleware
+from app.services.aggregation_service import aggregation_service
+from app.services.bulk_writer import bulk_writer
+from app.services.recommendation_table import recommendation_table
+from app.services.xgboost_service import get_xgboost_service
+from app.core.auth_executor import password_hasher
+from app.core.http_cache import HTTPCacheMiddleware
 
 # Load environment variables
 load_dotenv()
@@ -52,6 +61,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request identity map for farmer/farm/crop-history reads
+app.add_middleware(IdentityMapMiddleware)
+
+# Compression, ETags and conditional GETs for routes that declare a Cache-Control policy
+app.add_middleware(HTTPCacheMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # Include routers
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(farms_router, prefix="/api/v1/farms", tags=["Farm Management"])
@@ -63,6 +78,24 @@ app.include_router(sustainability_router, prefix="/api/v1/sustainability", tags=
 app.include_router(admin_router, prefix="/api/v1/admin", tags=["Admin Dashboard"])
 app.include_router(smart_advisory_router, prefix="/api/v1/smart-advisory", tags=["Smart Advisory System"])
 
+@app.on_event("startup")
+async def startup_event():
+    """Schedule the periodic aggregate reconciliation job, the bulk write flusher and the recommendation table refresh."""
+    aggregation_service.start_reconciliation(settings.AGGREGATE_RECONCILE_INTERVAL)
+    bulk_writer.start()
+    recommendation_table.start_refresh(get_xgboost_service(), settings.RECOMMENDATION_TABLE_REFRESH_INTERVAL)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs, flush buffered writes and release the worker's database connection pool."""
+    await aggregation_service.stop_reconciliation()
+    await bulk_writer.stop()
+    await recommendation_table.stop_refresh()
+    await close_rest_client()
+    await close_local_database()
+    password_hasher.shutdown()
+    bulk_advisory_runner.shutdown()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
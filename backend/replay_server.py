@@ -0,0 +1,228 @@
+"""
+Upstream replay server for offline market pipeline benchmarks.
+Serves recorded AGMARKNET, data.gov.in, eNAM and WeatherAPI responses from
+fixtures/upstream with configurable latency, error and timeout profiles.
+
+Point the backend at it with UPSTREAM_REPLAY_URL=http://127.0.0.1:8100.
+
+Usage:
+    python replay_server.py serve [--port 8100] [--profile healthy] [--source-profile agmarknet=down]
+    python replay_server.py record [--source weatherapi]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, JSONResponse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "upstream"
+
+# Named upstream behaviour profiles
+PROFILES: Dict[str, Dict[str, float]] = {
+    "healthy": {"latency_ms": 150, "jitter_ms": 50, "error_rate": 0.0, "timeout_rate": 0.0, "timeout_s": 35},
+    "slow": {"latency_ms": 2500, "jitter_ms": 1000, "error_rate": 0.0, "timeout_rate": 0.0, "timeout_s": 35},
+    "flaky": {"latency_ms": 400, "jitter_ms": 300, "error_rate": 0.2, "timeout_rate": 0.05, "timeout_s": 35},
+    "down": {"latency_ms": 0, "jitter_ms": 0, "error_rate": 0.0, "timeout_rate": 1.0, "timeout_s": 35},
+    "instant": {"latency_ms": 0, "jitter_ms": 0, "error_rate": 0.0, "timeout_rate": 0.0, "timeout_s": 35},
+}
+
+
+def load_manifest(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, Any]:
+    """Load the fixture manifest describing recorded routes per source."""
+    with open(fixtures_dir / "manifest.json") as f:
+        return json.load(f)
+
+
+def create_replay_app(fixtures_dir: Path = FIXTURES_DIR,
+                      profile: str = "healthy",
+                      source_profiles: Optional[Dict[str, str]] = None,
+                      seed: int = 42) -> FastAPI:
+    """
+    Build the replay ASGI app.
+
+    Args:
+        fixtures_dir: Directory containing manifest.json and recorded bodies
+        profile: Default behaviour profile for every source
+        source_profiles: Per-source profile overrides, e.g. {"agmarknet": "down"}
+        seed: Seed for latency jitter and fault injection
+
+    Returns:
+        FastAPI application
+    """
+    manifest = load_manifest(fixtures_dir)
+    rng = random.Random(seed)
+    bodies: Dict[str, bytes] = {}
+    state = {
+        "profiles": {source: dict(PROFILES[(source_profiles or {}).get(source, profile)]) for source in manifest},
+        "calls": Counter(),
+        "outcomes": Counter(),
+        "started_at": time.time(),
+    }
+
+    def read_body(file_name: str) -> bytes:
+        if file_name not in bodies:
+            bodies[file_name] = (fixtures_dir / file_name).read_bytes()
+        return bodies[file_name]
+
+    def find_route(source: Optional[str], method: str, path: str, form: Dict[str, str]):
+        # Absolute links (urljoin on "/node/..." or "/api/...") lose the source prefix,
+        # so unprefixed paths are looked up across every source.
+        sources = [source] if source else list(manifest)
+        for name in sources:
+            for route in manifest[name]["routes"]:
+                if route["method"] != method or route["path"] != path:
+                    continue
+                expected = route.get("match_form", {})
+                if all(form.get(k) == v for k, v in expected.items()):
+                    return name, route
+        return source, None
+
+    app = FastAPI(title="AuraFarming upstream replay server", docs_url=None, redoc_url=None)
+
+    @app.get("/__replay/stats")
+    async def replay_stats():
+        """Upstream call counts per source and outcome."""
+        return {
+            "calls": dict(state["calls"]),
+            "outcomes": dict(state["outcomes"]),
+            "total_calls": sum(state["calls"].values()),
+            "profiles": state["profiles"],
+            "uptime_s": round(time.time() - state["started_at"], 1),
+        }
+
+    @app.post("/__replay/reset")
+    async def replay_reset():
+        """Reset call counters."""
+        state["calls"].clear()
+        state["outcomes"].clear()
+        return {"reset": True}
+
+    @app.post("/__replay/profile/{source}/{name}")
+    async def replay_set_profile(source: str, name: str):
+        """Switch a source (or 'all') to a named profile at runtime."""
+        if name not in PROFILES:
+            return JSONResponse(status_code=400, content={"error": f"Unknown profile {name}"})
+        targets = list(manifest) if source == "all" else [source]
+        for target in targets:
+            state["profiles"][target] = dict(PROFILES[name])
+        return {"profiles": state["profiles"]}
+
+    @app.api_route("/{full_path:path}", methods=["GET", "POST"])
+    async def replay(full_path: str, request: Request):
+        first, _, rest = full_path.partition("/")
+        if first in manifest:
+            source, path = first, "/" + rest
+        else:
+            source, path = None, "/" + full_path
+
+        form: Dict[str, str] = {}
+        if request.method == "POST":
+            form = dict(parse_qsl((await request.body()).decode("utf-8", errors="replace")))
+
+        source, route = find_route(source, request.method, path, form)
+        source = source or "unknown"
+        state["calls"][source] += 1
+
+        behaviour = state["profiles"].get(source, PROFILES[profile])
+        roll = rng.random()
+        if roll < behaviour["timeout_rate"]:
+            state["outcomes"][f"{source}:timeout"] += 1
+            await asyncio.sleep(behaviour["timeout_s"])
+            return Response(status_code=504)
+
+        delay = max(0.0, behaviour["latency_ms"] + rng.uniform(-1, 1) * behaviour["jitter_ms"]) / 1000
+        await asyncio.sleep(delay)
+
+        if roll < behaviour["timeout_rate"] + behaviour["error_rate"]:
+            state["outcomes"][f"{source}:error"] += 1
+            return Response(status_code=503, content=b"Service Unavailable")
+
+        if route is None:
+            state["outcomes"][f"{source}:not_found"] += 1
+            return Response(status_code=404, content=b"Not Found")
+
+        state["outcomes"][f"{source}:ok"] += 1
+        return Response(content=read_body(route["file"]), media_type=route.get("content_type", "text/html"))
+
+    return app
+
+
+def record_fixtures(fixtures_dir: Path = FIXTURES_DIR, only_source: Optional[str] = None) -> None:
+    """
+    Re-record GET fixtures from the live upstream sites.
+
+    POST form flows (AGMARKNET search) depend on live ViewState and are
+    kept as captured; record them manually when the portal layout changes.
+    """
+    import httpx
+
+    manifest = load_manifest(fixtures_dir)
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+
+    with httpx.Client(timeout=60.0, follow_redirects=True, headers=headers) as client:
+        for source, config in manifest.items():
+            if only_source and source != only_source:
+                continue
+            for route in config["routes"]:
+                if route["method"] != "GET":
+                    continue
+                params = dict(route.get("record_params", {}))
+                if source == "weatherapi":
+                    params["key"] = os.getenv("WEATHERAPI_KEY", "")
+                url = config["production_url"] + route["path"]
+                try:
+                    response = client.get(url, params=params)
+                    if response.status_code == 200:
+                        (fixtures_dir / route["file"]).write_bytes(response.content)
+                        print(f"✅ {source}{route['path']} -> {route['file']} ({len(response.content)} bytes)")
+                    else:
+                        print(f"⚠️ {source}{route['path']} returned {response.status_code}, fixture kept")
+                except Exception as e:
+                    print(f"❌ {source}{route['path']} failed: {e}")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Upstream replay server")
+    sub = parser.add_subparsers(dest="command")
+
+    serve = sub.add_parser("serve", help="Serve recorded fixtures")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8100)
+    serve.add_argument("--profile", default="healthy", choices=sorted(PROFILES))
+    serve.add_argument("--source-profile", action="append", default=[],
+                       help="Per-source override, e.g. agmarknet=down (repeatable)")
+    serve.add_argument("--seed", type=int, default=42)
+
+    record = sub.add_parser("record", help="Re-record GET fixtures from live sites")
+    record.add_argument("--source", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_fixtures(only_source=args.source)
+        return
+
+    if args.command is None:
+        args = parser.parse_args(["serve"] + sys.argv[1:])
+
+    import uvicorn
+
+    overrides = dict(item.split("=", 1) for item in args.source_profile)
+    app = create_replay_app(profile=args.profile, source_profiles=overrides, seed=args.seed)
+    print(f"🔁 Replaying {FIXTURES_DIR} on http://{args.host}:{args.port} (profile: {args.profile})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Bulk seeder for the local SQLite development database.
+Generates synthetic farmers, farms, crop history and recommendations spread
+over the Jharkhand districts so DB-bound routes can be load tested offline
+with realistic data volumes.
+
+Usage:
+    python seed_local_database.py [--farmers 10000] [--history-per-farm 6] [--path local_dev.sqlite3] [--reset]
+
+Every seeded farmer can log in with phone 7<9 digits> (printed at the end)
+and the --password given (default "farmer123").
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+SEASONS = ["Kharif", "Rabi", "Zaid"]
+LANGUAGES = ["english", "hindi", "santali", "nagpuri"]
+FIRST_NAMES = ["Ramesh", "Sita", "Birsa", "Lakshmi", "Sanjay", "Kiran", "Anita", "Suresh", "Geeta", "Mohan"]
+LAST_NAMES = ["Munda", "Oraon", "Mahato", "Kumar", "Devi", "Singh", "Hansda", "Tudu", "Soren", "Yadav"]
+
+
+def generate_farmer(rng: random.Random, index: int, password_hash: str, created_at: datetime) -> Dict[str, Any]:
+    """One synthetic farmer row."""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "phone": f"7{index:09d}",
+        "password": password_hash,
+        "language": rng.choice(LANGUAGES),
+        "created_at": created_at.isoformat(),
+        "updated_at": created_at.isoformat()
+    }
+
+
+def generate_farm(rng: random.Random, farmer: Dict[str, Any], districts: List[str], coordinates: Dict[str, Any],
+                  soil_types: List[str], irrigation: List[str]) -> Dict[str, Any]:
+    """One synthetic farm row near its district's centre."""
+    district = rng.choice(districts)
+    centre = coordinates.get(district, {"latitude": 23.3441, "longitude": 85.3096})
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "farmer_id": farmer["id"],
+        "name": f"{farmer['name'].split()[0]}'s Farm",
+        "location": {
+            "latitude": round(centre["latitude"] + rng.uniform(-0.2, 0.2), 4),
+            "longitude": round(centre["longitude"] + rng.uniform(-0.2, 0.2), 4),
+            "district": district,
+            "village": f"Village {rng.randrange(1, 400)}"
+        },
+        "soil_type": rng.choice(soil_types),
+        "irrigation_method": rng.choice(irrigation),
+        "field_size": round(rng.lognormvariate(0.6, 0.6), 2),
+        "created_at": farmer["created_at"],
+        "updated_at": farmer["created_at"]
+    }
+
+
+def generate_history(rng: random.Random, farm: Dict[str, Any], count: int, crops: List[str],
+                     weights: List[float]) -> List[Dict[str, Any]]:
+    """Synthetic crop history for one farm, newest season first."""
+    rows = []
+    year = datetime.now().year
+    for i in range(count):
+        season = SEASONS[i % len(SEASONS)]
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "farm_id": farm["id"],
+            "season": season,
+            "crop": rng.choices(crops, weights=weights)[0],
+            "yield_per_acre": round(rng.uniform(5, 30), 1),
+            "year": year - 1 - i // len(SEASONS),
+            "created_at": (datetime.now(timezone.utc) - timedelta(days=120 * (i + 1))).isoformat()
+        })
+    return rows
+
+
+def generate_recommendation(rng: random.Random, farm: Dict[str, Any], crops: List[str]) -> Dict[str, Any]:
+    """One synthetic recommendation row."""
+    picks = rng.sample(crops, 3)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "farm_id": farm["id"],
+        "crops": [{"crop": crop, "confidence": round(rng.uniform(0.5, 0.95), 3)} for crop in picks],
+        "model_confidence": round(rng.uniform(0.6, 0.95), 4),
+        "season": rng.choice(SEASONS),
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def seed(args) -> Dict[str, Any]:
+    """Generate and insert the dataset in batches."""
+    import bcrypt
+    from app.core.config import JHARKHAND_DISTRICTS, DISTRICT_COORDINATES, JHARKHAND_CROPS, JHARKHAND_SOIL_TYPES, IRRIGATION_METHODS
+    from app.services.local_database import get_local_database, close_local_database
+
+    db = get_local_database()
+    rng = random.Random(args.seed)
+    # A handful of staples dominate, as in the real crop mix
+    weights = [max(1.0, 30.0 / (rank + 1) ** 1.2) for rank in range(len(JHARKHAND_CROPS))]
+    password_hash = bcrypt.hashpw(args.password.encode('utf-8'), bcrypt.gensalt(rounds=args.rounds)).decode('utf-8')
+    start_index = (await db.run(db.table_counts))["farmers"]
+    since = datetime.now(timezone.utc) - timedelta(days=730)
+
+    totals = {"farmers": 0, "farms": 0, "crops_history": 0, "recommendations": 0}
+    started = time.perf_counter()
+    for batch_start in range(0, args.farmers, args.batch):
+        batch = {table: [] for table in totals}
+        for offset in range(min(args.batch, args.farmers - batch_start)):
+            created = since + timedelta(minutes=rng.randrange(730 * 24 * 60))
+            farmer = generate_farmer(rng, start_index + batch_start + offset, password_hash, created)
+            batch["farmers"].append(farmer)
+            for _ in range(max(1, round(rng.expovariate(1 / args.farms_per_farmer)))):
+                farm = generate_farm(rng, farmer, JHARKHAND_DISTRICTS, DISTRICT_COORDINATES, JHARKHAND_SOIL_TYPES, IRRIGATION_METHODS)
+                batch["farms"].append(farm)
+                batch["crops_history"].extend(generate_history(rng, farm, args.history_per_farm, JHARKHAND_CROPS, weights))
+                if rng.random() < args.recommendation_rate:
+                    batch["recommendations"].append(generate_recommendation(rng, farm, JHARKHAND_CROPS))
+
+        for table, rows in batch.items():
+            if rows:
+                await db.table(table).insert(rows).execute()
+                totals[table] += len(rows)
+        done = batch_start + len(batch["farmers"])
+        print(f"   • {done}/{args.farmers} farmers ({totals['farms']} farms, {totals['crops_history']} history rows)")
+
+    elapsed = time.perf_counter() - started
+    drift = await db.rpc("reconcile_aggregates").execute()
+    counts = await db.run(db.table_counts)
+    await close_local_database()
+    return {
+        "inserted": totals,
+        "table_counts": counts,
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round(sum(totals.values()) / elapsed) if elapsed else 0,
+        "aggregate_drift": drift.data,
+        "first_phone": f"7{start_index:09d}"
+    }
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Seed the local SQLite development database")
+    parser.add_argument("--path", default=None, help="Database file (default: LOCAL_DB_PATH)")
+    parser.add_argument("--reset", action="store_true", help="Delete the database file first")
+    parser.add_argument("--farmers", type=int, default=10000)
+    parser.add_argument("--farms-per-farmer", type=float, default=1.3)
+    parser.add_argument("--history-per-farm", type=int, default=6)
+    parser.add_argument("--recommendation-rate", type=float, default=0.5)
+    parser.add_argument("--batch", type=int, default=2000, help="Farmers generated per insert transaction")
+    parser.add_argument("--password", default="farmer123")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost for the shared password hash")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # Local database only: never seed a configured Supabase project
+    os.environ.setdefault("SUPABASE_URL", "https://your-project-ref.supabase.co")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "your_supabase_anon_key_here")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "local")
+    if args.path:
+        os.environ["LOCAL_DB_PATH"] = args.path
+    from app.core.config import settings
+
+    if args.reset:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(settings.LOCAL_DB_PATH + suffix):
+                os.remove(settings.LOCAL_DB_PATH + suffix)
+
+    print("🌱 Seeding local database")
+    print(f"   path: {settings.LOCAL_DB_PATH}")
+    print("=" * 60)
+    result = asyncio.run(seed(args))
+    print()
+    print(f"✅ Inserted {sum(result['inserted'].values())} rows in {result['elapsed_s']} s ({result['rows_per_s']} rows/s)")
+    for table, count in result["table_counts"].items():
+        print(f"   • {table}: {count}")
+    print(f"   • aggregate drift after seeding: {result['aggregate_drift']}")
+    print(f"🔑 Log in with phone {result['first_phone']} (and onwards) / password {args.password!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+-- AuraFarming Aggregate Tables
+-- Run this in Supabase SQL Editor after supabase_schema.sql
+--
+-- Admin dashboards and /api/v1/crops/popular read these summary tables instead
+-- of scanning farmers/farms/crops_history. Triggers keep them current on every
+-- insert/update/delete; reconcile_aggregates() rebuilds them from the base
+-- tables and is called periodically by the API to repair any drift.
+
+-- Row counts per base table, split over COUNTER_SHARDS rows per counter so
+-- concurrent inserts from different sessions do not queue on one hot row; a
+-- counter's value is the sum of its shards
+CREATE TABLE IF NOT EXISTS platform_counters (
+    name VARCHAR(50) NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (name, shard)
+);
+
+-- Upgrade installs created before counters were sharded
+ALTER TABLE platform_counters ADD COLUMN IF NOT EXISTS shard SMALLINT NOT NULL DEFAULT 0;
+DO $$
+BEGIN
+    IF (SELECT COUNT(*) FROM information_schema.key_column_usage
+        WHERE table_name = 'platform_counters' AND constraint_name = 'platform_counters_pkey') = 1 THEN
+        ALTER TABLE platform_counters DROP CONSTRAINT platform_counters_pkey;
+        ALTER TABLE platform_counters ADD PRIMARY KEY (name, shard);
+    END IF;
+END $$;
+
+-- Crop history entries per crop
+CREATE TABLE IF NOT EXISTS crop_popularity (
+    crop VARCHAR(50) PRIMARY KEY,
+    entries BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Farms and cultivated area per district (farms.location->>'district')
+CREATE TABLE IF NOT EXISTS district_farm_stats (
+    district VARCHAR(50) PRIMARY KEY,
+    farm_count BIGINT NOT NULL DEFAULT 0,
+    total_area DECIMAL(14,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_crop_popularity_count ON crop_popularity (entries DESC);
+
+-- Summary tables hold no personal data; readable by the API, written only by
+-- the SECURITY DEFINER functions below, which only the backend's service_role
+-- may execute
+ALTER TABLE platform_counters ENABLE ROW LEVEL SECURITY;
+ALTER TABLE crop_popularity ENABLE ROW LEVEL SECURITY;
+ALTER TABLE district_farm_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Aggregates are readable" ON platform_counters FOR SELECT USING (true);
+CREATE POLICY "Aggregates are readable" ON crop_popularity FOR SELECT USING (true);
+CREATE POLICY "Aggregates are readable" ON district_farm_stats FOR SELECT USING (true);
+
+-- Trigger: platform_counters (counter name passed as TG_ARGV[0]); each session
+-- bumps the shard picked by its backend pid (16 shards per counter). Shards
+-- may go negative, only their sum is meaningful.
+CREATE OR REPLACE FUNCTION bump_platform_counter() RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    INSERT INTO platform_counters (name, shard, value, updated_at)
+    VALUES (TG_ARGV[0], pg_backend_pid() % 16, CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END, NOW())
+    ON CONFLICT (name, shard) DO UPDATE
+        SET value = platform_counters.value + EXCLUDED.value,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+-- Trigger: crop_popularity
+CREATE OR REPLACE FUNCTION track_crop_popularity() RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.crop IS NOT NULL THEN
+        UPDATE crop_popularity
+        SET entries = GREATEST(entries - 1, 0), updated_at = NOW()
+        WHERE crop = OLD.crop;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.crop IS NOT NULL THEN
+        INSERT INTO crop_popularity (crop, entries, updated_at)
+        VALUES (NEW.crop, 1, NOW())
+        ON CONFLICT (crop) DO UPDATE
+            SET entries = crop_popularity.entries + 1, updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Trigger: district_farm_stats
+CREATE OR REPLACE FUNCTION track_district_farm_stats() RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.location->>'district' IS NOT NULL THEN
+        UPDATE district_farm_stats
+        SET farm_count = GREATEST(farm_count - 1, 0),
+            total_area = GREATEST(total_area - COALESCE(OLD.field_size, 0), 0),
+            updated_at = NOW()
+        WHERE district = OLD.location->>'district';
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.location->>'district' IS NOT NULL THEN
+        INSERT INTO district_farm_stats (district, farm_count, total_area, updated_at)
+        VALUES (NEW.location->>'district', 1, COALESCE(NEW.field_size, 0), NOW())
+        ON CONFLICT (district) DO UPDATE
+            SET farm_count = district_farm_stats.farm_count + 1,
+                total_area = district_farm_stats.total_area + EXCLUDED.total_area,
+                updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS farmers_count_trigger ON farmers;
+CREATE TRIGGER farmers_count_trigger AFTER INSERT OR DELETE ON farmers
+    FOR EACH ROW EXECUTE FUNCTION bump_platform_counter('farmers');
+
+DROP TRIGGER IF EXISTS farms_count_trigger ON farms;
+CREATE TRIGGER farms_count_trigger AFTER INSERT OR DELETE ON farms
+    FOR EACH ROW EXECUTE FUNCTION bump_platform_counter('farms');
+
+DROP TRIGGER IF EXISTS recommendations_count_trigger ON recommendations;
+CREATE TRIGGER recommendations_count_trigger AFTER INSERT OR DELETE ON recommendations
+    FOR EACH ROW EXECUTE FUNCTION bump_platform_counter('recommendations');
+
+DROP TRIGGER IF EXISTS crops_history_count_trigger ON crops_history;
+CREATE TRIGGER crops_history_count_trigger AFTER INSERT OR DELETE ON crops_history
+    FOR EACH ROW EXECUTE FUNCTION bump_platform_counter('crops_history');
+
+DROP TRIGGER IF EXISTS crops_history_popularity_trigger ON crops_history;
+CREATE TRIGGER crops_history_popularity_trigger AFTER INSERT OR DELETE OR UPDATE OF crop ON crops_history
+    FOR EACH ROW EXECUTE FUNCTION track_crop_popularity();
+
+DROP TRIGGER IF EXISTS farms_district_trigger ON farms;
+CREATE TRIGGER farms_district_trigger AFTER INSERT OR DELETE OR UPDATE OF location, field_size ON farms
+    FOR EACH ROW EXECUTE FUNCTION track_district_farm_stats();
+
+-- RPC: all platform counters (summed over shards) in one round trip
+CREATE OR REPLACE FUNCTION platform_summary() RETURNS JSONB
+LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public AS $$
+    SELECT COALESCE(jsonb_object_agg(name, value), '{}'::jsonb)
+    FROM (SELECT name, GREATEST(SUM(value), 0) AS value FROM platform_counters GROUP BY name) totals;
+$$;
+
+-- RPC: rebuild every summary table from the base tables (reconciliation job).
+-- Returns the number of rows whose stored value had drifted (rows already
+-- decremented to zero are removed without counting as drift). Counter shards
+-- are folded back into shard 0.
+CREATE OR REPLACE FUNCTION reconcile_aggregates() RETURNS JSONB
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+    counter_drift INTEGER;
+    crop_drift INTEGER;
+    district_drift INTEGER;
+BEGIN
+    LOCK TABLE platform_counters, crop_popularity, district_farm_stats IN EXCLUSIVE MODE;
+
+    WITH actual AS (
+        SELECT 'farmers' AS name, COUNT(*) AS value FROM farmers
+        UNION ALL SELECT 'farms', COUNT(*) FROM farms
+        UNION ALL SELECT 'recommendations', COUNT(*) FROM recommendations
+        UNION ALL SELECT 'crops_history', COUNT(*) FROM crops_history
+    ), stored AS (
+        SELECT name, SUM(value) AS value FROM platform_counters GROUP BY name
+    )
+    SELECT COUNT(*) INTO counter_drift
+    FROM actual a LEFT JOIN stored s ON s.name = a.name
+    WHERE COALESCE(s.value, 0) <> a.value;
+
+    DELETE FROM platform_counters;
+    INSERT INTO platform_counters (name, shard, value, updated_at)
+    SELECT name, 0, value, NOW() FROM (
+        SELECT 'farmers' AS name, COUNT(*) AS value FROM farmers
+        UNION ALL SELECT 'farms', COUNT(*) FROM farms
+        UNION ALL SELECT 'recommendations', COUNT(*) FROM recommendations
+        UNION ALL SELECT 'crops_history', COUNT(*) FROM crops_history
+    ) actual;
+
+    WITH actual AS (
+        SELECT crop, COUNT(*) AS entries FROM crops_history
+        WHERE crop IS NOT NULL GROUP BY crop
+    ), removed AS (
+        DELETE FROM crop_popularity cp
+        WHERE NOT EXISTS (SELECT 1 FROM actual a WHERE a.crop = cp.crop)
+        RETURNING cp.entries
+    ), upserted AS (
+        INSERT INTO crop_popularity AS cp (crop, entries, updated_at)
+        SELECT crop, entries, NOW() FROM actual
+        ON CONFLICT (crop) DO UPDATE SET entries = EXCLUDED.entries, updated_at = NOW()
+        WHERE cp.entries IS DISTINCT FROM EXCLUDED.entries
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM removed WHERE entries > 0) + (SELECT COUNT(*) FROM upserted) INTO crop_drift;
+
+    WITH actual AS (
+        SELECT location->>'district' AS district,
+               COUNT(*) AS farm_count,
+               COALESCE(SUM(field_size), 0) AS total_area
+        FROM farms
+        WHERE location->>'district' IS NOT NULL
+        GROUP BY location->>'district'
+    ), removed AS (
+        DELETE FROM district_farm_stats ds
+        WHERE NOT EXISTS (SELECT 1 FROM actual a WHERE a.district = ds.district)
+        RETURNING ds.farm_count
+    ), upserted AS (
+        INSERT INTO district_farm_stats AS ds (district, farm_count, total_area, updated_at)
+        SELECT district, farm_count, total_area, NOW() FROM actual
+        ON CONFLICT (district) DO UPDATE
+            SET farm_count = EXCLUDED.farm_count, total_area = EXCLUDED.total_area, updated_at = NOW()
+        WHERE ds.farm_count IS DISTINCT FROM EXCLUDED.farm_count
+           OR ds.total_area IS DISTINCT FROM EXCLUDED.total_area
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM removed WHERE farm_count > 0) + (SELECT COUNT(*) FROM upserted) INTO district_drift;
+
+    RETURN jsonb_build_object(
+        'counters', counter_drift,
+        'crops', crop_drift,
+        'districts', district_drift,
+        'reconciled_at', NOW()
+    );
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION bump_platform_counter(), track_crop_popularity(), track_district_farm_stats(),
+    platform_summary(), reconcile_aggregates() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION platform_summary(), reconcile_aggregates() TO service_role;
+
+-- Seed the summary tables from existing data
+SELECT reconcile_aggregates();
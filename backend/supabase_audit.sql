@@ -0,0 +1,110 @@
+-- AuraFarming Audit Log Hash Chain
+-- Run this in Supabase SQL Editor after supabase_schema.sql
+--
+-- Federated-learning audit entries form a hash chain: every entry stores its
+-- position (seq), the previous entry's hash and its own entry_hash over
+-- (seq, round_number, update_hash, previous_hash, timestamp). The API verifies
+-- the chain incrementally from the cursor in audit_checkpoints, so each run
+-- only re-hashes entries appended since the last one, and pages through the
+-- log by seq (keyset) instead of OFFSET. Rows without seq (action log entries
+-- from supabase_schema.sql) are not part of the chain.
+
+CREATE TABLE IF NOT EXISTS audit_logs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS seq BIGINT;
+ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS round_number INTEGER;
+ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS update_hash TEXT;
+ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS previous_hash TEXT;
+ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS entry_hash TEXT;
+
+-- Chain entries carry no action; relax the action log's NOT NULL if present
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'audit_logs' AND column_name = 'action') THEN
+        ALTER TABLE audit_logs ALTER COLUMN action DROP NOT NULL;
+    END IF;
+END $$;
+
+-- Chain order; seq increases with (round_number, timestamp)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_logs_seq ON audit_logs (seq);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_round_seq ON audit_logs (round_number, seq);
+
+-- Verification cursor: last verified entry and the outcome of the last run
+CREATE TABLE IF NOT EXISTS audit_checkpoints (
+    name VARCHAR(50) PRIMARY KEY,
+    seq BIGINT NOT NULL DEFAULT 0,
+    entry_hash TEXT,
+    verified_entries BIGINT NOT NULL DEFAULT 0,
+    status VARCHAR(20),
+    broken_at BIGINT,
+    detail TEXT,
+    verified_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Appends allocate seq and chain onto the current head inside one
+-- transaction, under an advisory lock, so concurrent API workers can never
+-- hand out the same seq or fork the chain. entry_hash matches
+-- compute_entry_hash in app/services/audit_service.py.
+CREATE OR REPLACE FUNCTION append_audit_entries(entries JSONB)
+RETURNS SETOF audit_logs
+LANGUAGE plpgsql AS $$
+DECLARE
+    head audit_logs%ROWTYPE;
+    entry JSONB;
+    appended audit_logs%ROWTYPE;
+    next_seq BIGINT;
+    last_round INTEGER;
+    last_hash TEXT;
+    stamped TIMESTAMPTZ;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('audit_logs_chain'));
+    SELECT * INTO head FROM audit_logs WHERE seq IS NOT NULL ORDER BY seq DESC LIMIT 1;
+    next_seq := COALESCE(head.seq, 0);
+    last_round := COALESCE(head.round_number, 0);
+    last_hash := COALESCE(head.entry_hash, repeat('0', 64));
+
+    FOR entry IN SELECT value FROM jsonb_array_elements(entries) LOOP
+        IF (entry->>'round_number')::INTEGER < last_round THEN
+            RAISE EXCEPTION 'Round % is older than the chain head (round %)', entry->>'round_number', last_round
+                USING ERRCODE = '22023';
+        END IF;
+        next_seq := next_seq + 1;
+        last_round := (entry->>'round_number')::INTEGER;
+        stamped := clock_timestamp();
+        INSERT INTO audit_logs (seq, round_number, update_hash, previous_hash, entry_hash, timestamp)
+        VALUES (
+            next_seq, last_round, entry->>'update_hash', last_hash,
+            encode(sha256(convert_to(concat_ws('|', next_seq, last_round, entry->>'update_hash', last_hash,
+                to_char(stamped AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US') || '+00:00'), 'UTF8')), 'hex'),
+            stamped
+        )
+        RETURNING * INTO appended;
+        last_hash := appended.entry_hash;
+        RETURN NEXT appended;
+    END LOOP;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION append_audit_entries(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION append_audit_entries(JSONB) TO service_role;
+
+-- Entries are append-only: anyone may read them, only the backend's
+-- service_role may append entries or move the verification cursor
+ALTER TABLE audit_logs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE audit_checkpoints ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Audit entries are readable" ON audit_logs;
+DROP POLICY IF EXISTS "Audit entries are appendable" ON audit_logs;
+DROP POLICY IF EXISTS "Audit checkpoints are readable" ON audit_checkpoints;
+DROP POLICY IF EXISTS "Audit checkpoints are writable" ON audit_checkpoints;
+DROP POLICY IF EXISTS "Audit checkpoints are updatable" ON audit_checkpoints;
+
+CREATE POLICY "Audit entries are readable" ON audit_logs FOR SELECT USING (true);
+CREATE POLICY "Audit entries are appendable" ON audit_logs FOR INSERT TO service_role WITH CHECK (true);
+CREATE POLICY "Audit checkpoints are readable" ON audit_checkpoints FOR SELECT USING (true);
+CREATE POLICY "Audit checkpoints are writable" ON audit_checkpoints FOR INSERT TO service_role WITH CHECK (true);
+CREATE POLICY "Audit checkpoints are updatable" ON audit_checkpoints FOR UPDATE TO service_role USING (true);
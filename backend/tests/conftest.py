@@ -0,0 +1,50 @@
+"""
+Shared test configuration.
+Settings are read from the environment when app.core.config is first
+imported, so the test environment is set up here before any app import.
+The Supabase URL is left at its placeholder, which routes every database
+call to a throwaway local SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SUPABASE_URL", "https://your-project-ref.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role-key")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("WEATHERAPI_KEY", "test-weather-api-key")
+os.environ.setdefault("LOCAL_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="aurafarming-tests-"), "local.sqlite3"))
+
+
+@pytest.fixture
+def admin_headers():
+    """Authorization header carrying an admin token."""
+    from app.core.security import create_admin_token
+    return {"Authorization": f"Bearer {create_admin_token('test-admin', 'admin@example.com')}"}
+
+
+@pytest.fixture
+def farmer_headers():
+    """Authorization header carrying a farmer token."""
+    from app.core.security import create_farmer_token
+    return {"Authorization": f"Bearer {create_farmer_token('test-farmer', '9999999999')}"}
+
+
+@pytest.fixture
+def local_db(tmp_path):
+    """DatabaseService bound to a fresh local SQLite database."""
+    from app.services.database import DatabaseService
+    from app.services.local_database import LocalDatabase
+
+    db = DatabaseService.__new__(DatabaseService)
+    db.use_mock = True
+    db.rest = db.service_rest = LocalDatabase(str(tmp_path / "local.sqlite3"))
+    yield db
+    db.rest._executor.submit(db.rest._conn.close).result()
+    db.rest._executor.shutdown()
@@ -0,0 +1,94 @@
+"""Tests for the content-addressed advisory cache and the stages sharing one rotation plan."""
+
+import pytest
+
+from app.services import smart_advisory_service as advisory_module
+from app.services.advisory_cache import AdvisoryCache, content_key, normalize
+from app.services.smart_advisory_service import SmartAdvisoryService
+
+CONDITIONS = {"soil_type": "loamy", "location": "Ranchi", "water_availability": "medium", "farm_size": 2.0}
+
+
+@pytest.fixture
+def service():
+    return SmartAdvisoryService()
+
+
+def _stage(service, stage):
+    return service.get_cache_stats()["stages"][stage]
+
+
+def test_equivalent_requests_share_a_key():
+    a = normalize({"soil_type": " Loamy ", "ph": 6.50001, "notes": None, "seasons": ["Kharif"]})
+    b = normalize({"seasons": ["kharif"], "ph": 6.5, "soil_type": "loamy"})
+
+    assert content_key("rotation", a) == content_key("rotation", b)
+    assert content_key("rotation", a) != content_key("economic", a)
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = AdvisoryCache(max_entries=2, ttl=10)
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.advisory_cache.time.time", lambda: clock[0])
+    cache.set("rotation", "a", 1)
+    cache.set("rotation", "b", 2)
+    cache.get("rotation", "a")
+    cache.set("economic", "c", 3)
+
+    assert cache.get("rotation", "b") is None
+    assert cache.get("rotation", "a") == 1
+    clock[0] += 11
+    assert cache.get("economic", "c") is None
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.invalidate("rotation") == 1
+
+
+def test_stages_share_one_cached_plan(service):
+    plan = service.get_rotation_plan(CONDITIONS)
+    service.get_economic_analysis(CONDITIONS)
+    service.get_climate_analysis(CONDITIONS)
+
+    assert _stage(service, "rotation") == {"hits": 2, "misses": 1, "entries": 1, "hit_rate": 0.6667}
+    assert _stage(service, "economic")["misses"] == _stage(service, "climate")["misses"] == 1
+    assert plan.years
+
+
+def test_plans_are_sliced_to_the_requested_depth(service):
+    single = service.get_rotation_plan(CONDITIONS, top_k=1)
+    double = service.get_rotation_plan(CONDITIONS, top_k=2)
+    full = service.get_rotation_plan(CONDITIONS, top_k=SmartAdvisoryService.ECONOMIC_TOP_K)
+
+    assert (len(single.alternatives), len(double.alternatives)) == (0, 1)
+    assert double.alternatives == full.alternatives[:1]
+    assert single.years == full.years
+    assert _stage(service, "rotation")["misses"] == 1
+
+
+def test_farm_size_and_spelling_do_not_split_the_cache(service):
+    service.get_rotation_plan(CONDITIONS)
+    service.get_rotation_plan({**CONDITIONS, "farm_size": 9.0, "soil_type": "Loamy ", "location": "ranchi"})
+
+    assert service.advisory_profile(CONDITIONS)["key"] == service.advisory_profile({**CONDITIONS, "farm_size": 1})["key"]
+    assert _stage(service, "rotation") == {"hits": 1, "misses": 1, "entries": 1, "hit_rate": 0.5}
+
+
+def test_new_prices_invalidate_only_the_economic_stage(service, monkeypatch):
+    service.get_economic_analysis(CONDITIONS)
+    service.get_climate_analysis(CONDITIONS)
+    monkeypatch.setattr(advisory_module.market_analytics_store, "_data_version",
+                        advisory_module.market_analytics_store.data_version + 1)
+    service.get_economic_analysis(CONDITIONS)
+    service.get_climate_analysis(CONDITIONS)
+
+    assert _stage(service, "economic")["misses"] == 2
+    assert _stage(service, "climate") == {"hits": 1, "misses": 1, "entries": 1, "hit_rate": 0.5}
+
+
+def test_cached_advisory_round_trip(service):
+    profile = service.advisory_profile(CONDITIONS)
+    assert service.get_cached_advisory(profile) is None
+
+    service.store_advisory(profile, "plan", {"economic": 1}, {"climate": 1})
+
+    assert service.get_cached_advisory(profile) == ("plan", {"economic": 1}, {"climate": 1})
+    assert service.invalidate_cache() == 3
@@ -0,0 +1,88 @@
+"""Tests for the trigger-maintained aggregates and their reconciliation."""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.aggregation_service import AggregationService
+
+
+async def _seed(db):
+    farm = await db.create_farm({"farmer_id": "demo-farmer-123", "name": "North", "field_size": 1.5,
+                                 "location": {"district": "Dhanbad"}})
+    await db.add_crop_history({"farm_id": farm["id"], "crop": "Rice", "season": "kharif", "year": 2025})
+    await db.add_crop_history({"farm_id": farm["id"], "crop": "Rice", "season": "kharif", "year": 2024})
+    await db.add_crop_history({"farm_id": farm["id"], "crop": "Wheat", "season": "rabi", "year": 2025})
+    return farm
+
+
+def test_triggers_keep_summary_tables_current(local_db):
+    async def scenario():
+        await _seed(local_db)
+        return (await local_db.get_platform_counts(), await local_db.get_popular_crops(),
+                await local_db.get_regional_data("Dhanbad"), await local_db.get_farm_count())
+
+    counts, crops, regional, farm_count = asyncio.run(scenario())
+
+    # The demo farmer and farm are seeded with every new database
+    assert counts == {"farmers": 1, "farms": 2, "recommendations": 0, "crops_history": 3}
+    assert farm_count == 2
+    assert crops == [{"crop": "Rice", "count": 2}, {"crop": "Wheat", "count": 1}]
+    assert regional["districts"] == [{"district": "Dhanbad", "farm_count": 1, "total_area": 1.5}]
+
+
+def test_reconcile_repairs_drift_and_reports_it(local_db):
+    def tamper(conn):
+        conn.execute("UPDATE platform_counters SET value = 99 WHERE name = 'farms'")
+        conn.execute("UPDATE crop_popularity SET entries = 0 WHERE crop = 'Wheat'")
+        conn.execute("INSERT INTO crop_popularity (crop, entries, updated_at) VALUES ('Ghost', 4, datetime('now'))")
+
+    async def scenario():
+        await _seed(local_db)
+        await local_db.rest.run(tamper, local_db.rest._conn)
+        drift = await local_db.reconcile_aggregates()
+        again = await local_db.reconcile_aggregates()
+        return drift, again, await local_db.get_farm_count(), await local_db.get_popular_crops()
+
+    drift, again, farm_count, crops = asyncio.run(scenario())
+
+    assert (drift["counters"], drift["crops"], drift["districts"]) == (1, 2, 0)
+    assert (again["counters"], again["crops"], again["districts"]) == (0, 0, 0)
+    assert farm_count == 2
+    assert crops == [{"crop": "Rice", "count": 2}, {"crop": "Wheat", "count": 1}]
+
+
+def test_aggregation_service_caches_until_reconciled(local_db):
+    service = AggregationService(ttl=60)
+    service._db = local_db
+
+    async def scenario():
+        before = await service.get_platform_counts()
+        await local_db.create_farm({"farmer_id": "demo-farmer-123", "name": "South", "field_size": 1.0})
+        cached = await service.get_platform_counts()
+        await service.reconcile()
+        return before, cached, await service.get_platform_counts()
+
+    before, cached, after = asyncio.run(scenario())
+
+    assert cached == before
+    assert after["farms"] == before["farms"] + 1
+    assert service.get_stats()["last_reconciliation"]["counters"] == 0
+
+
+def test_reconcile_route_requires_an_admin(monkeypatch, local_db, admin_headers, farmer_headers):
+    from app.api import admin
+    service = AggregationService()
+    service._db = local_db
+    monkeypatch.setattr(admin, "aggregation_service", service)
+
+    app = FastAPI()
+    app.include_router(admin.admin_router, prefix="/admin")
+    client = TestClient(app)
+
+    assert client.post("/admin/aggregates/reconcile").status_code == 401
+    assert client.post("/admin/aggregates/reconcile", headers=farmer_headers).status_code == 403
+    response = client.post("/admin/aggregates/reconcile", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["counters"] == 0
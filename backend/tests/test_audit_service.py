@@ -0,0 +1,102 @@
+"""Tests for the audit hash chain: appends, incremental verification and routes."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.audit_service import AuditLogService, GENESIS_HASH, compute_entry_hash
+
+
+@pytest.fixture
+def audit(local_db):
+    service = AuditLogService(verify_batch_size=2)
+    service._db = local_db
+    return service
+
+
+def _entries(*rounds):
+    return [{"round_number": r, "update_hash": f"hash-{r}-{i}"} for i, r in enumerate(rounds)]
+
+
+def _tamper(local_db, seq, **changes):
+    asyncio.run(local_db.rest.table("audit_logs").update(changes).eq("seq", seq).execute())
+
+
+def test_append_chains_entries_onto_the_head(audit):
+    first = asyncio.run(audit.append(_entries(1, 1)))
+    second = asyncio.run(audit.append(_entries(2)))
+
+    assert [e["seq"] for e in first + second] == [1, 2, 3]
+    assert first[0]["previous_hash"] == GENESIS_HASH
+    assert second[0]["previous_hash"] == first[1]["entry_hash"]
+    assert all(compute_entry_hash(e) == e["entry_hash"] for e in first + second)
+    with pytest.raises(ValueError):
+        asyncio.run(audit.append(_entries(1)))
+
+
+def test_verify_resumes_from_the_checkpoint(audit):
+    asyncio.run(audit.append(_entries(1, 1, 2)))
+    first = asyncio.run(audit.verify())
+    asyncio.run(audit.append(_entries(3, 3)))
+    second = asyncio.run(audit.verify())
+    idle = asyncio.run(audit.verify())
+
+    assert (first["status"], first["checked_this_run"], first["full"]) == ("valid", 3, True)
+    assert (second["status"], second["checked_this_run"], second["full"]) == ("valid", 2, False)
+    assert second["verified_entries"] == second["verified_through_seq"] == 5
+    assert idle["checked_this_run"] == 0
+
+
+def test_verify_reports_where_the_chain_breaks(audit, local_db):
+    asyncio.run(audit.append(_entries(1, 2, 3, 4)))
+    asyncio.run(audit.verify())
+    asyncio.run(audit.append(_entries(5)))
+    _tamper(local_db, 5, update_hash="forged")
+
+    result = asyncio.run(audit.verify())
+
+    assert (result["status"], result["broken_at_seq"]) == ("broken", 5)
+    assert "entry_hash" in result["detail"]
+    assert result["verified_through_seq"] == 4
+
+
+def test_editing_a_checkpointed_entry_forces_a_full_pass(audit, local_db):
+    asyncio.run(audit.append(_entries(1, 2, 3)))
+    asyncio.run(audit.verify())
+    _tamper(local_db, 3, round_number=99)
+
+    result = asyncio.run(audit.verify())
+
+    assert (result["status"], result["broken_at_seq"], result["checked_this_run"]) == ("broken", 3, 3)
+
+
+def test_audit_routes(monkeypatch, audit, admin_headers, farmer_headers):
+    from app.api import admin
+    from app.services import admin_service
+    monkeypatch.setattr(admin, "audit_service", audit)
+    monkeypatch.setattr(admin_service, "audit_service", audit)
+    app = FastAPI()
+    app.include_router(admin.admin_router, prefix="/admin")
+    body = {"entries": _entries(1, 2)}
+
+    with TestClient(app) as client:
+        for path, payload in [("/admin/audit-logs", body), ("/admin/audit-logs/verify", None)]:
+            assert client.post(path, json=payload).status_code == 401
+            assert client.post(path, json=payload, headers=farmer_headers).status_code == 403
+
+        appended = client.post("/admin/audit-logs", json=body, headers=admin_headers).json()["data"]
+        assert [e["seq"] for e in appended] == [1, 2]
+        stale = {"entries": _entries(0)}
+        assert client.post("/admin/audit-logs", json=stale, headers=admin_headers).status_code == 400
+
+        unverified = client.get("/admin/audit-logs").json()["data"]
+        assert unverified["verification"]["checkpoint"] is None
+        assert client.post("/admin/audit-logs/verify", headers=admin_headers).json()["success"]
+
+        page = client.get("/admin/audit-logs", params={"limit": 1}).json()["data"]
+        assert [e["seq"] for e in page["entries"]] == [2]
+        assert page["next_cursor"] == 2
+        assert page["verification"]["checkpoint"]["status"] == "valid"
+        assert page["verification"]["head_seq"] == 2
@@ -0,0 +1,85 @@
+"""Tests for the bcrypt worker pool and the verified-token cache."""
+
+import asyncio
+import time
+
+from app.core import auth_executor
+from app.core.auth_executor import PasswordHasher, TokenCache, AuthBusyError
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, rounds=4)
+
+    async def scenario():
+        hashed = await hasher.hash("demo1234")
+        return hashed, await hasher.verify("demo1234", hashed), await hasher.verify("wrong", hashed)
+
+    hashed, good, bad = asyncio.run(scenario())
+    hasher.shutdown()
+
+    assert good and not bad
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=12).needs_rehash(hashed)
+    assert hasher.get_stats()["completed"] == 3
+
+
+def test_admission_rejects_callers_beyond_the_queue():
+    hasher = PasswordHasher(workers=1, max_pending=2, queue_timeout=0.05)
+
+    async def scenario():
+        calls = [hasher._run(time.sleep, 0.3) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    hasher.shutdown()
+
+    rejected = [r for r in results if isinstance(r, AuthBusyError)]
+    assert len(rejected) == 1
+    assert rejected[0].retry_after == 0.05
+    assert hasher.get_stats()["rejected"] == 1
+    assert hasher.get_stats()["completed"] == 2
+
+
+def test_token_cache_hits_until_ttl_or_token_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_executor.time, "time", lambda: now[0])
+    cache = TokenCache(max_size=10, ttl=60)
+
+    cache.put("long", {"sub": "a", "exp": 5000})
+    cache.put("short", {"sub": "b", "exp": 1010})
+    cache.put("expired", {"sub": "c", "exp": 999})
+
+    assert cache.get("long") == {"sub": "a", "exp": 5000}
+    assert cache.get("expired") is None
+    now[0] = 1011
+    assert cache.get("short") is None
+    assert cache.get("long") is not None
+    now[0] = 1061
+    assert cache.get("long") is None
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2, ttl=60)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert TokenCache(max_size=0).get_stats()["size"] == 0
+
+
+def test_verified_tokens_are_served_from_the_cache():
+    from app.core.security import create_admin_token, verify_token
+
+    token = create_admin_token("cache-admin", "admin@example.com")
+    auth_executor.token_cache.clear()
+    auth_executor.token_cache.reset_stats()
+
+    first = verify_token(token)
+    second = verify_token(token)
+
+    assert first == second and first["type"] == "admin"
+    assert auth_executor.token_cache.get_stats()["hits"] == 1
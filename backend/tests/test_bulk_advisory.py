@@ -0,0 +1,115 @@
+"""Tests for bulk advisory generation and its NDJSON stream."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import bulk_advisory
+from app.services.bulk_advisory import BulkAdvisoryRunner
+from app.services.smart_advisory_service import SmartAdvisoryService
+
+LOAMY = {"soil_type": "loamy", "location": "Ranchi", "water_availability": "medium"}
+SANDY = {"soil_type": "sandy", "location": "Dhanbad", "water_availability": "low"}
+FARMS = [
+    {"farm_id": "a", "farm_conditions": {**LOAMY, "farm_size": 1.0}},
+    {"farm_id": "b", "farm_conditions": {**LOAMY, "farm_size": 3.0, "soil_type": "Loamy"}},
+    {"farm_id": "c", "farm_conditions": {**SANDY, "farm_size": 2.0}},
+]
+
+
+@pytest.fixture
+def runner():
+    runner = BulkAdvisoryRunner(SmartAdvisoryService(), workers=0)
+    yield runner
+    runner.shutdown()
+
+
+def _collect(runner, farms, **kwargs):
+    async def scenario():
+        return [json.loads(line) async for line in runner.stream(farms, **kwargs)]
+    return asyncio.run(scenario())
+
+
+def test_stream_solves_each_profile_once(runner):
+    lines = _collect(runner, FARMS)
+
+    assert lines[0] == {"type": "job", "farms": 3, "unique_profiles": 2}
+    farms = {line["farm_id"]: line for line in lines if line["type"] == "farm"}
+    assert set(farms) == {"a", "b", "c"}
+    assert farms["a"]["profile"] == farms["b"]["profile"] != farms["c"]["profile"]
+    assert farms["a"]["rotation_plan"] == farms["b"]["rotation_plan"]
+    assert lines[-1]["type"] == "portfolio"
+    assert lines[-1]["farms"] == 3 and lines[-1]["total_area_ha"] == 6.0
+
+
+def test_repeat_jobs_are_served_from_the_advisory_cache(runner, monkeypatch):
+    first = _collect(runner, FARMS)
+
+    def unreachable(*args):
+        raise AssertionError("cached profiles must not be solved again")
+
+    monkeypatch.setattr(bulk_advisory, "_solve_profile", unreachable)
+    second = _collect(runner, FARMS)
+
+    assert runner.get_stats()["cached_profiles"] == 2
+    # Tied crops may be listed in another order when profiles finish in another order
+    assert second[-1]["water_demand"] == first[-1]["water_demand"]
+    assert sorted(map(str, second[-1]["crop_mix"])) == sorted(map(str, first[-1]["crop_mix"]))
+    assert second[-1]["price_risk"]["expected_profit"] == first[-1]["price_risk"]["expected_profit"]
+
+
+def test_portfolio_scales_per_hectare_results_by_farm_size(runner):
+    single = _collect(runner, FARMS[:1])[-1]
+    tripled = _collect(runner, FARMS[1:2])[-1]
+
+    assert tripled["price_risk"]["expected_profit"] == pytest.approx(3 * single["price_risk"]["expected_profit"], abs=0.05)
+    assert tripled["water_demand"]["total_m3"] == pytest.approx(3 * single["water_demand"]["total_m3"], abs=0.5)
+    shares = [item["revenue_share"] for item in single["price_risk"]["commodity_exposure"]]
+    assert sum(shares) == pytest.approx(1.0, abs=1e-3)
+    assert single["price_risk"]["concentration_index"] == pytest.approx(sum(s * s for s in shares), abs=1e-3)
+
+
+def test_failed_profiles_stream_error_lines(runner, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("solver crashed")
+
+    monkeypatch.setattr(bulk_advisory, "_solve_profile", broken)
+    lines = _collect(runner, FARMS)
+
+    errors = [line for line in lines if line["type"] == "error"]
+    assert sorted(line["farm_id"] for line in errors) == ["a", "b", "c"]
+    assert errors[0]["detail"] == "solver crashed"
+    assert lines[-1]["farms"] == 0
+    assert runner.get_stats()["failed_profiles"] == 2
+
+
+def test_profiles_solve_on_worker_processes():
+    runner = BulkAdvisoryRunner(SmartAdvisoryService(), workers=1)
+    try:
+        lines = _collect(runner, FARMS[:1])
+    finally:
+        runner.shutdown()
+
+    assert [line["type"] for line in lines] == ["job", "farm", "portfolio"]
+    assert runner.service.get_cached_advisory(runner.service.advisory_profile(LOAMY)) is not None
+
+
+def test_bulk_route_streams_ndjson(monkeypatch):
+    from app.api import smart_advisory
+    runner = BulkAdvisoryRunner(SmartAdvisoryService(), workers=0)
+    monkeypatch.setattr(smart_advisory, "bulk_advisory_runner", runner)
+    app = FastAPI()
+    app.include_router(smart_advisory.smart_advisory_router, prefix="/smart-advisory")
+    body = {"farms": [{"farm_id": farm["farm_id"], "farm_conditions": farm["farm_conditions"]} for farm in FARMS]}
+
+    with TestClient(app) as client:
+        response = client.post("/smart-advisory/bulk", json=body)
+        rejected = client.post("/smart-advisory/bulk", json={**body, "seasons": ["Monsoon"]})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["unique_profiles"] == 2 and lines[-1]["type"] == "portfolio"
+    assert rejected.status_code == 422
@@ -0,0 +1,121 @@
+"""Tests for the buffered bulk-write pipeline."""
+
+import asyncio
+import sqlite3
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.bulk_writer import BulkWriter, is_permanent_error
+
+
+class FakeDatabase:
+    """Rejects batches containing a bad row; optionally fails transiently first."""
+
+    def __init__(self, bad_ids=(), transient_failures=0):
+        self.bad_ids = set(bad_ids)
+        self.transient_failures = transient_failures
+        self.calls = []
+        self.rows = {}
+
+    async def bulk_insert(self, table, records):
+        self.calls.append([row["id"] for row in records])
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise httpx.ConnectError("connection refused")
+        if self.bad_ids & {row["id"] for row in records}:
+            raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+        for row in records:
+            self.rows.setdefault(row["id"], row)
+
+
+def _writer(db, **kwargs):
+    writer = BulkWriter(batch_size=kwargs.pop("batch_size", 100), retry_backoff=0, **kwargs)
+    writer._db = db
+    return writer
+
+
+def _records(count):
+    return [{"id": f"r{i}", "farm_id": "farm"} for i in range(count)]
+
+
+def test_error_classification():
+    response = httpx.Response(409, request=httpx.Request("POST", "http://db"))
+    throttled = httpx.Response(429, request=httpx.Request("POST", "http://db"))
+
+    assert is_permanent_error(sqlite3.IntegrityError("unique"))
+    assert is_permanent_error(httpx.HTTPStatusError("conflict", request=response.request, response=response))
+    assert not is_permanent_error(httpx.HTTPStatusError("slow down", request=throttled.request, response=throttled))
+    assert not is_permanent_error(httpx.ConnectError("down"))
+
+
+def test_bad_rows_are_bisected_out_and_dead_lettered():
+    db = FakeDatabase(bad_ids={"r2", "r5"})
+    writer = _writer(db)
+
+    async def scenario():
+        await writer.enqueue("crops_history", _records(8))
+        return await writer.flush()
+
+    written = asyncio.run(scenario())
+
+    assert written == 6
+    assert sorted(db.rows) == ["r0", "r1", "r3", "r4", "r6", "r7"]
+    letters = writer.get_dead_letters("crops_history")["crops_history"]
+    assert [letter["row"]["id"] for letter in letters] == ["r2", "r5"]
+    assert letters[0]["error"].startswith("IntegrityError")
+    assert writer.get_stats()["dead_lettered"] == 2
+    assert writer.buffered == 0
+
+
+def test_transient_errors_are_retried_then_requeued_in_order():
+    db = FakeDatabase(transient_failures=5)
+    writer = _writer(db, max_retries=2)
+
+    async def scenario():
+        await writer.enqueue("recommendations", _records(3))
+        first = await writer.flush()
+        await writer.enqueue("recommendations", [{"id": "late"}])
+        return first, writer._buffers["recommendations"][:], await writer.flush()
+
+    first, requeued, second = asyncio.run(scenario())
+
+    assert first == 0
+    assert [row["id"] for row in requeued] == ["r0", "r1", "r2", "late"]
+    assert second == 4
+    assert writer.get_stats()["retries"] == 4
+    assert writer.get_stats()["requeued_batches"] == 1
+    assert not writer.get_dead_letters()["recommendations"]
+
+
+def test_full_batches_flush_inline_and_stamp_ids():
+    db = FakeDatabase()
+    writer = _writer(db, batch_size=2)
+
+    ids = asyncio.run(writer.enqueue("recommendations", [{"crop": "Rice"}, {"id": "given"}]))
+
+    assert ids[1] == "given" and len(ids[0]) == 36
+    assert db.calls == [ids]
+    assert "created_at" in db.rows["given"]
+
+
+def test_dead_letter_routes_require_an_admin(monkeypatch, admin_headers, farmer_headers):
+    from app.api import admin
+    writer = _writer(FakeDatabase(bad_ids={"r0"}))
+    asyncio.run(writer.enqueue("crops_history", _records(1)))
+    monkeypatch.setattr(admin, "bulk_writer", writer)
+    app = FastAPI()
+    app.include_router(admin.admin_router, prefix="/admin")
+
+    with TestClient(app) as client:
+        for method, path in [("get", "/admin/bulk-writes/dead-letters"), ("post", "/admin/bulk-writes/flush")]:
+            assert getattr(client, method)(path).status_code == 401
+            assert getattr(client, method)(path, headers=farmer_headers).status_code == 403
+
+        assert client.post("/admin/bulk-writes/flush", headers=admin_headers).json()["data"]["written"] == 0
+        letters = client.get("/admin/bulk-writes/dead-letters", params={"table": "crops_history"},
+                             headers=admin_headers).json()["data"]
+        assert [letter["row"]["id"] for letter in letters["crops_history"]] == ["r0"]
+        assert client.get("/admin/bulk-writes/dead-letters", params={"table": "farms"},
+                          headers=admin_headers).status_code == 400
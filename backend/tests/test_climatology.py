@@ -0,0 +1,85 @@
+"""Tests for the precomputed district climatology."""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.climatology import Climatology, SEASON_NORMALS, climatology
+
+
+def test_month_normals_spread_season_rainfall_over_its_months():
+    july = climatology.month_normals("Ranchi", 7)
+
+    assert july == {"season": "kharif", "temp_low": 26.0, "temp_high": 32.0, "rain_low": 250.0,
+                    "rain_high": 350.0, "humidity_low": 70.0, "humidity_high": 85.0}
+    assert climatology.month_normals("ranchi", 1)["season"] == "rabi"
+    assert climatology.month_normals("Ranchi", 10) is None  # between the monsoon and rabi sowing
+    assert climatology.month_normals("Atlantis", 7) is None
+
+
+def test_district_modifiers_shift_temperature_and_scale_rainfall():
+    dumka = climatology.month_normals("Dumka", 4)
+    ranchi = climatology.month_normals("Ranchi", 4)
+
+    assert dumka["temp_high"] == ranchi["temp_high"] - 1
+    assert dumka["rain_high"] == pytest.approx(ranchi["rain_high"] * 1.2, abs=0.1)
+    assert dumka["humidity_low"] == ranchi["humidity_low"]
+
+
+def test_planting_normals_read_the_sowing_month():
+    kharif = climatology.planting_normals("Ranchi", "Kharif")
+    zaid = climatology.planting_normals("Garhwa", "Zaid")
+    state = climatology.planting_normals("jharkhand", "rabi")
+
+    assert kharif["month"] == "June" and kharif["rain_low"] == 250.0
+    assert zaid["month"] == "March" and zaid["temp_high"] == 41.5
+    assert state["month"] == "November"
+    assert state["temp_low"] == pytest.approx(climatology.normals[:, 1, 10, 0].mean(), abs=0.05)
+    assert climatology.planting_normals("Ranchi", "monsoon") is None
+
+
+def test_seasonal_patterns_match_the_normals():
+    patterns = climatology.seasonal_patterns("Ranchi")
+
+    assert patterns is climatology.seasonal_patterns("Ranchi")
+    kharif = patterns["seasons"]["kharif"]
+    assert kharif["avg_rainfall"] == 1200 and kharif["avg_temperature"] == 29.0
+    assert [month["month"] for month in kharif["monthly"]] == SEASON_NORMALS["kharif"]["months"]
+    assert sum(month["avg_rainfall"] for month in kharif["monthly"]) == kharif["avg_rainfall"]
+    for season in patterns["seasons"].values():
+        assert all(month["avg_temperature"] == season["avg_temperature"] for month in season["monthly"])
+
+
+def test_climate_profile_and_season_risk():
+    ranchi = climatology.climate_profile("Ranchi")
+    garhwa = climatology.climate_profile("Garhwa")
+
+    assert ranchi["annual_rainfall"] == 1200 + 100 + 50
+    assert "flood" in ranchi["extreme_events"] and "drought" not in ranchi["extreme_events"]
+    assert "drought" in garhwa["extreme_events"] and "heatwave" in garhwa["extreme_events"]
+    assert climatology.season_risk("Ranchi", "summer") == {"heat_stress_risk": 1.0, "extreme_event_risk": 0.3}
+    assert climatology.season_risk("Ranchi", "kharif") == {"heat_stress_risk": 0.2, "extreme_event_risk": 0.3}
+    assert climatology.season_risk("Garhwa", "kharif")["heat_stress_risk"] == 0.35
+    state = climatology.season_risk(None, None)
+    assert state["heat_stress_risk"] == pytest.approx(float(np.mean(climatology.heat_risk)), abs=1e-3)
+
+
+def test_custom_district_lists_use_default_modifiers():
+    custom = Climatology(["Ranchi", "Nowhere"])
+
+    assert custom.month_normals("Nowhere", 7) == custom.month_normals("Ranchi", 7)
+    assert custom.normals.shape == (2, 3, 12, 6)
+
+
+def test_seasonal_route():
+    from app.api import weather
+    app = FastAPI()
+    app.include_router(weather.weather_router, prefix="/weather")
+
+    with TestClient(app) as client:
+        response = client.get("/weather/seasonal/Ranchi")
+        unknown = client.get("/weather/seasonal/Atlantis")
+
+    assert response.json()["data"]["seasons"]["kharif"]["monthly"][0]["month"] == "June"
+    assert unknown.status_code == 400
@@ -0,0 +1,68 @@
+"""Tests for the shared crop economics engine."""
+
+import numpy as np
+import pytest
+
+from app.services.crop_economics import (
+    COST_BREAKDOWN, DEFAULT_PARAMETERS, HECTARES_PER_ACRE, CropEconomics, crop_economics, quintals_per_acre
+)
+
+CROPS = ["Rice", "paddy", "Gram", "Dragonfruit", "Potato"]
+FARMS = [
+    {},
+    {"area_ha": 2.5, "yield_factor": 0.8, "cost_factor": 1.2},
+    {"area_ha": 0.4, "yield_factor": [1.0, 1.1, 0.9, 1.0, 1.3]},
+]
+
+
+def test_batch_estimates_match_single_estimates():
+    batch = crop_economics.estimate(CROPS, FARMS)
+
+    for f, farm in enumerate(FARMS):
+        for c, crop in enumerate(CROPS):
+            factor = farm.get("yield_factor", 1.0)
+            single = crop_economics.estimate_one(
+                crop, area_ha=farm.get("area_ha", 1.0),
+                yield_factor=factor[c] if isinstance(factor, list) else factor,
+                cost_factor=farm.get("cost_factor", 1.0)
+            )
+            for field in ("yield_t_ha", "production_quintals", "revenue", "cost", "profit", "margin_percent", "roi_percent"):
+                assert batch[field][f, c] == pytest.approx(single[field]), (field, farm, crop)
+
+
+def test_reference_rows_aliases_and_defaults():
+    rice = crop_economics.estimate_one("Rice", area_ha=2)
+
+    assert rice["production_quintals"] == pytest.approx(4.5 * 10 * 2)
+    assert rice["profit"] == pytest.approx(4.5 * 10 * 2 * 2000 - 45000 * 2)
+    assert crop_economics.price("paddy") == crop_economics.price(" rice ") == 2000
+    assert crop_economics.base_yield("gram") == crop_economics.base_yield("Chickpea")
+    assert (crop_economics.base_yield("Dragonfruit"), crop_economics.price("Dragonfruit"),
+            crop_economics.cost("Dragonfruit")) == DEFAULT_PARAMETERS
+
+
+def test_price_overrides_keep_reference_prices_for_missing_entries():
+    by_sequence = crop_economics.estimate(["Rice", "Wheat", "Maize"], prices=[2500, 0, -1])
+    by_name = crop_economics.estimate(["Rice", "Wheat"], prices={"Wheat": 2400})
+
+    assert by_sequence["price"].tolist() == [2500, 2100, 1800]
+    assert by_name["price"].tolist() == [2000, 2400]
+    assert by_sequence["revenue"][0, 0] == pytest.approx(4.5 * 10 * 2500)
+
+
+def test_loss_making_and_zero_revenue_crops():
+    economics = CropEconomics({"Fallow": (0.0, 2000, 10000)})
+    result = economics.estimate_one("Fallow")
+
+    assert result["revenue"] == 0 and result["profit"] == -10000
+    assert result["margin_percent"] == 0.0
+    assert result["roi_percent"] == -100.0
+
+
+def test_unit_helpers():
+    assert quintals_per_acre(1.0) == pytest.approx(10 * HECTARES_PER_ACRE)
+    assert sum(crop_economics.cost_breakdown(10000).values()) == pytest.approx(10000, abs=1)
+    assert set(crop_economics.cost_breakdown(1)) == set(COST_BREAKDOWN)
+    assert CropEconomics.management_factor("Alluvial Soil", "Drip irrigation") == pytest.approx(1.44)
+    assert CropEconomics.management_factor("Unknown", None) == 1.0
+    assert np.array_equal(crop_economics.rows(["rice", "nope"]), [0, crop_economics.default_row])
@@ -0,0 +1,56 @@
+"""Tests for the shared async PostgREST client pool."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import database
+from app.services.database import DatabaseService
+
+
+@pytest.fixture
+def supabase_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setattr(settings, "SUPABASE_ANON_KEY", "anon-key")
+    monkeypatch.setattr(settings, "SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(database, "_rest_client", None)
+    monkeypatch.setattr(database, "_service_rest_client", None)
+    yield
+    asyncio.run(database.close_rest_client())
+
+
+def test_services_share_one_bounded_client_per_key(supabase_settings):
+    first, second = DatabaseService(), DatabaseService()
+
+    assert first.use_mock is False
+    assert first.rest is second.rest
+    assert first.service_rest is second.service_rest
+    assert first.rest is not first.service_rest
+    assert first.rest.session._transport._pool._max_connections == 7
+    assert first.rest.headers["apikey"] == "anon-key"
+    assert first.service_rest.headers["Authorization"] == "Bearer service-key"
+    assert str(first.rest.base_url).rstrip("/") == "https://example.supabase.co/rest/v1"
+
+
+def test_close_releases_the_pools(supabase_settings):
+    client = database.get_rest_client()
+    asyncio.run(database.close_rest_client())
+
+    assert database._rest_client is None and database._service_rest_client is None
+    assert database.get_rest_client() is not client
+
+
+def test_placeholder_credentials_use_the_local_database():
+    service = DatabaseService()
+
+    assert service.use_mock is True
+    assert service.rest is service.service_rest
+
+    async def round_trip():
+        farmer = await service.create_farmer({"name": "Pool Test", "phone": "7000000031", "password": "x"})
+        return farmer, await service.get_farmer_by_phone("7000000031")
+
+    created, loaded = asyncio.run(round_trip())
+    assert loaded["id"] == created["id"]
@@ -0,0 +1,83 @@
+"""Tests for the farmer, farm and crop-history entity cache."""
+
+import asyncio
+
+from app.services.entity_cache import EntityCache, MISSING, request_scope, entity_cache
+from app.services.database import DatabaseService
+
+
+class CountingLoader:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_rows_load_once_and_are_copied_across_requests():
+    cache = EntityCache(ttl=60)
+    loader = CountingLoader({"id": "f1", "name": "Asha"})
+
+    async def scenario():
+        first = await cache.get("farmer", "f1", loader)
+        first["name"] = "mutated"
+        second = await cache.get("farmer", "f1", loader)
+        return second
+
+    second = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert second["name"] == "Asha"
+
+
+def test_identity_map_returns_the_same_object_within_a_request():
+    cache = EntityCache(ttl=60)
+    loader = CountingLoader({"id": "farm-1"})
+
+    async def scenario():
+        with request_scope():
+            first = await cache.get("farm", "farm-1", loader)
+            second = await cache.get("farm", "farm-1", loader)
+            return first is second
+
+    assert asyncio.run(scenario())
+    assert cache.get_stats()["identity_map_hits"] == 1
+
+
+def test_missing_rows_are_cached_and_invalidation_drops_both_layers():
+    cache = EntityCache(ttl=60)
+    loader = CountingLoader(None)
+
+    async def scenario():
+        with request_scope():
+            assert await cache.get("farm", "gone", loader) is None
+            assert await cache.get("farm", "gone", loader) is None
+            cache.invalidate("farm", "gone")
+            assert cache.peek("farm", "gone") is MISSING
+            await cache.get("farm", "gone", loader)
+
+    asyncio.run(scenario())
+    assert loader.calls == 2
+
+
+def test_prime_serves_written_rows_without_a_read():
+    cache = EntityCache(ttl=60)
+    cache.prime("farmer", "f2", {"id": "f2"})
+
+    assert cache.peek("farmer", "f2") == {"id": "f2"}
+    assert cache.clear() == 1
+    assert cache.peek("farmer", "f2") is MISSING
+
+
+def test_database_writes_invalidate_cached_rows():
+    db = DatabaseService()
+
+    async def scenario():
+        farmer = await db.create_farmer({"name": "Cache Test", "phone": "7000000032", "password": "x"})
+        assert (await db.get_farmer_by_id(farmer["id"]))["name"] == "Cache Test"
+        await db.update_farmer(farmer["id"], {"name": "Renamed"})
+        return await db.get_farmer_by_id(farmer["id"])
+
+    entity_cache.clear()
+    assert asyncio.run(scenario())["name"] == "Renamed"
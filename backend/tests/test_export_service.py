@@ -0,0 +1,146 @@
+"""Tests for streamed exports, their encoders and resumable export jobs."""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.export_service import (
+    CSVEncoder, NDJSONEncoder, ExportService, EXPORT_SPECS, PARQUET_AVAILABLE, normalize_export
+)
+
+FIELDS = EXPORT_SPECS["farms"]["fields"]
+ROWS = [
+    {"farm_id": "a", "district": "Ranchi", "soil_type": "loam", "irrigation_method": "drip",
+     "field_size": 1.5, "created_at": "2026-01-01"},
+    {"farm_id": "b", "district": "Dhanbad, East", "soil_type": None, "irrigation_method": "rainfed",
+     "field_size": None, "created_at": "2026-01-02"},
+]
+
+
+def test_csv_encoder_writes_header_then_batches():
+    encoder = CSVEncoder(FIELDS)
+    data = encoder.header() + encoder.encode(ROWS[:1]) + encoder.encode(ROWS[1:]) + encoder.close()
+
+    parsed = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+    assert [row["farm_id"] for row in parsed] == ["a", "b"]
+    assert parsed[1]["district"] == "Dhanbad, East"
+
+
+def test_ndjson_encoder_writes_one_object_per_line():
+    encoder = NDJSONEncoder(FIELDS)
+    data = encoder.header() + encoder.encode(ROWS) + encoder.close()
+
+    assert [json.loads(line) for line in data.decode("utf-8").splitlines()] == ROWS
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow is not installed")
+def test_parquet_encoder_writes_one_row_group_per_batch():
+    import pyarrow.parquet as pq
+    from app.services.export_service import ParquetEncoder
+
+    encoder = ParquetEncoder(FIELDS)
+    data = encoder.header() + encoder.encode(ROWS[:1]) + encoder.encode(ROWS[1:]) + encoder.close()
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.num_row_groups == 2
+    assert parquet.read().to_pylist() == ROWS
+
+
+def test_normalize_export_validates_kind_and_format():
+    assert normalize_export("farms", "json") == "ndjson"
+    with pytest.raises(ValueError):
+        normalize_export("farmers", "csv")
+    with pytest.raises(ValueError):
+        normalize_export("farms", "xlsx")
+
+
+async def _add_farms(db, count):
+    for i in range(count):
+        await db.create_farm({"farmer_id": "demo-farmer-123", "name": f"Farm {i}", "field_size": i + 1,
+                              "location": {"district": "Ranchi", "latitude": 23.3}})
+
+
+def _service(db, tmp_path):
+    service = ExportService(batch_size=2, export_dir=str(tmp_path))
+    service._db = db
+    return service
+
+
+def test_gzip_stream_matches_the_plain_stream(local_db, tmp_path):
+    service = _service(local_db, tmp_path)
+
+    async def scenario():
+        await _add_farms(local_db, 4)
+        plain = b"".join([chunk async for chunk in service.stream_export("farms", "csv")])
+        packed = b"".join([chunk async for chunk in service.stream_export("farms", "csv", compress=True)])
+        return plain, packed
+
+    plain, packed = asyncio.run(scenario())
+
+    assert gzip.decompress(packed) == plain
+    lines = plain.decode("utf-8").splitlines()
+    assert len(lines) == 1 + 5  # header, demo farm and four new farms
+    assert "latitude" not in plain.decode("utf-8")
+
+
+@pytest.mark.parametrize("fmt, compress", [("csv", False), ("ndjson", True)])
+def test_failed_job_resumes_from_its_cursor(local_db, tmp_path, fmt, compress):
+    service = _service(local_db, tmp_path)
+    iter_rows = local_db.iter_table_rows
+
+    async def flaky(*args, **kwargs):
+        batches = 0
+        async for batch in iter_rows(*args, **kwargs):
+            if batches == 1 and job.attempts == 1:
+                raise ConnectionError("connection reset")
+            batches += 1
+            yield batch
+
+    async def scenario():
+        nonlocal job
+        await _add_farms(local_db, 4)
+        expected = b"".join([chunk async for chunk in service.stream_export("farms", fmt)])
+        local_db.iter_table_rows = flaky
+        job = service.start_job("farms", fmt, compress=compress)
+        await job.task
+        failed = (job.status, job.rows)
+        service.resume_job(job.id)
+        await job.task
+        return expected, failed
+
+    job = None
+    expected, failed = asyncio.run(scenario())
+
+    assert failed == ("failed", 2)
+    assert job.status == "completed" and job.rows == 5 and job.attempts == 2
+    with open(job.path, "rb") as fh:
+        written = fh.read()
+    assert (gzip.decompress(written) if compress else written) == expected
+
+
+def test_job_routes_require_an_admin(monkeypatch, local_db, tmp_path, admin_headers, farmer_headers):
+    from app.api import admin
+    monkeypatch.setattr(admin, "export_service", _service(local_db, tmp_path))
+    app = FastAPI()
+    app.include_router(admin.admin_router, prefix="/admin")
+
+    with TestClient(app) as client:
+        assert client.post("/admin/export/jobs", params={"kind": "farms"}).status_code == 401
+        assert client.post("/admin/export/jobs", params={"kind": "farms"}, headers=farmer_headers).status_code == 403
+        for method, path in [("get", "/admin/export/jobs"), ("get", "/admin/export/jobs/x"),
+                             ("post", "/admin/export/jobs/x/resume"), ("delete", "/admin/export/jobs/x"),
+                             ("get", "/admin/export/jobs/x/download")]:
+            assert getattr(client, method)(path).status_code == 401
+            assert getattr(client, method)(path, headers=farmer_headers).status_code == 403
+
+        started = client.post("/admin/export/jobs", params={"kind": "farms", "format": "json"}, headers=admin_headers)
+        assert started.status_code == 200
+        job_id = started.json()["data"]["job_id"]
+        assert client.get(f"/admin/export/jobs/{job_id}", headers=admin_headers).status_code == 200
+        assert client.get("/admin/export/jobs/missing", headers=admin_headers).status_code == 404
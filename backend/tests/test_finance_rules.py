@@ -0,0 +1,126 @@
+"""Tests for the finance rules engine, member screening and the NDJSON encoder."""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.ndjson import ndjson_line
+from app.services.finance_rules import FinanceRulesEngine
+from app.services.finance_service import FinanceService
+
+PROFILES = [
+    {"farmer_id": "small", "field_size": 1.5},
+    {"farmer_id": "large", "field_size": 3.0, "shg_member": False},
+    {"farmer_id": "landless", "field_size": None, "shg_member": True},
+    {"farmer_id": "zero", "field_size": 0.0},
+]
+
+
+@pytest.fixture(scope="module")
+def service():
+    return FinanceService()
+
+
+def _eligible(engine, profile):
+    return {name for name, scheme in engine.evaluate_one(profile).items() if scheme["eligible"]}
+
+
+def test_eligibility_follows_the_scheme_rules(service):
+    engine = service.rules
+
+    assert _eligible(engine, PROFILES[0]) == set(engine.names) - {"Agriculture Term Loan"}
+    assert _eligible(engine, PROFILES[1]) == set(engine.names) - {
+        "PM-KISAN Samman Nidhi", "Seed Subsidy", "Self Help Group (SHG) Loans"
+    }
+    # No land on record: only schemes that are not worth something per hectare
+    assert _eligible(engine, PROFILES[2]) == _eligible(engine, PROFILES[3]) == set()
+    assert "Self Help Group (SHG) Loans" in _eligible(engine, {"field_size": 1.0, "shg_member": None})
+
+
+def test_benefit_amounts(service):
+    schemes = service.rules.evaluate_one({"field_size": 1.5})
+
+    assert schemes["PM-KISAN Samman Nidhi"]["value"] == 6000
+    assert schemes["Kisan Credit Card (KCC)"]["base"] == 75000
+    assert schemes["Seed Subsidy"]["value"] == pytest.approx(1.5 * 10000 * 0.3)
+    assert schemes["Drip Irrigation Subsidy"]["value"] == pytest.approx(1.5 * 80000 * 0.6)
+    assert service.rules.evaluate_one({"field_size": 100})["Kisan Credit Card (KCC)"]["base"] == 300000
+
+
+def test_batch_evaluation_matches_single_profiles(service):
+    batch = service.rules.evaluate(PROFILES)
+
+    for p, profile in enumerate(PROFILES):
+        single = service.rules.evaluate_one(profile)
+        for s, name in enumerate(service.rules.names):
+            assert bool(batch["eligible"][p, s]) == single[name]["eligible"]
+            assert float(batch["value"][p, s]) == single[name]["value"]
+
+
+def test_screen_totals_credit_and_direct_benefits(service):
+    record = service.rules.screen(PROFILES[:1])[0]
+    by_name = {scheme["scheme"]: scheme for scheme in record["eligible_schemes"]}
+
+    assert record["credit_available"] == 75000 + 150000
+    assert record["direct_benefit"] == pytest.approx(6000 + 7500 + 4500 + 72000)
+    assert by_name["Pradhan Mantri Fasal Bima Yojana (PMFBY)"]["farmer_contribution"] == pytest.approx(300)
+    assert by_name["Drip Irrigation Subsidy"]["farmer_contribution"] == pytest.approx(48000)
+
+
+def test_schemes_without_rules_are_rejected(service):
+    schemes = {**service.schemes_data, "subsidies": [*service.schemes_data["subsidies"], {"name": "Solar Pump Subsidy"}]}
+
+    with pytest.raises(ValueError, match="Solar Pump Subsidy"):
+        FinanceRulesEngine(schemes, service.loan_schemes, service.insurance_schemes)
+
+
+def test_stream_screens_in_chunks(service):
+    async def scenario():
+        return [json.loads(line) async for line in service.rules.stream(PROFILES, chunk_size=3)]
+
+    lines = asyncio.run(scenario())
+
+    assert lines[0] == {"type": "job", "profiles": 4, "schemes": len(service.rules.names)}
+    assert [line["farmer_id"] for line in lines[1:-1]] == [p["farmer_id"] for p in PROFILES]
+    summary = lines[-1]
+    assert summary["eligible_by_scheme"]["PM-KISAN Samman Nidhi"] == 1
+    assert summary["total_credit_available"] == sum(line["credit_available"] for line in lines[1:-1])
+
+
+def test_seed_subsidy_savings_are_reported(service):
+    small = asyncio.run(service.get_subsidies({"id": "f"}, {"field_size": 1.5}))
+    large = asyncio.run(service.get_subsidies({"id": "f"}, {"field_size": 3.0}))
+
+    seed = {s["name"]: s for s in small["applicable_subsidies"]}["Seed Subsidy"]
+    assert seed["estimated_annual_savings"] == "₹4,500.0"
+    assert "estimated_annual_savings" not in {s["name"]: s for s in large["applicable_subsidies"]}["Seed Subsidy"]
+
+
+def test_ndjson_line_encodes_one_document_per_line():
+    @dataclass
+    class Point:
+        crop: str
+
+    line = ndjson_line({"at": datetime(2026, 1, 2, 3, 4), "point": Point("Rice"), "name": "धान"})
+
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == {"at": "2026-01-02T03:04:00", "point": {"crop": "Rice"}, "name": "धान"}
+
+
+def test_screen_route_requires_a_user(farmer_headers):
+    from app.api import finance
+    app = FastAPI()
+    app.include_router(finance.finance_router, prefix="/finance")
+    body = {"profiles": [{"farmer_id": "a", "field_size": 1.0}]}
+
+    with TestClient(app) as client:
+        assert client.post("/finance/screen", json=body).status_code == 401
+        response = client.post("/finance/screen", json=body, headers=farmer_headers)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["type"] for line in response.text.splitlines()] == ["job", "profile", "summary"]
@@ -0,0 +1,120 @@
+"""Tests for response compression, ETags and conditional GETs."""
+
+import gzip
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import (
+    HTTPCacheMiddleware, PayloadCache, cache_policy, etag_matches, negotiate_encoding
+)
+
+BIG = {"rows": [{"crop": "Rice", "price": i} for i in range(200)]}
+GZIP = {"Accept-Encoding": "gzip"}
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(HTTPCacheMiddleware, minimum_size=100)
+    payloads = PayloadCache(max_entries=2)
+    state = {"version": 1, "builds": 0}
+
+    @app.get("/cached", dependencies=[Depends(cache_policy("public, max-age=60"))])
+    async def cached():
+        return BIG
+
+    @app.get("/small", dependencies=[Depends(cache_policy("public, max-age=60"))])
+    async def small():
+        return {"ok": True}
+
+    @app.get("/private")
+    async def private():
+        return BIG
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield f'{{"line":{i}}}\n'.encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/payload")
+    async def payload(request: Request):
+        def build():
+            state["builds"] += 1
+            return BIG
+        return await payloads.respond(request, "payload", state["version"], build, "public, max-age=60")
+
+    with TestClient(app) as test_client:
+        test_client.state = state
+        test_client.payloads = payloads
+        yield test_client
+
+
+def test_encoding_negotiation_and_etag_matching():
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("*") == "gzip"
+    assert etag_matches('W/"abc-gz", "other"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+def test_cacheable_responses_get_an_etag_and_304(client):
+    first = client.get("/cached", headers=IDENTITY)
+    etag = first.headers["etag"]
+    again = client.get("/cached", headers={**IDENTITY, "If-None-Match": etag})
+
+    assert first.status_code == 200 and "content-encoding" not in first.headers
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    assert again.headers["cache-control"] == "public, max-age=60"
+    assert "etag" not in client.get("/private", headers=IDENTITY).headers
+
+
+def test_compressed_responses_use_an_encoding_specific_etag(client):
+    plain = client.get("/cached", headers=IDENTITY)
+    compressed = client.get("/cached", headers=GZIP)
+    revalidated = client.get("/cached", headers={**GZIP, "If-None-Match": compressed.headers["etag"]})
+    cross = client.get("/cached", headers={**GZIP, "If-None-Match": plain.headers["etag"]})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == plain.json() == BIG
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gz"'
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert revalidated.status_code == cross.status_code == 304
+    assert revalidated.headers["etag"] == compressed.headers["etag"]
+
+
+def test_small_bodies_are_not_compressed(client):
+    assert "content-encoding" not in client.get("/small", headers=GZIP).headers
+
+
+def test_streams_are_compressed_chunk_by_chunk(client):
+    with client.stream("GET", "/stream", headers=GZIP) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw) == b'{"line":0}\n{"line":1}\n{"line":2}\n'
+
+
+def test_payload_cache_reuses_the_serialized_body_until_the_version_changes(client):
+    first = client.get("/payload", headers=IDENTITY)
+    compressed = client.get("/payload", headers=GZIP)
+    not_modified = client.get("/payload", headers={**IDENTITY, "If-None-Match": first.headers["etag"]})
+    client.state["version"] = 2
+    rebuilt = client.get("/payload", headers={**IDENTITY, "If-None-Match": first.headers["etag"]})
+
+    assert first.json() == compressed.json() == BIG
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert not_modified.status_code == 304
+    assert rebuilt.status_code == 304  # same body under the new version, so the ETag still matches
+    assert client.state["builds"] == 2
+    assert client.payloads.get_stats()["hits"] == 2
+    assert client.payloads.get_stats()["not_modified"] == 2
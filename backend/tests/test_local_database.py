@@ -0,0 +1,105 @@
+"""Tests for the embedded SQLite development database."""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.services.local_database import LocalDatabase
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_select_filters_order_and_range(local_db):
+    db = local_db.rest
+
+    async def scenario():
+        await db.table("farms").insert([
+            {"id": f"f{i}", "farmer_id": "owner", "name": f"Farm {i}", "field_size": i} for i in range(1, 6)
+        ]).execute()
+        ordered = await db.table("farms").select("id, field_size").eq("farmer_id", "owner") \
+            .gt("field_size", 1).order("field_size", desc=True).range(1, 2).execute()
+        chosen = await db.table("farms").select("id").in_("id", ["f1", "f4", "nope"]).order("id").execute()
+        empty = await db.table("farms").select("id").in_("id", []).execute()
+        return ordered.data, chosen.data, empty.data
+
+    ordered, chosen, empty = _run(scenario())
+
+    assert ordered == [{"id": "f4", "field_size": 4}, {"id": "f3", "field_size": 3}]
+    assert chosen == [{"id": "f1"}, {"id": "f4"}]
+    assert empty == []
+
+
+def test_embedded_children_and_cascading_deletes(local_db):
+    db = local_db.rest
+
+    async def scenario():
+        await db.table("farms").insert({"id": "farm-x", "farmer_id": "demo-farmer-123", "name": "X"}).execute()
+        await db.table("crops_history").insert([
+            {"id": "h1", "farm_id": "farm-x", "crop": "Rice", "year": 2024},
+            {"id": "h2", "farm_id": "farm-x", "crop": "Wheat", "year": 2025},
+        ]).execute()
+        farm = await db.table("farms").select("id, crops_history(crop, year)").eq("id", "farm-x") \
+            .order("year", desc=True, foreign_table="crops_history").execute()
+        await db.table("farmers").delete().eq("id", "demo-farmer-123").execute()
+        left = await db.table("crops_history").select("id").execute()
+        return farm.data, left.data, await local_db.get_platform_counts()
+
+    farm, left, counts = _run(scenario())
+
+    assert farm == [{"id": "farm-x", "crops_history": [{"crop": "Wheat", "year": 2025},
+                                                        {"crop": "Rice", "year": 2024}]}]
+    assert left == []
+    assert counts == {"farmers": 0, "farms": 0, "recommendations": 0, "crops_history": 0}
+
+
+def test_upsert_ignore_and_merge(local_db):
+    db = local_db.rest
+
+    async def scenario():
+        await db.table("farms").insert({"id": "u1", "name": "Old", "field_size": 1}).execute()
+        await db.table("farms").upsert({"id": "u1", "name": "Ignored"}, ignore_duplicates=True).execute()
+        ignored = (await db.table("farms").select("name").eq("id", "u1").execute()).data
+        await db.table("farms").upsert({"id": "u1", "name": "New"}).execute()
+        merged = (await db.table("farms").select("name, field_size").eq("id", "u1").execute()).data
+        return ignored, merged
+
+    ignored, merged = _run(scenario())
+
+    assert ignored == [{"name": "Old"}]
+    assert merged == [{"name": "New", "field_size": 1}]
+
+
+def test_unique_phone_is_enforced(local_db):
+    with pytest.raises(sqlite3.IntegrityError):
+        _run(local_db.rest.table("farmers").insert({"name": "Dup", "phone": "9876543210"}).execute())
+
+
+def test_reconcile_ignores_rows_already_decremented_to_zero(local_db):
+    async def scenario():
+        farm = await local_db.create_farm({"farmer_id": "demo-farmer-123", "name": "Z", "field_size": 1})
+        entry = await local_db.add_crop_history({"farm_id": farm["id"], "crop": "Millet"})
+        await local_db.delete_crop_history(entry["id"])
+        return await local_db.reconcile_aggregates()
+
+    result = _run(scenario())
+
+    assert (result["counters"], result["crops"], result["districts"]) == (0, 0, 0)
+
+
+def _open(path):
+    LocalDatabase(path)
+    return True
+
+
+def test_workers_opening_one_file_seed_the_demo_data_once(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    with ProcessPoolExecutor(4) as pool:
+        assert all(pool.map(_open, [path] * 4))
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM farmers").fetchone()[0] == 1
+        assert conn.execute("SELECT value FROM platform_counters WHERE name = 'farms'").fetchone()[0] == 1
@@ -0,0 +1,132 @@
+"""Tests for the materialized market analytics store."""
+
+import asyncio
+
+import pytest
+
+from app.services.market_analytics_store import MarketAnalyticsStore
+
+
+def _payload(*rows):
+    return {"prices": [{"crop": crop, "market": market, "modal_price": price} for crop, market, price in rows]}
+
+
+class FakeMarketService:
+    """Serves fixed payloads per district and records fetch concurrency."""
+
+    def __init__(self, payloads, delay=0.02):
+        self.payloads = payloads
+        self.delay = delay
+        self.calls = {}
+        self.active = 0
+        self.peak = 0
+
+    async def get_mandi_prices(self, district):
+        self.calls[district] = self.calls.get(district, 0) + 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            payload = self.payloads[district]
+            if isinstance(payload, Exception):
+                raise payload
+            return payload
+        finally:
+            self.active -= 1
+
+
+def test_district_analytics_match_ingested_rows():
+    store = MarketAnalyticsStore()
+    store.ingest("Ranchi", _payload(("Rice", "A", 2000), ("Rice", "B", 2200), ("Wheat", "A", 2100)))
+
+    analytics = store.get_district_analytics("Ranchi")
+
+    assert analytics["price_summary"]["total_commodities"] == 2
+    assert analytics["price_summary"]["total_price_points"] == 3
+    assert analytics["price_summary"]["price_range"] == {"min": 2000, "max": 2200}
+    rice = next(c for c in analytics["top_commodities"] if c["crop"] == "Rice")
+    assert rice["average_price"] == 2100
+    assert rice["markets"] == 2
+
+
+def test_crop_analytics_rank_districts_and_match_partial_names():
+    store = MarketAnalyticsStore()
+    store.ingest("Ranchi", _payload(("Arhar (Tur)", "A", 6000)))
+    store.ingest("Dhanbad", _payload(("Arhar (Tur)", "B", 6400), ("Arhar (Tur)", "C", 6200)))
+
+    analytics = store.get_crop_analytics("Arhar")
+
+    assert [d["district"] for d in analytics["district_comparison"]] == ["Dhanbad", "Ranchi"]
+    assert analytics["district_comparison"][0]["price"] == 6300
+    assert analytics["price_analysis"]["price_variance"] == 400
+    assert store.get_crop_analytics("Cotton")["message"] == "No data found for Cotton"
+
+
+def test_filtered_ingest_keeps_other_crops_and_freshness():
+    store = MarketAnalyticsStore()
+    store.ingest("Ranchi", _payload(("Rice", "A", 2000), ("Wheat", "A", 2100)), complete=False)
+    assert store.is_stale("Ranchi")
+
+    store.ingest("Ranchi", _payload(("Rice", "A", 1900)), complete=False)
+
+    crops = {c["crop"]: c["average_price"] for c in store.get_district_analytics("Ranchi")["top_commodities"]}
+    assert crops == {"Rice": 1900, "Wheat": 2100}
+
+
+def test_unchanged_or_empty_payload_does_not_bump_version():
+    store = MarketAnalyticsStore()
+    store.ingest("Ranchi", _payload(("Rice", "A", 2000)))
+    version = store.data_version
+
+    store.ingest("Ranchi", _payload(("Rice", "A", 2000)))
+    assert store.ingest("Ranchi", {"prices": []}) == 0
+
+    assert store.data_version == version
+
+
+def test_ensure_districts_fetches_each_district_once_without_holding_the_lock():
+    async def scenario():
+        store = MarketAnalyticsStore(max_concurrent_fetches=2)
+        service = FakeMarketService({
+            "A": _payload(("Rice", "A", 2000)),
+            "B": _payload(("Rice", "B", 2100)),
+            "C": _payload(("Rice", "C", 2200)),
+            "Bad": RuntimeError("portal down"),
+        })
+
+        async def lock_wait():
+            await asyncio.sleep(0.005)
+            started = asyncio.get_running_loop().time()
+            async with store._refresh_lock:
+                return asyncio.get_running_loop().time() - started
+
+        results = await asyncio.gather(
+            store.ensure_districts(service, ["A", "B", "Bad"]),
+            store.ensure_districts(service, ["A", "C"]),
+            lock_wait(),
+        )
+        return store, service, results[2]
+
+    store, service, waited = asyncio.run(scenario())
+
+    assert service.calls == {"A": 1, "B": 1, "C": 1, "Bad": 1}
+    assert service.peak <= 2
+    assert waited < 0.01
+    assert not any(store.is_stale(d) for d in "ABC")
+    assert store.is_stale("Bad")
+    assert store._inflight == {}
+
+
+@pytest.mark.parametrize("districts", [["A"], ["A", "B"]])
+def test_refresh_all_rebuilds_views(districts):
+    async def scenario():
+        store = MarketAnalyticsStore()
+        service = FakeMarketService({d: _payload(("Rice", d, 2000)) for d in districts}, delay=0)
+        stats = await store.refresh_all(service, districts)
+        return store, stats
+
+    store, stats = asyncio.run(scenario())
+
+    assert stats["districts"] == len(districts)
+    assert stats["dirty"] is False
+    assert store.get_crop_analytics("Rice")["market_presence"]["districts_available"] == len(districts)
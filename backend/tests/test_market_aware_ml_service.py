@@ -0,0 +1,114 @@
+"""Tests for the concurrent, vectorized market-aware recommendation pipeline."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.crop_economics import HECTARES_PER_ACRE, crop_economics
+from app.services.market_aware_ml_service import MarketAwareMLService
+
+BASE = [
+    {"crop": "Rice", "suitability_score": 0.9},
+    {"crop": "Wheat", "suitability_score": 0.7},
+    {"crop": "Maize", "suitability_score": 0.8},
+    {"crop": "Turmeric", "suitability_score": 0.4},
+]
+PRICES = {
+    "source": "AGMARKNET",
+    "reliability": "high",
+    "prices": [
+        {"crop": "Rice", "modal_price": 2100, "min_price": 1800, "max_price": 2200, "trend": "increasing", "market": "Ranchi"},
+        {"crop": "Rice", "modal_price": 9999, "market": "Duplicate"},
+        {"crop": "Wheat", "modal_price": 2000, "min_price": 2000, "max_price": 2000, "trend": "decreasing"},
+        {"crop": "Maize", "modal_price": 1900, "min_price": 1700, "max_price": 2100, "trend": "Stable"},
+    ],
+}
+
+
+class FakeML:
+    def __init__(self, started=None, peer=None):
+        self.started, self.peer = started, peer
+        self.calls = []
+
+    def predict_crop(self, farm_data, top_n=3):
+        self.calls.append(top_n)
+        if self.started is not None:
+            self.started.set()
+            assert self.peer.wait(timeout=2), "price fetch did not run alongside inference"
+        return [dict(rec) for rec in (BASE if top_n is None else BASE[:top_n])]
+
+
+class FakeMarket:
+    def __init__(self, payload=PRICES, error=None, started=None, peer=None):
+        self.payload, self.error, self.started, self.peer = payload, error, started, peer
+
+    async def get_mandi_prices(self, district):
+        if self.started is not None:
+            self.started.set()
+            while not self.peer.is_set():
+                await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.payload
+
+
+def _service(ml=None, market=None):
+    service = MarketAwareMLService.__new__(MarketAwareMLService)
+    service.ml_service = ml or FakeML()
+    service.market_service = market or FakeMarket()
+    return service
+
+
+def _recommend(service, farm=None, **kwargs):
+    return asyncio.run(service.get_market_enhanced_recommendations(farm or {"field_size": 1}, "Ranchi", **kwargs))
+
+
+def test_inference_and_price_fetch_run_concurrently():
+    inference, fetch = threading.Event(), threading.Event()
+    service = _service(FakeML(started=inference, peer=fetch), FakeMarket(started=fetch, peer=inference))
+
+    results = _recommend(service)
+
+    assert service.ml_service.calls == [None]
+    assert len(results) == len(BASE)
+
+
+def test_every_candidate_is_scored_and_ranked():
+    results = _recommend(_service())
+    by_crop = {rec["crop"]: rec for rec in results}
+
+    assert [rec["combined_score"] for rec in results] == sorted((rec["combined_score"] for rec in results), reverse=True)
+    rice = by_crop["Rice"]
+    assert rice["market_score"] == pytest.approx(0.75 * 0.4 + 0.8 * 0.4 + 1.0 * 0.2)
+    assert rice["combined_score"] == pytest.approx(round(0.9 * 0.6 + rice["market_score"] * 0.4, 3))
+    assert (rice["current_market_price"], rice["price_trend"]) == (2100.0, "rising")
+    assert by_crop["Wheat"]["price_trend"] == "falling"
+    assert by_crop["Wheat"]["market_score"] == pytest.approx(0.5 * 0.4 + 0.3 * 0.4 + 0.2)
+    assert by_crop["Turmeric"]["market_data"]["data_source"] == "default"
+    assert all(rec["recommendation_type"] == "market_enhanced" for rec in results)
+
+
+def test_profit_matches_the_single_crop_estimate():
+    farm = {"field_size": 3, "irrigation": True, "soil_quality_score": 0.9, "climate_suitability": 0.7}
+    rice = next(rec for rec in _recommend(_service(), farm) if rec["crop"] == "Rice")
+
+    expected = crop_economics.estimate_one("Rice", yield_factor=0.9 * 0.7, cost_factor=1.2 * 0.9, price=2100)
+    assert rice["profit_analysis"]["net_profit"] == pytest.approx(expected["profit"], abs=0.01)
+    assert rice["profit_analysis"]["roi_percent"] == rice["roi_percentage"] == pytest.approx(expected["roi_percent"], abs=0.01)
+    assert rice["profit_per_acre"] == pytest.approx(expected["profit"] * HECTARES_PER_ACRE, abs=0.01)
+
+
+def test_wrapped_payloads_and_skipped_profit_analysis():
+    results = _recommend(_service(market=FakeMarket({"data": PRICES})), include_profit_analysis=False)
+    rice = next(rec for rec in results if rec["crop"] == "Rice")
+
+    assert rice["market_data"]["market_name"] == "Ranchi"
+    assert rice["profit_analysis"] == {} and rice["profit_per_acre"] is None
+
+
+def test_unavailable_prices_fall_back_to_reference_data():
+    results = _recommend(_service(market=FakeMarket(error=ConnectionError("mandi feed down"))))
+
+    assert len(results) == len(BASE)
+    assert {rec["market_data"]["data_source"] for rec in results} == {"default"}
@@ -0,0 +1,67 @@
+"""Tests for the columnar market price batch."""
+
+import numpy as np
+
+from app.services.price_batch import PriceBatch, CodeTable
+
+RECORDS = [
+    {"commodity": "Rice", "market": "Ranchi Mandi", "district": "Ranchi", "min_price": "1,800",
+     "max_price": 2200, "modal_price": "₹ 2,000", "date": "01-Jan-2026", "source": "AGMARKNET", "variety": "Common"},
+    {"crop": "rice ", "market": "ranchi mandi", "district": "Ranchi", "min_price": 1900,
+     "max_price": 2100, "modal_price": 2000, "source": "ENAM"},
+    {"commodity": "Wheat", "market": "Pandra", "district": "Ranchi", "min_price": 2000,
+     "max_price": 2300, "modal_price": 2150.5},
+    {"commodity": "Arhar (Tur)", "market": "Dhanbad Mandi", "district": "Dhanbad", "modal_price": 6000},
+    "not a record",
+]
+
+
+def test_records_round_trip_through_columns():
+    batch = PriceBatch.from_records(RECORDS)
+
+    assert len(batch) == 4
+    assert batch.commodity.dtype == np.int32
+    records = batch.to_records()
+    assert records[0] == {"commodity": "Rice", "market": "Ranchi Mandi", "district": "Ranchi",
+                          "min_price": 1800, "max_price": 2200, "modal_price": 2000,
+                          "date": "01-Jan-2026", "source": "AGMARKNET", "variety": "Common"}
+    # Labels are interned case-insensitively and keep the first spelling
+    assert records[1]["commodity"] == "Rice" and records[1]["market"] == "Ranchi Mandi"
+    assert records[2]["modal_price"] == 2150.5
+
+
+def test_dedupe_keeps_first_occurrence_of_each_price_row():
+    batch = PriceBatch.from_records(RECORDS).dedupe()
+
+    assert [r["source"] for r in batch.to_records() if r["commodity"] == "Rice"] == ["AGMARKNET"]
+    assert len(batch) == 3
+
+
+def test_filter_by_district_and_commodity():
+    batch = PriceBatch.from_records(RECORDS)
+
+    assert batch.filter(district="dhanbad").commodities() == ["Arhar (Tur)"]
+    assert batch.filter(commodity="arhar").commodities() == ["Arhar (Tur)"]
+    assert len(batch.filter(commodity="arhar", exact_commodity=True)) == 0
+    assert len(batch.filter(district="Ranchi", commodity="rice")) == 2
+
+
+def test_modal_price_ranges_and_concat():
+    batch = PriceBatch.concat([
+        PriceBatch.from_records(RECORDS[:2]),
+        PriceBatch.empty(),
+        PriceBatch.from_records([{"commodity": "Rice", "market": "Bokaro", "modal_price": 2300}]),
+    ])
+
+    assert len(batch) == 3
+    assert batch.modal_price_ranges() == {"Rice": {"min": 2000, "max": 2300, "avg": 2100.0}}
+    assert PriceBatch.empty().modal_price_ranges() == {}
+
+
+def test_code_table_matching():
+    table = CodeTable()
+    codes = np.array([table.code("Rice"), table.code("Brown Rice"), table.code(None)], dtype=np.int32)
+
+    assert table.code("  RICE ") == codes[0]
+    assert sorted(table.matching(codes, "rice").tolist()) == sorted(codes[:2].tolist())
+    assert table.matching(codes, "Rice", exact=True).tolist() == [codes[0]]
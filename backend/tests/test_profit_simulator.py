@@ -0,0 +1,98 @@
+"""Tests for the Monte Carlo profit simulator and the observed price history it resamples."""
+
+import numpy as np
+import pytest
+
+from app.services.market_analytics_store import MarketAnalyticsStore
+from app.services.profit_simulator import MIN_HISTORY, ProfitSimulator
+
+INPUTS = {
+    "rice": {"price_mean": 2000, "price_cv": 0.2, "yield_mean": 40, "yield_cv": 0.25, "cost": 60000},
+    "wheat": {"price_mean": 2200, "price_cv": 0.15, "yield_mean": 35, "yield_cv": 0.2, "cost": 50000},
+}
+PLANS = [
+    [{"year": 1, "crop": "rice"}, {"year": 2, "crop": "wheat"}],
+    [{"year": 1, "crop": "wheat"}, {"year": 2, "crop": "wheat"}],
+]
+
+
+def test_var_and_cvar_match_the_scenario_distribution():
+    simulator = ProfitSimulator(n_scenarios=4000, seed=7)
+    result = simulator.simulate(PLANS, INPUTS, confidence=0.9)
+
+    price, yields = simulator._draw(["rice", "wheat"], 2, INPUTS)
+    profit = price * yields - np.array([INPUTS["rice"]["cost"], INPUTS["wheat"]["cost"]])
+    first_plan = profit[:, 0, 0] + profit[:, 1, 1]
+    var = np.quantile(first_plan, 0.1)
+
+    summary = result["plans"][0]
+    assert summary["value_at_risk"] == pytest.approx(var, abs=0.01)
+    assert summary["conditional_value_at_risk"] == pytest.approx(first_plan[first_plan <= var].mean(), abs=0.01)
+    assert summary["probability_of_loss"] == pytest.approx((first_plan < 0).mean(), abs=1e-4)
+    assert summary["conditional_value_at_risk"] <= summary["value_at_risk"] <= summary["percentiles"]["p50"]
+    assert sum(summary["distribution"]["counts"]) == 4000
+
+
+def test_deterministic_inputs_have_no_tail():
+    flat = {crop: {**spec, "price_cv": 0.0, "yield_cv": 0.0} for crop, spec in INPUTS.items()}
+    summary = ProfitSimulator(n_scenarios=500).simulate(PLANS[:1], flat)["plans"][0]
+
+    expected = 2000 * 40 - 60000 + 2200 * 35 - 50000
+    assert summary["expected_profit"] == summary["value_at_risk"] == summary["conditional_value_at_risk"] == expected
+    assert summary["std_profit"] == 0.0
+
+
+def test_plans_share_scenarios_and_seeds_are_reproducible():
+    duplicated = ProfitSimulator(n_scenarios=1000).simulate([PLANS[0], PLANS[0]], INPUTS)
+    again = ProfitSimulator(n_scenarios=1000).simulate([PLANS[0]], INPUTS)
+
+    assert duplicated["plans"][0] == duplicated["plans"][1] == again["plans"][0]
+    assert len(duplicated["slots"]) == 4
+
+
+def test_observed_history_is_resampled_within_its_range():
+    history = [1800, 1900, 2050, 2100, 2400]
+    inputs = {**INPUTS, "rice": {**INPUTS["rice"], "price_history": history}}
+    simulator = ProfitSimulator(n_scenarios=2000)
+
+    result = simulator.simulate(PLANS, inputs)
+    price, _ = simulator._draw(["rice", "wheat"], 2, inputs)
+
+    assert result["history_backed_crops"] == ["rice"]
+    assert price[:, :, 0].min() >= min(history) and price[:, :, 0].max() <= max(history)
+    short = {**INPUTS, "rice": {**INPUTS["rice"], "price_history": history[:MIN_HISTORY - 1]}}
+    assert simulator.simulate(PLANS, short)["history_backed_crops"] == []
+
+
+def test_empty_plans():
+    assert ProfitSimulator().simulate([], INPUTS)["plans"] == []
+
+
+def _row(price, market="A", date="2026-10-01", source=None):
+    row = {"crop": "Rice", "market": market, "modal_price": price, "date": date}
+    if source:
+        row["source"] = source
+    return row
+
+
+def test_store_history_keeps_one_mean_per_day_from_live_sources():
+    store = MarketAnalyticsStore()
+    store.ingest("Ranchi", {"source": "AGMARKNET", "prices": [
+        _row(2000, "A", "2026-10-01"), _row(2200, "B", "01-Oct-2026"), _row(2100, "A", "02/10/2026"),
+        _row(9999, "C", "2026-10-03", source="MOCK"),
+    ]})
+    store.ingest("Dhanbad", {"data_source": "mock_fallback", "prices": [_row(5000, "D", "2026-10-04")]})
+
+    assert store.get_price_samples("rice") == [2100.0, 2100.0]
+    assert store.get_stats()["history_crops"] == 1
+
+
+def test_store_history_is_trimmed_and_versioned():
+    store = MarketAnalyticsStore(history_days=2)
+    for day in ("2026-10-01", "2026-10-02", "2026-10-03"):
+        store.ingest("Ranchi", {"source": "AGMARKNET_REAL", "prices": [_row(2000, date=day)]})
+    version = store.data_version
+    store.ingest("Ranchi", {"source": "AGMARKNET_REAL", "prices": [_row(2000, date="2026-10-03")]})
+
+    assert store.get_price_samples("Rice") == [2000.0, 2000.0]
+    assert store.data_version == version
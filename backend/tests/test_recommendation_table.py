@@ -0,0 +1,125 @@
+"""Tests for the precomputed recommendation table and its rebuild route."""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.feature_engineer import feature_engineer
+from app.services.recommendation_table import RecommendationTable, default_npk, default_rainfall
+
+CROPS = ["rice", "wheat", "maize", "arhar", "potato", "mustard"]
+
+
+class FakeTrainer:
+    """Softmax over a fixed linear map of the numeric engineered features."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.weights = np.random.default_rng(0).normal(scale=0.05, size=(len(columns), len(CROPS)))
+
+    def predict_probabilities(self, frame):
+        values = frame[self.columns].astype(float).fillna(0.0).to_numpy()
+        logits = values @ self.weights
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def _estimate_yield(self, crop, farm_data):
+        return 2.0 + CROPS.index(crop)
+
+
+class FakeModelManager:
+    def __init__(self, trainer):
+        self.trainer = trainer
+        self.crop_classifier = object()
+        self.label_encoders = {"crop": type("Encoder", (), {"classes_": np.array(CROPS)})()}
+
+    def get_trainer(self):
+        return self.trainer
+
+    def is_ready(self):
+        return True
+
+
+def _request(season="kharif", soil="Loamy Soil", ph=6.5, temperature=27.0, humidity=70.0):
+    return {**default_npk(soil), "ph": ph, "temperature": temperature, "humidity": humidity,
+            "rainfall": default_rainfall(season), "season": season}
+
+
+@pytest.fixture(scope="module")
+def manager():
+    frame = feature_engineer.prepare_feature_frame([_request()])
+    return FakeModelManager(FakeTrainer(list(frame.select_dtypes("number").columns)))
+
+
+@pytest.fixture
+def table(manager):
+    table = RecommendationTable(top_k=3, weather_spread=1)
+    table.district_weather = {"Ranchi": (27.0, 70.0)}
+    asyncio.run(table.rebuild(manager, refresh_weather=False))
+    return table
+
+
+def test_batched_features_match_single_row_features():
+    rows = [_request(), _request("rabi", "Clay Soil", 5.2, 18.0, 45.0), _request("summer", "Unknown", 8.5, 35.0, 100.0)]
+    frame = feature_engineer.prepare_feature_frame(rows)
+
+    for i, row in enumerate(rows):
+        single = feature_engineer.prepare_feature_matrix(row)
+        batched = frame.iloc[i].to_dict()
+        assert set(single) == set(batched)
+        for name, value in single.items():
+            expected = 0.0 if pd.isna(batched[name]) else batched[name]
+            if isinstance(value, str):
+                assert value == expected
+            else:
+                assert value == pytest.approx(expected), name
+
+
+def test_lookups_match_live_predictions(table, manager):
+    grid = table._grid()
+    assert table.get_stats()["grid_points"] == len(grid) == 3 * 6 * 9 * 41
+
+    for row in [_request(), _request("rabi", "Sandy Soil", 4.5, 26.0, 75.0), _request("summer", "Red Soil", 8.5, 28.0, 65.0)]:
+        features = pd.DataFrame([feature_engineer.prepare_feature_matrix(row)])
+        probabilities = manager.trainer.predict_probabilities(features)[0]
+        best = np.argsort(probabilities)[::-1][:3]
+
+        result = table.lookup(row, manager, top_k=3)
+
+        assert [rec["crop"] for rec in result] == [CROPS[i] for i in best]
+        assert [rec["confidence"] for rec in result] == pytest.approx([probabilities[i] for i in best], abs=1e-4)
+        assert result[0]["expected_yield"] == 2.0 + best[0]
+
+
+def test_lookups_miss_off_grid_or_after_a_model_change(table, manager):
+    assert table.lookup(_request(ph=6.55), manager) is None
+    assert table.lookup(_request(temperature=40.0), manager) is None
+    assert table.lookup(_request(), manager, top_k=4) is None
+    manager_after_training = FakeModelManager(manager.trainer)
+    assert table.lookup(_request(), manager_after_training) is None
+    assert table.get_stats()["misses"] == 4
+
+
+def test_rebuild_route_requires_an_admin_and_rejects_overlaps(monkeypatch, manager, admin_headers, farmer_headers):
+    from app.api import crops
+    fresh = RecommendationTable(top_k=3)
+    fresh.district_weather = {"Ranchi": (27.0, 70.0)}
+    monkeypatch.setattr(crops, "recommendation_table", fresh)
+    monkeypatch.setattr(crops, "get_xgboost_service", lambda: manager)
+    app = FastAPI()
+    app.include_router(crops.crops_router, prefix="/crops")
+    path = "/crops/ml/recommend/table/rebuild"
+    params = {"refresh_weather": False}
+
+    with TestClient(app) as client:
+        assert client.post(path, params=params).status_code == 401
+        assert client.post(path, params=params, headers=farmer_headers).status_code == 403
+        rebuilt = client.post(path, params=params, headers=admin_headers)
+        assert rebuilt.status_code == 200 and rebuilt.json()["data"]["builds"] == 1
+
+        monkeypatch.setattr(RecommendationTable, "rebuilding", property(lambda self: True))
+        assert client.post(path, params=params, headers=admin_headers).status_code == 409
@@ -0,0 +1,50 @@
+"""Tests for the upstream replay server used by the market pipeline benchmark."""
+
+from fastapi.testclient import TestClient
+
+from replay_server import FIXTURES_DIR, PROFILES, create_replay_app
+
+
+def _client(**kwargs):
+    return TestClient(create_replay_app(FIXTURES_DIR, profile="instant", **kwargs))
+
+
+def test_recorded_routes_are_served_per_source():
+    client = _client()
+
+    weather = client.get("/weatherapi/v1/current.json", params={"q": "23.3,85.3"})
+    form = client.get("/agmarknet/SearchCmmMkt.aspx")
+
+    assert weather.status_code == 200
+    assert weather.headers["content-type"].startswith("application/json")
+    assert form.status_code == 200
+    assert client.get("/agmarknet/missing.aspx").status_code == 404
+
+
+def test_form_posts_are_matched_on_their_fields():
+    client = _client()
+
+    results = client.post("/agmarknet/SearchCmmMkt.aspx", data={"ctl00$btnSubmit": "Submit"})
+    districts = client.post("/agmarknet/SearchCmmMkt.aspx", data={"ctl00$ddlState": "JH"})
+
+    assert results.content == (FIXTURES_DIR / "agmarknet/search_results.html").read_bytes()
+    assert districts.content == (FIXTURES_DIR / "agmarknet/search_form_districts.html").read_bytes()
+
+
+def test_profiles_inject_errors_and_count_outcomes(monkeypatch):
+    # Flaky without its timeouts, which would sleep for the full upstream timeout
+    monkeypatch.setitem(PROFILES, "flaky", {**PROFILES["instant"], "error_rate": 0.5})
+    client = _client()
+
+    assert client.post("/__replay/profile/enam/unknown").status_code == 400
+    client.post("/__replay/profile/enam/flaky")
+    for _ in range(50):
+        client.get("/enam/web/dashboard")
+
+    stats = client.get("/__replay/stats").json()
+    assert stats["calls"]["enam"] == 50
+    assert stats["outcomes"].get("enam:error", 0) > 0
+    assert stats["outcomes"]["enam:ok"] + stats["outcomes"]["enam:error"] == 50
+
+    client.post("/__replay/reset")
+    assert client.get("/__replay/stats").json()["total_calls"] == 0
@@ -0,0 +1,99 @@
+"""Tests for the rotation planner's search against an exhaustive enumeration."""
+
+import pytest
+
+from app.services import rotation_planner as planner_module
+from app.services.rotation_planner import FALLOW, GROWING, SEASONS, RotationPlanner
+from app.services.smart_advisory_service import CropRotationOptimizer, DEFAULT_PREFERENCES
+
+CONDITIONS = {"climate_risk": 0.3}
+
+
+@pytest.fixture(scope="module")
+def optimizer():
+    return CropRotationOptimizer()
+
+
+def _exhaustive(planner, crops, years, seasons, preferences=DEFAULT_PREFERENCES):
+    """Score every feasible slot sequence with the planner's own rules."""
+    ids = [planner.index[c] for c in crops]
+    weight = preferences["sustainability_weight"]
+    crop_score = {}
+    for i in ids:
+        info = planner.crop_database[planner.crop_names[i]]
+        economic = info.profit_per_hectare * (1 - info.market_volatility) / 50000
+        risk = min(0.4 * (1 - info.disease_resistance) + 0.3 * info.market_volatility
+                   + 0.3 * CONDITIONS["climate_risk"], 1.0)
+        crop_score[i] = preferences["profit_weight"] * economic + preferences["risk_weight"] * (1 - risk)
+
+    annual = not seasons
+    if annual:
+        options = [ids] * years
+        per_year = 1
+    else:
+        options = [[i for i in ids if planner.seasons[i] == s] if s in seasons else []
+                   for _ in range(years) for s in SEASONS]
+        per_year = len(SEASONS)
+
+    totals = []
+
+    def walk(s, last, busy, score, sequence):
+        if s == len(options):
+            cropped = [i for i in sequence if i >= 0]
+            if cropped:
+                totals.append(round(score / years + weight * planner.sustainability_score(cropped), 4))
+            return
+        if busy:
+            walk(s + 1, last, busy - 1, score, sequence + (GROWING,))
+            return
+        extended = False
+        for j in options[s]:
+            if not planner._allowed(sequence, j, per_year):
+                continue
+            extended = True
+            bonus = weight * planner.transition[last][j] if last >= 0 else 0.0
+            walk(s + 1, j, 0 if annual else planner.occupancy[j], score + crop_score[j] + bonus, sequence + (j,))
+        if not annual or not extended:
+            walk(s + 1, last, 0, score, sequence + (FALLOW,))
+
+    walk(0, FALLOW, 0, 0.0, ())
+    return sorted(totals, reverse=True)
+
+
+@pytest.mark.parametrize("crops, years, seasons", [
+    (["rice", "wheat", "maize", "chickpea", "mustard"], 4, None),
+    (["rice", "wheat", "chickpea", "soybean", "mustard", "cotton"], 2, ["Kharif", "Rabi"]),
+    (["maize", "chickpea", "sugarcane", "mustard"], 2, ["Kharif", "Rabi", "Zaid"]),
+])
+def test_search_finds_the_exhaustive_optimum(optimizer, crops, years, seasons):
+    expected = _exhaustive(optimizer.planner, crops, years, seasons)
+
+    plans = optimizer.planner.plan(crops, CONDITIONS, DEFAULT_PREFERENCES, years=years, seasons=seasons, top_k=3)
+
+    assert [plan["score"] for plan in plans] == expected[:3]
+
+
+def test_pruning_does_not_change_the_result(optimizer, monkeypatch):
+    crops = ["rice", "wheat", "maize", "chickpea", "soybean", "mustard"]
+    pruned = optimizer.planner.plan(crops, CONDITIONS, DEFAULT_PREFERENCES, years=3, seasons=["Kharif", "Rabi"], top_k=2)
+    branches_pruned = optimizer.planner._pruned
+
+    monkeypatch.setattr(RotationPlanner, "_incumbent", lambda self, *args: None)
+    unpruned = optimizer.planner.plan(crops, CONDITIONS, DEFAULT_PREFERENCES, years=3, seasons=["Kharif", "Rabi"], top_k=2)
+
+    assert branches_pruned > 0
+    assert optimizer.planner._pruned == 0
+    assert pruned == unpruned
+
+
+def test_plans_respect_gap_rules_and_season_choice(optimizer, monkeypatch):
+    monkeypatch.setattr(planner_module.settings, "ROTATION_BEAM_WIDTH", 4)
+    plans = optimizer.planner.plan(["rice", "wheat", "chickpea"], CONDITIONS, DEFAULT_PREFERENCES,
+                                   years=3, seasons=["Kharif", "Rabi"], top_k=5)
+
+    assert len(plans) == 5
+    for plan in plans:
+        rice_years = [slot["year"] for slot in plan["slots"] if slot["crop"] == "rice"]
+        assert all(b - a > 1 for a, b in zip(rice_years, rice_years[1:]))
+        assert {slot["season"] for slot in plan["slots"]} <= {"Kharif", "Rabi"}
+    assert optimizer.planner.plan(["rice", "wheat"], CONDITIONS, DEFAULT_PREFERENCES, seasons=["Zaid"]) == []
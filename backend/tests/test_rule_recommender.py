@@ -0,0 +1,115 @@
+"""Tests for the compiled rule-based recommender against the per-crop rules."""
+
+import numpy as np
+import pytest
+
+from app.services.ml_service import MLService
+from app.services.rule_recommender import (
+    IRRIGATION_CAPACITY, WATER_NEEDS, WINDOW_ADJUSTMENT, WINDOW_INPUTS, RuleRecommender
+)
+
+FARMS = [
+    {"soil_type": "Loamy Soil", "irrigation_method": "Tube well", "field_size": 2.0},
+    {"soil_type": "Sandy Soil", "irrigation_method": "Rain-fed", "field_size": 0.3, "soil_ph": 6.0, "rainfall": 900},
+    {"soil_type": "Peat", "irrigation_method": "Bucket", "field_size": 1.0, "temperature": 45, "soil_ph": 4.0},
+    {"soil_type": "Clay Soil", "irrigation_method": "Canal", "field_size": 5.0, "rainfall": 1200, "temperature": 28},
+]
+HISTORIES = [
+    [{"crop": "Rice", "yield_per_acre": 22}, {"crop": "Rice", "yield_per_acre": 18}, {"crop": "Wheat", "yield_per_acre": 9}],
+    None,
+    [{"crop": "Maize", "yield_per_acre": 15}, {"crop": "Unknown", "yield_per_acre": 30}],
+    [{"crop": "Potato"}],
+]
+
+
+@pytest.fixture(scope="module")
+def service():
+    return MLService()
+
+
+def _reference_score(service, crop, farm, season, history):
+    """The rule engine for one farm and one crop, written out rule by rule."""
+    features, weights = service.crop_features[crop], service.model_weights
+    score = 0.0
+    if farm.get("soil_type") in features.get("preferred_soil", []):
+        score += weights["soil_type_weight"]
+    if season.lower() in {s.lower() for s in features.get("season", [])}:
+        score += weights["season_weight"]
+    if farm.get("field_size", 1.0) >= features.get("min_field_size", 0.5):
+        score += weights["field_size_weight"]
+    capacity = IRRIGATION_CAPACITY.get(farm.get("irrigation_method"), 0.5)
+    need = WATER_NEEDS.get(features.get("water_requirement", "Medium"), 0.5)
+    score += weights["irrigation_weight"] * (1.0 if capacity >= need else capacity / need)
+    if history:
+        yields = [h["yield_per_acre"] for h in history if h.get("crop") == crop and h.get("yield_per_acre")]
+        if yields:
+            average = sum(yields) / len(yields)
+            history_score = 0.8 if average > 20 else 0.6 if average > 15 else 0.4 if average > 10 else 0.2
+        else:
+            history_score = 0.5
+        score += weights["history_weight"] * history_score
+    windows = service.jharkhand_crops.get(crop.lower())
+    checked = inside = 0
+    for name, key in WINDOW_INPUTS:
+        if windows and farm.get(name) is not None:
+            checked += 1
+            low, high = windows[key]
+            inside += low <= farm[name] <= high
+    if checked:
+        score += (2 * inside / checked - 1) * WINDOW_ADJUSTMENT
+    return max(0.0, min(1.0, score))
+
+
+@pytest.mark.parametrize("season", ["Kharif", "rabi", "Monsoon"])
+def test_batch_scores_match_the_rules_and_single_farm_scores(service, season):
+    recommender = service.rule_recommender
+    batch = recommender.score(FARMS, season, HISTORIES)
+
+    for f, farm in enumerate(FARMS):
+        single = recommender.score([farm], season, [HISTORIES[f]])[0]
+        assert single == pytest.approx(batch[f])
+        for c, crop in enumerate(recommender.crops):
+            assert batch[f, c] == pytest.approx(_reference_score(service, crop, farm, season, HISTORIES[f])), (farm, crop)
+
+
+def test_scores_without_histories_skip_the_history_term(service):
+    recommender = service.rule_recommender
+    without = recommender.score(FARMS, "Kharif")
+    empty = recommender.score(FARMS, "Kharif", [[] for _ in FARMS])
+
+    assert np.allclose(without, empty)
+
+
+def test_empty_batches(service):
+    recommender = service.rule_recommender
+
+    assert recommender.score([], "Kharif").shape == (0, len(recommender.crops))
+    assert recommender.recommend([], "Kharif") == []
+
+
+def test_recommend_ranks_top_k_per_farm(service):
+    ranked = service.rule_recommender.recommend(FARMS, "Kharif", HISTORIES, top_k=2)
+    scores = service.rule_recommender.score(FARMS, "Kharif", HISTORIES)
+
+    assert [len(crops) for crops in ranked] == [2] * len(FARMS)
+    for f, crops in enumerate(ranked):
+        assert crops[0][1] == pytest.approx(scores[f].max())
+        assert crops[0][1] >= crops[1][1]
+
+
+def test_batch_route_helper_builds_recommendations(service):
+    batch = service.get_rule_based_recommendations_batch(FARMS[:2], "Kharif", HISTORIES[:2])
+
+    assert [len(recs) for recs in batch] == [3, 3]
+    assert batch[0][0].crop_name == service.rule_recommender.recommend(FARMS[:1], "Kharif", HISTORIES[:1])[0][0][0]
+
+
+def test_crops_without_windows_get_no_adjustment():
+    recommender = RuleRecommender(
+        {"Millet": {"preferred_soil": ["Red Soil"], "season": ["Kharif"], "water_requirement": "Low"}},
+        {"soil_type_weight": 0.3, "season_weight": 0.2, "field_size_weight": 0.1,
+         "irrigation_weight": 0.2, "history_weight": 0.2}
+    )
+    score = recommender.score([{"soil_type": "Red Soil", "field_size": 1, "soil_ph": 14}], "kharif")
+
+    assert score[0, 0] == pytest.approx(0.8)
@@ -0,0 +1,72 @@
+"""Tests for the streaming portal HTML extractor."""
+
+import re
+
+from app.services.streaming_html_parser import PortalStreamParser, iter_table_rows, parse_html, group_rows_by_table
+
+PAGE = """
+<html><head><script>var grid = "<table><tr><td>fake</td></tr></table>";</script></head>
+<body><form>
+<input type="hidden" name="__VIEWSTATE" value="abc">
+<input type="text" name="visible" value="ignored">
+<select name="ctl00$ddlState"><option value="0">--Select--</option><option value="JH">Jharkhand</option></select>
+<table id="layout"><tr><td>menu</td></tr></table>
+<table id="cphBody_GridPriceData" border="1">
+  <tr><th>Market</th><th>Commodity</th><th>Modal</th></tr>
+  <tr><td>Ranchi</td><td>Rice</td><td>2,000</td></tr>
+  <tr><td>Pandra <b>APMC</b></td><td>Wheat</td><td>2,100</td></tr>
+</table>
+</form></body></html>
+"""
+
+
+def _grid_only(attrs):
+    return "Grid" in attrs.get("id", "")
+
+
+def test_only_target_table_rows_are_emitted():
+    rows = parse_html(PAGE, PortalStreamParser(table_filter=_grid_only))
+
+    assert [row.cells for row in rows] == [
+        ["Market", "Commodity", "Modal"],
+        ["Ranchi", "Rice", "2,000"],
+        ["Pandra APMC", "Wheat", "2,100"],
+    ]
+    assert rows[0].is_header and not rows[1].is_header
+    assert rows[1].table_attrs["id"] == "cphBody_GridPriceData"
+
+
+def test_hidden_inputs_and_select_options_are_collected():
+    parser = PortalStreamParser(capture_tables=False)
+    assert parse_html(PAGE, parser) == []
+
+    assert parser.hidden_inputs == {"__VIEWSTATE": "abc"}
+    assert parser.find_select_options(re.compile(r".*[Ss]tate.*")) == [("0", "--Select--"), ("JH", "Jharkhand")]
+
+
+def test_rows_are_yielded_before_the_document_ends():
+    head = b'<table id="Grid"><tr><td>a</td></tr><tr><td>b</td></tr>'
+    parser = PortalStreamParser(table_filter=_grid_only)
+
+    parser.feed_chunk(head)
+    early = [row.cells for row in parser.drain_rows()]
+
+    assert early == [["a"], ["b"]]
+
+
+def test_multibyte_characters_split_across_chunks_survive():
+    body = '<table id="Grid"><tr><td>₹ 2000</td></tr></table>'.encode("utf-8")
+    split = body.index("₹".encode("utf-8")) + 1
+    rows = list(iter_table_rows([body[:split], body[split:]], PortalStreamParser(table_filter=_grid_only)))
+
+    assert rows[0].cells == ["₹ 2000"]
+
+
+def test_nested_tables_do_not_leak_into_the_target():
+    html = ('<table id="Grid"><tr><td>outer<table><tr><td>inner</td></tr></table></td></tr>'
+            '<tr><td>next</td></tr></table><table id="Grid2"><tr><td>second</td></tr></table>')
+    grouped = group_rows_by_table(parse_html(html, PortalStreamParser(table_filter=_grid_only), chunk_size=7))
+
+    assert len(grouped) == 2
+    assert ["next"] in list(grouped.values())[0]
+    assert list(grouped.values())[1] == [["second"]]
@@ -0,0 +1,91 @@
+"""Tests for the cached per-farm sustainability profile."""
+
+import asyncio
+
+import pytest
+
+from app.services import sustainability_service as sustainability_module
+from app.services.cache_service import MarketDataCache
+from app.services.sustainability_service import SustainabilityService
+
+FARM = {"id": "farm-1", "soil_type": "Loamy", "irrigation_method": "Drip", "field_size": 2.0}
+HISTORY = [
+    {"id": "h2", "crop": "Rice", "season": "Kharif", "year": 2025},
+    {"id": "h1", "crop": "Rice", "season": "Kharif", "year": 2024},
+]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(sustainability_module, "_profile_cache", MarketDataCache(max_entries=2))
+    service = SustainabilityService()
+    computed = []
+    compute = service.compute_profile
+
+    def counting(farm, history):
+        computed.append(farm["id"])
+        return compute(farm, history)
+
+    service.compute_profile = counting
+    service.computed = computed
+    return service
+
+
+def test_panels_share_one_computed_profile(service):
+    async def scenario():
+        return [
+            await service.calculate_sustainability_score(FARM, HISTORY),
+            await service.calculate_carbon_footprint(FARM, HISTORY),
+            await service.calculate_water_efficiency(FARM, HISTORY),
+            await service.assess_soil_health(FARM, HISTORY),
+            await service.calculate_biodiversity_score(FARM, HISTORY),
+            await service.get_sustainability_recommendations(FARM, HISTORY),
+        ]
+
+    panels = asyncio.run(scenario())
+
+    assert service.computed == ["farm-1"]
+    assert panels[0] == service.compute_profile(FARM, HISTORY)["score"]
+    assert any("Rotate crops: Rice" in r["recommendation"] for r in panels[-1])
+
+
+def test_changed_inputs_recompute_the_profile(service):
+    async def scenario():
+        before = await service.get_profile(FARM, HISTORY)
+        grown = [{"id": "h3", "crop": "Pulses", "season": "Rabi", "year": 2025}] + HISTORY
+        after_history = await service.get_profile(FARM, grown)
+        after_farm = await service.get_profile({**FARM, "irrigation_method": "Flood"}, grown)
+        return before, after_history, after_farm
+
+    before, after_history, after_farm = asyncio.run(scenario())
+
+    assert service.computed == ["farm-1"] * 3
+    assert after_history["biodiversity"]["distinct_crops"] == before["biodiversity"]["distinct_crops"] + 1
+    assert after_farm["water_efficiency"] != after_history["water_efficiency"]
+
+
+def test_cache_is_bounded(service):
+    async def scenario():
+        for farm_id in ("a", "b", "c"):
+            await service.get_profile({**FARM, "id": farm_id}, HISTORY)
+
+    asyncio.run(scenario())
+
+    assert SustainabilityService.get_cache_stats()["total_entries"] == 2
+
+
+def test_database_writes_drop_the_cached_profile(service, local_db):
+    cache = sustainability_module._profile_cache
+
+    async def scenario():
+        farm = await local_db.create_farm({"farmer_id": "demo-farmer-123", "name": "Cached"})
+        key = f"sustainability:{farm['id']}"
+        await service.get_profile(farm, [])
+        cached_before = cache.get(key) is not None
+        await local_db.add_crop_history({"farm_id": farm["id"], "crop": "Maize"})
+        dropped_by_history = cache.get(key) is None
+        await service.get_profile(farm, [])
+        await local_db.update_farm(farm["id"], {"irrigation_method": "Drip"})
+        return cached_before, dropped_by_history, cache.get(key) is None
+
+    assert asyncio.run(scenario()) == (True, True, True)
@@ -0,0 +1,140 @@
+"""Tests for upstream circuit breakers and the scraper's failure accounting."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import upstream_health as upstream_health_module
+from app.services.upstream_health import CircuitBreaker, CircuitOpenError, UpstreamHealthRegistry, upstream_health
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(upstream_health_module.time, "monotonic", fake)
+    return fake
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("portal", failure_threshold=3, cooldown=10)
+
+    breaker.record_failure(TimeoutError())
+    breaker.record_failure(TimeoutError())
+    breaker.record_success(0.1)
+    breaker.record_failure(TimeoutError())
+    breaker.record_failure(TimeoutError())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure(TimeoutError())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.get_stats()["rejections"] == 2
+
+
+def test_half_open_probe_closes_or_backs_off(clock):
+    breaker = CircuitBreaker("portal", failure_threshold=1, cooldown=10, max_cooldown=25)
+    breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # one probe at a time
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_in() == 20
+
+    clock.now += 20
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.retry_in() == 25  # capped at max_cooldown
+
+    clock.now += 25
+    assert breaker.allow_request()
+    breaker.record_success(0.2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.get_stats()["cooldown_s"] == 10
+
+
+def test_timeout_adapts_to_recent_latency():
+    breaker = CircuitBreaker("portal", default_timeout=30, min_timeout=2, max_timeout=30)
+    assert breaker.current_timeout() == 30
+
+    for latency in (0.5, 0.6, 0.7, 0.8, 4.0):
+        breaker.record_success(latency)
+    assert breaker.current_timeout() == 8.0
+
+    for _ in range(20):
+        breaker.record_success(0.1)
+    assert breaker.current_timeout() == 2.0
+
+
+def test_registry_resets_and_renders_metrics():
+    registry = UpstreamHealthRegistry()
+    for _ in range(3):
+        registry.breaker("enam").record_failure()
+    registry.breaker("agmarknet").record_success(0.3)
+
+    metrics = registry.render_metrics()
+    assert 'upstream_circuit_state{source="enam"} 2' in metrics
+    assert 'upstream_requests_success_total{source="agmarknet"} 1' in metrics
+
+    assert registry.reset("missing") == 0
+    assert registry.reset("enam") == 1
+    assert registry.breaker("enam").state == CircuitBreaker.CLOSED
+    assert registry.reset() == 2
+
+
+@pytest.mark.parametrize("error, counted", [
+    (httpx.ConnectError("refused"), True),
+    (httpx.TooManyRedirects("loop"), True),
+    (httpx.HTTPStatusError("bad", request=httpx.Request("GET", "http://x"),
+                           response=httpx.Response(502)), True),
+    (ValueError("layout changed"), False),
+])
+def test_scraper_counts_only_transport_errors_against_the_portal(monkeypatch, error, counted):
+    from app.services.enhanced_agmarknet_scraper import EnhancedAGMARKNETScraper
+
+    scraper = EnhancedAGMARKNETScraper()
+    upstream_health.reset("agmarknet")
+    breaker = upstream_health.breaker("agmarknet")
+    failures = breaker.get_stats()["failures"]
+
+    async def failing_endpoint(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(scraper, "_try_endpoint", failing_endpoint)
+    monkeypatch.setattr(scraper, "endpoints", ["/only.aspx"])
+    result = asyncio.run(scraper.get_market_data("Ranchi"))
+
+    assert result["data_source"] == "enhanced_fallback"
+    assert breaker.get_stats()["failures"] - failures == (1 if counted else 0)
+    upstream_health.reset("agmarknet")
+
+
+def test_breaker_reset_requires_an_admin(admin_headers, farmer_headers):
+    from app.api.admin import admin_router
+
+    app = FastAPI()
+    app.include_router(admin_router, prefix="/admin")
+    client = TestClient(app)
+    upstream_health.breaker("enam")
+
+    assert client.post("/admin/upstream-health/enam/reset").status_code == 401
+    assert client.post("/admin/upstream-health/enam/reset", headers=farmer_headers).status_code == 403
+    response = client.post("/admin/upstream-health/enam/reset", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["reset"] == 1